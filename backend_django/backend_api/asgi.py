@@ -13,4 +13,6 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_api.settings')
 
+# As rotas /api/v1/async/ (parceiros/api/views_async.py) só rendem sob ASGI, ex.:
+#   uvicorn backend_api.asgi:application --workers 1
 application = get_asgi_application()
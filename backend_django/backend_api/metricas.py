@@ -0,0 +1,194 @@
+# CÓDIGO para: backend_django/backend_api/metricas.py
+
+# Registro de métricas em memória (por processo) exportado no formato texto do
+# Prometheus em /metrics. Contadores e histogramas com buckets fixos: cada
+# observação custa um bisect e um lock curto, então dá para deixar ligado em produção.
+#
+# Cada processo (worker do gunicorn/uvicorn) responde só com os próprios
+# números e eles zeram quando o processo reinicia. Com vários workers, o
+# Prometheus precisa coletar cada um (ex.: uma porta por worker) e somar na
+# consulta com sum(rate(...)); /metrics atrás do balanceador mostra um worker
+# qualquer a cada coleta.
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Buckets (segundos) pensados para requisições web e chamadas HTTP externas
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _chave(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _formatar_labels(chave, extra=()):
+    itens = list(chave) + list(extra)
+    if not itens:
+        return ''
+    texto = ','.join('%s="%s"' % (nome, str(valor).replace('\\', '\\\\').replace('"', '\\"')) for nome, valor in itens)
+    return '{%s}' % texto
+
+
+class Contador:
+    def __init__(self, nome, ajuda):
+        self.nome = nome
+        self.ajuda = ajuda
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, valor=1, **labels):
+        chave = _chave(labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        with self._lock:
+            for chave, valor in sorted(self._valores.items()):
+                linhas.append(f"{self.nome}{_formatar_labels(chave)} {valor}")
+        return linhas
+
+
+class Histograma:
+    def __init__(self, nome, ajuda, buckets=BUCKETS_PADRAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.buckets = tuple(buckets)
+        self._series = {}  # chave -> [contagens por bucket..., +Inf], soma
+        self._lock = threading.Lock()
+
+    def observar(self, valor, **labels):
+        chave = _chave(labels)
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            series = [(chave, list(contagens), soma) for chave, (contagens, soma) in sorted(self._series.items())]
+        for chave, contagens, soma in series:
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + ('+Inf',), contagens):
+                acumulado += contagem
+                linhas.append(f"{self.nome}_bucket{_formatar_labels(chave, [('le', limite)])} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_formatar_labels(chave)} {soma}")
+            linhas.append(f"{self.nome}_count{_formatar_labels(chave)} {acumulado}")
+        return linhas
+
+
+# --- MÉTRICAS DO PROJETO ---
+
+REQUISICOES_DURACAO = Histograma(
+    'http_requisicao_duracao_segundos', 'Duração das requisições por rota, método e status.')
+REQUISICOES_CONSULTAS = Histograma(
+    'http_requisicao_consultas_sql', 'Consultas SQL por requisição.', buckets=(0, 1, 2, 5, 10, 20, 50, 100))
+REQUISICOES_FASES = Histograma(
+    'http_requisicao_fase_duracao_segundos', 'Tempo das fases da requisição (banco, serialização, render, API externa).')
+CONSULTAS_DURACAO = Histograma(
+    'db_consulta_duracao_segundos', 'Duração das consultas SQL por banco.')
+API_EXTERNA_DURACAO = Histograma(
+    'embedded_api_duracao_segundos', 'Duração das chamadas à API Embedded por operação e status.')
+REQUISICOES_LENTAS = Contador(
+    'http_requisicoes_lentas_total', 'Requisições acima do limiar de lentidão.')
+
+REGISTRO = [
+    REQUISICOES_DURACAO, REQUISICOES_CONSULTAS, REQUISICOES_FASES,
+    CONSULTAS_DURACAO, API_EXTERNA_DURACAO, REQUISICOES_LENTAS,
+]
+
+# Funções extras que devolvem linhas prontas (ex.: cache e disjuntor dos parceiros)
+_coletores = []
+
+
+def registrar_coletor(funcao):
+    """Registra uma função sem argumentos que devolve linhas no formato Prometheus."""
+    if funcao not in _coletores:
+        _coletores.append(funcao)
+
+
+def _linhas(tipo, nome, ajuda, valores):
+    linhas = [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+    for labels, valor in valores:
+        linhas.append(f"{nome}{_formatar_labels(_chave(labels))} {valor}")
+    return linhas
+
+
+def linhas_gauge(nome, ajuda, valores):
+    """Formata um gauge para coletores: `valores` é uma lista de (labels, valor)."""
+    return _linhas('gauge', nome, ajuda, valores)
+
+
+def linhas_contador(nome, ajuda, valores):
+    """
+    Formata um contador (só cresce; volta a zero quando o processo reinicia)
+    para coletores. `nome` deve terminar em _total, como os do Prometheus.
+    """
+    return _linhas('counter', nome, ajuda, valores)
+
+
+def exportar_prometheus():
+    linhas = []
+    for metrica in REGISTRO:
+        linhas.extend(metrica.exportar())
+    for coletor in _coletores:
+        linhas.extend(coletor())
+    return '\n'.join(linhas) + '\n'
+
+
+# --- COLETA POR REQUISIÇÃO ---
+# O middleware abre uma coleta; código de qualquer camada pode somar o tempo de
+# uma fase nela (ex.: services soma as chamadas externas) sem receber o request.
+
+_coleta_atual = ContextVar('coleta_metricas', default=None)
+
+
+class Coleta:
+    def __init__(self, guardar_sql):
+        self.guardar_sql = guardar_sql
+        self.consultas = 0
+        self.fases = {}
+        self.sql = []
+
+    def somar_fase(self, fase, segundos):
+        self.fases[fase] = self.fases.get(fase, 0.0) + segundos
+
+
+def iniciar_coleta(guardar_sql=True):
+    coleta = Coleta(guardar_sql)
+    return coleta, _coleta_atual.set(coleta)
+
+
+def encerrar_coleta(token):
+    _coleta_atual.reset(token)
+
+
+def coleta_atual():
+    return _coleta_atual.get()
+
+
+def somar_fase(fase, segundos):
+    """Soma `segundos` à fase da requisição em andamento (se houver)."""
+    coleta = _coleta_atual.get()
+    if coleta is not None:
+        coleta.somar_fase(fase, segundos)
+
+
+@contextmanager
+def medir_fase(fase):
+    """Cronometra o bloco e soma o tempo na fase da requisição em andamento."""
+    if _coleta_atual.get() is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        somar_fase(fase, time.perf_counter() - inicio)
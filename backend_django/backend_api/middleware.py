@@ -0,0 +1,128 @@
+# CÓDIGO para: backend_django/backend_api/middleware.py
+
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import metricas
+
+logger = logging.getLogger('backend_api.instrumentacao')
+
+
+def _coletar_consulta(execute, sql, params, many, context):
+    """
+    execute_wrapper fixo de cada conexão: conta e cronometra a consulta na coleta
+    da requisição em andamento. A coleta vem de um ContextVar, que o sync_to_async
+    leva junto; assim as consultas das views async (ORM em outra thread, com outra
+    conexão) também entram na conta.
+    """
+    coleta = metricas.coleta_atual()
+    if coleta is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duracao = time.perf_counter() - inicio
+        alias = context['connection'].alias
+        coleta.consultas += 1
+        coleta.somar_fase('banco', duracao)
+        metricas.CONSULTAS_DURACAO.observar(duracao, banco=alias)
+        # Só o SQL (sem os parâmetros, que podem ter dados pessoais)
+        if coleta.guardar_sql and len(coleta.sql) < getattr(settings, 'INSTRUMENTACAO_MAX_CONSULTAS_LOG', 50):
+            coleta.sql.append((duracao, alias, sql))
+
+
+def _instalar_coletor(connection, **kwargs):
+    """Põe o coletor na conexão (uma vez por conexão, em qualquer thread)."""
+    if _coletar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_coletar_consulta)
+
+
+# Cada thread tem as próprias conexões: o sinal cobre as que abrirem daqui em diante
+connection_created.connect(_instalar_coletor, dispatch_uid='backend_api.instrumentacao')
+
+
+def _instalar_nas_conexoes_da_thread():
+    """Conexões desta thread abertas antes do middleware carregar (o sinal não as viu)."""
+    for conexao in connections.all(initialized_only=True):
+        _instalar_coletor(conexao)
+
+
+def _rota(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'nao_resolvida'
+    return match.view_name or match.route
+
+
+class InstrumentacaoMiddleware:
+    """
+    Mede cada requisição: latência por rota/método/status, nº e tempo das
+    consultas SQL (execute_wrapper fixo em cada conexão), tempo das fases
+    (banco, serialização, render, API externa) e registra no log as
+    requisições acima de INSTRUMENTACAO_LIMIAR_LENTO com a lista de consultas.
+    Deve ser o primeiro middleware para medir a requisição inteira.
+    """
+
+    sync_capable = True
+    async_capable = True  # Sob ASGI não força as views async a rodarem em thread
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limiar = getattr(settings, 'INSTRUMENTACAO_LIMIAR_LENTO', 1.0)
+        self.modo_async = iscoroutinefunction(get_response)
+        if self.modo_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.modo_async:
+            return self.__acall__(request)
+        _instalar_nas_conexoes_da_thread()
+        coleta, token = metricas.iniciar_coleta()
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metricas.encerrar_coleta(token)
+        self._registrar(request, response, time.perf_counter() - inicio, coleta)
+        return response
+
+    async def __acall__(self, request):
+        coleta, token = metricas.iniciar_coleta()
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metricas.encerrar_coleta(token)
+        self._registrar(request, response, time.perf_counter() - inicio, coleta)
+        return response
+
+    def _registrar(self, request, response, duracao, coleta):
+        rota = _rota(request)
+        metricas.REQUISICOES_DURACAO.observar(
+            duracao, rota=rota, metodo=request.method, status=response.status_code
+        )
+        metricas.REQUISICOES_CONSULTAS.observar(coleta.consultas, rota=rota)
+        for fase, segundos in coleta.fases.items():
+            metricas.REQUISICOES_FASES.observar(segundos, rota=rota, fase=fase)
+
+        if self.limiar is not None and duracao >= self.limiar:
+            metricas.REQUISICOES_LENTAS.incrementar(rota=rota)
+            self._registrar_lenta(request, response, rota, duracao, coleta)
+
+    def _registrar_lenta(self, request, response, rota, duracao, coleta):
+        fases = ', '.join(f"{fase}={segundos * 1000:.1f}ms" for fase, segundos in sorted(coleta.fases.items()))
+        linhas = [
+            f"Requisição lenta: {request.method} {request.path} ({rota}) -> {response.status_code} "
+            f"em {duracao * 1000:.1f}ms; {coleta.consultas} consultas; {fases or 'sem fases'}"
+        ]
+        for segundos, alias, sql in coleta.sql:
+            linhas.append(f"  [{alias}] {segundos * 1000:8.2f}ms  {sql}")
+        if coleta.consultas > len(coleta.sql):
+            linhas.append(f"  ... mais {coleta.consultas - len(coleta.sql)} consultas omitidas")
+        logger.warning('\n'.join(linhas))
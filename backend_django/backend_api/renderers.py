@@ -0,0 +1,44 @@
+# CÓDIGO para: backend_django/backend_api/renderers.py
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+from .metricas import medir_fase
+
+
+class JSONRendererInstrumentado(JSONRenderer):
+    """JSONRenderer do DRF que soma o tempo de render na fase 'render' da requisição."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with medir_fase('render'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class JSONRendererRapido(JSONRendererInstrumentado):
+    """
+    Gera com orjson os mesmos bytes do JSONRenderer (compacto, UTF-8,
+    U+2028/U+2029 escapados). Datas e tipos que o orjson não conhece passam
+    pelo encoder do DRF. Com indentação (API navegável, `; indent=`) ou com
+    UNICODE_JSON/COMPACT_JSON desligados, usa o JSONRenderer normal.
+    Diferença conhecida: floats em notação científica (1e-05 vira 1e-5).
+    """
+    _OPCOES = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._default = self.encoder_class(ensure_ascii=False).default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        with medir_fase('render'):
+            try:
+                ret = orjson.dumps(data, default=self._default, option=self._OPCOES)
+            except TypeError:
+                # Ex.: inteiros acima de 64 bits; o json da stdlib aceita
+                return JSONRenderer.render(self, data, accepted_media_type, renderer_context)
+        # Como o JSONRenderer: escapa os separadores de linha/parágrafo do JavaScript
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
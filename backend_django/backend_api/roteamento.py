@@ -0,0 +1,63 @@
+# CÓDIGO para: backend_django/backend_api/roteamento.py
+
+# Roteamento entre o banco primário ('default') e a réplica de leitura
+# ('replica', opcional; ver DATABASES em settings). Por padrão tudo vai para o
+# primário: só as leituras feitas dentro de leitura_na_replica() (ex.: list,
+# retrieve, exportar e stats da API de parceiros) usam a réplica.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARIO = 'default'
+REPLICA = 'replica'
+
+_na_replica = ContextVar('leitura_na_replica', default=False)
+
+
+def replica_configurada():
+    return REPLICA in settings.DATABASES
+
+
+def banco_de_leitura():
+    """Alias usado pelas leituras neste ponto do código."""
+    return REPLICA if _na_replica.get() and replica_configurada() else PRIMARIO
+
+
+def lendo_da_replica():
+    return banco_de_leitura() == REPLICA
+
+
+def ativar_replica(ativa=True):
+    """Liga/desliga as leituras na réplica no contexto atual; retorna o token para restaurar()."""
+    return _na_replica.set(ativa)
+
+
+def restaurar(token):
+    _na_replica.reset(token)
+
+
+@contextmanager
+def leitura_na_replica(ativa=True):
+    token = ativar_replica(ativa)
+    try:
+        yield
+    finally:
+        restaurar(token)
+
+
+class RoteadorBancos:
+    def db_for_read(self, model, **hints):
+        return REPLICA if lendo_da_replica() else None  # None: o padrão do Django (primário)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARIO
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primário e réplica têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # A réplica recebe o esquema pela replicação
+        return db != REPLICA
@@ -1,7 +1,10 @@
 from . import config
 import os
+import tempfile
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -35,12 +38,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend_api.middleware.InstrumentacaoMiddleware',  # Primeiro: mede a requisição inteira
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'parceiros.idempotencia.IdempotenciaMiddleware',  # Depois da sessão e da autenticação: a chave vale por cliente
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -68,13 +73,104 @@ WSGI_APPLICATION = 'backend_api.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# SQLite em desenvolvimento; em produção DJANGO_DB_ENGINE=postgresql (requer
+# psycopg; com DJANGO_DB_POOL=1, psycopg[pool]). As conexões são reaproveitadas
+# entre requisições (CONN_MAX_AGE) e testadas antes do uso (CONN_HEALTH_CHECKS).
+# Com DJANGO_DB_REPLICA_HOST as leituras da API de parceiros vão para a réplica
+# (ver backend_api/roteamento.py).
+
+DB_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', '60'))  # Segundos (0 = uma conexão por requisição)
+
+if DB_ENGINE == 'postgresql':
+    _banco = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DJANGO_DB_NAME', 'parceiros'),
+        'USER': os.environ.get('DJANGO_DB_USER', 'parceiros'),
+        'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+        'HOST': os.environ.get('DJANGO_DB_HOST', '127.0.0.1'),
+        'PORT': os.environ.get('DJANGO_DB_PORT', '5432'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    if os.environ.get('DJANGO_DB_POOL', '0') == '1':
+        # Pool do psycopg no processo: substitui as conexões persistentes
+        _banco['CONN_MAX_AGE'] = 0
+        _banco['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DJANGO_DB_POOL_MIN', '2')),
+            'max_size': int(os.environ.get('DJANGO_DB_POOL_MAX', '10')),
+            'timeout': 10,
+        }
+    DATABASES = {'default': _banco}
+    if os.environ.get('DJANGO_DB_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **_banco,
+            'OPTIONS': dict(_banco['OPTIONS']),
+            'HOST': os.environ['DJANGO_DB_REPLICA_HOST'],
+            'PORT': os.environ.get('DJANGO_DB_REPLICA_PORT', _banco['PORT']),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                # WAL: leitores não bloqueiam o escritor (nem o contrário)
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+                # BEGIN IMMEDIATE: a escrita pega a trava no início da transação e
+                # espera até `timeout` segundos (busy_timeout) em vez de falhar com
+                # "database is locked" ao promover uma leitura para escrita
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': int(os.environ.get('DJANGO_DB_SQLITE_TIMEOUT', '20')),
+            },
+        }
+    }
+
+DATABASE_ROUTERS = ['backend_api.roteamento.RoteadorBancos']
+
+# Leituras da API de parceiros na réplica: depois de uma escrita o cliente lê do
+# primário (cookie) por este tempo, e o cache não guarda respostas da réplica
+# montadas logo após uma escrita (a réplica pode ainda não tê-la recebido).
+PARCEIROS_REPLICA_ATRASO_MAXIMO = 5  # Segundos
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# locmem em desenvolvimento; em produção use 'file' ou 'redis' (compatível com
+# Redis/Valkey) para que o cache seja compartilhado entre os processos.
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_LOCATIONS_PADRAO = {
+    'locmem': '',
+    'file': str(BASE_DIR / 'cache'),
+    'redis': 'redis://127.0.0.1:6379/1',
+}
+CACHE_BACKEND = os.environ.get('DJANGO_CACHE_BACKEND', 'locmem')
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', CACHE_LOCATIONS_PADRAO[CACHE_BACKEND]),
     }
 }
 
+# Cache de leitura da API de parceiros (parceiros/cache.py)
+PARCEIROS_CACHE_ALIAS = 'default'
+PARCEIROS_CACHE_TIMEOUT = 300  # Segundos
+
+# list/retrieve em JSON com .values() + ParceiroLeituraSerializer (parceiros/api/serializers.py)
+PARCEIROS_LEITURA_ENXUTA = True
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -119,4 +215,118 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000", # Endereço padrão do React
-]
\ No newline at end of file
+]
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
+
+# --- API EMBEDDED (Power Embedded) ---
+EMBEDDED_API_URL = os.environ.get('EMBEDDED_API_URL', 'https://api.powerembedded.com.br/api/user')
+# Pool de conexões HTTP usado por parceiros/services.py
+EMBEDDED_API_POOL_CONNECTIONS = 4   # Nº de hosts distintos mantidos no pool
+EMBEDDED_API_POOL_MAXSIZE = 20      # Conexões keep-alive por host
+EMBEDDED_API_CONNECT_TIMEOUT = 3.05 # Segundos para abrir a conexão
+EMBEDDED_API_READ_TIMEOUT = 10      # Segundos esperando a resposta
+EMBEDDED_API_MAX_RETRIES = 3        # Retries (só métodos idempotentes)
+EMBEDDED_API_BACKOFF_FACTOR = 0.5   # Backoff exponencial entre retries
+EMBEDDED_API_PARAM_PAGINA = 'page'      # Parâmetros da listagem paginada de usuários
+EMBEDDED_API_PARAM_TAMANHO = 'pageSize'
+
+# Espelho local dos usuários da API (parceiros/espelho.py), atualizado por
+# `python manage.py sincronizar_usuarios_embedded`
+PARCEIROS_ESPELHO_TTL = 3600  # Segundos em que uma entrada (ou sincronização) é confiável
+
+# --- PROVISIONAMENTO ASSÍNCRONO DE PARCEIROS ---
+# True: o POST responde 202 e o cadastro na API é feito pelo comando
+# `python manage.py processar_provisionamentos` (o cliente também pode pedir
+# esse modo por requisição com o header `Prefer: respond-async`).
+PARCEIROS_PROVISIONAMENTO_ASSINCRONO = False
+PARCEIROS_PROVISIONAMENTO_MAX_TENTATIVAS = 5
+PARCEIROS_PROVISIONAMENTO_BACKOFF = 30            # Segundos (dobra a cada tentativa)
+PARCEIROS_PROVISIONAMENTO_TIMEOUT_RESERVA = 300   # Segundos até liberar tarefa presa
+
+# --- OUTBOX DA API EMBEDDED (parceiros/outbox.py) ---
+# True: criação, atualização e deleção só gravam no banco (criação como PENDENTE,
+# demais como EventoOutbox) e o comando `python manage.py despachar_outbox`
+# (junto com `processar_provisionamentos`) leva as alterações à API.
+# Desligada por padrão: muda o contrato da API (a criação responde 202 em vez de
+# 201) e exige os dois comandos rodando. Ligue com PARCEIROS_OUTBOX=1.
+PARCEIROS_OUTBOX = os.environ.get('PARCEIROS_OUTBOX', '0') == '1'
+PARCEIROS_OUTBOX_MAX_TENTATIVAS = 8
+PARCEIROS_OUTBOX_BACKOFF = 10             # Segundos (dobra a cada tentativa)
+PARCEIROS_OUTBOX_TIMEOUT_RESERVA = 300    # Segundos até liberar evento preso
+
+# --- DEFINIÇÃO DE SENHAS EM LOTE (parceiros/senhas.py) ---
+PARCEIROS_SENHA_WORKERS = 8          # Chamadas simultâneas a /change-password
+PARCEIROS_SENHA_LOTE_MAXIMO = 1000   # Parceiros por requisição
+
+# --- RESUMO DO PAINEL (GET /parceiros/stats/, parceiros/resumo.py) ---
+PARCEIROS_STATS_DIAS = 30   # Janela padrão de "vencendo nos próximos N dias"
+
+# --- HISTÓRICO DE ALTERAÇÕES (GET /parceiros/changes/, parceiros/historico.py) ---
+# Segundos de atraso na entrega das alterações. No SQLite as escritas são
+# serializadas (0 basta); com escritas concorrentes (PostgreSQL) o atraso evita
+# que um seq menor confirmado depois de um maior seja pulado pelo cursor.
+PARCEIROS_ALTERACOES_ATRASO = int(os.environ.get('PARCEIROS_ALTERACOES_ATRASO', 0 if DB_ENGINE == 'sqlite' else 3))
+
+# --- DETECÇÃO DE DUPLICADOS (parceiros/duplicados.py) ---
+# O POST de criação responde 409 quando já existe parceiro com o mesmo CNPJ ou
+# nome parecido (o cliente pode forçar com ?ignorar_duplicados=true). O
+# relatório completo: GET /parceiros/duplicados/ ou `python manage.py detectar_duplicados`.
+PARCEIROS_VERIFICAR_DUPLICADOS = True
+PARCEIROS_DUPLICADOS_LIMIAR = 0.6  # Similaridade (Jaccard dos trigramas dos nomes) mínima
+
+# --- IDEMPOTENCY-KEY NAS ESCRITAS DA API (parceiros/idempotencia.py) ---
+# POST/PUT/PATCH/DELETE com o header Idempotency-Key guardam a resposta; a
+# repetição recebe a resposta gravada sem executar de novo.
+PARCEIROS_IDEMPOTENCIA_PREFIXO = '/api/'
+PARCEIROS_IDEMPOTENCIA_TTL = 86400               # Segundos que a resposta fica guardada
+PARCEIROS_IDEMPOTENCIA_ESPERA = 30               # Segundos que uma repetição async espera pela original (as síncronas recebem 409 na hora)
+PARCEIROS_IDEMPOTENCIA_TIMEOUT_RESERVA = 300     # Segundos até assumir a chave de um processo que caiu
+
+# --- AÇÕES EM MASSA DO ADMIN (parceiros/acoes_em_massa.py) ---
+# Executadas pelo comando `python manage.py processar_acoes_em_massa`.
+PARCEIROS_ACOES_TIMEOUT_RESERVA = 600  # Segundos até liberar lote preso
+
+# E-mail (reenvio de senha pelo admin). Em produção use o backend SMTP
+# (django.core.mail.backends.smtp.EmailBackend) com EMAIL_HOST etc.
+EMAIL_BACKEND = os.environ.get('DJANGO_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('DJANGO_EMAIL_HOST', 'localhost')
+DEFAULT_FROM_EMAIL = os.environ.get('DJANGO_DEFAULT_FROM_EMAIL', 'nao-responda@localhost')
+
+# --- PROTEÇÕES DAS CHAMADAS À API EMBEDDED (parceiros/resiliencia.py) ---
+# Limite de taxa compartilhado entre os processos da máquina (arquivo SQLite local)
+EMBEDDED_API_RATE_LIMIT = 10          # Requisições por segundo (0/None desliga)
+EMBEDDED_API_RATE_LIMIT_RAJADA = 20   # Fichas acumuladas para picos
+EMBEDDED_API_RATE_LIMIT_ESPERA = 2    # Segundos que uma chamada espera pela ficha
+# Fora do código-fonte; os processos da máquina precisam apontar para o mesmo arquivo
+EMBEDDED_API_RATE_LIMIT_ARQUIVO = os.environ.get(
+    'EMBEDDED_API_RATE_LIMIT_ARQUIVO', os.path.join(tempfile.gettempdir(), 'parceiros_ratelimit.sqlite3')
+)
+# Disjuntor: abre com >= 50% de falhas em 30 s (mínimo de 10 chamadas)
+EMBEDDED_API_DISJUNTOR_LIMIAR = 0.5
+EMBEDDED_API_DISJUNTOR_VOLUME_MINIMO = 10
+EMBEDDED_API_DISJUNTOR_JANELA = 30        # Segundos
+EMBEDDED_API_DISJUNTOR_TEMPO_ABERTO = 30  # Segundos até a chamada de teste
+
+# --- INSTRUMENTAÇÃO (backend_api/middleware.py e /metrics) ---
+INSTRUMENTACAO_LIMIAR_LENTO = 1.0          # Segundos; requisições acima disso vão para o log (None desliga)
+INSTRUMENTACAO_MAX_CONSULTAS_LOG = 50      # Consultas listadas no log de requisição lenta
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN', '')  # /metrics exige "Authorization: Bearer"; vazio = fechado
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend_api.renderers.JSONRendererRapido',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'backend_api.instrumentacao': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from parceiros.api.views import ParceiroViewSet # Importa nossa View da API
+from parceiros.api.views_async import ParceiroCriacaoAsyncView, ParceiroDetalheAsyncView, ParceiroSenhaAsyncView
+from .views import metricas_prometheus
 
 # Configura o roteador do DRF
 router = DefaultRouter()
@@ -10,4 +12,10 @@ router.register(r'parceiros', ParceiroViewSet, basename='parceiro')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include(router.urls)), # Aqui está a rota da nossa API
+    # Escritas assíncronas (para servidores ASGI; ver parceiros/api/views_async.py)
+    path('api/v1/async/parceiros/', ParceiroCriacaoAsyncView.as_view(), name='parceiro-async-list'),
+    path('api/v1/async/parceiros/<int:pk>/', ParceiroDetalheAsyncView.as_view(), name='parceiro-async-detail'),
+    path('api/v1/async/parceiros/<int:pk>/definir-senha/', ParceiroSenhaAsyncView.as_view(),
+         name='parceiro-async-definir-senha'),
+    path('metrics', metricas_prometheus, name='metrics'), # Métricas (Prometheus)
 ]
\ No newline at end of file
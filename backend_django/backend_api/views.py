@@ -0,0 +1,20 @@
+# CÓDIGO para: backend_django/backend_api/views.py
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .metricas import exportar_prometheus
+
+
+def metricas_prometheus(request):
+    """
+    Métricas do processo no formato texto do Prometheus.
+    Exige `Authorization: Bearer <METRICAS_TOKEN>`; sem token configurado o
+    endpoint fica fechado (as rotas e os volumes não devem ficar públicos).
+    """
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    enviado = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    if not token or not constant_time_compare(enviado, token):
+        return HttpResponseForbidden()
+    return HttpResponse(exportar_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,163 @@
+# CÓDIGO para: backend_django/parceiros/acoes_em_massa.py
+
+# Ações em massa do admin em segundo plano. A action do admin só grava os ids
+# selecionados em lotes de AcaoEmMassa (um INSERT por lote, sem chamar a API
+# nem alterar parceiros na requisição); o comando `processar_acoes_em_massa`
+# reserva os lotes e executa cada um com UPDATEs em lote e, quando há chamadas
+# à API, em paralelo.
+
+import secrets
+import string
+import uuid
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import invalidar_cache_parceiros
+from .concorrencia import executar_em_paralelo
+from .models import AcaoEmMassa, Parceiro
+from . import historico, outbox, resumo, senhas, services
+
+TAMANHO_LOTE = 500
+
+
+def _config(nome, padrao):
+    return getattr(settings, nome, padrao)
+
+
+# --- ENFILEIRAMENTO (admin) ---
+
+def enfileirar(acao, queryset, solicitada_por='', tamanho_lote=TAMANHO_LOTE):
+    """Grava os ids do queryset em lotes de AcaoEmMassa. Retorna (parceiros, lotes)."""
+    grupo = uuid.uuid4()
+    ids = queryset.order_by('id').values_list('id', flat=True).iterator(chunk_size=2000)
+    total = lotes = 0
+    while True:
+        bloco = list(islice(ids, tamanho_lote * 20))
+        if not bloco:
+            return total, lotes
+        novos = [
+            AcaoEmMassa(grupo=grupo, acao=acao, parceiro_ids=bloco[i:i + tamanho_lote], solicitada_por=solicitada_por)
+            for i in range(0, len(bloco), tamanho_lote)
+        ]
+        AcaoEmMassa.objects.bulk_create(novos)
+        total += len(bloco)
+        lotes += len(novos)
+
+
+# --- EXECUÇÃO DE CADA AÇÃO: retornam (processados, erros=[[id, mensagem]]) ---
+
+def desativar(ids, workers=1):
+    with transaction.atomic():
+        alvos = list(Parceiro.objects.select_for_update().filter(id__in=ids, status=True).values_list('id', flat=True))
+        resumo.atualizar_com_resumo(Parceiro.objects.filter(id__in=alvos), status=False, data_atualizacao=timezone.now())
+        # update() não dispara signals: histórico e cache são atualizados aqui
+        historico.registrar_alteracoes((pk, {'status': False}) for pk in alvos)
+        invalidar_cache_parceiros()
+    return len(alvos), []
+
+
+def sincronizar(ids, workers=4):
+    parceiros = list(
+        Parceiro.objects.filter(id__in=ids, api_user_id__isnull=False).only('id', 'api_user_id', *services.CAMPOS_API)
+    )
+    if outbox.outbox_ativa():
+        with transaction.atomic():
+            outbox.registrar_atualizacoes(parceiros)
+        return len(parceiros), []
+    resultados = executar_em_paralelo(outbox.sincronizar_direto, parceiros, workers)
+    erros = [[parceiro.pk, erro] for parceiro, (sucesso, erro) in zip(parceiros, resultados) if not sucesso]
+    return len(parceiros), erros
+
+
+def gerar_senha_temporaria(tamanho=12):
+    """Senha aleatória com maiúscula, minúscula, dígito e símbolo."""
+    grupos = (string.ascii_uppercase, string.ascii_lowercase, string.digits, '@#$%&*!')
+    caracteres = [secrets.choice(grupo) for grupo in grupos]
+    caracteres += [secrets.choice(''.join(grupos)) for _ in range(tamanho - len(caracteres))]
+    secrets.SystemRandom().shuffle(caracteres)
+    return ''.join(caracteres)
+
+
+def _mensagem_senha(email, senha):
+    return EmailMessage(
+        subject="Sua nova senha de acesso",
+        body=f"Uma nova senha foi gerada para o seu acesso aos relatórios.\n\nUsuário: {email}\nSenha: {senha}\n",
+        to=[email],
+    )
+
+
+def reenviar_senha(ids, workers=None):
+    """Gera uma senha nova, define na API e envia por e-mail ao gestor."""
+    itens = [{'id': pk, 'senha': gerar_senha_temporaria()} for pk in ids]
+    relatorio = senhas.definir_senhas(itens, workers)
+    emails = dict(Parceiro.objects.filter(id__in=ids).values_list('id', 'email_gestor'))
+    geradas = {item['id']: item['senha'] for item in itens}
+
+    definidos = [linha['id'] for linha in relatorio if linha['resultado'] == 'DEFINIDA']
+    erros = [[linha['id'], linha['erro']] for linha in relatorio if linha['resultado'] != 'DEFINIDA']
+    with get_connection() as conexao:
+        # Uma conexão SMTP para o lote inteiro
+        for pk in definidos:
+            try:
+                conexao.send_messages([_mensagem_senha(emails[pk], geradas[pk])])
+            except Exception as e:
+                erros.append([pk, f"Senha definida, mas o e-mail não foi enviado: {e}"])
+    return len(relatorio), erros
+
+
+EXECUTORES = {
+    'DESATIVAR': desativar,
+    'SINCRONIZAR': sincronizar,
+    'REENVIAR_SENHA': reenviar_senha,
+}
+
+
+# --- WORKER ---
+
+def reservar_lotes(limite):
+    agora = timezone.now()
+    reserva_expirada = agora - timedelta(seconds=_config("PARCEIROS_ACOES_TIMEOUT_RESERVA", 600))
+    elegiveis = Q(estado='PENDENTE') | Q(estado='PROCESSANDO', reservada_em__lt=reserva_expirada)
+    token = uuid.uuid4().hex
+
+    with transaction.atomic():
+        ids = list(
+            AcaoEmMassa.objects.select_for_update(skip_locked=True)
+            .filter(elegiveis).order_by('id').values_list('id', flat=True)[:limite]
+        )
+        AcaoEmMassa.objects.filter(elegiveis, id__in=ids).update(estado='PROCESSANDO', reserva=token, reservada_em=agora)
+
+    return list(AcaoEmMassa.objects.filter(reserva=token, estado='PROCESSANDO').order_by('id'))
+
+
+def processar_lote(lote, workers=4):
+    """Executa um lote reservado. Retorna True se terminou (mesmo com erros por parceiro)."""
+    try:
+        processados, erros = EXECUTORES[lote.acao](lote.parceiro_ids, workers)
+    except Exception as e:
+        lote.estado = 'FALHOU'
+        lote.ultimo_erro = str(e)
+    else:
+        lote.estado = 'CONCLUIDA'
+        lote.processados = processados
+        lote.erros = erros
+    lote.reserva = ''
+    lote.concluida_em = timezone.now()
+    lote.save()
+    return lote.estado == 'CONCLUIDA'
+
+
+def processar_pendentes(limite=10, workers=4):
+    """
+    Reserva até `limite` lotes e executa um por vez (as chamadas de cada lote
+    já rodam em paralelo). Retorna (lotes, concluídos).
+    """
+    lotes = reservar_lotes(limite)
+    concluidos = sum(1 for lote in lotes if processar_lote(lote, workers))
+    return len(lotes), concluidos
@@ -1,13 +1,169 @@
 # CÓDIGO para: backend_django/parceiros/admin.py
 
-from django.contrib import admin
-from .models import Parceiro # Importa o modelo que você criou
+import json
+
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .models import AcaoEmMassa, EventoOutbox, Parceiro, TarefaProvisionamento # Importa os modelos que você criou
+from .normalizacao import normalizar_cnpj
+from . import acoes_em_massa
+
+# --- LISTAGEM PARA TABELAS GRANDES ---
+# O changelist padrão faz COUNT(*) da tabela a cada página e pagina com OFFSET.
+# Aqui a contagem para em LIMITE_CONTAGEM (no PostgreSQL, acima disso vale a
+# estimativa do planejador) e, na ordenação padrão, as páginas seguem por
+# cursor (?apos=<id>): cada página custa o mesmo, não importa a profundidade.
+
+CURSOR_VAR = 'apos'
+
+
+def _estimativa_postgresql(queryset):
+    """Linhas estimadas pelo planejador (EXPLAIN), sem executar a consulta."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plano = cursor.fetchone()[0]
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    return int(plano[0]['Plan']['Plan Rows'])
+
+
+class PaginadorEstimado(Paginator):
+    LIMITE_CONTAGEM = 10000
+    aproximada = False  # Passou do limite: o total exibido é um piso ou uma estimativa
+    estimada = False    # Total vindo do planejador do PostgreSQL
+
+    @cached_property
+    def count(self):
+        limitada = self.object_list.order_by()[:self.LIMITE_CONTAGEM + 1].count()
+        if limitada <= self.LIMITE_CONTAGEM:
+            return limitada
+        self.aproximada = True
+        if connections[self.object_list.db].vendor == 'postgresql':
+            self.estimada = True
+            return max(_estimativa_postgresql(self.object_list), self.LIMITE_CONTAGEM)
+        return self.LIMITE_CONTAGEM
+
+
+class ChangeListPorCursor(ChangeList):
+    def __init__(self, request, *args, **kwargs):
+        try:
+            self.apos = int(request.GET[CURSOR_VAR])
+        except (KeyError, ValueError):
+            self.apos = None
+        if CURSOR_VAR in request.GET:
+            # O ChangeList trataria o cursor como filtro do queryset
+            request.GET = request.GET.copy()
+            del request.GET[CURSOR_VAR]
+        self.url_proxima = None
+        super().__init__(request, *args, **kwargs)
+
+    @property
+    def usa_cursor(self):
+        """Só na ordenação padrão (-id) e sem "mostrar tudo"."""
+        return ORDER_VAR not in self.params and not self.show_all
+
+    def get_results(self, request):
+        if not self.usa_cursor:
+            return super().get_results(request)
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        pagina = self.queryset.order_by('-pk')
+        if self.apos is not None:
+            pagina = pagina.filter(pk__lt=self.apos)
+        linhas = list(pagina[:self.list_per_page + 1])
+        if len(linhas) > self.list_per_page:
+            linhas = linhas[:self.list_per_page]
+            self.url_proxima = self.get_query_string({CURSOR_VAR: linhas[-1].pk})
+
+        self.result_count = paginator.count
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.result_list = linhas
+        self.can_show_all = False
+        self.multi_page = self.url_proxima is not None or self.apos is not None
+        self.paginator = paginator
+
 
 @admin.register(Parceiro)
 class ParceiroAdmin(admin.ModelAdmin):
     # Mostra estes campos na lista
-    list_display = ('nome_fantasia', 'email_gestor', 'tipo', 'status', 'senha_definida')
+    list_display = ('nome_fantasia', 'email_gestor', 'tipo', 'status', 'senha_definida', 'status_provisionamento')
     # Adiciona filtros na lateral
     list_filter = ('tipo', 'status', 'senha_definida')
-    # Adiciona uma barra de busca
-    search_fields = ('nome_fantasia', 'email_gestor', 'cnpj')
\ No newline at end of file
+    # Busca por prefixo ('^' = istartswith), atendida pelos índices de busca
+    # (parceiros/indices.py); um CNPJ usa o cnpj_normalizado indexado
+    search_fields = ('^nome_fantasia', '^email_gestor')
+    search_help_text = "Início do nome fantasia ou do e-mail, ou o CNPJ completo."
+    ordering = ('-id',)
+    list_per_page = 100
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    actions = ['desativar', 'sincronizar', 'reenviar_senha']
+
+    def get_changelist(self, request, **kwargs):
+        return ChangeListPorCursor
+
+    def get_search_results(self, request, queryset, search_term):
+        cnpj = normalizar_cnpj(search_term)
+        if len(cnpj) == 14 and not search_term.strip('0123456789./- '):
+            return queryset.filter(cnpj_normalizado=cnpj), False
+        return super().get_search_results(request, queryset, search_term)
+
+    # --- AÇÕES EM MASSA (em segundo plano, ver parceiros/acoes_em_massa.py) ---
+
+    def _enfileirar(self, request, queryset, acao):
+        total, lotes = acoes_em_massa.enfileirar(acao, queryset, request.user.get_username())
+        self.message_user(
+            request,
+            f"{total} parceiro(s) enfileirado(s) em {lotes} lote(s). A execução é feita pelo "
+            f"comando processar_acoes_em_massa; acompanhe em \"Ações em massa\".",
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Desativar (em segundo plano)", permissions=['change'])
+    def desativar(self, request, queryset):
+        self._enfileirar(request, queryset, 'DESATIVAR')
+
+    @admin.action(description="Sincronizar com a API Embedded (em segundo plano)", permissions=['change'])
+    def sincronizar(self, request, queryset):
+        self._enfileirar(request, queryset, 'SINCRONIZAR')
+
+    @admin.action(description="Reenviar senha por e-mail (em segundo plano)", permissions=['change'])
+    def reenviar_senha(self, request, queryset):
+        self._enfileirar(request, queryset, 'REENVIAR_SENHA')
+
+@admin.register(AcaoEmMassa)
+class AcaoEmMassaAdmin(admin.ModelAdmin):
+    list_display = ('id', 'acao', 'estado', 'quantidade', 'processados', 'quantidade_erros', 'solicitada_por', 'criada_em')
+    list_filter = ('estado', 'acao')
+    search_fields = ('grupo',)
+    readonly_fields = ('grupo', 'acao', 'parceiro_ids', 'solicitada_por', 'processados', 'erros', 'ultimo_erro',
+                       'criada_em', 'concluida_em')
+    show_full_result_count = False
+
+    @admin.display(description="Parceiros")
+    def quantidade(self, obj):
+        return len(obj.parceiro_ids)
+
+    @admin.display(description="Erros")
+    def quantidade_erros(self, obj):
+        return len(obj.erros)
+
+@admin.register(TarefaProvisionamento)
+class TarefaProvisionamentoAdmin(admin.ModelAdmin):
+    list_display = ('parceiro', 'estado', 'tentativas', 'proxima_tentativa', 'atualizada_em')
+    list_filter = ('estado',)
+    raw_id_fields = ('parceiro',)
+
+@admin.register(EventoOutbox)
+class EventoOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'operacao', 'chave', 'estado', 'tentativas', 'proxima_tentativa', 'criado_em')
+    list_filter = ('estado', 'operacao')
+    search_fields = ('chave',)
+    readonly_fields = ('chave_idempotencia',)
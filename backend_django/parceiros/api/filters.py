@@ -0,0 +1,78 @@
+# CÓDIGO para: backend_django/parceiros/api/filters.py
+
+from datetime import date, datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from ..normalizacao import normalizar_cnpj
+
+VALORES_VERDADEIROS = ('true', '1', 'sim', 's')
+VALORES_FALSOS = ('false', '0', 'nao', 'não', 'n')
+
+
+def _parse_bool(nome, valor):
+    valor = valor.strip().lower()
+    if valor in VALORES_VERDADEIROS:
+        return True
+    if valor in VALORES_FALSOS:
+        return False
+    raise ValidationError({nome: "Use true ou false."})
+
+
+def _parse_data(nome, valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValidationError({nome: "Formato de data inválido. Use AAAA-MM-DD."})
+
+
+def _parse_data_hora(nome, valor):
+    try:
+        data_hora = parse_datetime(valor)
+        if data_hora is None:
+            data_hora = datetime.combine(date.fromisoformat(valor), datetime.min.time())
+    except ValueError:
+        data_hora = None
+    if data_hora is None:
+        raise ValidationError({nome: "Formato inválido. Use AAAA-MM-DD ou AAAA-MM-DDTHH:MM:SS."})
+    if timezone.is_naive(data_hora):
+        data_hora = timezone.make_aware(data_hora)
+    return data_hora
+
+
+# parâmetro da URL -> (lookup do ORM, conversor)
+FILTROS = {
+    'tipo': ('tipo', lambda nome, valor: valor.upper()),
+    'senha_definida': ('senha_definida', _parse_bool),
+    'status_provisionamento': ('status_provisionamento', lambda nome, valor: valor.upper()),
+    'cnpj': ('cnpj_normalizado', lambda nome, valor: normalizar_cnpj(valor)),
+    'nome_fantasia': ('nome_fantasia__istartswith', lambda nome, valor: valor.strip()),
+    'data_entrada_de': ('data_entrada__gte', _parse_data),
+    'data_entrada_ate': ('data_entrada__lte', _parse_data),
+    'data_saida_de': ('data_saida__gte', _parse_data),
+    'data_saida_ate': ('data_saida__lte', _parse_data),
+    'atualizado_desde': ('data_atualizacao__gte', _parse_data_hora),
+    'atualizado_ate': ('data_atualizacao__lte', _parse_data_hora),
+}
+
+
+def filtrar_parceiros(queryset, params):
+    """Aplica os filtros de FILTROS presentes em `params` (um QueryDict ou dict)."""
+    condicoes = {}
+    for nome, (lookup, conversor) in FILTROS.items():
+        valor = params.get(nome)
+        if valor not in (None, ''):
+            condicoes[lookup] = conversor(nome, valor)
+    return queryset.filter(**condicoes) if condicoes else queryset
+
+
+class ParceiroFilterBackend(BaseFilterBackend):
+    """
+    Filtros da listagem de parceiros, ex.:
+    ?tipo=INDUSTRIA&senha_definida=false&data_entrada_de=2025-01-01
+    """
+    def filter_queryset(self, request, queryset, view):
+        return filtrar_parceiros(queryset, request.query_params)
@@ -0,0 +1,116 @@
+# CÓDIGO para: backend_django/parceiros/api/mixins.py
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from backend_api import roteamento
+from .. import cache as cache_parceiros
+
+
+def _calcular_etag(data):
+    bruto = json.dumps(data, cls=JSONEncoder, sort_keys=True, ensure_ascii=False)
+    return '"%s"' % hashlib.md5(bruto.encode('utf-8')).hexdigest()
+
+
+def _nao_modificado(request, entrada):
+    """Avalia If-None-Match (prioritário) e If-Modified-Since."""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = {etag.strip().removeprefix('W/') for etag in if_none_match.split(',')}
+        return '*' in etags or entrada['etag'] in etags
+
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    ultima = entrada['ultima_modificacao']
+    return bool(if_modified_since and ultima and int(ultima) <= if_modified_since)
+
+
+def _atraso_replica():
+    return getattr(settings, 'PARCEIROS_REPLICA_ATRASO_MAXIMO', 5)
+
+
+class LeituraReplicaMixin:
+    """
+    Executa as ações de `acoes_na_replica` com as leituras na réplica (ver
+    backend_api/roteamento.py). Depois de uma escrita o cliente recebe um cookie
+    e, enquanto ele durar, lê do primário (read-after-write).
+    """
+    acoes_na_replica = ()
+    COOKIE_PRIMARIO = 'parceiros_primario'
+
+    def ler_da_replica(self, request):
+        return self.action in self.acoes_na_replica and self.COOKIE_PRIMARIO not in request.COOKIES
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._token_replica = roteamento.ativar_replica(self.ler_da_replica(request))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_token_replica', None)
+        if token is not None:
+            roteamento.restaurar(token)
+            self._token_replica = None
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in permissions.SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(self.COOKIE_PRIMARIO, '1', max_age=_atraso_replica(), httponly=True, samesite='Lax')
+        return response
+
+
+class CacheLeituraMixin:
+    """
+    Cache de leitura para list/retrieve: a resposta serializada fica no cache de
+    parceiros (ver parceiros/cache.py) e é devolvida sem consultar o banco.
+    Também responde 304 com ETag/If-None-Match e Last-Modified/If-Modified-Since.
+    O Last-Modified é o momento da última escrita em parceiros (a versão do
+    cache), não a data dos itens da resposta: uma deleção ou um parceiro que
+    saiu do filtro também mudam a resposta. Com resolução de segundos, duas
+    escritas no mesmo segundo só são distinguidas pelo ETag.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._responder_com_cache('list', request, lambda: super(CacheLeituraMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._responder_com_cache('retrieve', request, lambda: super(CacheLeituraMixin, self).retrieve(request, *args, **kwargs))
+
+    def _responder_com_cache(self, escopo, request, gerar_resposta):
+        versao = cache_parceiros.versao_atual()
+        chave = cache_parceiros.montar_chave(escopo, request, versao)
+        entrada = cache_parceiros.ler(chave)
+        origem = 'HIT'
+
+        if entrada is None:
+            origem = 'MISS'
+            response = gerar_resposta()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            entrada = {
+                'data': response.data,
+                'etag': _calcular_etag(response.data),
+                'ultima_modificacao': cache_parceiros.momento_da_versao(versao),
+            }
+            if not (roteamento.lendo_da_replica() and cache_parceiros.escrita_recente(_atraso_replica())):
+                # Da réplica logo após uma escrita a resposta pode estar defasada: não fica no cache
+                cache_parceiros.gravar(chave, entrada)
+
+        if _nao_modificado(request, entrada):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(entrada['data'])
+
+        response['ETag'] = entrada['etag']
+        if entrada['ultima_modificacao']:
+            response['Last-Modified'] = http_date(entrada['ultima_modificacao'])
+        response['X-Cache'] = origem
+        return response
+
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """Contadores de acertos/falhas do cache de leitura."""
+        return Response(cache_parceiros.estatisticas())
@@ -0,0 +1,14 @@
+# CÓDIGO para: backend_django/parceiros/api/pagination.py
+
+from rest_framework.pagination import CursorPagination
+
+
+class ParceiroCursorPagination(CursorPagination):
+    """
+    Paginação por cursor sobre a chave primária (sempre indexada).
+    Ao contrário do OFFSET, o custo de cada página não cresce com a tabela.
+    """
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
@@ -1,16 +1,176 @@
 # CÓDIGO para: backend_django/parceiros/api/serializers.py
 
-from rest_framework import serializers
+from django.conf import settings
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from backend_api.metricas import medir_fase
 from ..models import Parceiro  # (..models sobe um nível para /parceiros/models.py)
 
-class ParceiroSerializer(serializers.ModelSerializer):
+
+class SerializacaoMedidaMixin:
+    """Soma o tempo de `.data` na fase 'serializacao' da requisição (ver backend_api/metricas.py)."""
+    @property
+    def data(self):
+        with medir_fase('serializacao'):
+            return super().data
+
+
+class ListaMedidaSerializer(SerializacaoMedidaMixin, serializers.ListSerializer):
+    pass
+
+
+class CamposDinamicosMixin:
+    """
+    Permite ao cliente escolher os campos da resposta com `?fields=id,nome_fantasia`
+    (sparse fieldset). Campos desconhecidos são ignorados.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = campos_solicitados(self.context.get('request'))
+        if campos:
+            for nome in set(self.fields) - set(campos):
+                self.fields.pop(nome)
+
+
+def campos_solicitados(request):
+    """Lê o parâmetro `fields` (só em leituras); retorna None quando ausente."""
+    if request is None or request.method not in ('GET', 'HEAD') or not request.query_params.get('fields'):
+        return None
+    return [campo.strip() for campo in request.query_params['fields'].split(',') if campo.strip()]
+
+
+class ParceiroSerializer(SerializacaoMedidaMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Parceiro
+        list_serializer_class = ListaMedidaSerializer
         # Simplesmente listamos os campos que a API deve expor
         fields = [
             'id', 'api_user_id', 'nome_ajustado', 'tipo', 'cnpj', 
             'nome_fantasia', 'razao_social', 'gestor', 'telefone_gestor', 
-            'email_gestor', 'data_entrada', 'data_saida', 'senha_definida'
+            'email_gestor', 'data_entrada', 'data_saida', 'senha_definida',
+            'status_provisionamento', 'erro_provisionamento'
         ]
+        read_only_fields = ['status_provisionamento', 'erro_provisionamento']
+
+    def get_extra_kwargs(self):
+        extra_kwargs = super().get_extra_kwargs()
         # O email_gestor não pode ser editado após a criação
-        read_only_fields = ['email_gestor']
\ No newline at end of file
+        if self.instance is not None:
+            extra_kwargs.setdefault('email_gestor', {})['read_only'] = True
+        return extra_kwargs
+
+
+# --- LEITURA ENXUTA (list/retrieve) ---
+# O ParceiroSerializer cria e percorre os Field do DRF a cada linha. Nas
+# leituras a view busca só as colunas com `.values()` e este serializer aplica
+# apenas as conversões que mudam o valor (datas -> ISO), pré-calculadas uma
+# vez a partir dos campos do ParceiroSerializer: a saída é idêntica.
+
+def _conversor(campo):
+    """Função que converte o valor do banco como o campo do DRF faria, ou None se não muda nada."""
+    if isinstance(campo, serializers.DateTimeField):
+        return campo.to_representation
+    if isinstance(campo, serializers.DateField):
+        formato = getattr(campo, 'format', api_settings.DATE_FORMAT)
+        if isinstance(formato, str) and formato.lower() == ISO_8601:
+            return lambda valor: valor if isinstance(valor, str) else valor.isoformat()
+        return campo.to_representation
+    if isinstance(campo, serializers.ChoiceField):
+        mapa = campo.choice_strings_to_values
+        if any(chave != valor for chave, valor in mapa.items()):
+            return lambda valor: mapa.get(str(valor), valor)
+        return None
+    if isinstance(campo, (serializers.CharField, serializers.BooleanField, serializers.IntegerField)):
+        return None  # O banco já devolve str/bool/int
+    return campo.to_representation
+
+
+class ParceiroLeituraSerializer:
+    """
+    Serializer só de leitura com a mesma saída do ParceiroSerializer, para os
+    dicts de `Parceiro.objects.values(...)` (ver ParceiroViewSet). Respeita
+    ?fields= e mede o tempo na fase 'serializacao', como o original.
+    """
+    _conversores = None
+
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self.campos = colunas_de_leitura(self.context.get('request'))
+
+    @classmethod
+    def conversores(cls):
+        if cls._conversores is None:
+            campos = ParceiroSerializer().fields
+            conversores = {}
+            for nome in ParceiroSerializer.Meta.fields:
+                conversor = _conversor(campos[nome])
+                if conversor is not None:
+                    conversores[nome] = conversor
+            cls._conversores = conversores
+        return cls._conversores
+
+    def _representar(self, linhas):
+        conversores = [(nome, conversor) for nome, conversor in self.conversores().items() if nome in self.campos]
+        remover_id = 'id' not in self.campos  # Buscado só para o cursor da paginação
+        for linha in linhas:
+            for nome, conversor in conversores:
+                valor = linha[nome]
+                if valor is not None:
+                    linha[nome] = conversor(valor)
+            if remover_id:
+                del linha['id']
+        return linhas
+
+    @property
+    def data(self):
+        with medir_fase('serializacao'):
+            if self.many:
+                return self._representar(list(self.instance))
+            return self._representar([self.instance])[0]
+
+
+def colunas_de_leitura(request):
+    """Campos da resposta (?fields=) na ordem do ParceiroSerializer."""
+    campos = campos_solicitados(request)
+    if not campos:
+        return list(ParceiroSerializer.Meta.fields)
+    return [nome for nome in ParceiroSerializer.Meta.fields if nome in set(campos)]
+
+
+class ParceiroImportacaoSerializer(ParceiroSerializer):
+    """
+    Validação das linhas da importação em massa. Os campos únicos são checados
+    pela importação com uma consulta por lote, então os validadores de
+    unicidade (uma consulta por linha) ficam desligados aqui.
+    """
+    class Meta(ParceiroSerializer.Meta):
+        extra_kwargs = {
+            'email_gestor': {'validators': []},
+            'api_user_id': {'validators': []},
+        }
+
+class DefinirSenhaSerializer(serializers.Serializer):
+    senha = serializers.CharField(write_only=True, trim_whitespace=False, max_length=128)
+
+
+class DefinirSenhaItemSerializer(DefinirSenhaSerializer):
+    id = serializers.IntegerField()
+
+
+class DefinirSenhaLoteSerializer(serializers.ListSerializer):
+    """Lote do POST /parceiros/definir-senha-lote/: [{"id": 1, "senha": "..."}, ...]."""
+    child = DefinirSenhaItemSerializer()
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('allow_empty', False)
+        kwargs.setdefault('max_length', getattr(settings, 'PARCEIROS_SENHA_LOTE_MAXIMO', 1000))
+        super().__init__(*args, **kwargs)
+
+    def validate(self, attrs):
+        ids = [item['id'] for item in attrs]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Há parceiros repetidos no lote.")
+        return attrs
@@ -1,22 +1,101 @@
 # CÓDIGO CORRETO para: backend_django/parceiros/api/views.py
 
-from rest_framework import viewsets, status
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from rest_framework import filters, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
-from ..models import Parceiro
-from .serializers import ParceiroSerializer
+from rest_framework.reverse import reverse
+from backend_api import roteamento
+from ..models import Parceiro, TarefaProvisionamento
+from .filters import ParceiroFilterBackend, VALORES_VERDADEIROS
+from .mixins import CacheLeituraMixin, LeituraReplicaMixin
+from .pagination import ParceiroCursorPagination
+from .serializers import (
+    DefinirSenhaLoteSerializer, DefinirSenhaSerializer, ParceiroLeituraSerializer, ParceiroSerializer,
+    campos_solicitados, colunas_de_leitura,
+)
 from .. import services as parceiros_embedded_service
+from .. import busca, duplicados, exportacao, historico, importacao, outbox, provisionamento, resiliencia, resumo, senhas
 
-class ParceiroViewSet(viewsets.ModelViewSet):
+def _resposta_indisponivel(erro):
+    return Response({"detail": str(erro)}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={'Retry-After': str(erro.retry_after or 1)})
+
+
+class _NegociacaoExportacao(BaseContentNegotiation):
+    """Na exportação o formato vem de ?formato=: o Accept do cliente não gera 406."""
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class ParceiroViewSet(LeituraReplicaMixin, CacheLeituraMixin, viewsets.ModelViewSet):
     """
     Esta única classe cria automaticamente as rotas para:
-    - GET /api/v1/parceiros/ (Listar todos)
+    - GET /api/v1/parceiros/ (Listar, paginado por cursor; aceita filtros,
+      ?search= e ?fields= para escolher os campos)
     - GET /api/v1/parceiros/{id}/ (Ver um)
-    - POST /api/v1/parceiros/ (Criar novo)
-    - PUT /api/v1/parceiros/{id}/ (Atualizar)
-    - DELETE /api/v1/parceiros/{id}/ (Deletar)
+      (listagem e detalhe passam pelo cache de leitura, com ETag/Last-Modified)
+    - POST /api/v1/parceiros/ (Criar novo; 409 se parecer duplicado, salvo ?ignorar_duplicados=true)
+    - PUT/PATCH /api/v1/parceiros/{id}/ (Atualizar; só chama a API se nome/tipo/data_saida mudarem)
+    - DELETE /api/v1/parceiros/{id}/ (Deletar, local e na API)
+    - GET /api/v1/parceiros/{id}/provisionamento/ (Situação do cadastro na API)
+    - POST /api/v1/parceiros/{id}/definir-senha/ (Define a senha do gestor na API)
+    - POST /api/v1/parceiros/definir-senha-lote/ (Idem para vários parceiros, em paralelo)
+    - POST /api/v1/parceiros/importar/ (Importação em massa via CSV/JSON)
+    - GET /api/v1/parceiros/exportar/ (Exportação em streaming: CSV/NDJSON/XLSX, com os filtros da lista)
+    - GET /api/v1/parceiros/autocomplete/?q= (Busca por prefixo, sem acentos, ordenada por relevância)
+    - GET /api/v1/parceiros/duplicados/?limiar= (Grupos de parceiros que parecem a mesma empresa)
+    - GET /api/v1/parceiros/changes/?since=<seq> (Alterações desde o cursor, para sincronização incremental)
+    - GET /api/v1/parceiros/cache-stats/ (Acertos/falhas do cache)
+    - GET /api/v1/parceiros/status-api/ (Disjuntor e limite de taxa da API Embedded)
     """
     queryset = Parceiro.objects.filter(status=True)
     serializer_class = ParceiroSerializer
+    # Leituras que podem ir para a réplica (quando configurada)
+    acoes_na_replica = ('list', 'retrieve', 'exportar', 'stats', 'autocomplete', 'relatorio_duplicados')
+    pagination_class = ParceiroCursorPagination
+    filter_backends = [ParceiroFilterBackend, filters.SearchFilter]
+    # '^' = busca por prefixo (istartswith), que aproveita índices
+    search_fields = ['^nome_fantasia', '^razao_social', '^email_gestor', '^cnpj']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('update', 'partial_update', 'destroy') and outbox.outbox_ativa():
+            # Trava a linha até o commit (no SQLite a transação já serializa as escritas)
+            return queryset.select_for_update()
+        if self._leitura_enxuta():
+            # Só as colunas da resposta, como dicts (o id é usado pelo cursor)
+            return queryset.values('id', *colunas_de_leitura(self.request))
+        campos = campos_solicitados(self.request)
+        if campos and self.action in ('list', 'retrieve'):
+            # Busca no banco só as colunas pedidas (o id é usado pelo cursor)
+            colunas = {f.name for f in Parceiro._meta.concrete_fields} & set(campos)
+            queryset = queryset.only('id', *colunas)
+        return queryset
+
+    def get_serializer_class(self):
+        if self._leitura_enxuta():
+            return ParceiroLeituraSerializer
+        return super().get_serializer_class()
+
+    def _leitura_enxuta(self):
+        """
+        list/retrieve em JSON usam .values() + ParceiroLeituraSerializer (mesma saída,
+        bem menos CPU). A API navegável continua com o serializer completo (formulários).
+        """
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return (
+            self.action in ('list', 'retrieve')
+            and renderer is not None and renderer.format == 'json'
+            and getattr(settings, 'PARCEIROS_LEITURA_ENXUTA', True)
+        )
 
     # --- AQUI ESTÁ A LÓGICA DE NEGÓCIOS ---
     # Nós "interceptamos" o método de criação (POST)
@@ -28,28 +107,317 @@ class ParceiroViewSet(viewsets.ModelViewSet):
         data = serializer.validated_data # Dados prontos para usar
         
         email_para_api = data.get('email_gestor')
+
+        # Mesma empresa já cadastrada (CNPJ ou nome parecido): barra antes de tocar na API
+        suspeitos = duplicados.verificar_antes_de_criar(request, data)
+        if suspeitos:
+            return Response({"detail": duplicados.MENSAGEM_DUPLICADO, "duplicados": suspeitos},
+                            status=status.HTTP_409_CONFLICT)
+
+        # Modo assíncrono: salva já como PENDENTE e o worker cadastra na API depois
+        if provisionamento.provisionamento_assincrono_ativo(request):
+            with transaction.atomic():
+                parceiro = serializer.save(status_provisionamento='PENDENTE')
+                provisionamento.enfileirar_provisionamento(parceiro)
+            url_status = reverse('parceiro-provisionamento', args=[parceiro.pk], request=request)
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED, headers={'Location': url_status})
         
         try:
             # 2. Chama seu serviço (o mesmo código do Flask)
             # (Certifique-se que você copiou seu 'services/parceiros_embedded_service.py'
             # para 'parceiros/services.py' como eu instruí)
+            # Se falhar depois do POST, o próprio serviço já desfez o usuário criado
             api_id, erro_api = parceiros_embedded_service.criar_parceiro_completo(data)
-            
-            if erro_api:
-                # Se a API externa falhar, retorna um erro 400
-                return Response({"detail": erro_api}, status=status.HTTP_400_BAD_REQUEST)
+        except resiliencia.ServicoIndisponivel as e:
+            # API fora do ar ou limite de taxa: responde na hora em vez de segurar o worker
+            return _resposta_indisponivel(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        if erro_api:
+            # Se a API externa falhar, retorna um erro 400
+            return Response({"detail": erro_api}, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
             # 3. Salva no banco de dados local
             # Note que não usamos 'db.add_parceiro', o serializer faz isso
-            parceiro = serializer.save(api_user_id=api_id)
-            
-            # Retorna o JSON do novo parceiro e um status 201 (Created)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            serializer.save(api_user_id=api_id)
+        except Exception as e:
+            # 4. Rollback! O usuário existe na API, mas o parceiro não foi gravado
+            outbox.desfazer_criacao(email_para_api)
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # Retorna o JSON do novo parceiro e um status 201 (Created)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'])
+    def provisionamento(self, request, pk=None):
+        """Situação do cadastro do parceiro na API Embedded."""
+        parceiro = self.get_object()
+        try:
+            tarefa = parceiro.tarefa_provisionamento
+        except TarefaProvisionamento.DoesNotExist:
+            tarefa = None
+
+        return Response({
+            'id': parceiro.pk,
+            'api_user_id': parceiro.api_user_id,
+            'status_provisionamento': parceiro.status_provisionamento,
+            'erro_provisionamento': parceiro.erro_provisionamento,
+            'tentativas': tarefa.tentativas if tarefa else 0,
+            'proxima_tentativa': tarefa.proxima_tentativa if tarefa and tarefa.estado == 'PENDENTE' else None,
+        })
+
+    @action(detail=True, methods=['post'], url_path='definir-senha')
+    def definir_senha(self, request, pk=None):
+        """Define a senha do gestor na API Embedded. Corpo: {"senha": "..."}."""
+        parceiro = self.get_object()
+        serializer = DefinirSenhaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            sucesso, erro_api = parceiros_embedded_service.definir_senha_usuario(
+                parceiro.email_gestor, serializer.validated_data['senha']
+            )
+        except resiliencia.ServicoIndisponivel as e:
+            return _resposta_indisponivel(e)
+        if not sucesso:
+            return Response({"detail": erro_api}, status=status.HTTP_400_BAD_REQUEST)
+
+        senhas.marcar_senha_definida([parceiro.pk])
+        return Response({"id": parceiro.pk, "senha_definida": True})
+
+    @action(detail=False, methods=['post'], url_path='definir-senha-lote')
+    def definir_senha_lote(self, request):
+        """
+        Define a senha de vários parceiros: [{"id": 1, "senha": "..."}, ...].
+        Responde com o resultado de cada parceiro (DEFINIDA, ERRO, NAO_ENCONTRADO).
+        """
+        serializer = DefinirSenhaLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        resultados = senhas.definir_senhas(serializer.validated_data)
+        return Response({"resumo": importacao.resumir(resultados), "resultados": resultados})
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, JSONParser])
+    def importar(self, request):
+        """
+        Importação em massa. Aceita um arquivo em `arquivo` (multipart, CSV/JSON/NDJSON)
+        ou uma lista JSON no corpo. Responde com o relatório de cada linha.
+        """
+        arquivo = request.FILES.get('arquivo')
+        if arquivo is not None:
+            formato = request.query_params.get('formato') or importacao.formato_pelo_nome(arquivo.name)
+            try:
+                registros = importacao.ler_registros(arquivo, formato)
+            except ValueError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        elif isinstance(request.data, list):
+            registros = request.data
+        else:
+            return Response({"detail": "Envie um arquivo em 'arquivo' ou uma lista de parceiros."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            relatorio = list(importacao.importar_parceiros(
+                registros, assincrono=provisionamento.provisionamento_assincrono_ativo(request)
+            ))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        return Response({"resumo": importacao.resumir(relatorio), "linhas": relatorio})
+
+    @action(detail=False, methods=['get'], content_negotiation_class=_NegociacaoExportacao)
+    def exportar(self, request):
+        """
+        Exporta os parceiros filtrados (mesmos filtros e ?search= da listagem) em
+        streaming. ?formato=csv|ndjson|xlsx, ?gzip=true e ?fields= para as colunas.
+        """
+        formato = request.query_params.get('formato', 'csv').lower()
+        gzip = request.query_params.get('gzip', '').lower() in VALORES_VERDADEIROS
+        # O arquivo é gerado depois que a view retorna: fixa aqui o banco de leitura
+        queryset = self.filter_queryset(self.get_queryset()).using(roteamento.banco_de_leitura())
+        colunas = exportacao.escolher_colunas(campos_solicitados(request))
+        try:
+            conteudo = exportacao.exportar(queryset, formato, colunas, gzip=gzip)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            conteudo, content_type='application/gzip' if gzip else exportacao.CONTENT_TYPES[formato]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{exportacao.nome_do_arquivo(formato, gzip)}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Totais para o cabeçalho do painel (por tipo, ativos/inativos, senha
+        pendente, saída vencida e vencendo em ?dias=), lidos do resumo e servidos
+        pelo mesmo cache versionado da listagem.
+        """
+        try:
+            dias = int(request.query_params.get('dias', getattr(settings, 'PARCEIROS_STATS_DIAS', 30)))
+        except ValueError:
+            dias = -1
+        if not 0 <= dias <= 3650:
+            return Response({"detail": "'dias' deve ser um inteiro entre 0 e 3650."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return self._responder_com_cache('stats', request, lambda: Response(resumo.estatisticas(dias)))
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Parceiros ativos cujo nome fantasia, razão social, gestor ou CNPJ começam
+        com as palavras de ?q= (acentos ignorados), mais relevantes primeiro.
+        ?limit= (padrão 10, máximo 50).
+        """
+        try:
+            limite = int(request.query_params.get('limit', busca.LIMITE_PADRAO))
+        except ValueError:
+            limite = 0
+        if not 1 <= limite <= busca.LIMITE_MAXIMO:
+            return Response({"detail": f"'limit' deve ser um inteiro entre 1 e {busca.LIMITE_MAXIMO}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        resultados = busca.buscar(request.query_params.get('q', ''), limite, self.get_queryset())
+        return Response({"resultados": resultados})
+
+    @action(detail=False, methods=['get'], url_path='duplicados')
+    def relatorio_duplicados(self, request):
+        """
+        Relatório de duplicados (ativos e inativos): grupos de parceiros com o
+        mesmo CNPJ ou nomes com similaridade >= ?limiar= (padrão em settings),
+        com os pares que os ligam. Servido pelo cache versionado da listagem.
+        """
+        try:
+            limiar = float(request.query_params.get('limiar', duplicados.limiar_configurado()))
+        except ValueError:
+            limiar = -1
+        if not 0 < limiar <= 1:
+            return Response({"detail": "'limiar' deve ser um número maior que 0 e até 1."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return self._responder_com_cache(
+            'duplicados', request, lambda: Response(duplicados.encontrar_duplicados(limiar))
+        )
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Alterações depois do cursor ?since= (0 = desde o início), uma por
+        parceiro: GRAVADO com os dados atuais (respeita ?fields=) ou REMOVIDO
+        (deletado ou inativo). O cliente guarda o `cursor` da resposta e repete
+        enquanto `mais` for true. 410 quando o histórico do cursor já foi removido.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+            limite = int(request.query_params.get('page_size', historico.TAMANHO_PAGINA))
+        except ValueError:
+            since = limite = -1
+        if since < 0 or not 1 <= limite <= historico.TAMANHO_PAGINA_MAXIMO:
+            return Response(
+                {"detail": f"'since' deve ser um inteiro >= 0 e 'page_size' entre 1 e {historico.TAMANHO_PAGINA_MAXIMO}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            ultimas, cursor, mais = historico.alteracoes_desde(since, limite)
+        except historico.HistoricoExpirado as e:
+            return Response({"detail": str(e), "cursor": historico.cursor_atual()}, status=status.HTTP_410_GONE)
+
+        linhas = self.get_queryset().filter(id__in=list(ultimas)).values('id', *colunas_de_leitura(request))
+        dados = {linha['id']: linha for linha in linhas}
+        serializados = ParceiroLeituraSerializer(list(dados.values()), many=True, context={'request': request}).data
+        dados = dict(zip(dados, serializados))
+
+        alteracoes = [
+            {"seq": seq, "id": pk, "operacao": "GRAVADO" if pk in dados else "REMOVIDO", "dados": dados.get(pk)}
+            for pk, (seq, _) in ultimas.items()
+        ]
+        return Response({"cursor": cursor, "mais": mais, "alteracoes": alteracoes})
+
+    @action(detail=False, methods=['get'], url_path='status-api')
+    def status_api(self, request):
+        """Estado do disjuntor e do limite de taxa das chamadas à API Embedded."""
+        return Response(resiliencia.metricas())
+
+    # --- UPDATE E DELETE: SINCRONIZADOS COM A API EMBEDDED ---
+    # Com a outbox ligada a alteração e o EventoOutbox são gravados na mesma
+    # transação e o despachante chama a API depois. Sem ela, a API é chamada
+    # primeiro, fora de transação, e o banco é gravado depois numa transação
+    # curta: se a API recusar, nada muda no banco; nenhuma linha fica travada
+    # durante a chamada remota.
+
+    def update(self, request, *args, **kwargs):
+        parcial = kwargs.pop('partial', False)
+        if not outbox.outbox_ativa():
+            return self._atualizar_direto(request, parcial)
+
+        with transaction.atomic():
+            parceiro = self.get_object()
+            serializer = self.get_serializer(parceiro, data=request.data, partial=parcial)
+            serializer.is_valid(raise_exception=True)
+
+            diferencas = parceiro.diferencas(serializer.validated_data)
+            if not diferencas:
+                # Nada mudou: nem escrita local nem chamada remota
+                return Response(serializer.data)
+            serializer.save()
+
+            # Telefone, gestor etc. não vão para a API: só gera evento se um campo do payload mudou
+            if diferencas.keys() & set(parceiros_embedded_service.CAMPOS_API):
+                outbox.registrar_atualizacao(parceiro)
+        return Response(serializer.data)
+
+    def _atualizar_direto(self, request, parcial):
+        """
+        Sem a outbox: PUT na API primeiro, fora de transação, e depois uma
+        transação curta para o banco. Nenhuma linha fica travada durante a
+        chamada remota; se o banco falhar, a API volta aos dados antigos.
+        """
+        parceiro = self.get_object()
+        serializer = self.get_serializer(parceiro, data=request.data, partial=parcial)
+        serializer.is_valid(raise_exception=True)
+
+        diferencas = parceiro.diferencas(serializer.validated_data)
+        if not diferencas:
+            return Response(serializer.data)
+
+        dados_antigos = provisionamento.dados_para_api(parceiro)
+        sincronizar = bool(diferencas.keys() & set(parceiros_embedded_service.CAMPOS_API))
+        if sincronizar:
+            dados_api = {**dados_antigos, **{campo: novo for campo, (_, novo) in diferencas.items() if campo in dados_antigos}}
+            try:
+                sucesso, erro_api = parceiros_embedded_service.atualizar_usuario(parceiro.api_user_id, dados_api)
+            except resiliencia.ServicoIndisponivel as e:
+                return _resposta_indisponivel(e)
+            if not sucesso:
+                return Response({"detail": erro_api}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                serializer.save()
         except Exception as e:
-            # 4. Rollback!
-            parceiros_embedded_service.rollback_criacao_usuario(email_para_api)
+            if sincronizar:
+                # Desfaz na API o que o banco não conseguiu gravar (ou deixa na outbox)
+                outbox.restaurar_na_api(parceiro.pk)
             return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response(serializer.data)
+
+    def destroy(self, request, *args, **kwargs):
+        if outbox.outbox_ativa():
+            with transaction.atomic():
+                parceiro = self.get_object()
+                outbox.registrar_delecao(parceiro)
+                parceiro.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        # Sem a outbox: DELETE na API primeiro, fora de transação. Se o banco
+        # falhar depois, o cliente repete: o DELETE remoto é idempotente (404 conta como sucesso)
+        parceiro = self.get_object()
+        try:
+            sucesso, erro_api = parceiros_embedded_service.deletar_usuario(parceiro.email_gestor)
+        except resiliencia.ServicoIndisponivel as e:
+            return _resposta_indisponivel(e)
+        if not sucesso:
+            return Response({"detail": erro_api}, status=status.HTTP_400_BAD_REQUEST)
 
-    # (Você faria o mesmo 'override' para os métodos 'update' e 'destroy'
-    #  para chamar 'atualizar_usuario' e 'deletar_usuario' da sua service)
\ No newline at end of file
+        with transaction.atomic():
+            parceiro.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
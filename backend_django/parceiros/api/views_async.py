@@ -0,0 +1,229 @@
+# CÓDIGO para: backend_django/parceiros/api/views_async.py
+
+# Views assíncronas (Django puro: o DRF não tem views async) para as rotas de
+# escrita que passam a maior parte do tempo esperando a API Embedded.
+# Sob ASGI (ex.: `uvicorn backend_api.asgi:application`) um único worker
+# atende centenas dessas requisições ao mesmo tempo:
+#
+# - POST   /api/v1/async/parceiros/                    (Criar; 409 se parecer duplicado)
+# - PUT    /api/v1/async/parceiros/{id}/               (Atualizar; PATCH = parcial)
+# - DELETE /api/v1/async/parceiros/{id}/               (Deletar)
+# - POST   /api/v1/async/parceiros/{id}/definir-senha/ (Definir a senha na API)
+#
+# Validação e respostas usam o mesmo ParceiroSerializer das rotas síncronas.
+# Com a outbox ligada (settings.PARCEIROS_OUTBOX) atualização e deleção só
+# gravam no banco, como nas rotas síncronas; a definição de senha continua direta.
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.reverse import reverse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .. import duplicados, outbox, provisionamento, resiliencia, senhas
+from .. import services_async as parceiros_embedded_service
+from ..models import Parceiro
+from ..services import CAMPOS_API
+from .serializers import DefinirSenhaSerializer, ParceiroSerializer
+
+
+def _responder(dados, status=200, headers=None):
+    return JsonResponse(dados, status=status, encoder=JSONEncoder, safe=False, headers=headers)
+
+
+def _ler_json(request):
+    """Corpo JSON da requisição. Retorna (dados, resposta_de_erro)."""
+    try:
+        dados = json.loads(request.body or b'{}')
+    except ValueError:
+        return None, _responder({"detail": "JSON inválido."}, status=400)
+    if not isinstance(dados, dict):
+        return None, _responder({"detail": "Envie um objeto JSON."}, status=400)
+    return dados, None
+
+
+async def _buscar_parceiro(pk):
+    try:
+        return await Parceiro.objects.filter(status=True).aget(pk=pk)
+    except (Parceiro.DoesNotExist, ValueError):
+        return None
+
+
+def _nao_encontrado():
+    return _responder({"detail": "Não encontrado."}, status=404)
+
+
+def _indisponivel(erro):
+    return _responder({"detail": str(erro)}, status=503, headers={'Retry-After': str(erro.retry_after or 1)})
+
+
+def _salvar_com_evento(serializer, sincronizar):
+    with transaction.atomic():
+        parceiro = serializer.save()
+        if sincronizar:
+            outbox.registrar_atualizacao(parceiro)
+
+
+def _deletar_com_evento(parceiro):
+    with transaction.atomic():
+        outbox.registrar_delecao(parceiro)
+        parceiro.delete()
+
+
+def _deletar(parceiro):
+    with transaction.atomic():
+        parceiro.delete()
+
+
+def _salvar_pendente(serializer):
+    # O ORM async não tem transações: o bloco inteiro roda em uma thread
+    with transaction.atomic():
+        parceiro = serializer.save(status_provisionamento='PENDENTE')
+        provisionamento.enfileirar_provisionamento(parceiro)
+    return parceiro
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ParceiroCriacaoAsyncView(View):
+    http_method_names = ['post', 'options']
+
+    async def post(self, request):
+        dados, erro = _ler_json(request)
+        if erro:
+            return erro
+        serializer = ParceiroSerializer(data=dados)
+        if not await sync_to_async(serializer.is_valid)():
+            return _responder(serializer.errors, status=400)
+        data = serializer.validated_data
+        email_para_api = data.get('email_gestor')
+
+        suspeitos = await sync_to_async(duplicados.verificar_antes_de_criar)(request, data)
+        if suspeitos:
+            return _responder({"detail": duplicados.MENSAGEM_DUPLICADO, "duplicados": suspeitos}, status=409)
+
+        if provisionamento.provisionamento_assincrono_ativo(request):
+            parceiro = await sync_to_async(_salvar_pendente)(serializer)
+            url_status = reverse('parceiro-provisionamento', args=[parceiro.pk], request=request)
+            return _responder(serializer.data, status=202, headers={'Location': url_status})
+
+        try:
+            # Se falhar depois do POST, o próprio serviço já desfez o usuário criado
+            api_id, erro_api = await parceiros_embedded_service.criar_parceiro_completo(data)
+        except resiliencia.ServicoIndisponivel as e:
+            return _indisponivel(e)
+        except Exception as e:
+            return _responder({"detail": str(e)}, status=500)
+        if erro_api:
+            return _responder({"detail": erro_api}, status=400)
+
+        try:
+            await sync_to_async(serializer.save)(api_user_id=api_id)
+        except Exception as e:
+            # O usuário existe na API, mas o parceiro não foi gravado: desfaz
+            await sync_to_async(outbox.desfazer_criacao)(email_para_api)
+            return _responder({"detail": str(e)}, status=500)
+        return _responder(serializer.data, status=201)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ParceiroDetalheAsyncView(View):
+    http_method_names = ['put', 'patch', 'delete', 'options']
+
+    async def put(self, request, pk):
+        return await self._atualizar(request, pk, parcial=False)
+
+    async def patch(self, request, pk):
+        return await self._atualizar(request, pk, parcial=True)
+
+    async def _atualizar(self, request, pk, parcial):
+        parceiro = await _buscar_parceiro(pk)
+        if parceiro is None:
+            return _nao_encontrado()
+        dados, erro = _ler_json(request)
+        if erro:
+            return erro
+        serializer = ParceiroSerializer(parceiro, data=dados, partial=parcial)
+        if not await sync_to_async(serializer.is_valid)():
+            return _responder(serializer.errors, status=400)
+
+        diferencas = parceiro.diferencas(serializer.validated_data)
+        if not diferencas:
+            return _responder(serializer.data)
+
+        # Só os campos enviados à API justificam o PUT remoto
+        dados_antigos = provisionamento.dados_para_api(parceiro)
+        sincronizar = bool(diferencas.keys() & set(CAMPOS_API))
+        if outbox.outbox_ativa():
+            # Só o commit local: o despachante da outbox leva a alteração à API
+            await sync_to_async(_salvar_com_evento)(serializer, sincronizar)
+            return _responder(serializer.data)
+        if sincronizar:
+            dados_api = {**dados_antigos, **{campo: novo for campo, (_, novo) in diferencas.items() if campo in dados_antigos}}
+            try:
+                sucesso, erro_api = await parceiros_embedded_service.atualizar_usuario(parceiro.api_user_id, dados_api)
+            except resiliencia.ServicoIndisponivel as e:
+                return _indisponivel(e)
+            if not sucesso:
+                return _responder({"detail": erro_api}, status=400)
+
+        try:
+            await sync_to_async(serializer.save)()
+        except Exception as e:
+            if sincronizar:
+                # Desfaz na API o que o banco não conseguiu gravar (ou deixa na outbox)
+                await sync_to_async(outbox.restaurar_na_api)(parceiro.pk)
+            return _responder({"detail": str(e)}, status=500)
+        return _responder(serializer.data)
+
+    async def delete(self, request, pk):
+        parceiro = await _buscar_parceiro(pk)
+        if parceiro is None:
+            return _nao_encontrado()
+        if outbox.outbox_ativa():
+            await sync_to_async(_deletar_com_evento)(parceiro)
+            return HttpResponse(status=204)
+
+        # Mesma ordem da rota síncrona: DELETE na API primeiro, fora de transação;
+        # se o banco falhar depois, o cliente repete (404 na API conta como sucesso)
+        try:
+            sucesso, erro_api = await parceiros_embedded_service.deletar_usuario(parceiro.email_gestor)
+        except resiliencia.ServicoIndisponivel as e:
+            return _indisponivel(e)
+        if not sucesso:
+            return _responder({"detail": erro_api}, status=400)
+
+        await sync_to_async(_deletar)(parceiro)
+        return HttpResponse(status=204)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ParceiroSenhaAsyncView(View):
+    http_method_names = ['post', 'options']
+
+    async def post(self, request, pk):
+        parceiro = await _buscar_parceiro(pk)
+        if parceiro is None:
+            return _nao_encontrado()
+        dados, erro = _ler_json(request)
+        if erro:
+            return erro
+        serializer = DefinirSenhaSerializer(data=dados)
+        if not serializer.is_valid():
+            return _responder(serializer.errors, status=400)
+        try:
+            sucesso, erro_api = await parceiros_embedded_service.definir_senha_usuario(
+                parceiro.email_gestor, serializer.validated_data['senha']
+            )
+        except resiliencia.ServicoIndisponivel as e:
+            return _indisponivel(e)
+        if not sucesso:
+            return _responder({"detail": erro_api}, status=400)
+
+        # Mesmo caminho da rota síncrona: resumo, histórico e cache atualizados juntos
+        await sync_to_async(senhas.marcar_senha_definida)([parceiro.pk])
+        return _responder({"id": parceiro.pk, "senha_definida": True})
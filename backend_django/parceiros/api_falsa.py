@@ -0,0 +1,187 @@
+# CÓDIGO para: backend_django/parceiros/api_falsa.py
+
+# Servidor local que imita a API Power Embedded (/api/user, /link-groups,
+# /change-password e DELETE /api/user/<email>) para benchmarks e testes de
+# carga, com latência e taxa de erros configuráveis. Os usuários ficam em memória.
+#
+#   with ServidorApiFalsa(latencia=0.05, taxa_erro=0.01) as api:
+#       with override_settings(EMBEDDED_API_URL=api.url): ...
+
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+PREFIXO = '/api/user'
+
+
+class EstadoApiFalsa:
+    def __init__(self, latencia=0.0, variacao=0.0, taxa_erro=0.0, post_devolve_usuario=True, semente=None):
+        self.latencia = latencia
+        self.variacao = variacao
+        self.taxa_erro = taxa_erro
+        self.post_devolve_usuario = post_devolve_usuario
+        self.usuarios = {}  # e-mail (minúsculo) -> usuário no formato da API
+        self.chamadas = {}  # "MÉTODO rota" -> quantidade
+        self.lock = threading.Lock()
+        self._aleatorio = random.Random(semente)
+
+    def sortear(self):
+        """Retorna (espera_em_segundos, deve_falhar) para uma chamada."""
+        with self.lock:
+            espera = self.latencia + self._aleatorio.uniform(0, self.variacao) if self.variacao else self.latencia
+            return espera, self._aleatorio.random() < self.taxa_erro
+
+    def contar(self, chave):
+        with self.lock:
+            self.chamadas[chave] = self.chamadas.get(chave, 0) + 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, como a API real (o pool do services reaproveita)
+    disable_nagle_algorithm = True  # Cabeçalho e corpo saem em escritas separadas
+
+    def log_message(self, formato, *args):
+        pass
+
+    @property
+    def estado(self):
+        return self.server.estado
+
+    def do_GET(self):
+        self._tratar('GET')
+
+    def do_POST(self):
+        self._tratar('POST')
+
+    def do_PUT(self):
+        self._tratar('PUT')
+
+    def do_DELETE(self):
+        self._tratar('DELETE')
+
+    def _tratar(self, metodo):
+        partes = urlsplit(self.path)
+        if not partes.path.startswith(PREFIXO):
+            return self._responder(404, {'message': 'Rota desconhecida.'})
+        rota = partes.path[len(PREFIXO):]
+        corpo = self._ler_corpo()
+
+        espera, falhar = self.estado.sortear()
+        if espera:
+            time.sleep(espera)
+        self.estado.contar(f"{metodo} {rota if rota in ('/link-groups', '/change-password') else PREFIXO}")
+        if falhar:
+            return self._responder(503, {'message': 'Falha simulada.'})
+
+        if metodo == 'POST' and rota in ('', '/'):
+            return self._criar(corpo)
+        if metodo == 'GET' and rota in ('', '/'):
+            return self._buscar(parse_qs(partes.query))
+        if metodo == 'PUT' and rota in ('', '/'):
+            return self._atualizar(corpo)
+        if metodo == 'PUT' and rota == '/link-groups':
+            return self._existe(corpo.get('userEmail'))
+        if metodo == 'PUT' and rota == '/change-password':
+            return self._existe(corpo.get('email'))
+        if metodo == 'DELETE' and rota.count('/') == 1:
+            return self._deletar(unquote(rota[1:]))
+        return self._responder(404, {'message': 'Rota desconhecida.'})
+
+    def _ler_corpo(self):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        if not tamanho:
+            return {}
+        try:
+            return json.loads(self.rfile.read(tamanho) or b'{}')
+        except ValueError:
+            return {}
+
+    def _responder(self, status, dados=None):
+        corpo = json.dumps(dados if dados is not None else {}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    # --- ROTAS ---
+
+    def _criar(self, dados):
+        email = (dados.get('email') or '').lower()
+        if not email or not dados.get('name'):
+            return self._responder(400, {'message': 'name e email são obrigatórios.'})
+        with self.estado.lock:
+            if email in self.estado.usuarios:
+                return self._responder(400, {'message': f"Usuário '{email}' já existe."})
+            usuario = dict(dados, id=str(uuid.uuid4()), email=email)
+            self.estado.usuarios[email] = usuario
+        return self._responder(200, usuario if self.estado.post_devolve_usuario else {})
+
+    def _buscar(self, parametros):
+        with self.estado.lock:
+            if 'email' in parametros:
+                usuario = self.estado.usuarios.get(parametros['email'][0].lower())
+                return self._responder(200, {'data': [usuario] if usuario else []})
+            pagina = int(parametros.get('page', ['1'])[0])
+            tamanho = int(parametros.get('pageSize', ['100'])[0])
+            usuarios = list(self.estado.usuarios.values())[(pagina - 1) * tamanho:pagina * tamanho]
+        return self._responder(200, {'data': usuarios})
+
+    def _atualizar(self, dados):
+        with self.estado.lock:
+            atual = next((u for u in self.estado.usuarios.values() if u['id'] == dados.get('id')), None)
+            if atual is None:
+                return self._responder(404, {'message': 'Usuário não encontrado.'})
+            atual.update({chave: valor for chave, valor in dados.items() if chave != 'email'})
+        return self._responder(200, atual)
+
+    def _existe(self, email):
+        with self.estado.lock:
+            existe = (email or '').lower() in self.estado.usuarios
+        if not existe:
+            return self._responder(400, {'errors': f"Usuário '{email}' não encontrado."})
+        return self._responder(200, {})
+
+    def _deletar(self, email):
+        with self.estado.lock:
+            removido = self.estado.usuarios.pop(email.lower(), None)
+        return self._responder(200 if removido else 404, {})
+
+
+class ServidorApiFalsa:
+    """Sobe a API falsa em uma thread. `porta=0` escolhe uma porta livre."""
+
+    def __init__(self, host='127.0.0.1', porta=0, **opcoes):
+        self.estado = EstadoApiFalsa(**opcoes)
+        self._servidor = ThreadingHTTPServer((host, porta), _Handler)
+        self._servidor.daemon_threads = True
+        self._servidor.estado = self.estado
+        self._thread = None
+
+    @property
+    def url(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}{PREFIXO}"
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def servir(self):
+        """Atende em primeiro plano (usado pelo comando api_embedded_falsa)."""
+        self._servidor.serve_forever()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
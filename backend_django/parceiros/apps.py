@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ParceirosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'parceiros'
+
+    def ready(self):
+        from . import signals  # noqa: F401 (registra os receivers)
+        from backend_api.metricas import registrar_coletor
+        from .observabilidade import coletar
+        registrar_coletor(coletar)
@@ -0,0 +1,158 @@
+# CÓDIGO para: backend_django/parceiros/benchmark.py
+
+# Cenários de carga da API de parceiros (usados pelo comando benchmark_api).
+# As requisições passam pela pilha completa do Django (middlewares, DRF,
+# serializers) com o cliente de testes, sem rede, e a API Embedded é a
+# falsa de parceiros/api_falsa.py. Cada cenário mede latência e consultas.
+
+import json
+import math
+import random
+import statistics
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .dados_sinteticos import DOMINIO_SINTETICO
+
+URL_LISTA = '/api/v1/parceiros/'
+
+
+def percentil(valores, p):
+    """Percentil pelo método nearest-rank (valores já ordenados)."""
+    if not valores:
+        return None
+    posicao = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[posicao]
+
+
+def resumir_medicoes(latencias, consultas, status, duracao_total, itens_por_requisicao=1):
+    latencias = sorted(latencias)
+    consultas = sorted(consultas)
+    erros = {}
+    for codigo in status:
+        if codigo >= 400:
+            erros[str(codigo)] = erros.get(str(codigo), 0) + 1
+    total = len(latencias)
+    return {
+        'requisicoes': total,
+        'erros': erros,
+        'duracao_s': round(duracao_total, 3),
+        'req_por_s': round(total / duracao_total, 2) if duracao_total else None,
+        'itens_por_s': round(total * itens_por_requisicao / duracao_total, 2) if duracao_total else None,
+        'latencia_ms': {
+            'p50': round(percentil(latencias, 50), 3),
+            'p95': round(percentil(latencias, 95), 3),
+            'p99': round(percentil(latencias, 99), 3),
+            'max': round(latencias[-1], 3),
+            'media': round(statistics.fmean(latencias), 3),
+        },
+        'consultas': {
+            'media': round(statistics.fmean(consultas), 2),
+            'p95': percentil(consultas, 95),
+            'max': consultas[-1],
+        },
+    }
+
+
+def _dados_novo_parceiro(n):
+    return {
+        'nome_ajustado': f'BENCH {n}', 'tipo': 'INDUSTRIA', 'cnpj': f'{n:014d}',
+        'nome_fantasia': f'Bench {n}', 'razao_social': f'Bench {n} LTDA', 'gestor': 'Gestor',
+        'telefone_gestor': '11999999999', 'email_gestor': f'novo{n}@{DOMINIO_SINTETICO}',
+        'data_entrada': '2025-01-01',
+    }
+
+
+class Cenarios:
+    """
+    Gera as requisições de cada cenário. `ids` são ids de parceiros ativos
+    existentes; `semente` deixa a sequência de requisições repetível.
+    """
+
+    NOMES = ('listagem', 'listagem_filtrada', 'busca', 'detalhe', 'criacao', 'atualizacao', 'importacao')
+
+    def __init__(self, ids, semente=42, tamanho_importacao=100):
+        self.ids = ids
+        self.aleatorio = random.Random(semente)
+        self.tamanho_importacao = tamanho_importacao
+        self._contador = 0
+
+    def _proximo(self):
+        self._contador += 1
+        return self._contador
+
+    def listagem(self, cliente):
+        return cliente.get(URL_LISTA, {'page_size': 50})
+
+    def listagem_filtrada(self, cliente):
+        tipo = self.aleatorio.choice(['INDUSTRIA', 'DISTRIBUIDOR'])
+        return cliente.get(URL_LISTA, {'tipo': tipo, 'senha_definida': 'false', 'page_size': 50})
+
+    def busca(self, cliente):
+        return cliente.get(URL_LISTA, {'search': f"Atacado {self.aleatorio.randrange(1000):04d}"})
+
+    def detalhe(self, cliente):
+        return cliente.get(f"{URL_LISTA}{self.aleatorio.choice(self.ids)}/")
+
+    def criacao(self, cliente):
+        return cliente.post(URL_LISTA, _dados_novo_parceiro(self._proximo()), format='json')
+
+    def atualizacao(self, cliente):
+        pk = self.aleatorio.choice(self.ids)
+        return cliente.patch(f"{URL_LISTA}{pk}/", {'gestor': f'Gestor {self._proximo()}'}, format='json')
+
+    def importacao(self, cliente):
+        registros = [_dados_novo_parceiro(self._proximo()) for _ in range(self.tamanho_importacao)]
+        return cliente.post(f"{URL_LISTA}importar/", registros, format='json')
+
+    def itens_por_requisicao(self, nome):
+        return self.tamanho_importacao if nome == 'importacao' else 1
+
+
+def executar_cenario(cenarios, nome, requisicoes, aquecimento=5):
+    """Executa `requisicoes` chamadas do cenário e devolve o resumo das medições."""
+    cliente = APIClient()
+    gerar = getattr(cenarios, nome)
+    for _ in range(aquecimento):
+        gerar(cliente)
+
+    latencias, consultas, status = [], [], []
+    inicio_total = time.perf_counter()
+    for _ in range(requisicoes):
+        with CaptureQueriesContext(connection) as capturadas:
+            inicio = time.perf_counter()
+            resposta = gerar(cliente)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(len(capturadas))
+        status.append(resposta.status_code)
+    duracao = time.perf_counter() - inicio_total
+    return resumir_medicoes(latencias, consultas, status, duracao, cenarios.itens_por_requisicao(nome))
+
+
+def comparar_relatorios(base, atual):
+    """Variação (%) de req/s e p95 de cada cenário entre dois relatórios JSON."""
+    variacoes = {}
+    for nome, medicao in atual['cenarios'].items():
+        anterior = base.get('cenarios', {}).get(nome)
+        if not anterior:
+            continue
+        variacoes[nome] = {
+            'req_por_s_%': _variacao(anterior['req_por_s'], medicao['req_por_s']),
+            'p95_%': _variacao(anterior['latencia_ms']['p95'], medicao['latencia_ms']['p95']),
+            'consultas_media': [anterior['consultas']['media'], medicao['consultas']['media']],
+        }
+    return variacoes
+
+
+def _variacao(antes, depois):
+    if not antes or depois is None:
+        return None
+    return round((depois - antes) / antes * 100, 1)
+
+
+def carregar_relatorio(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
@@ -0,0 +1,89 @@
+# CÓDIGO para: backend_django/parceiros/busca.py
+
+# Busca de parceiros ativos para o autocomplete (GET /parceiros/autocomplete/?q=).
+# Cada palavra digitada vira um prefixo (todas precisam casar) procurado em
+# nome_fantasia, razao_social, gestor e no CNPJ só com dígitos, sem diferenciar
+# acentos. Usa o índice de texto completo de parceiros/indices.py: FTS5 (bm25)
+# no SQLite, tsvector + unaccent (ts_rank) no PostgreSQL. Em outros bancos cai
+# num istartswith por coluna.
+
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+from .indices import TABELA, TABELA_FTS, TSVECTOR_PG
+from .models import Parceiro
+from .normalizacao import normalizar_cnpj
+
+TAMANHO_MINIMO = 2     # Caracteres antes de consultar
+LIMITE_PADRAO = 10
+LIMITE_MAXIMO = 50
+CAMPOS_RESULTADO = ('id', 'nome_fantasia', 'razao_social', 'gestor', 'cnpj')
+
+_PALAVRAS = re.compile(r'\w+')
+_CNPJ = re.compile(r'^[\d./\-\s]+$')
+
+
+def termos(texto):
+    """
+    Palavras da busca. Um texto só com dígitos e pontuação de CNPJ vira um
+    único termo com os dígitos ("12.345.678/0001" -> "123456780001").
+    """
+    texto = (texto or '').strip()
+    if _CNPJ.match(texto) and normalizar_cnpj(texto):
+        return [normalizar_cnpj(texto)]
+    return [palavra.lower() for palavra in _PALAVRAS.findall(texto)]
+
+
+def _ids_sqlite(cursor, palavras, limite):
+    # Entre aspas cada palavra é literal no FTS5; o * pede o prefixo
+    consulta = ' '.join(f'"{palavra}"*' for palavra in palavras)
+    cursor.execute(
+        f"SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s ORDER BY rank LIMIT %s",
+        [consulta, limite],
+    )
+    return [linha[0] for linha in cursor.fetchall()]
+
+
+def _ids_postgresql(cursor, palavras, limite):
+    consulta = ' & '.join(f'{palavra}:*' for palavra in palavras)
+    cursor.execute(
+        f"SELECT id FROM {TABELA} "
+        f"WHERE status AND ({TSVECTOR_PG}) @@ to_tsquery('simple', parceiros_unaccent(%s)) "
+        f"ORDER BY ts_rank(({TSVECTOR_PG}), to_tsquery('simple', parceiros_unaccent(%s))) DESC, id DESC "
+        f"LIMIT %s",
+        [consulta, consulta, limite],
+    )
+    return [linha[0] for linha in cursor.fetchall()]
+
+
+def _ids_generico(queryset, palavras, limite):
+    condicao = Q()
+    for palavra in palavras:
+        condicao &= (
+            Q(nome_fantasia__istartswith=palavra) | Q(razao_social__istartswith=palavra)
+            | Q(gestor__istartswith=palavra) | Q(cnpj_normalizado__startswith=palavra)
+        )
+    return list(queryset.filter(condicao).order_by('nome_fantasia', '-id').values_list('id', flat=True)[:limite])
+
+
+def buscar(texto, limite=LIMITE_PADRAO, queryset=None):
+    """Até `limite` parceiros ativos (dicts com CAMPOS_RESULTADO), do mais ao menos relevante."""
+    palavras = termos(texto)
+    if not palavras or len(''.join(palavras)) < TAMANHO_MINIMO:
+        return []
+    queryset = Parceiro.objects.filter(status=True) if queryset is None else queryset
+
+    conexao = connections[queryset.db]
+    if conexao.vendor in ('sqlite', 'postgresql'):
+        with conexao.cursor() as cursor:
+            if conexao.vendor == 'sqlite':
+                ids = _ids_sqlite(cursor, palavras, limite)
+            else:
+                ids = _ids_postgresql(cursor, palavras, limite)
+    else:
+        ids = _ids_generico(queryset, palavras, limite)
+
+    linhas = {linha['id']: linha for linha in queryset.filter(id__in=ids).values(*CAMPOS_RESULTADO)}
+    return [linhas[pk] for pk in ids if pk in linhas]
@@ -0,0 +1,115 @@
+# CÓDIGO para: backend_django/parceiros/cache.py
+
+# Cache das respostas de leitura da API de parceiros.
+# As chaves carregam um número de versão: qualquer escrita em Parceiro incrementa
+# a versão (via signals ou chamada explícita nos caminhos com bulk_create/update),
+# e todas as entradas antigas deixam de ser usadas de uma vez.
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+CHAVE_VERSAO = 'parceiros:versao'
+CHAVE_ACERTOS = 'parceiros:cache:acertos'
+CHAVE_FALHAS = 'parceiros:cache:falhas'
+CHAVE_ULTIMA_ESCRITA = 'parceiros:ultima_escrita'
+
+
+def get_cache():
+    return caches[getattr(settings, 'PARCEIROS_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'PARCEIROS_CACHE_TIMEOUT', 300)
+
+
+def versao_atual():
+    cache = get_cache()
+    versao = cache.get(CHAVE_VERSAO)
+    if versao is None:
+        # Começa pelo relógio (ms) para nunca reaproveitar uma versão antiga se a chave for despejada
+        cache.add(CHAVE_VERSAO, int(time.time() * 1000), None)
+        versao = cache.get(CHAVE_VERSAO)
+    return versao
+
+
+def _incrementar_versao():
+    cache = get_cache()
+    agora = time.time()
+    try:
+        versao = cache.incr(CHAVE_VERSAO)
+    except ValueError:
+        versao = int(agora * 1000)
+        cache.set(CHAVE_VERSAO, versao, None)
+    cache.add(f"{CHAVE_ULTIMA_ESCRITA}:{versao}", agora, _timeout())
+    cache.set(CHAVE_ULTIMA_ESCRITA, agora, None)
+
+
+def momento_da_versao(versao):
+    """
+    Quando a `versao` começou a valer (timestamp): é o Last-Modified das
+    respostas dela. Se o registro sumiu, vale o momento atual, que nunca é
+    anterior à escrita que criou a versão.
+    """
+    cache = get_cache()
+    chave = f"{CHAVE_ULTIMA_ESCRITA}:{versao}"
+    cache.add(chave, time.time(), _timeout())
+    return cache.get(chave) or time.time()
+
+
+def invalidar_cache_parceiros():
+    """Descarta todas as respostas em cache (quando a transação atual for confirmada)."""
+    transaction.on_commit(_incrementar_versao)
+
+
+def escrita_recente(segundos):
+    """True se houve escrita em parceiros nos últimos `segundos`."""
+    ultima = get_cache().get(CHAVE_ULTIMA_ESCRITA)
+    return ultima is not None and time.time() - ultima < segundos
+
+
+def montar_chave(escopo, request, versao=None):
+    """Chave da resposta: versão + escopo + caminho + query string ordenada."""
+    parametros = sorted(request.query_params.lists())
+    bruto = f"{request.path}?{parametros}"
+    resumo = hashlib.md5(bruto.encode('utf-8')).hexdigest()
+    return f"parceiros:v{versao_atual() if versao is None else versao}:{escopo}:{resumo}"
+
+
+def ler(chave):
+    entrada = get_cache().get(chave)
+    _contar(CHAVE_ACERTOS if entrada is not None else CHAVE_FALHAS)
+    return entrada
+
+
+def gravar(chave, entrada):
+    get_cache().set(chave, entrada, _timeout())
+
+
+def _contar(chave):
+    cache = get_cache()
+    try:
+        cache.incr(chave)
+    except ValueError:
+        # Contador ausente (primeiro uso, despejado ou cache que não guarda nada)
+        if not cache.add(chave, 1, None):
+            try:
+                cache.incr(chave)
+            except ValueError:
+                pass
+
+
+def estatisticas():
+    cache = get_cache()
+    acertos = cache.get(CHAVE_ACERTOS) or 0
+    falhas = cache.get(CHAVE_FALHAS) or 0
+    total = acertos + falhas
+    return {
+        'acertos': acertos,
+        'falhas': falhas,
+        'taxa_acerto': round(acertos / total, 4) if total else None,
+        'versao': versao_atual(),
+    }
@@ -0,0 +1,28 @@
+# CÓDIGO para: backend_django/parceiros/concorrencia.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+
+
+def _com_conexao_propria(funcao):
+    def executar(item):
+        try:
+            return funcao(item)
+        finally:
+            # Cada thread abre sua própria conexão com o banco; fechamos ao terminar
+            connection.close()
+    return executar
+
+
+def executar_em_paralelo(funcao, itens, workers):
+    """
+    Aplica `funcao` a cada item com no máximo `workers` threads, preservando a
+    ordem dos resultados. Com workers <= 1 roda na thread atual (útil nos testes,
+    onde o banco em memória não é compartilhado entre threads).
+    """
+    itens = list(itens)
+    if workers <= 1 or len(itens) <= 1:
+        return [funcao(item) for item in itens]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_com_conexao_propria(funcao), itens))
@@ -0,0 +1,58 @@
+# CÓDIGO para: backend_django/parceiros/dados_sinteticos.py
+
+# Geração de parceiros sintéticos para benchmarks (nunca use em produção).
+# Os e-mails usam o domínio reservado .invalid para não colidir com dados reais.
+
+from datetime import date, timedelta
+from itertools import islice
+
+from .models import Parceiro
+from .normalizacao import normalizar_cnpj
+from . import duplicados, historico, resumo
+
+DOMINIO_SINTETICO = 'bench.invalid'
+NOMES = ['Comercial', 'Industria', 'Distribuidora', 'Alimentos', 'Logistica', 'Farmacêutica', 'Atacado', 'Varejo']
+
+
+def _cnpj(numero):
+    digitos = f"{numero:014d}"
+    return f"{digitos[:2]}.{digitos[2:5]}.{digitos[5:8]}/{digitos[8:12]}-{digitos[12:]}"
+
+
+def gerar_parceiros(quantidade, inicio=0):
+    """Gera objetos Parceiro (não salvos) com uma distribuição próxima da real."""
+    base = date(2020, 1, 1)
+    for i in range(inicio, inicio + quantidade):
+        nome = f"{NOMES[i % len(NOMES)]} {i:07d}"
+        cnpj = _cnpj(10_000_000_000_000 + i)
+        yield Parceiro(
+            api_user_id=f"bench-{i}",
+            nome_ajustado=nome.upper(),
+            tipo='INDUSTRIA' if i % 3 else 'DISTRIBUIDOR',
+            cnpj=cnpj,
+            cnpj_normalizado=normalizar_cnpj(cnpj),
+            nome_fantasia=nome,
+            razao_social=f"{nome} LTDA",
+            gestor=f"Gestor {i}",
+            telefone_gestor=f"11{i:09d}"[-11:],
+            email_gestor=f"gestor{i}@{DOMINIO_SINTETICO}",
+            data_entrada=base + timedelta(days=i % 2000),
+            data_saida=(base + timedelta(days=2000 + i % 1000)) if i % 4 == 0 else None,
+            status=i % 10 != 0,           # ~10% inativos
+            senha_definida=i % 5 < 2,     # ~40% com senha definida
+        )
+
+
+def semear_parceiros(quantidade, inicio=0, lote=5000):
+    """Grava `quantidade` parceiros sintéticos com bulk_create em lotes."""
+    objetos = gerar_parceiros(quantidade, inicio=inicio)
+    total = 0
+    while True:
+        bloco = list(islice(objetos, lote))
+        if not bloco:
+            return total
+        Parceiro.objects.bulk_create(bloco, batch_size=lote)
+        resumo.registrar_criados(bloco)
+        historico.registrar_criados(bloco)
+        duplicados.indexar(bloco)
+        total += len(bloco)
@@ -0,0 +1,286 @@
+# CÓDIGO para: backend_django/parceiros/duplicados.py
+
+# Detecção de parceiros duplicados (mesma empresa com grafias diferentes de
+# razão social/nome fantasia ou do CNPJ), sem comparar todos contra todos:
+#
+# 1. Bloqueio: cada parceiro tem chaves em ChaveDuplicidade — o CNPJ só com
+#    dígitos e as bandas MinHash dos trigramas dos nomes normalizados. Nomes
+#    parecidos (Jaccard alto) tendem a cair em pelo menos uma banda igual.
+#    As chaves são mantidas pelos signals e pelos caminhos em massa, como o
+#    resumo e o histórico; `python manage.py detectar_duplicados --reindexar`
+#    refaz tudo.
+# 2. Verificação: só os pares que dividem uma chave são comparados (mesmo
+#    CNPJ ou similaridade de Jaccard dos trigramas >= limiar).
+#
+# Usado pelo relatório (GET /parceiros/duplicados/ e o comando) e pela
+# checagem antes de criar um parceiro (POST, antes de chamar a API Embedded).
+
+import hashlib
+import random
+import struct
+from collections import defaultdict
+from functools import lru_cache
+from itertools import combinations, islice, pairwise
+
+from django.conf import settings
+from django.db.models import Count
+
+from .models import ChaveDuplicidade, Parceiro
+from .normalizacao import normalizar_cnpj, normalizar_nome
+
+# Campos que entram nas chaves (mudou um deles, o parceiro é reindexado)
+CAMPOS = ('cnpj', 'nome_fantasia', 'razao_social')
+CAMPOS_NOME = ('nome_fantasia', 'razao_social')
+
+TAMANHO_NGRAMA = 3
+NUM_BANDAS = 20
+LINHAS_POR_BANDA = 3  # 60 hashes: pares com Jaccard 0,5 viram candidatos ~93% das vezes, 0,6 ~99%
+LIMIAR_PADRAO = 0.6
+# Bandas de nome com mais parceiros que isso (nomes muito comuns) só ligam
+# vizinhos em cadeia no relatório, em vez de todos os pares do bloco
+TAMANHO_MAXIMO_BLOCO = 100
+TAMANHO_LOTE = 2000
+
+_PRIMO = (1 << 61) - 1
+_sorteio = random.Random(20240601)  # Fixo: as chaves gravadas precisam ser reproduzíveis
+_COEFICIENTES = [
+    (_sorteio.randrange(1, _PRIMO), _sorteio.randrange(0, _PRIMO))
+    for _ in range(NUM_BANDAS * LINHAS_POR_BANDA)
+]
+
+
+@lru_cache(maxsize=65536)
+def _permutacoes(trigrama):
+    """Os hashes do trigrama em cada permutação (o vocabulário de trigramas é pequeno: cabe no cache)."""
+    h = int.from_bytes(hashlib.blake2b(trigrama.encode(), digest_size=8).digest(), 'big')
+    return tuple((a * h + b) % _PRIMO for a, b in _COEFICIENTES)
+
+
+def ngramas(nome):
+    """Trigramas do nome normalizado (com espaço nas pontas, para pesar o início e o fim)."""
+    texto = normalizar_nome(nome)
+    if not texto:
+        return frozenset()
+    texto = f" {texto} "
+    return frozenset(texto[i:i + TAMANHO_NGRAMA] for i in range(len(texto) - TAMANHO_NGRAMA + 1))
+
+
+def _bandas(trigramas):
+    assinatura = list(map(min, zip(*map(_permutacoes, trigramas))))
+    for banda in range(NUM_BANDAS):
+        linhas = assinatura[banda * LINHAS_POR_BANDA:(banda + 1) * LINHAS_POR_BANDA]
+        resumo = hashlib.blake2b(struct.pack(f'>{LINHAS_POR_BANDA}Q', *linhas), digest_size=8).hexdigest()
+        yield f"n{banda:02d}{resumo}"
+
+
+def chaves(cnpj, nomes):
+    """Chaves de bloqueio de um parceiro: 'c<cnpj>' e uma por banda MinHash dos nomes."""
+    resultado = set()
+    cnpj = normalizar_cnpj(cnpj)
+    if cnpj:
+        resultado.add(f"c{cnpj}")
+    for trigramas in {ngramas(nome) for nome in nomes}:  # Razão social costuma repetir o nome fantasia
+        if trigramas:
+            resultado.update(_bandas(trigramas))
+    return resultado
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def similaridade(nomes_a, nomes_b):
+    """Maior Jaccard entre os nomes de um e do outro (razão social x nome fantasia também conta)."""
+    return max((jaccard(a, b) for a in nomes_a for b in nomes_b), default=0.0)
+
+
+def limiar_configurado():
+    return getattr(settings, 'PARCEIROS_DUPLICADOS_LIMIAR', LIMIAR_PADRAO)
+
+
+# --- MANUTENÇÃO DAS CHAVES ---
+
+def _objetos_chave(parceiros):
+    return [
+        ChaveDuplicidade(parceiro_id=parceiro.pk, chave=chave)
+        for parceiro in parceiros
+        for chave in chaves(parceiro.cnpj, [getattr(parceiro, campo) for campo in CAMPOS_NOME])
+    ]
+
+
+def indexar(parceiros):
+    """Grava (ou regrava) as chaves dos parceiros. Para bulk_create, que não dispara signals."""
+    parceiros = list(parceiros)
+    ChaveDuplicidade.objects.filter(parceiro_id__in=[p.pk for p in parceiros]).delete()
+    ChaveDuplicidade.objects.bulk_create(_objetos_chave(parceiros), batch_size=TAMANHO_LOTE)
+
+
+def registrar_save(anterior, parceiro):
+    """`anterior`: valores antes do save (None para um parceiro novo)."""
+    if anterior is None or any(anterior[campo] != getattr(parceiro, campo) for campo in CAMPOS):
+        indexar([parceiro])
+
+
+def reindexar():
+    """Apaga e recalcula as chaves de todos os parceiros. Retorna quantos foram indexados."""
+    ChaveDuplicidade.objects.all().delete()
+    parceiros = Parceiro.objects.order_by('id').only('id', *CAMPOS).iterator(chunk_size=TAMANHO_LOTE)
+    total = 0
+    while True:
+        lote = list(islice(parceiros, TAMANHO_LOTE))
+        if not lote:
+            return total
+        ChaveDuplicidade.objects.bulk_create(_objetos_chave(lote), batch_size=TAMANHO_LOTE)
+        total += len(lote)
+
+
+# --- VERIFICAÇÃO ---
+
+COLUNAS = ('id', 'nome_fantasia', 'razao_social', 'cnpj', 'cnpj_normalizado', 'status')
+
+
+def _carregar(ids):
+    """{id: linha} com os trigramas dos nomes já calculados, em lotes."""
+    ids = list(ids)
+    linhas = {}
+    for inicio in range(0, len(ids), TAMANHO_LOTE):
+        for linha in Parceiro.objects.filter(id__in=ids[inicio:inicio + TAMANHO_LOTE]).values(*COLUNAS):
+            linha['ngramas'] = [ngramas(linha[campo]) for campo in CAMPOS_NOME]
+            linhas[linha['id']] = linha
+    return linhas
+
+
+def _comparar(a, b, limiar):
+    """(motivo, similaridade) se `a` e `b` parecem a mesma empresa; senão None."""
+    if a['cnpj_normalizado'] and a['cnpj_normalizado'] == b['cnpj_normalizado']:
+        return 'CNPJ', 1.0
+    valor = similaridade(a['ngramas'], b['ngramas'])
+    if valor >= limiar:
+        return 'NOME', round(valor, 3)
+    return None
+
+
+def _resumo(linha):
+    return {campo: linha[campo] for campo in ('id', 'nome_fantasia', 'razao_social', 'cnpj', 'status')}
+
+
+def candidatos_para(dados, limiar=None, excluir=None):
+    """
+    Parceiros já cadastrados que parecem a mesma empresa de `dados` (cnpj,
+    nome_fantasia, razao_social), mais parecidos primeiro. Só consulta o
+    índice de chaves: serve de checagem rápida antes de criar um parceiro.
+    """
+    limiar = limiar_configurado() if limiar is None else limiar
+    chaves_novo = chaves(dados.get('cnpj'), [dados.get(campo) for campo in CAMPOS_NOME])
+    if not chaves_novo:
+        return []
+    ids = ChaveDuplicidade.objects.filter(chave__in=chaves_novo).values_list('parceiro_id', flat=True).distinct()
+    if excluir is not None:
+        ids = ids.exclude(parceiro_id=excluir)
+
+    novo = {
+        'cnpj_normalizado': normalizar_cnpj(dados.get('cnpj')),
+        'ngramas': [ngramas(dados.get(campo)) for campo in CAMPOS_NOME],
+    }
+    encontrados = []
+    for linha in _carregar(ids).values():
+        resultado = _comparar(novo, linha, limiar)
+        if resultado:
+            encontrados.append({**_resumo(linha), 'motivo': resultado[0], 'similaridade': resultado[1]})
+    return sorted(encontrados, key=lambda item: (-item['similaridade'], item['id']))
+
+
+MENSAGEM_DUPLICADO = "Parceiro possivelmente duplicado. Use ?ignorar_duplicados=true para criar mesmo assim."
+
+
+def verificar_antes_de_criar(request, dados):
+    """
+    Duplicados de `dados` para barrar um POST (antes de qualquer chamada à
+    API Embedded). Desligada por settings.PARCEIROS_VERIFICAR_DUPLICADOS=False
+    ou por requisição com ?ignorar_duplicados=true.
+    """
+    if not getattr(settings, 'PARCEIROS_VERIFICAR_DUPLICADOS', True):
+        return []
+    if request.GET.get('ignorar_duplicados', '').lower() in ('1', 'true', 'sim', 'yes'):
+        return []
+    return candidatos_para(dados)
+
+
+def _pares_do_bloco(chave, bloco, tamanho_maximo_bloco):
+    """
+    Todos os pares do bloco; numa banda de nome grande demais, só os vizinhos
+    (em ordem de id). O CNPJ sempre gera todos: mesmo CNPJ é sempre duplicado.
+    """
+    if chave.startswith('c') or len(bloco) <= tamanho_maximo_bloco:
+        return combinations(bloco, 2)
+    return pairwise(bloco)
+
+
+def _pares_candidatos(tamanho_maximo_bloco):
+    """Pares (id_a, id_b) que dividem ao menos uma chave, lendo só os blocos com 2+ parceiros."""
+    blocos = (
+        ChaveDuplicidade.objects.values('chave').annotate(n=Count('id'))
+        .filter(n__gt=1).values('chave')
+    )
+    membros = (
+        ChaveDuplicidade.objects.filter(chave__in=blocos).order_by('chave', 'parceiro_id')
+        .values_list('chave', 'parceiro_id').iterator(chunk_size=TAMANHO_LOTE)
+    )
+    pares = set()
+    chave_atual, bloco = None, []
+    for chave, parceiro_id in membros:
+        if chave != chave_atual:
+            if bloco:
+                pares.update(_pares_do_bloco(chave_atual, bloco, tamanho_maximo_bloco))
+            chave_atual, bloco = chave, []
+        bloco.append(parceiro_id)
+    if bloco:
+        pares.update(_pares_do_bloco(chave_atual, bloco, tamanho_maximo_bloco))
+    return pares
+
+
+def _raiz(pais, item):
+    while pais[item] != item:
+        pais[item] = pais[pais[item]]
+        item = pais[item]
+    return item
+
+
+def encontrar_duplicados(limiar=None, tamanho_maximo_bloco=TAMANHO_MAXIMO_BLOCO):
+    """
+    Relatório de duplicados: grupos de parceiros ligados por pares confirmados
+    (union-find), maiores primeiro. Cada grupo traz os parceiros e os pares
+    com o motivo (CNPJ ou NOME) e a similaridade.
+    """
+    limiar = limiar_configurado() if limiar is None else limiar
+    pares = _pares_candidatos(tamanho_maximo_bloco)
+    linhas = _carregar({pk for par in pares for pk in par})
+
+    pais = {}
+    confirmados = defaultdict(list)
+    for a, b in sorted(pares):
+        resultado = _comparar(linhas[a], linhas[b], limiar) if a in linhas and b in linhas else None
+        if resultado is None:
+            continue
+        pais.setdefault(a, a)
+        pais.setdefault(b, b)
+        raiz_a, raiz_b = _raiz(pais, a), _raiz(pais, b)
+        if raiz_a != raiz_b:
+            pais[max(raiz_a, raiz_b)] = min(raiz_a, raiz_b)
+        confirmados[(a, b)] = resultado
+
+    grupos = defaultdict(lambda: {'parceiros': [], 'pares': []})
+    for pk in sorted(pais):
+        grupos[_raiz(pais, pk)]['parceiros'].append(_resumo(linhas[pk]))
+    for (a, b), (motivo, valor) in confirmados.items():
+        grupos[_raiz(pais, a)]['pares'].append({'a': a, 'b': b, 'motivo': motivo, 'similaridade': valor})
+
+    ordenados = sorted(grupos.values(), key=lambda grupo: (-len(grupo['parceiros']), grupo['parceiros'][0]['id']))
+    return {
+        'limiar': limiar,
+        'total_grupos': len(ordenados),
+        'parceiros_envolvidos': len(pais),
+        'grupos': ordenados,
+    }
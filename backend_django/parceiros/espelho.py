@@ -0,0 +1,157 @@
+# CÓDIGO para: backend_django/parceiros/espelho.py
+
+# Espelho local dos usuários da API Embedded, indexado por e-mail e por id.
+# Os serviços consultam o espelho antes de ir à API:
+# - uma entrada mais nova que o TTL responde a busca sem GET remoto;
+# - com uma sincronização completa dentro do TTL, a AUSÊNCIA de um e-mail
+#   também é confiável (ex.: deletar um usuário que não existe não chama a API).
+# Entradas que não aparecem em uma sincronização completa são despejadas.
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SincronizacaoEmbedded, UsuarioEmbedded
+
+CAMPOS = ('api_id', 'nome', 'departamento', 'data_expiracao', 'sincronizado_em')
+
+
+def _ttl():
+    return timedelta(seconds=getattr(settings, 'PARCEIROS_ESPELHO_TTL', 3600))
+
+
+def _normalizar_email(email):
+    return (email or '').strip().lower()
+
+
+def _limite_frescor():
+    return timezone.now() - _ttl()
+
+
+def _da_api(dados, agora):
+    """Converte um usuário no formato da API para UsuarioEmbedded (não salvo)."""
+    return UsuarioEmbedded(
+        api_id=str(dados.get('id')),
+        email=_normalizar_email(dados.get('email')),
+        nome=dados.get('name') or '',
+        departamento=dados.get('department') or '',
+        data_expiracao=dados.get('expirationDate') or '',
+        sincronizado_em=agora,
+    )
+
+
+def como_dados_api(usuario):
+    """Formato devolvido pela API (o mesmo que services.buscar_usuario_por_email retorna)."""
+    return {
+        'id': usuario.api_id,
+        'email': usuario.email,
+        'name': usuario.nome,
+        'department': usuario.departamento,
+        'expirationDate': usuario.data_expiracao or None,
+    }
+
+
+# --- CONSULTAS ---
+
+def buscar_por_email(email):
+    """Usuário do espelho se a entrada ainda estiver dentro do TTL."""
+    return UsuarioEmbedded.objects.filter(
+        email=_normalizar_email(email), sincronizado_em__gte=_limite_frescor()
+    ).first()
+
+
+def buscar_por_id(api_id):
+    return UsuarioEmbedded.objects.filter(api_id=api_id, sincronizado_em__gte=_limite_frescor()).first()
+
+
+def sincronizacao_recente():
+    """A última sincronização completa terminou dentro do TTL?"""
+    return SincronizacaoEmbedded.objects.filter(
+        concluida_em__gte=_limite_frescor(), erro=''
+    ).exists()
+
+
+def ausencia_confirmada(email):
+    """True quando sabemos, sem chamar a API, que o e-mail não existe lá."""
+    if not sincronizacao_recente():
+        return False
+    return not UsuarioEmbedded.objects.filter(email=_normalizar_email(email)).exists()
+
+
+# --- ATUALIZAÇÕES ---
+
+def registrar(dados):
+    """Grava/atualiza um usuário vindo da API (resposta de criação, GET ou PUT)."""
+    if not dados or not dados.get('id') or not dados.get('email'):
+        return None
+    usuario = _da_api(dados, timezone.now())
+    with transaction.atomic():
+        # O id pode ter mudado de e-mail (ou vice-versa): remove o registro conflitante
+        UsuarioEmbedded.objects.filter(api_id=usuario.api_id).exclude(email=usuario.email).delete()
+        UsuarioEmbedded.objects.update_or_create(
+            email=usuario.email, defaults={campo: getattr(usuario, campo) for campo in CAMPOS}
+        )
+    return usuario
+
+
+def remover(email):
+    UsuarioEmbedded.objects.filter(email=_normalizar_email(email)).delete()
+
+
+def _gravar_pagina(usuarios, agora):
+    """Upsert de uma página: uma consulta para achar os existentes e duas escritas em lote."""
+    por_email = {}
+    for dados in usuarios:
+        usuario = _da_api(dados, agora)
+        if usuario.email and dados.get('id'):
+            por_email[usuario.email] = usuario
+
+    existentes = {
+        u.email: u for u in UsuarioEmbedded.objects.filter(email__in=list(por_email))
+    }
+    novos, alterados = [], []
+    for email, usuario in por_email.items():
+        atual = existentes.get(email)
+        if atual is None:
+            novos.append(usuario)
+            continue
+        for campo in CAMPOS:
+            setattr(atual, campo, getattr(usuario, campo))
+        alterados.append(atual)
+
+    with transaction.atomic():
+        ids_novos = [u.api_id for u in novos] + [u.api_id for u in alterados]
+        UsuarioEmbedded.objects.filter(api_id__in=ids_novos).exclude(email__in=list(por_email)).delete()
+        UsuarioEmbedded.objects.bulk_create(novos)
+        UsuarioEmbedded.objects.bulk_update(alterados, list(CAMPOS))
+    return len(por_email)
+
+
+def sincronizar(paginas):
+    """
+    Sincronização completa a partir de um iterador de páginas de usuários
+    (ver services.iterar_usuarios). Ao final, despeja quem não apareceu.
+    Retorna o registro SincronizacaoEmbedded.
+    """
+    sincronizacao = SincronizacaoEmbedded.objects.create()
+    inicio = sincronizacao.iniciada_em
+    try:
+        for pagina in paginas:
+            sincronizacao.total_usuarios += _gravar_pagina(pagina, timezone.now())
+    except Exception as e:
+        sincronizacao.erro = str(e)
+        sincronizacao.save()
+        raise
+
+    UsuarioEmbedded.objects.filter(sincronizado_em__lt=inicio).delete()
+    sincronizacao.concluida_em = timezone.now()
+    sincronizacao.save()
+    return sincronizacao
+
+
+def expurgar():
+    """Remove as entradas vencidas (fora do TTL). Retorna quantas foram removidas."""
+    removidos, _ = UsuarioEmbedded.objects.filter(sincronizado_em__lt=_limite_frescor()).delete()
+    return removidos
@@ -0,0 +1,73 @@
+# CÓDIGO para: backend_django/parceiros/expiracao.py
+
+# Desativação dos parceiros cuja data_saida já passou (status=True -> False).
+# A API Embedded recebe a data como expirationDate, mas localmente nada mudava
+# o status. O comando `expirar_parceiros` chama processar_vencidos(), que
+# percorre só os vencidos pelo índice parcial parceiro_ativos_saida_idx, em
+# lotes: cada lote é travado, desativado com um UPDATE e, opcionalmente,
+# reenviado à API (pela outbox quando ligada; senão em paralelo, direto).
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidar_cache_parceiros
+from .concorrencia import executar_em_paralelo
+from .models import Parceiro
+from . import historico, outbox, resumo, services
+
+TAMANHO_LOTE = 500
+
+
+def vencidos(hoje=None):
+    """Parceiros ativos com data_saida anterior a `hoje` (padrão: data local atual)."""
+    hoje = hoje or timezone.localdate()
+    return Parceiro.objects.filter(status=True, data_saida__isnull=False, data_saida__lt=hoje)
+
+
+def desativar_lote(hoje=None, limite=TAMANHO_LOTE, sincronizar=False, workers=4):
+    """
+    Desativa até `limite` parceiros vencidos. Retorna (desativados, erros), onde
+    erros é [(id, mensagem)] das sincronizações diretas que falharam.
+    """
+    with transaction.atomic():
+        ids = list(
+            vencidos(hoje).select_for_update(skip_locked=True)
+            .order_by('data_saida', 'id').values_list('id', flat=True)[:limite]
+        )
+        if not ids:
+            return 0, []
+        # status=True repetido: outro processo pode ter desativado algum entre a leitura e a trava
+        ids = list(Parceiro.objects.filter(id__in=ids, status=True).values_list('id', flat=True))
+        desativados = resumo.atualizar_com_resumo(
+            Parceiro.objects.filter(id__in=ids), status=False, data_atualizacao=timezone.now()
+        )
+        if not desativados:
+            return 0, []
+        # update() não dispara signals: histórico e cache são atualizados aqui (só os desativados agora)
+        historico.registrar_alteracoes((pk, {'status': False}) for pk in ids)
+        invalidar_cache_parceiros()
+
+        remotos = []
+        if sincronizar:
+            remotos = list(
+                Parceiro.objects.filter(id__in=ids, api_user_id__isnull=False)
+                .only('id', 'api_user_id', *services.CAMPOS_API)
+            )
+            if outbox.outbox_ativa():
+                outbox.registrar_atualizacoes(remotos)
+                remotos = []
+
+    resultados = executar_em_paralelo(outbox.sincronizar_direto, remotos, workers)
+    erros = [(parceiro.pk, erro) for parceiro, (sucesso, erro) in zip(remotos, resultados) if not sucesso]
+    return desativados, erros
+
+
+def processar_vencidos(hoje=None, lote=TAMANHO_LOTE, sincronizar=False, workers=4):
+    """Desativa todos os vencidos, lote a lote. Retorna (desativados, erros)."""
+    total, erros = 0, []
+    while True:
+        desativados, erros_lote = desativar_lote(hoje, lote, sincronizar, workers)
+        erros.extend(erros_lote)
+        if not desativados:
+            return total, erros
+        total += desativados
@@ -0,0 +1,226 @@
+# CÓDIGO para: backend_django/parceiros/exportacao.py
+
+# Exportação em massa de parceiros (CSV, NDJSON ou XLSX, opcionalmente em gzip).
+# As linhas saem do banco com values_list + iterator(chunk_size), sem montar
+# instâncias do modelo, e cada formato é codificado aos pedaços por um gerador:
+# a memória fica constante e o primeiro byte sai antes da primeira consulta
+# terminar de ser lida. Usada por GET /parceiros/exportar/ e pelo comando
+# `exportar_parceiros`.
+
+import csv
+import json
+import re
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+from .api.serializers import ParceiroSerializer
+
+FORMATOS = ('csv', 'ndjson', 'xlsx')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Mesmas colunas (e ordem) da API
+COLUNAS = tuple(ParceiroSerializer.Meta.fields)
+
+TAMANHO_LOTE = 2000  # Linhas por ida ao banco (e por pedaço gerado)
+
+
+def escolher_colunas(campos=None):
+    """Colunas pedidas (ex.: ?fields=), na ordem da API; desconhecidas são ignoradas."""
+    if not campos:
+        return COLUNAS
+    return tuple(coluna for coluna in COLUNAS if coluna in set(campos)) or COLUNAS
+
+
+def iterar_linhas(queryset, colunas, tamanho_lote=TAMANHO_LOTE):
+    """Tuplas de valores em ordem de id, lidas em lotes do cursor."""
+    return queryset.order_by('id').values_list(*colunas).iterator(chunk_size=tamanho_lote)
+
+
+def _em_lotes(linhas, tamanho_lote):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+# --- CSV ---
+
+class _Eco:
+    """'Arquivo' que devolve o que recebe: o csv.writer formata e nós coletamos."""
+    def write(self, valor):
+        return valor
+
+
+# Textos que o Excel/LibreOffice interpretariam como fórmula (injeção de CSV)
+INICIOS_DE_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'true' if valor else 'false'
+    if isinstance(valor, str) and valor.startswith(INICIOS_DE_FORMULA):
+        # O apóstrofo faz a planilha mostrar o texto como está; a importação o remove
+        return "'" + valor
+    return valor
+
+
+def gerar_csv(colunas, linhas, tamanho_lote=TAMANHO_LOTE):
+    # ';' e BOM para o Excel em português; a importação detecta os dois
+    escritor = csv.writer(_Eco(), delimiter=';')
+    yield ('\ufeff' + escritor.writerow(colunas)).encode('utf-8')
+    for lote in _em_lotes(linhas, tamanho_lote):
+        yield ''.join(escritor.writerow([_valor_csv(valor) for valor in linha]) for linha in lote).encode('utf-8')
+
+
+# --- NDJSON ---
+
+def gerar_ndjson(colunas, linhas, tamanho_lote=TAMANHO_LOTE):
+    for lote in _em_lotes(linhas, tamanho_lote):
+        yield ''.join(
+            json.dumps(dict(zip(colunas, linha)), ensure_ascii=False, default=str) + '\n' for linha in lote
+        ).encode('utf-8')
+
+
+# --- XLSX ---
+# Planilha mínima (sem estilos, strings inline) escrita direto no zip, sem
+# biblioteca externa. O zip vai sendo gerado aos pedaços por _SaidaZip.
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+    'officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Parceiros" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+    'worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_INICIO_PLANILHA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_FIM_PLANILHA = '</sheetData></worksheet>'
+
+# Caracteres de controle não são permitidos em XML 1.0
+_CONTROLE_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _SaidaZip:
+    """Destino do zipfile sem seek: acumula os bytes escritos até serem recolhidos."""
+
+    def __init__(self):
+        self.partes = []
+        self.posicao = 0
+
+    def write(self, dados):
+        self.partes.append(bytes(dados))
+        self.posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self.posicao
+
+    def flush(self):
+        pass
+
+    def recolher(self):
+        dados = b''.join(self.partes)
+        self.partes.clear()
+        return dados
+
+
+def _celula_xlsx(valor):
+    if valor is None:
+        return '<c/>'
+    if isinstance(valor, bool):
+        return f'<c t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, int):
+        return f'<c><v>{valor}</v></c>'
+    texto = escape(_CONTROLE_XML.sub('', str(valor)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _linha_xlsx(valores):
+    return '<row>' + ''.join(_celula_xlsx(valor) for valor in valores) + '</row>'
+
+
+def gerar_xlsx(colunas, linhas, tamanho_lote=TAMANHO_LOTE):
+    saida = _SaidaZip()
+    with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        arquivo_zip.writestr('[Content_Types].xml', _CONTENT_TYPES_XML)
+        arquivo_zip.writestr('_rels/.rels', _RELS_XML)
+        arquivo_zip.writestr('xl/workbook.xml', _WORKBOOK_XML)
+        arquivo_zip.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML)
+        # force_zip64: o tamanho final da planilha não é conhecido de antemão
+        with arquivo_zip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as planilha:
+            planilha.write((_INICIO_PLANILHA + _linha_xlsx(colunas)).encode('utf-8'))
+            yield saida.recolher()
+            for lote in _em_lotes(linhas, tamanho_lote):
+                planilha.write(''.join(_linha_xlsx(linha) for linha in lote).encode('utf-8'))
+                yield saida.recolher()
+            planilha.write(_FIM_PLANILHA.encode('utf-8'))
+    yield saida.recolher()
+
+
+# --- GZIP E ENTRADA PRINCIPAL ---
+
+def compactar_gzip(pedacos):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    primeiro = True
+    for pedaco in pedacos:
+        dados = compressor.compress(pedaco)
+        if primeiro:
+            # Libera já o cabeçalho: sem isso o zlib segura o primeiro byte até juntar dados
+            dados += compressor.flush(zlib.Z_SYNC_FLUSH)
+            primeiro = False
+        if dados:
+            yield dados
+    yield compressor.flush()
+
+
+_GERADORES = {'csv': gerar_csv, 'ndjson': gerar_ndjson, 'xlsx': gerar_xlsx}
+
+
+def exportar(queryset, formato, colunas=COLUNAS, gzip=False, tamanho_lote=TAMANHO_LOTE):
+    """Gerador de bytes do arquivo exportado. Levanta ValueError se o formato não existir."""
+    if formato not in _GERADORES:
+        raise ValueError(f"Formato '{formato}' não suportado. Use: {', '.join(FORMATOS)}.")
+    pedacos = _GERADORES[formato](colunas, iterar_linhas(queryset, colunas, tamanho_lote), tamanho_lote)
+    return compactar_gzip(pedacos) if gzip else pedacos
+
+
+def nome_do_arquivo(formato, gzip=False):
+    return f"parceiros.{formato}" + ('.gz' if gzip else '')
@@ -0,0 +1,105 @@
+# CÓDIGO para: backend_django/parceiros/historico.py
+
+# Histórico de alterações (AlteracaoParceiro) para sincronização incremental.
+# Cada criação, alteração (inclusive status=False, a "deleção lógica") e
+# deleção de um Parceiro grava uma linha com um seq sempre crescente, na mesma
+# transação da escrita: pelos signals nos saves/deletes e pelas funções
+# registrar_* nos caminhos em massa (bulk_create/update). Os clientes guardam
+# o último seq recebido e pedem GET /parceiros/changes/?since=<seq>.
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .api.serializers import ParceiroSerializer
+from .models import AlteracaoParceiro
+
+# Campos acompanhados: os que a API expõe, mais o status (que tira o parceiro da lista)
+CAMPOS = tuple(campo for campo in ParceiroSerializer.Meta.fields if campo != 'id') + ('status',)
+
+TAMANHO_PAGINA = 500
+TAMANHO_PAGINA_MAXIMO = 5000
+
+
+def _estado(parceiro):
+    return parceiro.valores(CAMPOS)
+
+
+def registrar_save(anterior, parceiro):
+    """`anterior`: valores de CAMPOS antes do save (None para um parceiro novo)."""
+    if anterior is None:
+        AlteracaoParceiro.objects.create(parceiro_id=parceiro.pk, operacao='CRIACAO', campos=_estado(parceiro))
+        return
+    mudancas = {campo: valor for campo, valor in _estado(parceiro).items() if valor != anterior[campo]}
+    if mudancas:
+        AlteracaoParceiro.objects.create(parceiro_id=parceiro.pk, operacao='ALTERACAO', campos=mudancas)
+
+
+def registrar_delete(parceiro):
+    AlteracaoParceiro.objects.create(parceiro_id=parceiro.pk, operacao='DELECAO')
+
+
+def registrar_criados(parceiros):
+    """Para bulk_create (que não dispara signals)."""
+    AlteracaoParceiro.objects.bulk_create([
+        AlteracaoParceiro(parceiro_id=parceiro.pk, operacao='CRIACAO', campos=_estado(parceiro))
+        for parceiro in parceiros
+    ])
+
+
+def registrar_alteracoes(itens):
+    """Para update()/bulk_update: `itens` = [(parceiro_id, {campo: novo valor})]."""
+    AlteracaoParceiro.objects.bulk_create([
+        AlteracaoParceiro(parceiro_id=pk, operacao='ALTERACAO',
+                          campos={campo: valor for campo, valor in campos.items() if campo in CAMPOS})
+        for pk, campos in itens
+    ])
+
+
+# --- LEITURA ---
+
+class HistoricoExpirado(Exception):
+    """O cursor aponta para alterações já removidas: o cliente precisa de uma carga completa."""
+
+
+def alteracoes_desde(seq, limite=TAMANHO_PAGINA):
+    """
+    Até `limite` alterações depois de `seq`, compactadas (só a última de cada
+    parceiro). Retorna ({parceiro_id: (seq, operacao)} em ordem de seq, cursor, mais).
+    """
+    primeiro = AlteracaoParceiro.objects.aggregate(primeiro=Min('seq'))['primeiro']
+    # Vale também para since=0: um cliente novo depois de uma limpeza perderia
+    # os parceiros sem alteração recente e precisa fazer a carga completa
+    if primeiro is not None and seq < primeiro - 1:
+        raise HistoricoExpirado(f"O histórico anterior ao seq {primeiro} já foi removido.")
+
+    alteracoes = AlteracaoParceiro.objects.filter(seq__gt=seq)
+    atraso = getattr(settings, 'PARCEIROS_ALTERACOES_ATRASO', 0)
+    if atraso:
+        # Com escritas concorrentes um seq menor pode ser confirmado depois de um
+        # maior: só entrega o que tem alguns segundos, para o cursor não pular nada
+        alteracoes = alteracoes.filter(registrada_em__lte=timezone.now() - timedelta(seconds=atraso))
+    linhas = list(alteracoes.order_by('seq').values_list('seq', 'parceiro_id', 'operacao')[:limite + 1])
+
+    mais = len(linhas) > limite
+    linhas = linhas[:limite]
+    ultimas = {}
+    for numero, parceiro_id, operacao in linhas:
+        ultimas.pop(parceiro_id, None)  # Reinsere no fim: a ordem segue a última alteração
+        ultimas[parceiro_id] = (numero, operacao)
+    cursor = linhas[-1][0] if linhas else seq
+    return ultimas, cursor, mais
+
+
+def cursor_atual():
+    return AlteracaoParceiro.objects.aggregate(ultimo=Max('seq'))['ultimo'] or 0
+
+
+def remover_antigas(dias):
+    """Apaga as alterações com mais de `dias` dias (nunca a última). Retorna quantas."""
+    ultimo = cursor_atual()
+    corte = timezone.now() - timedelta(days=dias)
+    removidas, _ = AlteracaoParceiro.objects.filter(registrada_em__lt=corte, seq__lt=ultimo).delete()
+    return removidas
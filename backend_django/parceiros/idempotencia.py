@@ -0,0 +1,267 @@
+# CÓDIGO para: backend_django/parceiros/idempotencia.py
+
+# Suporte ao header Idempotency-Key nas escritas da API (POST/PUT/PATCH/DELETE,
+# rotas síncronas e async). Quando o React ou um proxy desiste de um POST lento
+# e repete, a repetição não roda de novo o cadastro na API Embedded:
+#
+# 1. A primeira requisição com a chave grava uma linha RespostaIdempotente
+#    "em andamento" (a constraint unique é a trava) e segue para a view.
+# 2. Ao terminar, grava o status, o corpo (comprimido) e alguns cabeçalhos.
+#    Respostas 5xx não ficam: a trava é liberada e o cliente pode tentar de novo.
+# 3. Repetições com a mesma chave e o mesmo pedido recebem a resposta gravada
+#    (header Idempotent-Replayed: true) sem passar pela view. Se a primeira
+#    ainda está em andamento, a repetição recebe 409 com Retry-After na hora
+#    (um worker WSGI não fica dormindo à espera); nas rotas async, que esperam
+#    sem ocupar thread, ela aguarda até PARCEIROS_IDEMPOTENCIA_ESPERA segundos.
+# 4. A mesma chave com outro pedido (método, caminho ou corpo) recebe 422.
+#
+# A chave vale por cliente: o usuário autenticado ou, para chamadas anônimas
+# (o app React), a sessão ou o IP. Um cliente nunca recebe a resposta gravada
+# para a chave de outro.
+#
+# As linhas valem por PARCEIROS_IDEMPOTENCIA_TTL segundos e são apagadas por
+# `python manage.py limpar_chaves_idempotencia`.
+
+import asyncio
+import hashlib
+import time
+import zlib
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from .models import RespostaIdempotente
+
+HEADER = 'Idempotency-Key'
+TAMANHO_MAXIMO_CHAVE = 255
+METODOS = ('POST', 'PUT', 'PATCH', 'DELETE')
+CABECALHOS_GRAVADOS = ('Content-Type', 'Location', 'Retry-After')
+
+# Resultados de reservar()
+NOVA = 'NOVA'                    # Esta requisição executa a view
+CONCLUIDA = 'CONCLUIDA'          # Responder com a resposta gravada
+EM_ANDAMENTO = 'EM_ANDAMENTO'    # Outra requisição com a chave ainda não terminou
+CONFLITO = 'CONFLITO'            # Mesma chave, pedido diferente
+
+
+def _config(nome, padrao):
+    return getattr(settings, nome, padrao)
+
+
+def _sha256(*partes):
+    resumo = hashlib.sha256()
+    for parte in partes:
+        resumo.update(parte if isinstance(parte, bytes) else str(parte).encode())
+        resumo.update(b'\0')
+    return resumo.hexdigest()
+
+
+def _corpo(request):
+    """O corpo entra na impressão; uploads grandes demais para a memória entram só pelo tamanho."""
+    tamanho = int(request.META.get('CONTENT_LENGTH') or 0)
+    limite = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+    if limite is not None and tamanho > limite:
+        return f"{request.content_type}:{tamanho}"
+    return request.body
+
+
+def _cliente(request):
+    """Escopo da chave: usuário autenticado; senão a sessão; senão o IP."""
+    usuario = getattr(getattr(request, 'user', None), 'pk', None)
+    if usuario:
+        return f"usuario:{usuario}"
+    sessao = getattr(getattr(request, 'session', None), 'session_key', None)
+    if sessao:
+        return f"sessao:{sessao}"
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def identificar(request):
+    """(chave, impressao) da requisição; None se ela não usa Idempotency-Key."""
+    valor = request.headers.get(HEADER)
+    if not valor or request.method not in METODOS:
+        return None
+    if not request.path.startswith(_config('PARCEIROS_IDEMPOTENCIA_PREFIXO', '/api/')):
+        return None
+    # A chave vale por cliente; a impressão identifica o pedido feito com ela
+    return _sha256(_cliente(request), valor), _sha256(request.method, request.get_full_path(), _corpo(request))
+
+
+# --- TRAVA E RESPOSTAS GRAVADAS ---
+
+def reservar(chave, impressao):
+    """
+    Tenta ficar com a chave. Retorna (NOVA | CONCLUIDA | EM_ANDAMENTO | CONFLITO, registro).
+    Uma reserva mais antiga que PARCEIROS_IDEMPOTENCIA_TIMEOUT_RESERVA (processo
+    que caiu no meio) é assumida por esta requisição.
+    """
+    agora = timezone.now()
+    try:
+        with transaction.atomic():
+            registro = RespostaIdempotente.objects.create(
+                chave=chave, impressao=impressao, reservada_em=agora,
+                expira_em=agora + timedelta(seconds=_config('PARCEIROS_IDEMPOTENCIA_TTL', 86400)),
+            )
+        return NOVA, registro
+    except IntegrityError:
+        pass
+
+    registro = RespostaIdempotente.objects.filter(chave=chave).first()
+    if registro is None or registro.expira_em <= agora:
+        # Expirou (ou foi liberada) entre o INSERT e a leitura: recomeça do zero
+        RespostaIdempotente.objects.filter(chave=chave, expira_em__lte=agora).delete()
+        return reservar(chave, impressao)
+    if registro.impressao != impressao:
+        return CONFLITO, registro
+    if registro.status_code is not None:
+        return CONCLUIDA, registro
+
+    limite = agora - timedelta(seconds=_config('PARCEIROS_IDEMPOTENCIA_TIMEOUT_RESERVA', 300))
+    if registro.reservada_em <= limite:
+        assumida = RespostaIdempotente.objects.filter(
+            pk=registro.pk, status_code__isnull=True, reservada_em=registro.reservada_em,
+        ).update(reservada_em=agora)
+        if assumida:
+            return NOVA, registro
+    return EM_ANDAMENTO, registro
+
+
+def gravar(registro, response):
+    """Guarda a resposta da view. 5xx e respostas em streaming liberam a chave em vez disso."""
+    if response.status_code >= 500 or response.streaming:
+        liberar(registro)
+        return
+    RespostaIdempotente.objects.filter(pk=registro.pk).update(
+        status_code=response.status_code,
+        corpo=zlib.compress(response.content),
+        cabecalhos={nome: response[nome] for nome in CABECALHOS_GRAVADOS if response.has_header(nome)},
+    )
+
+
+def liberar(registro):
+    RespostaIdempotente.objects.filter(pk=registro.pk, status_code__isnull=True).delete()
+
+
+def consultar(chave):
+    """Estado atual da chave para quem está esperando: (resultado, registro)."""
+    registro = RespostaIdempotente.objects.filter(chave=chave).first()
+    if registro is None:
+        return None, None  # A primeira falhou (5xx) e liberou: esta pode executar
+    if registro.status_code is not None:
+        return CONCLUIDA, registro
+    return EM_ANDAMENTO, registro
+
+
+def remover_expiradas():
+    """Apaga as respostas vencidas. Retorna quantas foram removidas."""
+    removidas, _ = RespostaIdempotente.objects.filter(expira_em__lte=timezone.now()).delete()
+    return removidas
+
+
+# --- RESPOSTAS ---
+
+def repetir(registro):
+    response = HttpResponse(zlib.decompress(bytes(registro.corpo)), status=registro.status_code)
+    for nome, valor in registro.cabecalhos.items():
+        response[nome] = valor
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _resposta_gravada(resultado, registro):
+    """CONCLUIDA: a resposta gravada; CONFLITO: 422 (a chave é de outro pedido)."""
+    if resultado == CONFLITO:
+        return JsonResponse({"detail": f"{HEADER} já usada com outra requisição."}, status=422)
+    return repetir(registro)
+
+
+def _resposta_em_andamento():
+    response = JsonResponse(
+        {"detail": f"Uma requisição com esta {HEADER} ainda está em andamento. Tente de novo."}, status=409
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+def _resposta_chave_invalida():
+    return JsonResponse({"detail": f"{HEADER} deve ter até {TAMANHO_MAXIMO_CHAVE} caracteres."}, status=400)
+
+
+def _intervalos_de_espera():
+    """Pausas entre as consultas de quem espera (50 ms, dobrando até 500 ms) até o prazo."""
+    prazo = time.monotonic() + _config('PARCEIROS_IDEMPOTENCIA_ESPERA', 30)
+    pausa = 0.05
+    while time.monotonic() < prazo:
+        yield min(pausa, max(prazo - time.monotonic(), 0))
+        pausa = min(pausa * 2, 0.5)
+
+
+class IdempotenciaMiddleware:
+    """
+    Aplica Idempotency-Key às escritas sob PARCEIROS_IDEMPOTENCIA_PREFIXO.
+    Fica depois do SessionMiddleware e do AuthenticationMiddleware (a chave vale por cliente).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.modo_async = iscoroutinefunction(get_response)
+        if self.modo_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.modo_async:
+            return self.__acall__(request)
+        if len(request.headers.get(HEADER, '')) > TAMANHO_MAXIMO_CHAVE:
+            return _resposta_chave_invalida()
+        identificacao = identificar(request)
+        if identificacao is None:
+            return self.get_response(request)
+
+        resultado, registro = reservar(*identificacao)
+        if resultado == EM_ANDAMENTO:
+            # Sem esperar: dormir aqui ocuparia o worker durante uma rajada de repetições
+            return _resposta_em_andamento()
+        if resultado != NOVA:
+            return _resposta_gravada(resultado, registro)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            liberar(registro)
+            raise
+        gravar(registro, response)
+        return response
+
+    async def __acall__(self, request):
+        if len(request.headers.get(HEADER, '')) > TAMANHO_MAXIMO_CHAVE:
+            return _resposta_chave_invalida()
+        identificacao = identificar(request)
+        if identificacao is None:
+            return await self.get_response(request)
+
+        resultado, registro = await sync_to_async(reservar)(*identificacao)
+        esperas = _intervalos_de_espera()
+        while resultado == EM_ANDAMENTO:
+            pausa = next(esperas, None)
+            if pausa is None:
+                return _resposta_em_andamento()
+            await asyncio.sleep(pausa)
+            resultado, registro = await sync_to_async(consultar)(identificacao[0])
+            if resultado is None:
+                resultado, registro = await sync_to_async(reservar)(*identificacao)
+
+        if resultado != NOVA:
+            return _resposta_gravada(resultado, registro)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            await sync_to_async(liberar)(registro)
+            raise
+        await sync_to_async(gravar)(registro, response)
+        return response
@@ -0,0 +1,266 @@
+# CÓDIGO para: backend_django/parceiros/importacao.py
+
+# Importação em massa de parceiros (planilhas CSV ou JSON/NDJSON).
+# O arquivo é lido em streaming e processado em lotes: validação, checagem de
+# duplicados com uma consulta por lote, cadastro na API Embedded em paralelo
+# (com limite de threads) e gravação com bulk_create.
+
+import codecs
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from .api.serializers import ParceiroImportacaoSerializer
+from .cache import invalidar_cache_parceiros
+from .concorrencia import executar_em_paralelo
+from .exportacao import INICIOS_DE_FORMULA
+from .models import Parceiro, TarefaProvisionamento
+from .normalizacao import normalizar_cnpj
+from .resiliencia import ServicoIndisponivel
+from . import duplicados, historico, outbox, resumo, services
+
+TAMANHO_LEITURA = 64 * 1024
+
+
+# --- LEITURA DOS ARQUIVOS (STREAMING) ---
+
+def _como_texto(arquivo):
+    """Garante um stream de texto UTF-8 (aceita arquivos abertos em modo binário)."""
+    if isinstance(arquivo, io.TextIOBase):
+        return arquivo
+    return codecs.getreader('utf-8-sig')(arquivo)
+
+
+def _valor_lido(valor):
+    """
+    Limpa a célula; tira o apóstrofo que a exportação põe antes de textos com
+    cara de fórmula. Esses voltam exatamente como foram exportados (o \t ou \r
+    do início faz parte do valor), por isso o apóstrofo é visto antes do strip().
+    """
+    if valor.startswith("'") and valor[1:].startswith(INICIOS_DE_FORMULA):
+        return valor[1:]
+    return valor.strip() or None
+
+
+def ler_csv(arquivo):
+    """Gera os registros de um CSV (separador ',' ou ';', detectado no cabeçalho)."""
+    texto = _como_texto(arquivo)
+    cabecalho = texto.readline()
+    delimitador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+    colunas = [coluna.strip() for coluna in next(csv.reader([cabecalho], delimiter=delimitador))]
+
+    for registro in csv.DictReader(texto, fieldnames=colunas, delimiter=delimitador):
+        # Células vazias viram None para que campos opcionais (ex.: data_saida) validem
+        yield {chave: _valor_lido(valor) if isinstance(valor, str) else valor
+               for chave, valor in registro.items() if chave}
+
+
+def ler_json(arquivo):
+    """
+    Gera os registros de um array JSON ou de um NDJSON (um objeto por linha),
+    sem carregar o arquivo inteiro na memória.
+    """
+    texto = _como_texto(arquivo)
+    decoder = json.JSONDecoder()
+    buffer = texto.read(TAMANHO_LEITURA).lstrip()
+    em_array = buffer.startswith('[')
+    if em_array:
+        buffer = buffer[1:]
+
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip() if em_array else buffer.lstrip()
+        if em_array and buffer.startswith(']'):
+            return
+        try:
+            registro, fim = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            mais = texto.read(TAMANHO_LEITURA)
+            if not mais:
+                if buffer.strip():
+                    raise ValueError("JSON inválido ou incompleto no arquivo de importação.")
+                return
+            buffer += mais
+            continue
+        buffer = buffer[fim:]
+        yield registro
+
+
+def ler_registros(arquivo, formato):
+    if formato == 'csv':
+        return ler_csv(arquivo)
+    if formato in ('json', 'ndjson'):
+        return ler_json(arquivo)
+    raise ValueError(f"Formato de importação não suportado: '{formato}'. Use csv, json ou ndjson.")
+
+
+def formato_pelo_nome(nome_arquivo, padrao='csv'):
+    extensao = (nome_arquivo or '').rsplit('.', 1)[-1].lower()
+    return extensao if extensao in ('csv', 'json', 'ndjson') else padrao
+
+
+# --- PROCESSAMENTO EM LOTES ---
+
+def _resultado(linha, registro, resultado, erro=None, parceiro=None):
+    return {
+        'linha': linha,
+        'email_gestor': registro.get('email_gestor') if isinstance(registro, dict) else None,
+        'resultado': resultado,
+        'id': parceiro.pk if parceiro else None,
+        'api_user_id': parceiro.api_user_id if parceiro else None,
+        'erro': erro,
+    }
+
+
+def _validar_lote(lote, emails_vistos):
+    """
+    Valida os registros do lote e descarta duplicados: dentro do próprio arquivo
+    e contra o banco (uma consulta por campo único para o lote inteiro).
+    Retorna (validos, relatorio); validos é uma lista de (linha, registro, dados).
+    """
+    relatorio = []
+    candidatos = []
+    for linha, registro in lote:
+        if not isinstance(registro, dict):
+            relatorio.append(_resultado(linha, {}, 'INVALIDO', "Registro não é um objeto."))
+            continue
+        serializer = ParceiroImportacaoSerializer(data=registro)
+        if not serializer.is_valid():
+            relatorio.append(_resultado(linha, registro, 'INVALIDO', serializer.errors))
+            continue
+        dados = serializer.validated_data
+        if dados['email_gestor'] in emails_vistos:
+            relatorio.append(_resultado(linha, registro, 'DUPLICADO', "E-mail repetido no arquivo."))
+            continue
+        emails_vistos.add(dados['email_gestor'])
+        candidatos.append((linha, registro, dados))
+
+    emails_existentes = set(Parceiro.objects.filter(
+        email_gestor__in=[dados['email_gestor'] for _, _, dados in candidatos]
+    ).values_list('email_gestor', flat=True))
+    ids_existentes = set(Parceiro.objects.filter(
+        api_user_id__in=[dados['api_user_id'] for _, _, dados in candidatos if dados.get('api_user_id')]
+    ).values_list('api_user_id', flat=True))
+
+    validos = []
+    for linha, registro, dados in candidatos:
+        if dados['email_gestor'] in emails_existentes:
+            relatorio.append(_resultado(linha, registro, 'DUPLICADO', "E-mail já cadastrado."))
+        elif dados.get('api_user_id') and dados['api_user_id'] in ids_existentes:
+            relatorio.append(_resultado(linha, registro, 'DUPLICADO', "api_user_id já cadastrado."))
+        else:
+            validos.append((linha, registro, dados))
+    return validos, relatorio
+
+
+def _criar_na_api(item):
+    try:
+        return services.criar_parceiro_completo(item[2])
+    except ServicoIndisponivel as e:
+        return None, str(e)
+
+
+def _provisionar_lote(validos, workers):
+    """
+    Cadastra na API, em paralelo, os registros que ainda não têm api_user_id.
+    Retorna (provisionados, relatorio_de_erros).
+    """
+    pendentes = [item for item in validos if not item[2].get('api_user_id')]
+    prontos = [item for item in validos if item[2].get('api_user_id')]
+
+    respostas = executar_em_paralelo(_criar_na_api, pendentes, workers)
+
+    relatorio = []
+    for (linha, registro, dados), (api_id, erro) in zip(pendentes, respostas):
+        if erro:
+            relatorio.append(_resultado(linha, registro, 'ERRO_API', erro))
+        else:
+            prontos.append((linha, registro, dict(dados, api_user_id=api_id)))
+    return prontos, relatorio
+
+
+def _gravar_lote(itens, assincrono, tamanho_lote):
+    """
+    Grava os parceiros com bulk_create. Se o lote esbarrar em um registro
+    criado em paralelo (IntegrityError), grava um a um para isolar a falha.
+    Retorna [(linha, registro, parceiro_ou_None, erro)].
+    """
+    status_prov = 'PENDENTE' if assincrono else 'CONCLUIDO'
+    # bulk_create não passa pelo save(): o CNPJ normalizado é preenchido aqui
+    objetos = [
+        Parceiro(status_provisionamento=status_prov, cnpj_normalizado=normalizar_cnpj(dados.get('cnpj')), **dados)
+        for _, _, dados in itens
+    ]
+
+    try:
+        with transaction.atomic():
+            Parceiro.objects.bulk_create(objetos, batch_size=tamanho_lote)
+            if assincrono:
+                TarefaProvisionamento.objects.bulk_create(
+                    [TarefaProvisionamento(parceiro=p) for p in objetos], batch_size=tamanho_lote
+                )
+            # bulk_create não dispara signals: resumo, histórico, chaves de duplicidade e cache são atualizados aqui
+            resumo.registrar_criados(objetos)
+            historico.registrar_criados(objetos)
+            duplicados.indexar(objetos)
+            invalidar_cache_parceiros()
+        return [(linha, registro, p, None) for (linha, registro, _), p in zip(itens, objetos)]
+    except IntegrityError:
+        pass
+
+    gravados = []
+    for (linha, registro, dados) in itens:
+        try:
+            with transaction.atomic():
+                parceiro = Parceiro.objects.create(status_provisionamento=status_prov, **dados)
+                if assincrono:
+                    TarefaProvisionamento.objects.create(parceiro=parceiro)
+            gravados.append((linha, registro, parceiro, None))
+        except IntegrityError as e:
+            gravados.append((linha, registro, None, f"Conflito ao gravar no banco: {e}"))
+    return gravados
+
+
+def importar_parceiros(registros, tamanho_lote=500, workers=8, assincrono=False):
+    """
+    Importa os registros em lotes e gera uma linha de relatório por registro.
+    Com `assincrono=True` os parceiros ficam PENDENTES e o cadastro na API é
+    feito depois pelo comando `processar_provisionamentos`.
+    """
+    emails_vistos = set()
+    numerados = enumerate(registros, start=1)
+
+    while True:
+        lote = list(islice(numerados, tamanho_lote))
+        if not lote:
+            return
+
+        validos, relatorio = _validar_lote(lote, emails_vistos)
+
+        if assincrono:
+            prontos = validos
+        else:
+            prontos, erros_api = _provisionar_lote(validos, workers)
+            relatorio.extend(erros_api)
+
+        for linha, registro, parceiro, erro in _gravar_lote(prontos, assincrono, tamanho_lote):
+            if parceiro:
+                resultado = 'PENDENTE' if assincrono else 'CRIADO'
+                relatorio.append(_resultado(linha, registro, resultado, parceiro=parceiro))
+                continue
+            relatorio.append(_resultado(linha, registro, 'ERRO', erro))
+            # O usuário já foi criado na API, mas o parceiro não foi gravado: desfaz
+            if not assincrono and not registro.get('api_user_id'):
+                outbox.desfazer_criacao(registro.get('email_gestor'))
+
+        yield from sorted(relatorio, key=lambda item: item['linha'])
+
+
+def resumir(relatorio):
+    """Conta quantas linhas terminaram em cada resultado."""
+    resumo = {}
+    for item in relatorio:
+        resumo[item['resultado']] = resumo.get(item['resultado'], 0) + 1
+    return resumo
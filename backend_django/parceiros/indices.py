@@ -0,0 +1,120 @@
+# CÓDIGO para: backend_django/parceiros/indices.py
+
+# Índices de busca textual que dependem do banco (não dá para declarar em Meta.indexes):
+# - PostgreSQL: GIN com pg_trgm sobre UPPER(coluna), que atende icontains/istartswith
+#   (o Django gera `UPPER(coluna::text) LIKE UPPER(%s)` nesses lookups).
+# - SQLite: índice COLLATE NOCASE, usado pelo LIKE 'prefixo%' (istartswith).
+#
+# E o índice de texto completo do autocomplete (parceiros/busca.py), só dos
+# parceiros ativos e sem acentos:
+# - PostgreSQL: GIN parcial sobre o tsvector (unaccent) das colunas de busca;
+#   por ser um índice de expressão, o banco o mantém a cada escrita.
+# - SQLite: tabela FTS5 (unicode61 sem diacríticos, índices de prefixo)
+#   mantida por triggers, que também cobrem bulk_create e update().
+
+TABELA = 'parceiros_parceiro'
+COLUNAS_BUSCA = ('nome_fantasia', 'razao_social', 'email_gestor')
+
+
+def _sql_criacao(vendor):
+    if vendor == 'postgresql':
+        return ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+            f'CREATE INDEX IF NOT EXISTS parceiro_{coluna}_trgm_idx '
+            f'ON {TABELA} USING gin ((UPPER({coluna}::text)) gin_trgm_ops)'
+            for coluna in COLUNAS_BUSCA
+        ]
+    if vendor == 'sqlite':
+        return [
+            f'CREATE INDEX IF NOT EXISTS parceiro_{coluna}_nocase_idx ON {TABELA} ({coluna} COLLATE NOCASE)'
+            for coluna in COLUNAS_BUSCA
+        ]
+    return []
+
+
+def _sql_remocao(vendor):
+    sufixo = {'postgresql': 'trgm', 'sqlite': 'nocase'}.get(vendor)
+    if not sufixo:
+        return []
+    return [f'DROP INDEX IF EXISTS parceiro_{coluna}_{sufixo}_idx' for coluna in COLUNAS_BUSCA]
+
+
+def criar_indices_busca(connection):
+    with connection.cursor() as cursor:
+        for sql in _sql_criacao(connection.vendor):
+            cursor.execute(sql)
+
+
+def remover_indices_busca(connection):
+    with connection.cursor() as cursor:
+        for sql in _sql_remocao(connection.vendor):
+            cursor.execute(sql)
+
+
+# --- TEXTO COMPLETO (autocomplete) ---
+
+TABELA_FTS = 'parceiros_parceiro_busca'
+COLUNAS_FTS = ('nome_fantasia', 'razao_social', 'gestor', 'cnpj_normalizado')
+PESOS_FTS = (10.0, 5.0, 2.0, 1.0)  # Na ordem de COLUNAS_FTS
+
+# PostgreSQL: unaccent() não é IMMUTABLE e não pode entrar num índice; o
+# wrapper fixa o dicionário. A expressão precisa ser idêntica na consulta.
+TSVECTOR_PG = " || ".join(
+    f"setweight(to_tsvector('simple', parceiros_unaccent(coalesce({coluna}, ''))), '{peso}')"
+    for coluna, peso in zip(COLUNAS_FTS, 'ABCD')
+)
+
+
+def _sql_criacao_fts(vendor):
+    if vendor == 'postgresql':
+        return [
+            'CREATE EXTENSION IF NOT EXISTS unaccent',
+            "CREATE OR REPLACE FUNCTION parceiros_unaccent(text) RETURNS text "
+            "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS $$ SELECT public.unaccent('public.unaccent', $1) $$",
+            f'CREATE INDEX IF NOT EXISTS parceiro_busca_tsv_idx ON {TABELA} USING gin (({TSVECTOR_PG})) '
+            f'WHERE status',
+        ]
+    if vendor == 'sqlite':
+        colunas = ', '.join(COLUNAS_FTS)
+        novos = ', '.join(f'new.{coluna}' for coluna in COLUNAS_FTS)
+        inserir = f"INSERT INTO {TABELA_FTS}(rowid, {colunas}) VALUES (new.id, {novos});"
+        remover = f"DELETE FROM {TABELA_FTS} WHERE rowid = old.id;"
+        reinserir = f"INSERT INTO {TABELA_FTS}(rowid, {colunas}) SELECT new.id, {novos} WHERE new.status;"
+        return [
+            # A tabela guarda a própria cópia do texto (rowid = id do parceiro), assim
+            # os triggers removem pelo rowid sem depender dos valores antigos.
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5({colunas}, "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+            f"INSERT INTO {TABELA_FTS}({TABELA_FTS}, rank) VALUES ('rank', 'bm25({', '.join(map(str, PESOS_FTS))})')",
+            f"INSERT INTO {TABELA_FTS}(rowid, {colunas}) SELECT id, {colunas} FROM {TABELA} WHERE status",
+            f"CREATE TRIGGER IF NOT EXISTS parceiro_busca_insert AFTER INSERT ON {TABELA} "
+            f"WHEN new.status BEGIN {inserir} END",
+            f"CREATE TRIGGER IF NOT EXISTS parceiro_busca_delete AFTER DELETE ON {TABELA} "
+            f"WHEN old.status BEGIN {remover} END",
+            # Um trigger só para o UPDATE: remove e reinsere na ordem certa
+            f"CREATE TRIGGER IF NOT EXISTS parceiro_busca_update AFTER UPDATE OF status, {colunas} "
+            f"ON {TABELA} WHEN old.status OR new.status BEGIN {remover} {reinserir} END",
+        ]
+    return []
+
+
+def _sql_remocao_fts(vendor):
+    if vendor == 'postgresql':
+        return ['DROP INDEX IF EXISTS parceiro_busca_tsv_idx', 'DROP FUNCTION IF EXISTS parceiros_unaccent(text)']
+    if vendor == 'sqlite':
+        return [
+            f'DROP TRIGGER IF EXISTS parceiro_busca_{nome}'
+            for nome in ('insert', 'delete', 'update')
+        ] + [f'DROP TABLE IF EXISTS {TABELA_FTS}']
+    return []
+
+
+def criar_indice_texto_completo(connection):
+    with connection.cursor() as cursor:
+        for sql in _sql_criacao_fts(connection.vendor):
+            cursor.execute(sql)
+
+
+def remover_indice_texto_completo(connection):
+    with connection.cursor() as cursor:
+        for sql in _sql_remocao_fts(connection.vendor):
+            cursor.execute(sql)
@@ -0,0 +1,35 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/api_embedded_falsa.py
+
+from django.core.management.base import BaseCommand
+
+from ...api_falsa import ServidorApiFalsa
+
+
+class Command(BaseCommand):
+    help = (
+        "Sobe a API Power Embedded falsa (parceiros/api_falsa.py) para testes de carga. "
+        "Aponte o backend para ela com EMBEDDED_API_URL=http://127.0.0.1:<porta>/api/user."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--porta', type=int, default=8765)
+        parser.add_argument('--latencia-ms', type=float, default=50, help="Latência fixa de cada chamada.")
+        parser.add_argument('--variacao-ms', type=float, default=0, help="Latência extra aleatória (0 a N ms).")
+        parser.add_argument('--taxa-erro', type=float, default=0, help="Fração das chamadas que respondem 503.")
+        parser.add_argument('--post-sem-usuario', action='store_true',
+                            help="O POST não devolve o usuário (força o GET de confirmação).")
+
+    def handle(self, *args, **options):
+        servidor = ServidorApiFalsa(
+            host=options['host'], porta=options['porta'],
+            latencia=options['latencia_ms'] / 1000, variacao=options['variacao_ms'] / 1000,
+            taxa_erro=options['taxa_erro'], post_devolve_usuario=not options['post_sem_usuario'],
+        )
+        self.stdout.write(f"API Embedded falsa em {servidor.url} (Ctrl+C para sair)")
+        try:
+            servidor.servir()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.parar()
@@ -0,0 +1,165 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/benchmark_api.py
+
+import json
+import platform
+import subprocess
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from ... import resiliencia
+from ...api_falsa import ServidorApiFalsa
+from ...benchmark import Cenarios, carregar_relatorio, comparar_relatorios, executar_cenario
+from ...dados_sinteticos import DOMINIO_SINTETICO, semear_parceiros
+from ...models import Parceiro, UsuarioEmbedded
+
+DATASETS = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga da API de parceiros: semeia um dataset sintético em um banco "
+        "separado (como o dos testes), sobe a API Embedded falsa e mede req/s, "
+        "p50/p95/p99 e consultas por cenário. O resultado sai em JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=sorted(DATASETS), default='10k',
+                            help="Parceiros sintéticos semeados antes das medições.")
+        parser.add_argument('--linhas', type=int, help="Quantidade exata de parceiros (substitui --dataset).")
+        parser.add_argument('--cenarios', default=','.join(Cenarios.NOMES),
+                            help=f"Lista separada por vírgulas. Disponíveis: {', '.join(Cenarios.NOMES)}.")
+        parser.add_argument('--requisicoes', type=int, default=200, help="Requisições medidas por cenário.")
+        parser.add_argument('--aquecimento', type=int, default=5, help="Requisições descartadas por cenário.")
+        parser.add_argument('--tamanho-importacao', type=int, default=100, help="Registros por POST de importação.")
+        parser.add_argument('--latencia-ms', type=float, default=0, help="Latência da API Embedded falsa.")
+        parser.add_argument('--taxa-erro', type=float, default=0, help="Fração de 503 da API Embedded falsa.")
+        parser.add_argument('--com-cache', action='store_true', help="Mantém o cache de leitura ligado.")
+        parser.add_argument('--semente', type=int, default=42)
+        parser.add_argument('--manter-banco', action='store_true',
+                            help="Mantém o banco semeado para as próximas execuções (útil com 100k/1m).")
+        parser.add_argument('--json', dest='saida_json', help="Grava o relatório neste arquivo.")
+        parser.add_argument('--comparar', help="Relatório JSON anterior para calcular as variações.")
+
+    def handle(self, *args, **options):
+        cenarios_pedidos = [nome.strip() for nome in options['cenarios'].split(',') if nome.strip()]
+        desconhecidos = set(cenarios_pedidos) - set(Cenarios.NOMES)
+        if desconhecidos:
+            raise CommandError(f"Cenários desconhecidos: {', '.join(sorted(desconhecidos))}")
+        linhas = options['linhas'] if options['linhas'] is not None else DATASETS[options['dataset']]
+
+        relatorio = {
+            'commit': _commit_atual(),
+            'executado_em': timezone.now().isoformat(),
+            'banco': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'parametros': {
+                'linhas': linhas, 'requisicoes': options['requisicoes'], 'aquecimento': options['aquecimento'],
+                'latencia_api_ms': options['latencia_ms'], 'taxa_erro_api': options['taxa_erro'],
+                'com_cache': options['com_cache'], 'semente': options['semente'],
+            },
+            'cenarios': {},
+        }
+
+        api = ServidorApiFalsa(latencia=options['latencia_ms'] / 1000, taxa_erro=options['taxa_erro'],
+                               semente=options['semente'])
+        nome_original = self._criar_banco(linhas, options['manter_banco'])
+        try:
+            with api, override_settings(**self._ajustes(api, options['com_cache'])):
+                resiliencia.reiniciar()
+                self._semear(linhas)
+                ids = list(Parceiro.objects.filter(status=True, email_gestor__startswith='gestor')
+                           .values_list('id', flat=True)[:10_000])
+                if not ids:
+                    raise CommandError("Nenhum parceiro ativo para os cenários de leitura.")
+                cenarios = Cenarios(ids, semente=options['semente'],
+                                    tamanho_importacao=options['tamanho_importacao'])
+                for nome in cenarios_pedidos:
+                    self.stderr.write(f"Cenário {nome}...")
+                    relatorio['cenarios'][nome] = executar_cenario(
+                        cenarios, nome, options['requisicoes'], options['aquecimento']
+                    )
+                self._limpar_criados()
+        finally:
+            resiliencia.reiniciar()
+            connection.creation.destroy_test_db(nome_original, verbosity=0, keepdb=options['manter_banco'])
+        relatorio['chamadas_api_falsa'] = api.estado.chamadas
+
+        if options['comparar']:
+            relatorio['comparacao'] = comparar_relatorios(carregar_relatorio(options['comparar']), relatorio)
+
+        self._imprimir(relatorio)
+        if options['saida_json']:
+            with open(options['saida_json'], 'w', encoding='utf-8') as arquivo:
+                json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+    def _ajustes(self, api, com_cache):
+        ajustes = {
+            'EMBEDDED_API_URL': api.url,
+            'EMBEDDED_API_RATE_LIMIT': None,  # O limite de taxa mediria a si mesmo, não a aplicação
+            'ALLOWED_HOSTS': ['testserver'],
+            'INSTRUMENTACAO_LIMIAR_LENTO': None,
+        }
+        if not com_cache:
+            ajustes['PARCEIROS_CACHE_ALIAS'] = 'benchmark'
+            ajustes['CACHES'] = {
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'benchmark': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            }
+        return ajustes
+
+    def _criar_banco(self, linhas, manter):
+        """
+        Cria (ou reaproveita, com `manter`) o banco do benchmark, separado do banco
+        de trabalho. No SQLite é um arquivo por tamanho de dataset, para que os
+        cenários com threads (importação) funcionem. Retorna o nome original.
+        """
+        nome_original = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = str(
+                settings.BASE_DIR / f'benchmark_{linhas}.sqlite3'
+            )
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=manter, serialize=False)
+        return nome_original
+
+    def _semear(self, linhas):
+        """Completa o dataset até `linhas` parceiros sintéticos."""
+        existentes = Parceiro.objects.filter(email_gestor__endswith=f'@{DOMINIO_SINTETICO}',
+                                             email_gestor__startswith='gestor').count()
+        if existentes >= linhas:
+            return
+        self.stderr.write(f"Semeando {linhas - existentes} parceiros...")
+        semear_parceiros(linhas - existentes, inicio=existentes)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Parceiro._meta.db_table}')
+
+    def _limpar_criados(self):
+        """Remove o que os cenários de escrita criaram (o dataset semeado fica)."""
+        criados = Parceiro.objects.filter(email_gestor__startswith='novo', email_gestor__endswith=f'@{DOMINIO_SINTETICO}')
+        criados.delete()
+        UsuarioEmbedded.objects.filter(email__endswith=f'@{DOMINIO_SINTETICO}').delete()
+
+    def _imprimir(self, relatorio):
+        self.stdout.write(f"{'cenário':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+                          f"{'consultas':>11}{'erros':>8}")
+        for nome, medicao in relatorio['cenarios'].items():
+            latencia = medicao['latencia_ms']
+            self.stdout.write(
+                f"{nome:<20}{medicao['req_por_s']:>10.1f}{latencia['p50']:>10.2f}{latencia['p95']:>10.2f}"
+                f"{latencia['p99']:>10.2f}{medicao['consultas']['media']:>11.1f}{sum(medicao['erros'].values()):>8}"
+            )
+        for nome, variacao in relatorio.get('comparacao', {}).items():
+            self.stdout.write(f"{nome}: req/s {variacao['req_por_s_%']}%  p95 {variacao['p95_%']}%")
@@ -0,0 +1,118 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/benchmark_indices.py
+
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from ...dados_sinteticos import semear_parceiros
+from ...models import Parceiro
+
+# Consultas que a API e o admin fazem na tabela de parceiros. A listagem dos
+# ativos não tem índice próprio: percorre a chave primária de trás para a frente
+# (no SQLite aparece como SCAN da tabela, que é a árvore do rowid) e para no LIMIT.
+CONSULTAS = [
+    ('listagem_ativos',
+     lambda: Parceiro.objects.filter(status=True).order_by('-id')[:50]),
+    ('listagem_ativos_filtrada',
+     lambda: Parceiro.objects.filter(status=True, tipo='DISTRIBUIDOR', senha_definida=False).order_by('-id')[:50]),
+    ('admin_filtros',
+     lambda: Parceiro.objects.filter(status=False, tipo='INDUSTRIA', senha_definida=True).order_by('-id')[:100]),
+    ('cnpj_normalizado',
+     lambda: Parceiro.objects.filter(cnpj_normalizado='10000000123456')),
+    ('nome_fantasia_prefixo',
+     lambda: Parceiro.objects.filter(nome_fantasia__istartswith='atacado 01234')[:50]),
+    ('nome_fantasia_contem',
+     lambda: Parceiro.objects.filter(nome_fantasia__icontains='1234')[:50]),
+]
+
+# Só há índice para busca por trecho no PostgreSQL (pg_trgm, parceiros/indices.py);
+# no SQLite ela é sempre um SCAN, e nem a API nem o admin a usam (buscam por prefixo).
+SO_POSTGRESQL = {'nome_fantasia_contem'}
+
+
+class _Desfazer(Exception):
+    """Usada para desfazer a transação do benchmark (dados e índices voltam ao normal)."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara planos e tempos das consultas de parceiros com e sem os índices não "
+        "únicos da tabela. Tudo roda dentro de uma transação desfeita no final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=500_000, help="Parceiros sintéticos a semear.")
+        parser.add_argument('--repeticoes', type=int, default=5, help="Execuções por consulta (usa a mediana).")
+        parser.add_argument('--json', dest='saida_json', help="Grava o resultado neste arquivo JSON.")
+
+    def handle(self, *args, **options):
+        self.consultas = [
+            (nome, consulta) for nome, consulta in CONSULTAS
+            if connection.vendor == 'postgresql' or nome not in SO_POSTGRESQL
+        ]
+        resultado = {}
+        try:
+            with transaction.atomic():
+                if options['linhas']:
+                    inicio = (Parceiro.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+                    self.stderr.write(f"Semeando {options['linhas']} parceiros...")
+                    semear_parceiros(options['linhas'], inicio=inicio)
+                self._analisar()
+
+                resultado['com_indices'] = self._medir(options['repeticoes'])
+                removidos = self._remover_indices()
+                self.stderr.write(f"Índices removidos para a comparação: {', '.join(removidos)}")
+                self._analisar()
+                resultado['sem_indices'] = self._medir(options['repeticoes'])
+                raise _Desfazer()
+        except _Desfazer:
+            pass
+
+        self._imprimir(resultado)
+        if options['saida_json']:
+            with open(options['saida_json'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+
+    def _analisar(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Parceiro._meta.db_table}')
+
+    def _remover_indices(self):
+        """Remove os índices não únicos da tabela (a 0001 só tinha os únicos)."""
+        tabela = Parceiro._meta.db_table
+        with connection.cursor() as cursor:
+            restricoes = connection.introspection.get_constraints(cursor, tabela)
+            nomes = [
+                nome for nome, info in restricoes.items()
+                if info['index'] and not info['unique'] and not info['primary_key']
+            ]
+            for nome in nomes:
+                cursor.execute(f'DROP INDEX {connection.ops.quote_name(nome)}')
+        return nomes
+
+    def _medir(self, repeticoes):
+        medicoes = {}
+        for nome, consulta in self.consultas:
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                list(consulta())
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            medicoes[nome] = {
+                'mediana_ms': round(statistics.median(tempos), 3),
+                'plano': consulta().explain(),
+            }
+        return medicoes
+
+    def _imprimir(self, resultado):
+        self.stdout.write(f"{'consulta':<28}{'sem índices (ms)':>18}{'com índices (ms)':>18}")
+        for nome, _ in self.consultas:
+            antes = resultado['sem_indices'][nome]
+            depois = resultado['com_indices'][nome]
+            self.stdout.write(f"{nome:<28}{antes['mediana_ms']:>18.3f}{depois['mediana_ms']:>18.3f}")
+        for nome, _ in self.consultas:
+            self.stdout.write(f"\n[{nome}]\n  sem índices: {resultado['sem_indices'][nome]['plano']}"
+                              f"\n  com índices: {resultado['com_indices'][nome]['plano']}")
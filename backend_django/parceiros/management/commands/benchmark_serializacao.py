@@ -0,0 +1,104 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/benchmark_serializacao.py
+
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from backend_api.renderers import JSONRendererRapido
+from ...api.serializers import ParceiroLeituraSerializer, ParceiroSerializer
+from ...dados_sinteticos import semear_parceiros
+from ...models import Parceiro
+
+
+class _Desfazer(Exception):
+    """Usada para desfazer a transação do benchmark (os parceiros semeados somem)."""
+
+
+def _atual(tamanho):
+    """Caminho original: instâncias do modelo + ParceiroSerializer + JSONRenderer."""
+    inicio = time.perf_counter()
+    objetos = list(Parceiro.objects.filter(status=True).order_by('-id')[:tamanho])
+    banco = time.perf_counter()
+    dados = ParceiroSerializer(objetos, many=True).data
+    serializacao = time.perf_counter()
+    corpo = JSONRenderer().render(dados)
+    return corpo, (banco - inicio, serializacao - banco, time.perf_counter() - serializacao)
+
+
+def _enxuto(tamanho):
+    """Leitura enxuta: .values() + ParceiroLeituraSerializer + JSONRendererRapido."""
+    inicio = time.perf_counter()
+    linhas = list(
+        Parceiro.objects.filter(status=True).order_by('-id').values(*ParceiroSerializer.Meta.fields)[:tamanho]
+    )
+    banco = time.perf_counter()
+    dados = ParceiroLeituraSerializer(linhas, many=True).data
+    serializacao = time.perf_counter()
+    corpo = JSONRendererRapido().render(dados)
+    return corpo, (banco - inicio, serializacao - banco, time.perf_counter() - serializacao)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a serialização das leituras de parceiros: ParceiroSerializer + JSONRenderer "
+        "contra .values() + ParceiroLeituraSerializer + orjson. Confere que os bytes são iguais."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanhos', type=int, nargs='+', default=[1_000, 10_000], help="Linhas por resposta.")
+        parser.add_argument('--repeticoes', type=int, default=5, help="Execuções por caminho (usa a mediana).")
+        parser.add_argument('--json', dest='saida_json', help="Grava o resultado neste arquivo JSON.")
+
+    def handle(self, *args, **options):
+        resultado = {}
+        try:
+            with transaction.atomic():
+                faltam = max(options['tamanhos']) - Parceiro.objects.filter(status=True).count()
+                if faltam > 0:
+                    # ~10% dos sintéticos são inativos: semeia com folga
+                    inicio = (Parceiro.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+                    self.stderr.write(f"Semeando {int(faltam * 1.2)} parceiros...")
+                    semear_parceiros(int(faltam * 1.2), inicio=inicio)
+                for tamanho in options['tamanhos']:
+                    resultado[str(tamanho)] = self._comparar(tamanho, options['repeticoes'])
+                raise _Desfazer()
+        except _Desfazer:
+            pass
+
+        self._imprimir(resultado)
+        if options['saida_json']:
+            with open(options['saida_json'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, indent=2)
+
+    def _comparar(self, tamanho, repeticoes):
+        medicoes = {}
+        for nome, caminho in (('atual', _atual), ('enxuto', _enxuto)):
+            tempos = []
+            for _ in range(repeticoes):
+                corpo, fases = caminho(tamanho)
+                tempos.append(fases)
+            medicoes[nome] = {
+                'corpo': corpo,
+                'banco_ms': round(statistics.median(t[0] for t in tempos) * 1000, 2),
+                'serializacao_ms': round(statistics.median(t[1] for t in tempos) * 1000, 2),
+                'render_ms': round(statistics.median(t[2] for t in tempos) * 1000, 2),
+                'total_ms': round(statistics.median(sum(t) for t in tempos) * 1000, 2),
+            }
+        if medicoes['atual'].pop('corpo') != medicoes['enxuto'].pop('corpo'):
+            raise CommandError(f"Saídas diferentes com {tamanho} linhas: a leitura enxuta não é compatível.")
+        medicoes['aceleracao'] = round(medicoes['atual']['total_ms'] / medicoes['enxuto']['total_ms'], 2)
+        return medicoes
+
+    def _imprimir(self, resultado):
+        for tamanho, medicoes in resultado.items():
+            self.stdout.write(f"{tamanho} linhas (bytes idênticos) — {medicoes['aceleracao']}x mais rápido")
+            for nome in ('atual', 'enxuto'):
+                m = medicoes[nome]
+                self.stdout.write(
+                    f"  {nome:7} total {m['total_ms']:8.2f}ms  banco {m['banco_ms']:7.2f}ms  "
+                    f"serialização {m['serializacao_ms']:7.2f}ms  render {m['render_ms']:7.2f}ms"
+                )
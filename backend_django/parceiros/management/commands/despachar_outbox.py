@@ -0,0 +1,37 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/despachar_outbox.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...outbox import despachar_pendentes, reabrir_falhas
+
+
+class Command(BaseCommand):
+    help = "Entrega à API Embedded as alterações gravadas na outbox (atualizações, deleções, reversões)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Threads chamando a API em paralelo.")
+        parser.add_argument('--lote', type=int, default=100, help="Eventos reservados por rodada (um por parceiro).")
+        parser.add_argument('--continuo', action='store_true', help="Fica rodando e consultando a outbox.")
+        parser.add_argument('--intervalo', type=float, default=2, help="Segundos de espera quando a outbox está vazia.")
+        parser.add_argument('--reabrir-falhas', action='store_true',
+                            help="Antes de despachar, devolve à fila os eventos que esgotaram as tentativas.")
+
+    def handle(self, *args, **options):
+        if options['reabrir_falhas']:
+            self.stdout.write(f"{reabrir_falhas()} evento(s) com falha reaberto(s).")
+
+        total = 0
+        while True:
+            processados, sucessos = despachar_pendentes(limite=options['lote'], workers=options['workers'])
+            total += processados
+            if processados:
+                self.stdout.write(f"{processados} evento(s) entregue(s), {sucessos} com sucesso.")
+
+            if processados:
+                continue  # Enquanto houver trabalho vencido, segue sem pausa
+            if not options['continuo']:
+                self.stdout.write(f"Outbox vazia. Total processado: {total}.")
+                return
+            time.sleep(options['intervalo'])
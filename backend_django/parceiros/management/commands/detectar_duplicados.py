@@ -0,0 +1,44 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/detectar_duplicados.py
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ...duplicados import TAMANHO_MAXIMO_BLOCO, encontrar_duplicados, limiar_configurado, reindexar
+
+
+class Command(BaseCommand):
+    help = "Lista grupos de parceiros que parecem a mesma empresa (mesmo CNPJ ou nomes parecidos)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limiar', type=float, default=None,
+                            help="Similaridade mínima dos nomes, entre 0 e 1 (padrão: PARCEIROS_DUPLICADOS_LIMIAR).")
+        parser.add_argument('--bloco-maximo', type=int, default=TAMANHO_MAXIMO_BLOCO,
+                            help="Bandas de nome com mais parceiros que isso só comparam vizinhos (nomes muito comuns).")
+        parser.add_argument('--reindexar', action='store_true',
+                            help="Recalcula as chaves de todos os parceiros antes de procurar.")
+        parser.add_argument('--json', action='store_true', help="Imprime o relatório completo em JSON.")
+
+    def handle(self, *args, **options):
+        limiar = limiar_configurado() if options['limiar'] is None else options['limiar']
+        if not 0 < limiar <= 1:
+            raise CommandError("--limiar deve estar entre 0 (exclusivo) e 1.")
+
+        if options['reindexar']:
+            self.stdout.write(f"{reindexar()} parceiro(s) reindexado(s).")
+
+        relatorio = encontrar_duplicados(limiar, tamanho_maximo_bloco=options['bloco_maximo'])
+        if options['json']:
+            self.stdout.write(json.dumps(relatorio, cls=DjangoJSONEncoder, ensure_ascii=False, indent=2))
+            return
+
+        for grupo in relatorio['grupos']:
+            self.stdout.write(" | ".join(
+                f"#{p['id']} {p['nome_fantasia']} ({p['cnpj']})" for p in grupo['parceiros']
+            ))
+            for par in grupo['pares']:
+                self.stdout.write(f"    {par['a']} x {par['b']}: {par['motivo']} {par['similaridade']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{relatorio['total_grupos']} grupo(s), {relatorio['parceiros_envolvidos']} parceiro(s) envolvido(s)."
+        ))
@@ -0,0 +1,43 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/expirar_parceiros.py
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...expiracao import TAMANHO_LOTE, processar_vencidos, vencidos
+
+
+class Command(BaseCommand):
+    help = "Desativa (status=False) os parceiros cuja data_saida já passou."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Parceiros desativados por UPDATE.")
+        parser.add_argument('--data', help="Data de referência AAAA-MM-DD (padrão: hoje). Vence quem saiu antes dela.")
+        parser.add_argument('--sincronizar', action='store_true',
+                            help="Reenvia os usuários desativados à API Embedded (pela outbox, se ligada).")
+        parser.add_argument('--workers', type=int, default=4, help="Threads na sincronização direta com a API.")
+        parser.add_argument('--simular', action='store_true', help="Só conta os parceiros vencidos.")
+        parser.add_argument('--continuo', action='store_true', help="Fica rodando e verificando periodicamente.")
+        parser.add_argument('--intervalo', type=float, default=3600, help="Segundos entre verificações no modo contínuo.")
+
+    def handle(self, *args, **options):
+        try:
+            hoje = date.fromisoformat(options['data']) if options['data'] else None
+        except ValueError:
+            raise CommandError("Use --data no formato AAAA-MM-DD.")
+
+        if options['simular']:
+            self.stdout.write(f"{vencidos(hoje).count()} parceiro(s) vencido(s).")
+            return
+
+        while True:
+            desativados, erros = processar_vencidos(
+                hoje, lote=options['lote'], sincronizar=options['sincronizar'], workers=options['workers']
+            )
+            for pk, erro in erros:
+                self.stderr.write(f"Parceiro {pk}: {erro}")
+            self.stdout.write(f"{desativados} parceiro(s) desativado(s), {len(erros)} erro(s) de sincronização.")
+            if not options['continuo']:
+                return
+            time.sleep(options['intervalo'])
@@ -0,0 +1,61 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/exportar_parceiros.py
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from ...api.filters import FILTROS, filtrar_parceiros
+from ...exportacao import FORMATOS, escolher_colunas, exportar
+from ...models import Parceiro
+
+
+def _formato_pelo_nome(caminho):
+    nome = (caminho or '').lower().removesuffix('.gz')
+    extensao = nome.rsplit('.', 1)[-1]
+    return extensao if extensao in FORMATOS else 'csv'
+
+
+class Command(BaseCommand):
+    help = "Exporta os parceiros ativos em CSV, NDJSON ou XLSX (em streaming, com memória constante)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--saida', help="Arquivo de saída (padrão: saída padrão).")
+        parser.add_argument('--formato', choices=FORMATOS, help="Padrão: pela extensão de --saida, senão csv.")
+        parser.add_argument('--gzip', action='store_true', help="Compacta em gzip (implícito em --saida *.gz).")
+        parser.add_argument('--campos', help="Colunas separadas por vírgula (padrão: as mesmas da API).")
+        parser.add_argument('--filtro', action='append', default=[], metavar='NOME=VALOR',
+                            help=f"Filtro da listagem da API; pode repetir. Nomes: {', '.join(FILTROS)}.")
+        parser.add_argument('--lote', type=int, default=2000, help="Linhas lidas do banco por vez.")
+
+    def handle(self, *args, **options):
+        parametros = {}
+        for filtro in options['filtro']:
+            nome, separador, valor = filtro.partition('=')
+            if not separador or nome not in FILTROS:
+                raise CommandError(f"Filtro inválido: '{filtro}'. Use NOME=VALOR com um de: {', '.join(FILTROS)}.")
+            parametros[nome] = valor
+        try:
+            queryset = filtrar_parceiros(Parceiro.objects.filter(status=True), parametros)
+        except ValidationError as e:
+            raise CommandError(str(e.detail))
+
+        saida_caminho = options['saida']
+        formato = options['formato'] or _formato_pelo_nome(saida_caminho)
+        gzip = options['gzip'] or (saida_caminho or '').lower().endswith('.gz')
+        campos = options['campos'].split(',') if options['campos'] else None
+
+        conteudo = exportar(queryset, formato, escolher_colunas(campos), gzip=gzip, tamanho_lote=options['lote'])
+        saida = open(saida_caminho, 'wb') if saida_caminho else sys.stdout.buffer
+        total = 0
+        try:
+            for pedaco in conteudo:
+                saida.write(pedaco)
+                total += len(pedaco)
+        finally:
+            if saida is not sys.stdout.buffer:
+                saida.close()
+            else:
+                saida.flush()
+
+        self.stderr.write(f"Exportação {formato}{' (gzip)' if gzip else ''} concluída: {total} bytes.")
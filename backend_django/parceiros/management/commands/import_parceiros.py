@@ -0,0 +1,47 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/import_parceiros.py
+
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importacao import formato_pelo_nome, importar_parceiros, ler_registros
+
+
+class Command(BaseCommand):
+    help = "Importa parceiros em massa a partir de um arquivo CSV, JSON ou NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Caminho do arquivo ('-' para ler da entrada padrão).")
+        parser.add_argument('--formato', choices=['csv', 'json', 'ndjson'], help="Padrão: pela extensão do arquivo.")
+        parser.add_argument('--lote', type=int, default=500, help="Registros por lote (validação e bulk_create).")
+        parser.add_argument('--workers', type=int, default=8, help="Cadastros simultâneos na API Embedded.")
+        parser.add_argument('--assincrono', action='store_true',
+                            help="Grava como PENDENTE e deixa o cadastro na API para `processar_provisionamentos`.")
+        parser.add_argument('--relatorio', help="Arquivo NDJSON para o relatório por linha (padrão: saída padrão).")
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or formato_pelo_nome(options['arquivo'])
+        arquivo = sys.stdin.buffer if options['arquivo'] == '-' else open(options['arquivo'], 'rb')
+        saida = open(options['relatorio'], 'w', encoding='utf-8') if options['relatorio'] else self.stdout
+
+        resumo = {}
+        try:
+            relatorio = importar_parceiros(
+                ler_registros(arquivo, formato),
+                tamanho_lote=options['lote'],
+                workers=options['workers'],
+                assincrono=options['assincrono'],
+            )
+            for item in relatorio:
+                saida.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+                resumo[item['resultado']] = resumo.get(item['resultado'], 0) + 1
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            if arquivo is not sys.stdin.buffer:
+                arquivo.close()
+            if saida is not self.stdout:
+                saida.close()
+
+        self.stderr.write("Resumo: " + ", ".join(f"{chave}={total}" for chave, total in sorted(resumo.items())))
@@ -0,0 +1,14 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/limpar_chaves_idempotencia.py
+
+from django.core.management.base import BaseCommand
+
+from ...idempotencia import remover_expiradas
+
+
+class Command(BaseCommand):
+    help = ("Remove as respostas guardadas para Idempotency-Key que passaram do TTL "
+            "(PARCEIROS_IDEMPOTENCIA_TTL). Rode periodicamente (ex.: cron de hora em hora).")
+
+    def handle(self, *args, **options):
+        removidas = remover_expiradas()
+        self.stdout.write(self.style.SUCCESS(f"{removidas} resposta(s) expirada(s) removida(s)."))
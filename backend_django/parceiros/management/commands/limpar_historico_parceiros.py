@@ -0,0 +1,17 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/limpar_historico_parceiros.py
+
+from django.core.management.base import BaseCommand
+
+from ...historico import remover_antigas
+
+
+class Command(BaseCommand):
+    help = ("Remove do histórico de alterações as linhas mais antigas que --dias. "
+            "Clientes com cursor anterior recebem 410 e precisam de uma carga completa.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=90, help="Idade mínima (em dias) das alterações removidas.")
+
+    def handle(self, *args, **options):
+        removidas = remover_antigas(options['dias'])
+        self.stdout.write(self.style.SUCCESS(f"{removidas} alteração(ões) removida(s)."))
@@ -0,0 +1,30 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/processar_acoes_em_massa.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...acoes_em_massa import processar_pendentes
+
+
+class Command(BaseCommand):
+    help = "Executa as ações em massa enfileiradas pelo admin (desativar, sincronizar, reenviar senha)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Threads chamando a API em paralelo (por lote).")
+        parser.add_argument('--lote', type=int, default=10, help="Lotes reservados por rodada.")
+        parser.add_argument('--continuo', action='store_true', help="Fica rodando e consultando a fila.")
+        parser.add_argument('--intervalo', type=float, default=5, help="Segundos de espera quando a fila está vazia.")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            lotes, concluidos = processar_pendentes(limite=options['lote'], workers=options['workers'])
+            total += lotes
+            if lotes:
+                self.stdout.write(f"{lotes} lote(s) processado(s), {concluidos} concluído(s).")
+                continue
+            if not options['continuo']:
+                self.stdout.write(f"Fila vazia. Total processado: {total}.")
+                return
+            time.sleep(options['intervalo'])
@@ -0,0 +1,32 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/processar_provisionamentos.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...provisionamento import processar_pendentes
+
+
+class Command(BaseCommand):
+    help = "Processa a fila de provisionamento de parceiros na API Embedded."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Threads chamando a API em paralelo.")
+        parser.add_argument('--lote', type=int, default=50, help="Tarefas reservadas por rodada.")
+        parser.add_argument('--continuo', action='store_true', help="Fica rodando e consultando a fila.")
+        parser.add_argument('--intervalo', type=float, default=5, help="Segundos de espera quando a fila está vazia.")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processadas, sucessos = processar_pendentes(limite=options['lote'], workers=options['workers'])
+            total += processadas
+            if processadas:
+                self.stdout.write(f"{processadas} tarefa(s) processada(s), {sucessos} com sucesso.")
+
+            if processadas:
+                continue  # Enquanto houver trabalho vencido, segue sem pausa
+            if not options['continuo']:
+                self.stdout.write(f"Fila vazia. Total processado: {total}.")
+                return
+            time.sleep(options['intervalo'])
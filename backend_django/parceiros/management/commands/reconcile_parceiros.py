@@ -0,0 +1,51 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/reconcile_parceiros.py
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import reconciliacao, services
+from ...resiliencia import ServicoIndisponivel
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara os parceiros locais com os usuários da API Embedded e gera um "
+        "relatório NDJSON das divergências (opcionalmente aplicando as correções)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--relatorio', help="Arquivo NDJSON do relatório (padrão: saída padrão).")
+        parser.add_argument('--tamanho-pagina', type=int, default=500, help="Usuários por página da API.")
+        parser.add_argument('--aplicar', action='store_true', help="Aplica as correções encontradas.")
+        parser.add_argument('--remover-orfaos', action='store_true',
+                            help="Com --aplicar, deleta na API os usuários sem parceiro local.")
+        parser.add_argument('--workers', type=int, default=4, help="Chamadas simultâneas à API nas correções.")
+        parser.add_argument('--taxa', type=float, default=5, help="Máximo de chamadas por segundo nas correções.")
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        indice = reconciliacao.indexar_parceiros()
+        self.stderr.write(f"{len(indice)} parceiro(s) locais indexados.")
+
+        divergencias = reconciliacao.comparar(indice, services.iterar_usuarios(options['tamanho_pagina']))
+        saida = open(options['relatorio'], 'w', encoding='utf-8') if options['relatorio'] else self.stdout
+        resumo = {}
+        try:
+            if options['aplicar']:
+                divergencias = reconciliacao.aplicar_correcoes(
+                    list(divergencias), workers=options['workers'],
+                    chamadas_por_segundo=options['taxa'], remover_orfaos=options['remover_orfaos'],
+                )
+            for item in divergencias:
+                resumo[item['tipo']] = resumo.get(item['tipo'], 0) + 1
+                saida.write(json.dumps(item, ensure_ascii=False) + "\n")
+            saida.write(json.dumps({'resumo': resumo, 'segundos': round(time.monotonic() - inicio, 2)}) + "\n")
+        except (services.ErroApiEmbedded, ServicoIndisponivel) as e:
+            raise CommandError(f"Falha ao listar os usuários da API: {e}")
+        finally:
+            if saida is not self.stdout:
+                saida.close()
+
+        self.stderr.write("Resumo: " + (", ".join(f"{t}={n}" for t, n in sorted(resumo.items())) or "sem divergências"))
@@ -0,0 +1,29 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/reconstruir_resumo_parceiros.py
+
+from django.core.management.base import BaseCommand
+
+from ...cache import invalidar_cache_parceiros
+from ...resumo import divergencias, reconstruir
+
+
+class Command(BaseCommand):
+    help = "Recalcula o resumo do painel (GET /parceiros/stats/) a partir da tabela de parceiros."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verificar', action='store_true',
+                            help="Só compara o resumo com a contagem real, sem gravar nada.")
+
+    def handle(self, *args, **options):
+        if options['verificar']:
+            diferencas = divergencias()
+            for (tipo, chave), (gravado, real) in sorted(diferencas.items(), key=str):
+                self.stdout.write(f"{tipo} {chave}: resumo={gravado} real={real}")
+            if diferencas:
+                self.stdout.write(self.style.WARNING(f"{len(diferencas)} divergência(s) encontrada(s)."))
+            else:
+                self.stdout.write(self.style.SUCCESS("Resumo em dia."))
+            return
+
+        grupos, datas = reconstruir()
+        invalidar_cache_parceiros()
+        self.stdout.write(self.style.SUCCESS(f"Resumo reconstruído: {grupos} grupo(s), {datas} data(s) de saída."))
@@ -0,0 +1,38 @@
+# CÓDIGO para: backend_django/parceiros/management/commands/sincronizar_usuarios_embedded.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import espelho, services
+from ...resiliencia import ServicoIndisponivel
+
+
+class Command(BaseCommand):
+    help = "Sincroniza o espelho local com a lista paginada de usuários da API Embedded."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanho-pagina', type=int, default=200, help="Usuários por página da API.")
+        parser.add_argument('--expurgar', action='store_true',
+                            help="Só remove as entradas vencidas (fora do TTL), sem chamar a API.")
+        parser.add_argument('--continuo', action='store_true', help="Repete a sincronização periodicamente.")
+        parser.add_argument('--intervalo', type=float, default=900, help="Segundos entre sincronizações.")
+
+    def handle(self, *args, **options):
+        if options['expurgar']:
+            self.stdout.write(f"{espelho.expurgar()} entrada(s) vencida(s) removida(s).")
+            return
+
+        while True:
+            try:
+                sincronizacao = espelho.sincronizar(services.iterar_usuarios(options['tamanho_pagina']))
+            except (services.ErroApiEmbedded, ServicoIndisponivel) as e:
+                if not options['continuo']:
+                    raise CommandError(f"Sincronização interrompida: {e}")
+                self.stderr.write(f"Sincronização interrompida: {e}")
+            else:
+                self.stdout.write(f"{sincronizacao.total_usuarios} usuário(s) sincronizado(s).")
+
+            if not options['continuo']:
+                return
+            time.sleep(options['intervalo'])
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parceiro',
+            name='erro_provisionamento',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='parceiro',
+            name='status_provisionamento',
+            field=models.CharField(choices=[('PENDENTE', 'Pendente'), ('CONCLUIDO', 'Concluído'), ('ERRO', 'Erro')], default='CONCLUIDO', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='TarefaProvisionamento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('PENDENTE', 'Pendente'), ('PROCESSANDO', 'Processando'), ('CONCLUIDA', 'Concluída'), ('FALHOU', 'Falhou')], default='PENDENTE', max_length=20)),
+                ('tentativas', models.PositiveIntegerField(default=0)),
+                ('proxima_tentativa', models.DateTimeField(default=django.utils.timezone.now)),
+                ('reserva', models.CharField(blank=True, default='', max_length=32)),
+                ('reservada_em', models.DateTimeField(blank=True, null=True)),
+                ('ultimo_erro', models.TextField(blank=True, default='')),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('atualizada_em', models.DateTimeField(auto_now=True)),
+                ('parceiro', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tarefa_provisionamento', to='parceiros.parceiro')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'proxima_tentativa'], name='tarefa_prov_fila_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+from parceiros.indices import criar_indices_busca, remover_indices_busca
+from parceiros.normalizacao import normalizar_cnpj
+
+
+def preencher_cnpj_normalizado(apps, schema_editor):
+    Parceiro = apps.get_model('parceiros', 'Parceiro')
+    lote = []
+    for parceiro in Parceiro.objects.only('id', 'cnpj').iterator(chunk_size=2000):
+        parceiro.cnpj_normalizado = normalizar_cnpj(parceiro.cnpj)
+        lote.append(parceiro)
+        if len(lote) >= 2000:
+            Parceiro.objects.bulk_update(lote, ['cnpj_normalizado'])
+            lote = []
+    if lote:
+        Parceiro.objects.bulk_update(lote, ['cnpj_normalizado'])
+
+
+def criar_indices(apps, schema_editor):
+    criar_indices_busca(schema_editor.connection)
+
+
+def remover_indices(apps, schema_editor):
+    remover_indices_busca(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0002_provisionamento_assincrono'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parceiro',
+            name='cnpj_normalizado',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='parceiro',
+            index=models.Index(condition=models.Q(('status', True)), fields=['-id'], name='parceiro_ativos_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parceiro',
+            index=models.Index(condition=models.Q(('status', True)), fields=['tipo', 'senha_definida', '-id'], name='parceiro_ativos_filtros_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parceiro',
+            index=models.Index(fields=['status', 'tipo', 'senha_definida', '-id'], name='parceiro_admin_filtros_idx'),
+        ),
+        migrations.RunPython(preencher_cnpj_normalizado, migrations.RunPython.noop),
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0003_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SincronizacaoEmbedded',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('iniciada_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+                ('total_usuarios', models.PositiveIntegerField(default=0)),
+                ('erro', models.TextField(blank=True, default='')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UsuarioEmbedded',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('api_id', models.CharField(max_length=50, unique=True)),
+                ('email', models.EmailField(max_length=255, unique=True)),
+                ('nome', models.CharField(blank=True, default='', max_length=255)),
+                ('departamento', models.CharField(blank=True, default='', max_length=100)),
+                ('data_expiracao', models.CharField(blank=True, default='', max_length=40)),
+                ('sincronizado_em', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
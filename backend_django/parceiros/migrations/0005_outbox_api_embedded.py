@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:51
+
+import django.core.serializers.json
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0004_espelho_usuarios_embedded'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=255)),
+                ('parceiro_id', models.BigIntegerField(blank=True, null=True)),
+                ('operacao', models.CharField(choices=[('ATUALIZAR', 'Atualizar usuário'), ('DELETAR', 'Deletar usuário'), ('DESFAZER_CRIACAO', 'Desfazer criação')], max_length=20)),
+                ('payload', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('chave_idempotencia', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('estado', models.CharField(choices=[('PENDENTE', 'Pendente'), ('PROCESSANDO', 'Processando'), ('CONCLUIDO', 'Concluído'), ('FALHOU', 'Falhou')], default='PENDENTE', max_length=20)),
+                ('tentativas', models.PositiveIntegerField(default=0)),
+                ('proxima_tentativa', models.DateTimeField(default=django.utils.timezone.now)),
+                ('reserva', models.CharField(blank=True, default='', max_length=32)),
+                ('reservada_em', models.DateTimeField(blank=True, null=True)),
+                ('ultimo_erro', models.TextField(blank=True, default='')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'proxima_tentativa'], name='outbox_fila_idx'), models.Index(fields=['chave', 'estado'], name='outbox_chave_idx')],
+            },
+        ),
+    ]
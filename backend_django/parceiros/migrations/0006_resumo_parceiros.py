@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:01
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def preencher_resumo(apps, schema_editor):
+    Parceiro = apps.get_model('parceiros', 'Parceiro')
+    ResumoParceiros = apps.get_model('parceiros', 'ResumoParceiros')
+    ResumoSaidaParceiros = apps.get_model('parceiros', 'ResumoSaidaParceiros')
+    ResumoParceiros.objects.bulk_create([
+        ResumoParceiros(**linha)
+        for linha in Parceiro.objects.values('tipo', 'status', 'senha_definida').annotate(total=Count('id')).order_by()
+    ])
+    ResumoSaidaParceiros.objects.bulk_create([
+        ResumoSaidaParceiros(**linha)
+        for linha in Parceiro.objects.filter(status=True, data_saida__isnull=False)
+        .values('data_saida').annotate(total=Count('id')).order_by()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0005_outbox_api_embedded'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoSaidaParceiros',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_saida', models.DateField(unique=True)),
+                ('total', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumoParceiros',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=100)),
+                ('status', models.BooleanField()),
+                ('senha_definida', models.BooleanField()),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'status', 'senha_definida'), name='resumo_parceiros_grupo_uniq')],
+            },
+        ),
+        migrations.RunPython(preencher_resumo, migrations.RunPython.noop),
+    ]
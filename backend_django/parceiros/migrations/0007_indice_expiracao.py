@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0006_resumo_parceiros'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='parceiro',
+            index=models.Index(condition=models.Q(('data_saida__isnull', False), ('status', True)), fields=['data_saida', 'id'], name='parceiro_ativos_saida_idx'),
+        ),
+    ]
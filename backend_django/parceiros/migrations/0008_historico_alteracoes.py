@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:04
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def registrar_existentes(apps, schema_editor):
+    # Uma CRIACAO por parceiro já cadastrado: since=0 equivale a uma carga completa
+    Parceiro = apps.get_model('parceiros', 'Parceiro')
+    AlteracaoParceiro = apps.get_model('parceiros', 'AlteracaoParceiro')
+    lote = []
+    for pk in Parceiro.objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=2000):
+        lote.append(AlteracaoParceiro(parceiro_id=pk, operacao='CRIACAO'))
+        if len(lote) >= 2000:
+            AlteracaoParceiro.objects.bulk_create(lote)
+            lote = []
+    AlteracaoParceiro.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0007_indice_expiracao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlteracaoParceiro',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('parceiro_id', models.BigIntegerField()),
+                ('operacao', models.CharField(choices=[('CRIACAO', 'Criação'), ('ALTERACAO', 'Alteração'), ('DELECAO', 'Deleção')], max_length=10)),
+                ('campos', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('registrada_em', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(registrar_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:08
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0008_historico_alteracoes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AcaoEmMassa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grupo', models.UUIDField(db_index=True, default=uuid.uuid4)),
+                ('acao', models.CharField(choices=[('DESATIVAR', 'Desativar'), ('SINCRONIZAR', 'Sincronizar com a API Embedded'), ('REENVIAR_SENHA', 'Reenviar senha')], max_length=20)),
+                ('parceiro_ids', models.JSONField(default=list)),
+                ('solicitada_por', models.CharField(blank=True, default='', max_length=150)),
+                ('estado', models.CharField(choices=[('PENDENTE', 'Pendente'), ('PROCESSANDO', 'Processando'), ('CONCLUIDA', 'Concluída'), ('FALHOU', 'Falhou')], default='PENDENTE', max_length=20)),
+                ('reserva', models.CharField(blank=True, default='', max_length=32)),
+                ('reservada_em', models.DateTimeField(blank=True, null=True)),
+                ('processados', models.PositiveIntegerField(default=0)),
+                ('erros', models.JSONField(blank=True, default=list)),
+                ('ultimo_erro', models.TextField(blank=True, default='')),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'id'], name='acao_massa_fila_idx')],
+            },
+        ),
+    ]
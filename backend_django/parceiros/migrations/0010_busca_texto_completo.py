@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:10
+
+from django.db import migrations
+
+from parceiros.indices import criar_indice_texto_completo, remover_indice_texto_completo
+
+
+def criar_indice(apps, schema_editor):
+    criar_indice_texto_completo(schema_editor.connection)
+
+
+def remover_indice(apps, schema_editor):
+    remover_indice_texto_completo(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0009_acoes_em_massa'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from parceiros.duplicados import CAMPOS_NOME, chaves
+
+
+def indexar_existentes(apps, schema_editor):
+    # Chaves de bloqueio dos parceiros já cadastrados (mesmo cálculo de duplicados.indexar)
+    Parceiro = apps.get_model('parceiros', 'Parceiro')
+    ChaveDuplicidade = apps.get_model('parceiros', 'ChaveDuplicidade')
+    lote = []
+    for parceiro in Parceiro.objects.order_by('id').only('id', 'cnpj', *CAMPOS_NOME).iterator(chunk_size=2000):
+        lote.extend(
+            ChaveDuplicidade(parceiro_id=parceiro.pk, chave=chave)
+            for chave in chaves(parceiro.cnpj, [getattr(parceiro, campo) for campo in CAMPOS_NOME])
+        )
+        if len(lote) >= 2000:
+            ChaveDuplicidade.objects.bulk_create(lote)
+            lote = []
+    ChaveDuplicidade.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0010_busca_texto_completo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChaveDuplicidade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=40)),
+                ('parceiro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chaves_duplicidade', to='parceiros.parceiro')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['chave', 'parceiro'], name='chave_duplicidade_idx')],
+            },
+        ),
+        migrations.RunPython(indexar_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0011_chaves_duplicidade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RespostaIdempotente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=64, unique=True)),
+                ('impressao', models.CharField(max_length=64)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('corpo', models.BinaryField(blank=True, default=b'')),
+                ('cabecalhos', models.JSONField(blank=True, default=dict)),
+                ('reservada_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expira_em', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parceiros', '0012_respostas_idempotentes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='parceiro',
+            name='parceiro_ativos_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='parceiro',
+            name='parceiro_ativos_filtros_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='parceiro',
+            name='parceiro_admin_filtros_idx',
+        ),
+        migrations.AddIndex(
+            model_name='parceiro',
+            index=models.Index(condition=models.Q(('status', True)), fields=['tipo', '-id'], name='parceiro_ativos_filtros_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parceiro',
+            index=models.Index(condition=models.Q(('status', False)), fields=['tipo', '-id'], name='parceiro_inativos_filtros_idx'),
+        ),
+    ]
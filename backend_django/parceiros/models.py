@@ -1,6 +1,12 @@
 # CÓDIGO CORRETO para: backend_django/parceiros/models.py
 
-from django.db import models
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
+
+from .normalizacao import normalizar_cnpj
 
 # Esta é a definição do modelo (tabela) que o Django entende.
 # É o equivalente ao seu antigo `parceiro_db.py`, mas no formato ORM.
@@ -17,6 +23,8 @@ class Parceiro(models.Model):
     tipo = models.CharField(max_length=100, choices=TIPO_CHOICES)
     
     cnpj = models.CharField(max_length=20)
+    # Só os dígitos do CNPJ, mantido pelo save() (buscas exatas e indexadas)
+    cnpj_normalizado = models.CharField(max_length=20, blank=True, default='', editable=False, db_index=True)
     nome_fantasia = models.CharField(max_length=255)
     razao_social = models.CharField(max_length=255)
     gestor = models.CharField(max_length=255)
@@ -28,9 +36,281 @@ class Parceiro(models.Model):
     
     status = models.BooleanField(default=True)
     senha_definida = models.BooleanField(default=False)
+
+    # Situação do cadastro na API Embedded (o modo assíncrono começa em PENDENTE)
+    PROVISIONAMENTO_CHOICES = [
+        ('PENDENTE', 'Pendente'),
+        ('CONCLUIDO', 'Concluído'),
+        ('ERRO', 'Erro'),
+    ]
+    status_provisionamento = models.CharField(max_length=20, choices=PROVISIONAMENTO_CHOICES, default='CONCLUIDO')
+    erro_provisionamento = models.TextField(blank=True, default='')
     
     # O Django gerencia data_atualizacao automaticamente
     data_atualizacao = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # A listagem dos ativos por id (paginação por cursor) percorre a própria chave
+            # primária: ~90% das linhas são ativas e o LIMIT para cedo.
+            # Booleanos ficam na condição dos índices, não nas colunas: o Django os filtra
+            # como `"status"`/`NOT "status"` e o SQLite só busca no índice por `coluna = valor`.
+            # senha_definida é filtrada sobre as linhas já na ordem do índice.
+            # Filtros da API (e do admin) sobre os ativos
+            models.Index(fields=['tipo', '-id'], condition=models.Q(status=True), name='parceiro_ativos_filtros_idx'),
+            # Filtros laterais do admin sobre os inativos
+            models.Index(fields=['tipo', '-id'], condition=models.Q(status=False), name='parceiro_inativos_filtros_idx'),
+            # Expiração (parceiros/expiracao.py): ativos com data_saida, em ordem de vencimento
+            models.Index(fields=['data_saida', 'id'], condition=models.Q(status=True, data_saida__isnull=False),
+                         name='parceiro_ativos_saida_idx'),
+        ]
+        # Índices de busca textual dependem do banco e ficam na migração 0003:
+        # trigram (pg_trgm) no PostgreSQL, COLLATE NOCASE (busca por prefixo) no SQLite.
+
+    def save(self, *args, **kwargs):
+        self.cnpj_normalizado = normalizar_cnpj(self.cnpj)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'cnpj' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'cnpj_normalizado'}
+        # Os signals (resumo do painel e histórico de alterações) gravam na mesma transação
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+    def valores(self, campos):
+        """{campo: valor} no tipo do campo (ex.: uma data atribuída como texto vira date)."""
+        return {campo: self._meta.get_field(campo).to_python(getattr(self, campo)) for campo in campos}
+
+    def diferencas(self, dados):
+        """Campos de `dados` cujo valor difere do registro: {campo: (atual, novo)}."""
+        return {
+            campo: (getattr(self, campo), valor)
+            for campo, valor in dados.items()
+            if getattr(self, campo) != valor
+        }
+
+    def __str__(self):
+        return self.nome_fantasia
+
+
+# Fila (no próprio banco) de cadastros pendentes na API Embedded.
+# É consumida pelo comando `python manage.py processar_provisionamentos`.
+
+class TarefaProvisionamento(models.Model):
+    ESTADO_CHOICES = [
+        ('PENDENTE', 'Pendente'),
+        ('PROCESSANDO', 'Processando'),
+        ('CONCLUIDA', 'Concluída'),
+        ('FALHOU', 'Falhou'),
+    ]
+    parceiro = models.OneToOneField(Parceiro, on_delete=models.CASCADE, related_name='tarefa_provisionamento')
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='PENDENTE')
+    tentativas = models.PositiveIntegerField(default=0)
+    proxima_tentativa = models.DateTimeField(default=timezone.now)
+
+    # Preenchidos quando um worker reserva a tarefa
+    reserva = models.CharField(max_length=32, blank=True, default='')
+    reservada_em = models.DateTimeField(null=True, blank=True)
+
+    ultimo_erro = models.TextField(blank=True, default='')
+    criada_em = models.DateTimeField(auto_now_add=True)
+    atualizada_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'proxima_tentativa'], name='tarefa_prov_fila_idx'),
+        ]
+
+    def __str__(self):
+        return f"Provisionamento de {self.parceiro_id} ({self.estado})"
+
+
+# Resumo dos parceiros para o painel (ver parceiros/resumo.py), mantido pelos
+# signals de Parceiro e pelos caminhos em massa. Reconstruído do zero pelo
+# comando `python manage.py reconstruir_resumo_parceiros`.
+
+class ResumoParceiros(models.Model):
+    """Quantidade de parceiros por tipo, status e senha_definida."""
+    tipo = models.CharField(max_length=100)
+    status = models.BooleanField()
+    senha_definida = models.BooleanField()
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'status', 'senha_definida'], name='resumo_parceiros_grupo_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo}/{self.status}/{self.senha_definida}: {self.total}"
+
+
+class ResumoSaidaParceiros(models.Model):
+    """Parceiros ativos por data_saida (para 'vencendo nos próximos N dias')."""
+    data_saida = models.DateField(unique=True)
+    total = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.data_saida}: {self.total}"
+
+
+# Histórico de alterações dos parceiros (ver parceiros/historico.py), lido por
+# GET /parceiros/changes/?since=<seq> para sincronização incremental.
+
+class AlteracaoParceiro(models.Model):
+    OPERACAO_CHOICES = [
+        ('CRIACAO', 'Criação'),
+        ('ALTERACAO', 'Alteração'),
+        ('DELECAO', 'Deleção'),
+    ]
+    seq = models.BigAutoField(primary_key=True)  # Cursor dos clientes: sempre crescente
+    parceiro_id = models.BigIntegerField()  # Sem FK: o parceiro pode já ter sido deletado
+    operacao = models.CharField(max_length=10, choices=OPERACAO_CHOICES)
+    campos = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)  # {campo: novo valor}
+    registrada_em = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"#{self.seq} {self.operacao} parceiro {self.parceiro_id}"
+
+
+# Chaves de bloqueio da detecção de duplicados (ver parceiros/duplicados.py):
+# o CNPJ normalizado e as bandas MinHash dos nomes de cada parceiro. Dois
+# parceiros que compartilham uma chave são candidatos a duplicata.
+
+class ChaveDuplicidade(models.Model):
+    parceiro = models.ForeignKey(Parceiro, on_delete=models.CASCADE, related_name='chaves_duplicidade')
+    chave = models.CharField(max_length=40)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['chave', 'parceiro'], name='chave_duplicidade_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.chave} -> {self.parceiro_id}"
+
+
+# Ações em massa do admin (desativar, sincronizar, reenviar senha) executadas
+# em segundo plano pelo comando `python manage.py processar_acoes_em_massa`
+# (ver parceiros/acoes_em_massa.py). Cada linha é um lote de parceiros.
+
+class AcaoEmMassa(models.Model):
+    ACAO_CHOICES = [
+        ('DESATIVAR', 'Desativar'),
+        ('SINCRONIZAR', 'Sincronizar com a API Embedded'),
+        ('REENVIAR_SENHA', 'Reenviar senha'),
+    ]
+    ESTADO_CHOICES = [
+        ('PENDENTE', 'Pendente'),
+        ('PROCESSANDO', 'Processando'),
+        ('CONCLUIDA', 'Concluída'),
+        ('FALHOU', 'Falhou'),
+    ]
+    grupo = models.UUIDField(default=uuid.uuid4, db_index=True)  # Lotes de um mesmo pedido no admin
+    acao = models.CharField(max_length=20, choices=ACAO_CHOICES)
+    parceiro_ids = models.JSONField(default=list)
+    solicitada_por = models.CharField(max_length=150, blank=True, default='')
+
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='PENDENTE')
+    reserva = models.CharField(max_length=32, blank=True, default='')
+    reservada_em = models.DateTimeField(null=True, blank=True)
+    processados = models.PositiveIntegerField(default=0)
+    erros = models.JSONField(default=list, blank=True)  # [[parceiro_id, mensagem]]
+    ultimo_erro = models.TextField(blank=True, default='')
+    criada_em = models.DateTimeField(auto_now_add=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'id'], name='acao_massa_fila_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_acao_display()} ({len(self.parceiro_ids)} parceiros, {self.estado})"
+
+
+# Respostas das escritas da API feitas com o header Idempotency-Key (ver
+# parceiros/idempotencia.py): a repetição da mesma requisição recebe a
+# resposta gravada, sem executar de novo. Removidas depois do TTL pelo comando
+# `python manage.py limpar_chaves_idempotencia`.
+
+class RespostaIdempotente(models.Model):
+    chave = models.CharField(max_length=64, unique=True)     # sha256 de usuário + Idempotency-Key
+    impressao = models.CharField(max_length=64)              # sha256 de método + caminho + corpo
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)  # None: ainda em andamento
+    corpo = models.BinaryField(default=b'', blank=True)      # Conteúdo da resposta, comprimido (zlib)
+    cabecalhos = models.JSONField(default=dict, blank=True)  # Só Content-Type, Location e afins
+    reservada_em = models.DateTimeField(default=timezone.now)
+    expira_em = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.chave[:12]}... ({self.status_code or 'em andamento'})"
+
+
+# Outbox transacional das alterações que precisam chegar à API Embedded
+# (ver parceiros/outbox.py). Gravada na mesma transação que altera o Parceiro
+# e entregue pelo comando `python manage.py despachar_outbox`.
+
+class EventoOutbox(models.Model):
+    OPERACAO_CHOICES = [
+        ('ATUALIZAR', 'Atualizar usuário'),
+        ('DELETAR', 'Deletar usuário'),
+        ('DESFAZER_CRIACAO', 'Desfazer criação'),
+    ]
+    ESTADO_CHOICES = [
+        ('PENDENTE', 'Pendente'),
+        ('PROCESSANDO', 'Processando'),
+        ('CONCLUIDO', 'Concluído'),
+        ('FALHOU', 'Falhou'),
+    ]
+    # Eventos com a mesma chave (o e-mail, que identifica o usuário na API)
+    # são entregues um de cada vez, na ordem em que foram gravados
+    chave = models.CharField(max_length=255)
+    parceiro_id = models.BigIntegerField(null=True, blank=True)  # Sem FK: o parceiro pode já ter sido deletado
+    operacao = models.CharField(max_length=20, choices=OPERACAO_CHOICES)
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    chave_idempotencia = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='PENDENTE')
+    tentativas = models.PositiveIntegerField(default=0)
+    proxima_tentativa = models.DateTimeField(default=timezone.now)
+    reserva = models.CharField(max_length=32, blank=True, default='')
+    reservada_em = models.DateTimeField(null=True, blank=True)
+    ultimo_erro = models.TextField(blank=True, default='')
+    criado_em = models.DateTimeField(auto_now_add=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'proxima_tentativa'], name='outbox_fila_idx'),
+            models.Index(fields=['chave', 'estado'], name='outbox_chave_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.operacao} {self.chave} ({self.estado})"
+
+
+# Espelho local dos usuários da API Embedded (ver parceiros/espelho.py).
+# Alimentado pelas respostas de criação e pela sincronização paginada
+# (`python manage.py sincronizar_usuarios_embedded`).
+
+class UsuarioEmbedded(models.Model):
+    api_id = models.CharField(max_length=50, unique=True)
+    email = models.EmailField(max_length=255, unique=True)  # Sempre em minúsculas
+    nome = models.CharField(max_length=255, blank=True, default='')
+    departamento = models.CharField(max_length=100, blank=True, default='')
+    data_expiracao = models.CharField(max_length=40, blank=True, default='')
+    sincronizado_em = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.email
+
+
+class SincronizacaoEmbedded(models.Model):
+    """Registro de cada sincronização completa do espelho."""
+    iniciada_em = models.DateTimeField(default=timezone.now)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+    total_usuarios = models.PositiveIntegerField(default=0)
+    erro = models.TextField(blank=True, default='')
+
     def __str__(self):
-        return self.nome_fantasia
\ No newline at end of file
+        return f"Sincronização de {self.iniciada_em:%d/%m/%Y %H:%M}"
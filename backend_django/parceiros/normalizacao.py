@@ -0,0 +1,30 @@
+# CÓDIGO para: backend_django/parceiros/normalizacao.py
+
+import re
+import unicodedata
+
+_NAO_DIGITOS = re.compile(r'\D')
+
+
+def normalizar_cnpj(cnpj):
+    """Mantém só os dígitos do CNPJ ("12.345.678/0001-90" -> "12345678000190")."""
+    return _NAO_DIGITOS.sub('', cnpj or '')
+
+
+# Sufixos societários e conectivos que não distinguem uma empresa de outra
+_PALAVRAS_IGNORADAS = frozenset({
+    'ltda', 'sa', 'me', 'mei', 'epp', 'eireli', 'slu', 'cia', 'companhia',
+    'de', 'da', 'do', 'das', 'dos', 'e',
+})
+_SA = re.compile(r'\bs\s*[/.]?\s*a\b\.?')
+_NAO_PALAVRA = re.compile(r'[^a-z0-9]+')
+
+
+def normalizar_nome(nome):
+    """
+    Nome sem acentos, caixa, pontuação, sufixos societários e conectivos, para
+    comparação ("Ação Comércio Ltda." e "ACAO COMERCIO S/A" -> "acao comercio").
+    """
+    texto = unicodedata.normalize('NFKD', nome or '').encode('ascii', 'ignore').decode().lower()
+    palavras = _NAO_PALAVRA.sub(' ', _SA.sub(' ', texto)).split()
+    return ' '.join(palavra for palavra in palavras if palavra not in _PALAVRAS_IGNORADAS)
@@ -0,0 +1,54 @@
+# CÓDIGO para: backend_django/parceiros/observabilidade.py
+
+# Métricas dos parceiros expostas em /metrics (registrado em apps.ready):
+# cache de leitura, disjuntor e limite de taxa da API Embedded e fila da outbox.
+#
+# Escopo dos números: acertos/falhas do cache ficam no próprio cache (somam
+# todos os processos que o dividem); disjuntor e contadores do limite de taxa
+# são do processo que respondeu (ver backend_api/metricas.py); a outbox vem do banco.
+
+from django.db.models import Count
+
+from backend_api.metricas import linhas_contador, linhas_gauge
+
+from . import cache, resiliencia
+from .models import EventoOutbox
+
+
+def coletar():
+    linhas = []
+    estatisticas = cache.estatisticas()
+    linhas += linhas_contador('parceiros_cache_consultas_total', 'Leituras do cache de parceiros por resultado.', [
+        ({'resultado': 'acerto'}, estatisticas['acertos']),
+        ({'resultado': 'falha'}, estatisticas['falhas']),
+    ])
+
+    dados = resiliencia.metricas()
+    disjuntor = dados['disjuntor']
+    linhas += linhas_gauge('embedded_api_disjuntor_estado', 'Estado atual do disjuntor deste processo (1 no estado vigente).', [
+        ({'estado': estado}, int(disjuntor['estado'] == estado))
+        for estado in (resiliencia.FECHADO, resiliencia.ABERTO, resiliencia.SEMI_ABERTO)
+    ])
+    linhas += linhas_gauge('embedded_api_disjuntor_taxa_falhas', 'Taxa de falhas na janela do disjuntor.', [
+        ({}, disjuntor['taxa_falhas']),
+    ])
+    linhas += linhas_contador('embedded_api_disjuntor_eventos_total', 'Aberturas e chamadas recusadas pelo disjuntor deste processo.', [
+        ({'evento': 'abertura'}, disjuntor['aberturas']),
+        ({'evento': 'rejeicao'}, disjuntor['rejeicoes']),
+    ])
+
+    limite = dados['limite_taxa']
+    if limite:
+        linhas += linhas_contador('embedded_api_limite_taxa_fichas_total', 'Fichas do limite de taxa concedidas/negadas neste processo.', [
+            ({'resultado': 'concedida'}, limite['concedidas']),
+            ({'resultado': 'negada'}, limite['negadas']),
+        ])
+
+    # Backlog da outbox (índice estado/proxima_tentativa); os concluídos ficam de fora
+    abertos = dict(
+        EventoOutbox.objects.exclude(estado='CONCLUIDO').values_list('estado').annotate(total=Count('id'))
+    )
+    linhas += linhas_gauge('parceiros_outbox_eventos', 'Eventos da outbox ainda não entregues, por estado.', [
+        ({'estado': estado}, abertos.get(estado, 0)) for estado in ('PENDENTE', 'PROCESSANDO', 'FALHOU')
+    ])
+    return linhas
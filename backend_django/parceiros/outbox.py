@@ -0,0 +1,230 @@
+# CÓDIGO para: backend_django/parceiros/outbox.py
+
+# Outbox transacional: em vez de chamar a API Embedded durante a requisição,
+# as views gravam um EventoOutbox na mesma transação que altera o Parceiro.
+# A requisição custa só o commit local; o despachante (comando
+# `despachar_outbox`) entrega os eventos em lotes, com chave de idempotência,
+# novas tentativas e backoff exponencial.
+#
+# Ordem: eventos com a mesma chave (e-mail do usuário na API) são entregues
+# um de cada vez, na ordem de gravação, e só depois do provisionamento
+# (TarefaProvisionamento) criado antes deles. Um evento que esgota as
+# tentativas (FALHOU) segura os seguintes da mesma chave até ser reaberto.
+
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Min, OuterRef, Q
+from django.utils import timezone
+
+from .concorrencia import executar_em_paralelo
+from .models import EventoOutbox, Parceiro, TarefaProvisionamento
+from .provisionamento import dados_para_api
+from .resiliencia import ServicoIndisponivel
+from . import services
+
+ABERTOS = ('PENDENTE', 'PROCESSANDO', 'FALHOU')
+
+logger = logging.getLogger(__name__)
+
+
+def _config(nome, padrao):
+    return getattr(settings, nome, padrao)
+
+
+def outbox_ativa():
+    """Com a outbox ligada as views não chamam a API: só gravam eventos."""
+    return _config("PARCEIROS_OUTBOX", False)
+
+
+# --- GRAVAÇÃO (chamar dentro da transação que altera o parceiro) ---
+
+def _evento_atualizacao(parceiro):
+    return EventoOutbox(
+        chave=parceiro.email_gestor, parceiro_id=parceiro.pk, operacao='ATUALIZAR',
+        payload={'api_user_id': parceiro.api_user_id, 'dados': dados_para_api(parceiro)},
+    )
+
+
+def registrar_atualizacao(parceiro):
+    evento = _evento_atualizacao(parceiro)
+    evento.save()
+    return evento
+
+
+def registrar_atualizacoes(parceiros):
+    """Um evento ATUALIZAR por parceiro, gravados com um único bulk_create."""
+    return EventoOutbox.objects.bulk_create([_evento_atualizacao(parceiro) for parceiro in parceiros])
+
+
+def registrar_delecao(parceiro):
+    return EventoOutbox.objects.create(
+        chave=parceiro.email_gestor, parceiro_id=parceiro.pk, operacao='DELETAR',
+    )
+
+
+def registrar_desfazer_criacao(email):
+    """Reversão de um usuário criado na API cujo parceiro não foi gravado."""
+    if not email:
+        return None
+    return EventoOutbox.objects.create(chave=email, operacao='DESFAZER_CRIACAO')
+
+
+def desfazer_criacao(email):
+    """
+    Reverte um usuário que a criação deixou na API sem parceiro local. Com a
+    outbox ligada vai para a fila; sem ela é feita na hora (sem despachante
+    rodando o evento ficaria parado) e só vira evento se a API não confirmar.
+    Nada é feito se um parceiro com o e-mail existe (ele usa esse usuário).
+    """
+    if not email or Parceiro.objects.filter(email_gestor=email).exists():
+        return None
+    if outbox_ativa() or not services.rollback_criacao_usuario(email):
+        return registrar_desfazer_criacao(email)
+    return None
+
+
+def sincronizar_direto(parceiro):
+    """Sem a outbox: reenvia o usuário à API na hora (com o expirationDate). Retorna (sucesso, erro)."""
+    try:
+        return services.atualizar_usuario(parceiro.api_user_id, dados_para_api(parceiro))
+    except ServicoIndisponivel as e:
+        return False, str(e)
+    except Exception as e:
+        return False, f"Erro inesperado ao sincronizar: {e}"
+
+
+def restaurar_na_api(parceiro_id):
+    """
+    Sem a outbox: devolve à API os dados que estão no banco (ex.: o PUT passou,
+    mas a gravação local falhou). Se a API não confirmar, a correção vira um
+    evento ATUALIZAR, que o despachante repete até conseguir.
+    """
+    try:
+        parceiro = Parceiro.objects.get(pk=parceiro_id)
+        sucesso, erro = sincronizar_direto(parceiro)
+        if not sucesso:
+            logger.warning("Parceiro %s: API não voltou aos dados do banco (%s); correção na outbox.", parceiro_id, erro)
+            registrar_atualizacao(parceiro)
+    except Exception:
+        logger.exception("Parceiro %s: API ficou com dados que o banco não gravou.", parceiro_id)
+
+
+# --- DESPACHO ---
+
+def _elegiveis(agora):
+    reserva_expirada = agora - timedelta(seconds=_config("PARCEIROS_OUTBOX_TIMEOUT_RESERVA", 300))
+    # Só o evento aberto mais antigo de cada chave pode ser entregue
+    primeiros = (
+        EventoOutbox.objects.filter(estado__in=ABERTOS)
+        .values('chave').annotate(primeiro=Min('id')).values('primeiro')
+    )
+    provisionamento_anterior = TarefaProvisionamento.objects.filter(
+        estado__in=('PENDENTE', 'PROCESSANDO'),
+        parceiro__email_gestor=OuterRef('chave'),
+        criada_em__lte=OuterRef('criado_em'),
+    )
+    return (
+        Q(id__in=primeiros)
+        & (Q(estado='PENDENTE', proxima_tentativa__lte=agora)
+           | Q(estado='PROCESSANDO', reservada_em__lt=reserva_expirada))
+        & ~Exists(provisionamento_anterior)
+    )
+
+
+def reservar_eventos(limite):
+    """Reserva até `limite` eventos (no máximo um por chave) para este despachante."""
+    agora = timezone.now()
+    elegiveis = _elegiveis(agora)
+    token = uuid.uuid4().hex
+
+    with transaction.atomic():
+        ids = list(
+            EventoOutbox.objects.select_for_update(skip_locked=True)
+            .filter(elegiveis)
+            .order_by('id')
+            .values_list('id', flat=True)[:limite]
+        )
+        # O filtro é repetido no UPDATE para que dois despachantes nunca reservem o mesmo evento
+        EventoOutbox.objects.filter(elegiveis, id__in=ids).update(
+            estado='PROCESSANDO', reserva=token, reservada_em=agora
+        )
+
+    return list(EventoOutbox.objects.filter(reserva=token, estado='PROCESSANDO').order_by('id'))
+
+
+def entregar(evento):
+    """Executa a chamada do evento na API. Retorna (sucesso, erro)."""
+    chave = evento.chave_idempotencia
+    if evento.operacao == 'ATUALIZAR':
+        api_user_id = evento.payload.get('api_user_id')
+        if not api_user_id and evento.parceiro_id:
+            # Gravado antes do provisionamento terminar: o id remoto já está no parceiro
+            api_user_id = (
+                Parceiro.objects.filter(pk=evento.parceiro_id).values_list('api_user_id', flat=True).first()
+            )
+        return services.atualizar_usuario(api_user_id, evento.payload.get('dados', {}), chave_idempotencia=chave)
+    if evento.operacao == 'DESFAZER_CRIACAO' and Parceiro.objects.filter(email_gestor=evento.chave).exists():
+        # O cliente repetiu o cadastro e deu certo: o usuário remoto agora é de um parceiro válido
+        return True, None
+    # DELETAR e DESFAZER_CRIACAO: DELETE é idempotente (404 conta como sucesso)
+    return services.deletar_usuario(evento.chave, chave_idempotencia=chave)
+
+
+def processar_evento(evento):
+    """Entrega um evento reservado. Retorna True se a API confirmou."""
+    try:
+        sucesso, erro = entregar(evento)
+    except ServicoIndisponivel as e:
+        # Recusado localmente (disjuntor/limite de taxa): adia sem gastar uma tentativa
+        evento.estado = 'PENDENTE'
+        evento.reserva = ''
+        evento.proxima_tentativa = timezone.now() + timedelta(seconds=e.retry_after or 1)
+        evento.ultimo_erro = str(e)
+        evento.save()
+        return False
+    except Exception as e:
+        sucesso, erro = False, f"Erro inesperado na entrega: {e}"
+
+    evento.tentativas += 1
+    evento.reserva = ''
+    if sucesso:
+        evento.estado = 'CONCLUIDO'
+        evento.concluido_em = timezone.now()
+        evento.ultimo_erro = ''
+    elif evento.tentativas >= _config("PARCEIROS_OUTBOX_MAX_TENTATIVAS", 8):
+        evento.estado = 'FALHOU'
+        evento.ultimo_erro = erro or ''
+    else:
+        # Backoff exponencial: 10s, 20s, 40s... (base configurável)
+        espera = _config("PARCEIROS_OUTBOX_BACKOFF", 10) * (2 ** (evento.tentativas - 1))
+        evento.estado = 'PENDENTE'
+        evento.proxima_tentativa = timezone.now() + timedelta(seconds=espera)
+        evento.ultimo_erro = erro or ''
+    evento.save()
+    return bool(sucesso)
+
+
+def despachar_pendentes(limite=100, workers=4):
+    """
+    Reserva um lote de eventos (chaves distintas) e entrega em paralelo.
+    Retorna (processados, sucessos).
+    """
+    eventos = reservar_eventos(limite)
+    if not eventos:
+        return 0, 0
+
+    resultados = executar_em_paralelo(processar_evento, eventos, workers)
+
+    return len(resultados), sum(1 for ok in resultados if ok)
+
+
+def reabrir_falhas(chave=None):
+    """Devolve à fila os eventos que esgotaram as tentativas. Retorna quantos."""
+    falhas = EventoOutbox.objects.filter(estado='FALHOU')
+    if chave:
+        falhas = falhas.filter(chave=chave)
+    return falhas.update(estado='PENDENTE', tentativas=0, proxima_tentativa=timezone.now())
@@ -0,0 +1,191 @@
+# CÓDIGO para: backend_django/parceiros/provisionamento.py
+
+# Provisionamento assíncrono: o POST da API salva o Parceiro como PENDENTE e
+# cria uma TarefaProvisionamento. Um worker (comando `processar_provisionamentos`)
+# reserva as tarefas em lote e executa o fluxo POST -> GET -> link-groups em
+# um pool de threads, com novas tentativas e backoff exponencial.
+
+import re
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .concorrencia import executar_em_paralelo
+from .models import EventoOutbox, Parceiro, TarefaProvisionamento
+from .resiliencia import ServicoIndisponivel
+from . import services
+
+
+def _config(nome, padrao):
+    return getattr(settings, nome, padrao)
+
+
+# Status HTTP nas mensagens de erro de services ("API Erro 403 ...", "(GET 404)")
+_STATUS_NO_ERRO = re.compile(r'\b(?:Erro|GET) (\d{3})\b')
+# 4xx que podem passar numa nova tentativa (409: o usuário já existe e a
+# retentativa busca antes de criar)
+_STATUS_4XX_TEMPORARIOS = {408, 409, 429}
+
+
+def _erro_definitivo(erro):
+    """
+    True para um 4xx da API (dados ou permissão recusados): tentar de novo não
+    muda o resultado. Falhas de conexão, 5xx e erros sem status seguem o backoff.
+    """
+    encontrado = _STATUS_NO_ERRO.search(erro or '')
+    if not encontrado:
+        return False
+    status = int(encontrado.group(1))
+    return 400 <= status < 500 and status not in _STATUS_4XX_TEMPORARIOS
+
+
+def provisionamento_assincrono_ativo(request=None):
+    """
+    O modo assíncrono vale quando está ligado em settings (ou a outbox está
+    ligada) ou quando o cliente pede explicitamente com o header `Prefer: respond-async`.
+    """
+    if _config("PARCEIROS_PROVISIONAMENTO_ASSINCRONO", False) or _config("PARCEIROS_OUTBOX", False):
+        return True
+    if request is not None:
+        return "respond-async" in request.headers.get("Prefer", "")
+    return False
+
+
+def dados_para_api(parceiro):
+    """Monta, a partir do modelo, o dicionário que services._build_api_payload espera."""
+    return {campo: getattr(parceiro, campo) for campo in services.CAMPOS_API}
+
+
+def enfileirar_provisionamento(parceiro):
+    """Cria a tarefa de provisionamento (chamar dentro da transação que salvou o parceiro)."""
+    return TarefaProvisionamento.objects.create(parceiro=parceiro)
+
+
+def reservar_tarefas(limite):
+    """
+    Reserva até `limite` tarefas vencidas para este worker.
+    Tarefas presas em PROCESSANDO (worker morreu) voltam a ser elegíveis
+    depois de PARCEIROS_PROVISIONAMENTO_TIMEOUT_RESERVA segundos.
+    """
+    agora = timezone.now()
+    reserva_expirada = agora - timedelta(seconds=_config("PARCEIROS_PROVISIONAMENTO_TIMEOUT_RESERVA", 300))
+    # Uma reversão pendente na outbox para o mesmo e-mail (ex.: de um cadastro
+    # anterior que falhou) precisa ser entregue antes de criar o usuário de novo
+    outbox_anterior = EventoOutbox.objects.filter(
+        chave=OuterRef('parceiro__email_gestor'),
+        estado__in=('PENDENTE', 'PROCESSANDO', 'FALHOU'),
+        criado_em__lt=OuterRef('criada_em'),
+    )
+    elegiveis = (
+        (Q(estado='PENDENTE', proxima_tentativa__lte=agora)
+         | Q(estado='PROCESSANDO', reservada_em__lt=reserva_expirada))
+        & ~Exists(outbox_anterior)
+    )
+    token = uuid.uuid4().hex
+
+    with transaction.atomic():
+        ids = list(
+            TarefaProvisionamento.objects.select_for_update(skip_locked=True)
+            .filter(elegiveis)
+            .order_by('proxima_tentativa')
+            .values_list('id', flat=True)[:limite]
+        )
+        # O filtro é repetido no UPDATE para que dois workers nunca reservem a mesma tarefa
+        TarefaProvisionamento.objects.filter(elegiveis, id__in=ids).update(
+            estado='PROCESSANDO', reserva=token, reservada_em=agora
+        )
+
+    return list(
+        TarefaProvisionamento.objects.filter(reserva=token, estado='PROCESSANDO').select_related('parceiro')
+    )
+
+
+def _provisionar(parceiro, retentativa):
+    """
+    Executa o cadastro remoto. Em uma nova tentativa o usuário pode já ter sido
+    criado (ex.: o POST passou e o GET falhou), então buscamos antes de criar.
+    Retorna (api_id, erro).
+    """
+    if retentativa:
+        usuario, erro = services.buscar_usuario_por_email(parceiro.email_gestor, confiar_ausencia=False)
+        if erro:
+            return None, erro
+        if usuario and usuario.get('id'):
+            _, erro_link = services._linkar_usuario_ao_grupo(parceiro.email_gestor)
+            if erro_link:
+                return None, f"Erro ao vincular usuário ao grupo: {erro_link}"
+            return usuario['id'], None
+
+    return services.criar_parceiro_completo(dados_para_api(parceiro))
+
+
+def processar_tarefa(tarefa):
+    """Processa uma tarefa reservada. Retorna True se o parceiro foi provisionado."""
+    parceiro = tarefa.parceiro
+
+    try:
+        api_id, erro = _provisionar(parceiro, retentativa=tarefa.tentativas > 0)
+    except ServicoIndisponivel as e:
+        # Recusada localmente (disjuntor/limite de taxa): adia sem gastar uma tentativa
+        tarefa.estado = 'PENDENTE'
+        tarefa.reserva = ''
+        tarefa.proxima_tentativa = timezone.now() + timedelta(seconds=e.retry_after or 1)
+        tarefa.ultimo_erro = str(e)
+        tarefa.save()
+        return False
+    except Exception as e:
+        api_id, erro = None, f"Erro inesperado no provisionamento: {e}"
+
+    tarefa.tentativas += 1
+    tarefa.reserva = ''
+
+    with transaction.atomic():
+        if not Parceiro.objects.filter(pk=parceiro.pk).exists():
+            # Parceiro deletado enquanto o cadastro rodava (a tarefa foi junto): desfaz pela outbox
+            if not erro:
+                EventoOutbox.objects.create(chave=parceiro.email_gestor, operacao='DESFAZER_CRIACAO')
+            return False
+
+        if not erro:
+            parceiro.api_user_id = api_id
+            parceiro.status_provisionamento = 'CONCLUIDO'
+            parceiro.erro_provisionamento = ''
+            tarefa.estado = 'CONCLUIDA'
+            tarefa.ultimo_erro = ''
+        elif _erro_definitivo(erro) or tarefa.tentativas >= _config("PARCEIROS_PROVISIONAMENTO_MAX_TENTATIVAS", 5):
+            parceiro.status_provisionamento = 'ERRO'
+            parceiro.erro_provisionamento = erro
+            tarefa.estado = 'FALHOU'
+            tarefa.ultimo_erro = erro
+        else:
+            # Backoff exponencial: 30s, 60s, 120s... (base configurável)
+            espera = _config("PARCEIROS_PROVISIONAMENTO_BACKOFF", 30) * (2 ** (tarefa.tentativas - 1))
+            tarefa.estado = 'PENDENTE'
+            tarefa.proxima_tentativa = timezone.now() + timedelta(seconds=espera)
+            tarefa.ultimo_erro = erro
+
+        tarefa.save()
+        if tarefa.estado != 'PENDENTE':
+            parceiro.save(update_fields=[
+                'api_user_id', 'status_provisionamento', 'erro_provisionamento', 'data_atualizacao'
+            ])
+
+    return erro is None
+
+
+def processar_pendentes(limite=50, workers=4):
+    """
+    Reserva um lote de tarefas e processa em paralelo.
+    Retorna (processadas, sucessos).
+    """
+    tarefas = reservar_tarefas(limite)
+    if not tarefas:
+        return 0, 0
+
+    resultados = executar_em_paralelo(processar_tarefa, tarefas, workers)
+
+    return len(resultados), sum(1 for ok in resultados if ok)
@@ -0,0 +1,207 @@
+# CÓDIGO para: backend_django/parceiros/reconciliacao.py
+
+# Reconciliação entre a tabela Parceiro e os usuários da API Embedded.
+# Os dois lados são lidos em páginas: o lado local vira um índice compacto
+# (e-mail -> id, api_user_id, hash dos campos enviados à API) e a lista remota
+# é comparada contra ele em uma única passada, sem guardar os usuários remotos.
+
+import hashlib
+import threading
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidar_cache_parceiros
+from .concorrencia import executar_em_paralelo
+from .models import Parceiro, TarefaProvisionamento
+from .resiliencia import ServicoIndisponivel
+from . import historico, services
+
+# Tipos de divergência e a correção aplicada por `aplicar_correcoes`
+REMOTO_ORFAO = 'remoto_orfao'            # Usuário de parceiro na API sem parceiro local -> DELETE (só com remover_orfaos)
+LOCAL_SEM_API_ID = 'local_sem_api_id'    # Parceiro sem api_user_id, mas o usuário existe -> grava o id
+ID_DIVERGENTE = 'id_divergente'          # api_user_id local diferente do remoto -> grava o id remoto
+DADOS_DIVERGENTES = 'dados_divergentes'  # Nome/tipo/expiração diferentes -> PUT na API
+LOCAL_SEM_REMOTO = 'local_sem_remoto'    # Parceiro ativo sem usuário na API -> reenfileira o provisionamento
+
+
+# A API também tem usuários que não são de parceiros (admins, outras
+# integrações): só os do department de um tipo de parceiro podem ser órfãos
+DEPARTAMENTOS_PARCEIRO = frozenset(tipo for tipo, _ in Parceiro.TIPO_CHOICES)
+
+
+def _normalizar_email(email):
+    return (email or '').strip().lower()
+
+
+def _hash_campos(nome, departamento, expiracao):
+    """Hash curto dos campos que _build_api_payload envia (a data é comparada só pelo dia)."""
+    bruto = f"{nome or ''}\x1f{departamento or ''}\x1f{(expiracao or '')[:10]}"
+    return hashlib.blake2b(bruto.encode('utf-8'), digest_size=8).digest()
+
+
+def indexar_parceiros(chunk_size=5000):
+    """
+    Índice local: e-mail -> (id, api_user_id, verificar, hash dos campos da API).
+    `verificar` é falso para inativos e para quem ainda aguarda o provisionamento.
+    """
+    indice = {}
+    colunas = ('id', 'email_gestor', 'api_user_id', 'status', 'status_provisionamento',
+               'nome_fantasia', 'tipo', 'data_saida')
+    for pk, email, api_id, ativo, provisionamento, nome, tipo, data_saida in (
+        Parceiro.objects.order_by().values_list(*colunas).iterator(chunk_size=chunk_size)
+    ):
+        expiracao = data_saida.isoformat() if data_saida else None
+        verificar = ativo and provisionamento != 'PENDENTE'
+        indice[_normalizar_email(email)] = (pk, api_id, verificar, _hash_campos(nome, tipo, expiracao))
+    return indice
+
+
+def comparar(indice, paginas_remotas):
+    """
+    Gera as divergências (dicts) comparando o índice local com as páginas da API.
+    Os parceiros encontrados saem do índice; o que sobrar não existe na API.
+    """
+    for pagina in paginas_remotas:
+        for usuario in pagina:
+            email = _normalizar_email(usuario.get('email'))
+            api_id = str(usuario.get('id')) if usuario.get('id') is not None else None
+            local = indice.pop(email, None)
+
+            if local is None:
+                if usuario.get('department') in DEPARTAMENTOS_PARCEIRO:
+                    yield {'tipo': REMOTO_ORFAO, 'email': email, 'api_id_remoto': api_id}
+                continue
+
+            pk, api_id_local, verificar, hash_local = local
+            base = {'email': email, 'parceiro_id': pk, 'api_id_local': api_id_local, 'api_id_remoto': api_id}
+            if not api_id_local:
+                yield dict(base, tipo=LOCAL_SEM_API_ID)
+            elif api_id_local != api_id:
+                yield dict(base, tipo=ID_DIVERGENTE)
+
+            hash_remoto = _hash_campos(usuario.get('name'), usuario.get('department'), usuario.get('expirationDate'))
+            if verificar and hash_remoto != hash_local:
+                yield dict(base, tipo=DADOS_DIVERGENTES)
+
+    for email, (pk, api_id_local, verificar, _) in indice.items():
+        if verificar:
+            yield {'tipo': LOCAL_SEM_REMOTO, 'email': email, 'parceiro_id': pk,
+                   'api_id_local': api_id_local, 'api_id_remoto': None}
+
+
+# --- CORREÇÕES ---
+
+class LimitadorTaxa:
+    """Limita as chamadas (de todas as threads) a `por_segundo` por segundo."""
+
+    def __init__(self, por_segundo):
+        self.intervalo = 1.0 / por_segundo if por_segundo else 0
+        self.proxima = time.monotonic()
+        self.lock = threading.Lock()
+
+    def aguardar(self):
+        if not self.intervalo:
+            return
+        with self.lock:
+            agora = time.monotonic()
+            espera = self.proxima - agora
+            self.proxima = max(agora, self.proxima) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+
+def _corrigir_ids(divergencias):
+    """Grava no banco os ids remotos (LOCAL_SEM_API_ID / ID_DIVERGENTE) em lote."""
+    parceiros = []
+    for item in divergencias:
+        parceiros.append(Parceiro(id=item['parceiro_id'], api_user_id=item['api_id_remoto'],
+                                  status_provisionamento='CONCLUIDO', erro_provisionamento=''))
+    with transaction.atomic():
+        # Libera ids que estejam presos a outro parceiro antes de reatribuir
+        presos = Parceiro.objects.filter(api_user_id__in=[p.api_user_id for p in parceiros]).exclude(
+            id__in=[p.id for p in parceiros]
+        )
+        liberados = list(presos.values_list('id', flat=True))
+        presos.update(api_user_id=None)
+        Parceiro.objects.bulk_update(parceiros, ['api_user_id', 'status_provisionamento', 'erro_provisionamento'])
+        # update()/bulk_update() não disparam signals: histórico e cache são atualizados aqui
+        historico.registrar_alteracoes(
+            [(pk, {'api_user_id': None}) for pk in liberados]
+            + [(p.id, {'api_user_id': p.api_user_id, 'status_provisionamento': 'CONCLUIDO',
+                       'erro_provisionamento': ''}) for p in parceiros]
+        )
+        invalidar_cache_parceiros()
+    return len(parceiros)
+
+
+def _reenfileirar(divergencias):
+    """Volta os parceiros sem usuário remoto para a fila de provisionamento."""
+    ids = [item['parceiro_id'] for item in divergencias]
+    with transaction.atomic():
+        Parceiro.objects.filter(id__in=ids).update(
+            api_user_id=None, status_provisionamento='PENDENTE', erro_provisionamento='',
+            data_atualizacao=timezone.now(),
+        )
+        TarefaProvisionamento.objects.filter(parceiro_id__in=ids).update(
+            estado='PENDENTE', tentativas=0, proxima_tentativa=timezone.now(), ultimo_erro=''
+        )
+        existentes = set(TarefaProvisionamento.objects.filter(parceiro_id__in=ids).values_list('parceiro_id', flat=True))
+        TarefaProvisionamento.objects.bulk_create(
+            [TarefaProvisionamento(parceiro_id=pk) for pk in ids if pk not in existentes]
+        )
+        historico.registrar_alteracoes(
+            (pk, {'api_user_id': None, 'status_provisionamento': 'PENDENTE', 'erro_provisionamento': ''}) for pk in ids
+        )
+        invalidar_cache_parceiros()
+    return len(ids)
+
+
+def _chamar_api(item, limitador):
+    limitador.aguardar()
+    try:
+        return _corrigir_na_api(item)
+    except ServicoIndisponivel as e:
+        return False, str(e)
+
+
+def _corrigir_na_api(item):
+    if item['tipo'] == REMOTO_ORFAO:
+        return services.deletar_usuario(item['email'])
+
+    parceiro = Parceiro.objects.filter(pk=item['parceiro_id']).values(
+        'email_gestor', 'nome_fantasia', 'tipo', 'data_saida'
+    ).first()
+    if parceiro is None:
+        return False, "Parceiro removido durante a reconciliação."
+    return services.atualizar_usuario(item['api_id_remoto'], parceiro)
+
+
+def aplicar_correcoes(divergencias, workers=4, chamadas_por_segundo=5, remover_orfaos=False):
+    """
+    Aplica as correções: ids e reenfileiramentos em lote no banco; PUT/DELETE na
+    API em paralelo com taxa limitada. Retorna a lista de divergências com o
+    campo `correcao` preenchido ('aplicada', 'ignorada' ou a mensagem de erro).
+    """
+    por_tipo = {}
+    for item in divergencias:
+        por_tipo.setdefault(item['tipo'], []).append(item)
+
+    ids = por_tipo.get(LOCAL_SEM_API_ID, []) + por_tipo.get(ID_DIVERGENTE, [])
+    if ids:
+        _corrigir_ids(ids)
+    if por_tipo.get(LOCAL_SEM_REMOTO):
+        _reenfileirar(por_tipo[LOCAL_SEM_REMOTO])
+    for item in ids + por_tipo.get(LOCAL_SEM_REMOTO, []):
+        item['correcao'] = 'aplicada'
+
+    remotas = por_tipo.get(DADOS_DIVERGENTES, []) + (por_tipo.get(REMOTO_ORFAO, []) if remover_orfaos else [])
+    limitador = LimitadorTaxa(chamadas_por_segundo)
+    resultados = executar_em_paralelo(lambda item: _chamar_api(item, limitador), remotas, workers)
+    for item, (sucesso, erro) in zip(remotas, resultados):
+        item['correcao'] = 'aplicada' if sucesso else erro
+
+    for item in divergencias:
+        item.setdefault('correcao', 'ignorada')
+    return divergencias
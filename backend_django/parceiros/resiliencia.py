@@ -0,0 +1,285 @@
+# CÓDIGO para: backend_django/parceiros/resiliencia.py
+
+# Proteções das chamadas à API Embedded (usadas por services._requisitar):
+# - TokenBucket: limite de taxa compartilhado entre processos, guardado em um
+#   arquivo SQLite local (BEGIN IMMEDIATE serializa o acesso entre processos);
+# - Disjuntor (circuit breaker): depois de muitas falhas seguidas, passa a
+#   recusar na hora em vez de esperar o timeout, e testa a volta aos poucos.
+
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+FECHADO = 'FECHADO'
+ABERTO = 'ABERTO'
+SEMI_ABERTO = 'SEMI_ABERTO'
+
+
+class ServicoIndisponivel(Exception):
+    """A chamada foi recusada localmente (disjuntor aberto ou limite de taxa)."""
+
+    def __init__(self, mensagem, retry_after=None):
+        super().__init__(mensagem)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Balde de fichas: `taxa` fichas por segundo, acumulando até `capacidade`.
+    O estado fica em uma tabela SQLite, então vale para todos os processos da máquina.
+    """
+
+    def __init__(self, nome, taxa, capacidade, caminho):
+        self.nome = nome
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade)
+        self.caminho = str(caminho)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.concedidas = 0
+        self.negadas = 0
+        self.espera_total = 0.0
+
+    def _conexao(self):
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=10, isolation_level=None)
+            conexao.execute(
+                'CREATE TABLE IF NOT EXISTS token_bucket '
+                '(nome TEXT PRIMARY KEY, fichas REAL NOT NULL, atualizado REAL NOT NULL)'
+            )
+            self._local.conexao = conexao
+        return conexao
+
+    def _tentar(self):
+        """Tenta retirar uma ficha. Retorna 0 se conseguiu, senão os segundos até a próxima."""
+        conexao = self._conexao()
+        agora = time.time()
+        conexao.execute('BEGIN IMMEDIATE')
+        try:
+            linha = conexao.execute(
+                'SELECT fichas, atualizado FROM token_bucket WHERE nome = ?', (self.nome,)
+            ).fetchone()
+            fichas, atualizado = linha if linha else (self.capacidade, agora)
+            fichas = min(self.capacidade, fichas + max(0.0, agora - atualizado) * self.taxa)
+            espera = 0.0 if fichas >= 1 else (1 - fichas) / self.taxa
+            if not espera:
+                fichas -= 1
+            conexao.execute(
+                'INSERT OR REPLACE INTO token_bucket (nome, fichas, atualizado) VALUES (?, ?, ?)',
+                (self.nome, fichas, agora),
+            )
+            conexao.execute('COMMIT')
+        except Exception:
+            conexao.execute('ROLLBACK')
+            raise
+        return espera
+
+    def adquirir(self, espera_maxima=0):
+        """Espera até `espera_maxima` segundos por uma ficha. Retorna True se conseguiu."""
+        limite = time.monotonic() + espera_maxima
+        inicio = time.monotonic()
+        while True:
+            espera = self._tentar()
+            if not espera:
+                with self._lock:
+                    self.concedidas += 1
+                    self.espera_total += time.monotonic() - inicio
+                return True
+            if time.monotonic() + espera > limite:
+                with self._lock:
+                    self.negadas += 1
+                return False
+            time.sleep(espera)
+
+    async def adquirir_async(self, espera_maxima=0):
+        """Versão de `adquirir` para código assíncrono: o SQLite roda em uma thread e a espera não bloqueia o loop."""
+        limite = time.monotonic() + espera_maxima
+        inicio = time.monotonic()
+        while True:
+            espera = await asyncio.to_thread(self._tentar)
+            if not espera:
+                with self._lock:
+                    self.concedidas += 1
+                    self.espera_total += time.monotonic() - inicio
+                return True
+            if time.monotonic() + espera > limite:
+                with self._lock:
+                    self.negadas += 1
+                return False
+            await asyncio.sleep(espera)
+
+    def metricas(self):
+        return {
+            'taxa_por_segundo': self.taxa,
+            'capacidade': self.capacidade,
+            'concedidas': self.concedidas,
+            'negadas': self.negadas,
+            'espera_total_segundos': round(self.espera_total, 3),
+        }
+
+
+class Disjuntor:
+    """
+    Circuit breaker por processo. Abre quando, na janela de `janela` segundos e com
+    pelo menos `volume_minimo` chamadas, a taxa de falhas passa de `limiar`.
+    Aberto, recusa tudo por `tempo_aberto` segundos; depois deixa passar uma
+    chamada de teste (SEMI_ABERTO): sucesso fecha, falha reabre.
+    """
+
+    def __init__(self, limiar=0.5, volume_minimo=10, janela=30, tempo_aberto=30):
+        self.limiar = limiar
+        self.volume_minimo = volume_minimo
+        self.janela = janela
+        self.tempo_aberto = tempo_aberto
+        self._lock = threading.Lock()
+        self._resultados = deque()  # (instante, sucesso)
+        self._estado = FECHADO
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self.aberturas = 0
+        self.rejeicoes = 0
+
+    def _descartar_antigos(self, agora):
+        while self._resultados and self._resultados[0][0] < agora - self.janela:
+            self._resultados.popleft()
+
+    @property
+    def estado(self):
+        with self._lock:
+            return self._estado_atual(time.monotonic())
+
+    def _estado_atual(self, agora):
+        if self._estado == ABERTO and agora - self._aberto_em >= self.tempo_aberto:
+            self._estado = SEMI_ABERTO
+            self._teste_em_andamento = False
+        return self._estado
+
+    def segundos_para_tentar(self):
+        with self._lock:
+            restante = self.tempo_aberto - (time.monotonic() - self._aberto_em)
+        return max(1, math.ceil(restante))
+
+    def permitir(self):
+        """A chamada pode seguir? (No SEMI_ABERTO só uma chamada de teste por vez.)"""
+        with self._lock:
+            estado = self._estado_atual(time.monotonic())
+            if estado == FECHADO:
+                return True
+            if estado == SEMI_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+            self.rejeicoes += 1
+            return False
+
+    def registrar_sucesso(self):
+        with self._lock:
+            agora = time.monotonic()
+            if self._estado == SEMI_ABERTO:
+                self._estado = FECHADO
+                self._resultados.clear()
+            self._resultados.append((agora, True))
+            self._descartar_antigos(agora)
+
+    def registrar_falha(self):
+        with self._lock:
+            agora = time.monotonic()
+            if self._estado == SEMI_ABERTO:
+                self._abrir(agora)
+                return
+            self._resultados.append((agora, False))
+            self._descartar_antigos(agora)
+            total = len(self._resultados)
+            falhas = sum(1 for _, sucesso in self._resultados if not sucesso)
+            if self._estado == FECHADO and total >= self.volume_minimo and falhas / total >= self.limiar:
+                self._abrir(agora)
+
+    def liberar_teste(self):
+        """
+        A chamada liberada por permitir() terminou sem resultado da API (erro
+        de configuração, bug, cancelamento): não conta como sucesso nem falha,
+        mas libera a vaga da chamada de teste do SEMI_ABERTO.
+        """
+        with self._lock:
+            self._teste_em_andamento = False
+
+    def _abrir(self, agora):
+        self._estado = ABERTO
+        self._aberto_em = agora
+        self._teste_em_andamento = False
+        self.aberturas += 1
+
+    def metricas(self):
+        with self._lock:
+            agora = time.monotonic()
+            estado = self._estado_atual(agora)
+            self._descartar_antigos(agora)
+            total = len(self._resultados)
+            falhas = sum(1 for _, sucesso in self._resultados if not sucesso)
+            return {
+                'estado': estado,
+                'chamadas_na_janela': total,
+                'falhas_na_janela': falhas,
+                'taxa_falhas': round(falhas / total, 4) if total else 0.0,
+                'aberturas': self.aberturas,
+                'rejeicoes': self.rejeicoes,
+            }
+
+
+# --- INSTÂNCIAS COMPARTILHADAS (configuradas em settings) ---
+
+_instancias_lock = threading.Lock()
+_limitador = None
+_disjuntor = None
+
+
+def get_limitador():
+    """TokenBucket da API Embedded, ou None se EMBEDDED_API_RATE_LIMIT for 0/None."""
+    global _limitador
+    if not getattr(settings, 'EMBEDDED_API_RATE_LIMIT', None):
+        return None
+    if _limitador is None:
+        with _instancias_lock:
+            if _limitador is None:
+                _limitador = TokenBucket(
+                    'embedded_api',
+                    taxa=settings.EMBEDDED_API_RATE_LIMIT,
+                    capacidade=getattr(settings, 'EMBEDDED_API_RATE_LIMIT_RAJADA', settings.EMBEDDED_API_RATE_LIMIT),
+                    caminho=settings.EMBEDDED_API_RATE_LIMIT_ARQUIVO,
+                )
+    return _limitador
+
+
+def get_disjuntor():
+    global _disjuntor
+    if _disjuntor is None:
+        with _instancias_lock:
+            if _disjuntor is None:
+                _disjuntor = Disjuntor(
+                    limiar=getattr(settings, 'EMBEDDED_API_DISJUNTOR_LIMIAR', 0.5),
+                    volume_minimo=getattr(settings, 'EMBEDDED_API_DISJUNTOR_VOLUME_MINIMO', 10),
+                    janela=getattr(settings, 'EMBEDDED_API_DISJUNTOR_JANELA', 30),
+                    tempo_aberto=getattr(settings, 'EMBEDDED_API_DISJUNTOR_TEMPO_ABERTO', 30),
+                )
+    return _disjuntor
+
+
+def reiniciar():
+    """Descarta as instâncias (usado nos testes e quando settings muda)."""
+    global _limitador, _disjuntor
+    with _instancias_lock:
+        _limitador = None
+        _disjuntor = None
+
+
+def metricas():
+    limitador = get_limitador()
+    return {
+        'disjuntor': get_disjuntor().metricas(),
+        'limite_taxa': limitador.metricas() if limitador else None,
+    }
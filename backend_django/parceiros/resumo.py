@@ -0,0 +1,171 @@
+# CÓDIGO para: backend_django/parceiros/resumo.py
+
+# Estatísticas dos parceiros para o painel (GET /parceiros/stats/).
+# Em vez de contar a tabela inteira a cada pedido, duas tabelas pequenas
+# guardam os totais: ResumoParceiros (por tipo/status/senha_definida) e
+# ResumoSaidaParceiros (ativos por data_saida). Os signals de Parceiro aplicam
+# a variação de cada save/delete; os caminhos em massa (bulk_create, update)
+# usam registrar_criados/atualizar_com_resumo. reconstruir() refaz tudo com
+# duas consultas agregadas (comando `reconstruir_resumo_parceiros`).
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import Parceiro, ResumoParceiros, ResumoSaidaParceiros
+
+CAMPOS = ('tipo', 'status', 'senha_definida', 'data_saida')
+
+
+def _variacoes(linhas, sinal=1, variacoes=None):
+    """Soma em `variacoes` a contribuição de cada linha (dict com CAMPOS e, opcionalmente, 'n')."""
+    variacoes = Counter() if variacoes is None else variacoes
+    for linha in linhas:
+        quantidade = sinal * linha.get('n', 1)
+        variacoes[('grupo', linha['tipo'], linha['status'], linha['senha_definida'])] += quantidade
+        if linha['status'] and linha['data_saida']:
+            variacoes[('saida', linha['data_saida'])] += quantidade
+    return variacoes
+
+
+def _estado(parceiro):
+    return parceiro.valores(CAMPOS)
+
+
+def _somar(modelo, filtros, quantidade):
+    if modelo.objects.filter(**filtros).update(total=F('total') + quantidade):
+        return
+    try:
+        with transaction.atomic():
+            modelo.objects.create(total=quantidade, **filtros)
+    except IntegrityError:
+        # Outro processo criou a linha entre o UPDATE e o INSERT
+        modelo.objects.filter(**filtros).update(total=F('total') + quantidade)
+
+
+def aplicar(variacoes):
+    for chave, quantidade in variacoes.items():
+        if not quantidade:
+            continue
+        if chave[0] == 'grupo':
+            _, tipo, status, senha_definida = chave
+            _somar(ResumoParceiros, {'tipo': tipo, 'status': status, 'senha_definida': senha_definida}, quantidade)
+        else:
+            _somar(ResumoSaidaParceiros, {'data_saida': chave[1]}, quantidade)
+
+
+# --- MANUTENÇÃO INCREMENTAL ---
+
+def registrar_save(anterior, parceiro):
+    """`anterior`: valores de CAMPOS antes do save (None para um parceiro novo)."""
+    variacoes = _variacoes([_estado(parceiro)])
+    if anterior is not None:
+        _variacoes([anterior], -1, variacoes)
+    aplicar(variacoes)
+
+
+def registrar_delete(parceiro):
+    aplicar(_variacoes([_estado(parceiro)], -1))
+
+
+def registrar_criados(parceiros):
+    """Para bulk_create (que não dispara signals)."""
+    aplicar(_variacoes(_estado(parceiro) for parceiro in parceiros))
+
+
+def atualizar_com_resumo(queryset, **valores):
+    """
+    queryset.update(**valores) mantendo o resumo: conta as linhas afetadas por
+    grupo antes do UPDATE (chamar dentro de uma transação). Retorna o nº de linhas.
+    """
+    antes = list(queryset.values(*CAMPOS).annotate(n=Count('id')).order_by())
+    total = queryset.update(**valores)
+    variacoes = _variacoes(antes, -1)
+    _variacoes(({**linha, **{campo: valores[campo] for campo in CAMPOS if campo in valores}} for linha in antes),
+               1, variacoes)
+    aplicar(variacoes)
+    return total
+
+
+# --- LEITURA E RECONSTRUÇÃO ---
+
+def estatisticas(dias=30):
+    """Totais para o painel, lidos só das tabelas de resumo."""
+    hoje = timezone.localdate()
+    grupos = ResumoParceiros.objects.filter(total__gt=0).values_list('tipo', 'status', 'senha_definida', 'total')
+    saidas = ResumoSaidaParceiros.objects.filter(total__gt=0, data_saida__lte=hoje + timedelta(days=dias))
+
+    por_tipo = {}
+    ativos = inativos = senha_pendente = 0
+    for tipo, status, senha_definida, total in grupos:
+        contagem = por_tipo.setdefault(tipo, {'ativos': 0, 'inativos': 0})
+        if status:
+            ativos += total
+            contagem['ativos'] += total
+            if not senha_definida:
+                senha_pendente += total
+        else:
+            inativos += total
+            contagem['inativos'] += total
+
+    vencimentos = saidas.aggregate(
+        vencidos=Sum('total', filter=Q(data_saida__lt=hoje)),
+        vencendo=Sum('total', filter=Q(data_saida__gte=hoje)),
+    )
+    return {
+        'total': ativos + inativos,
+        'ativos': ativos,
+        'inativos': inativos,
+        'por_tipo': dict(sorted(por_tipo.items())),
+        'senha_pendente': senha_pendente,
+        'saida_vencida': vencimentos['vencidos'] or 0,
+        'vencendo': {'dias': dias, 'total': vencimentos['vencendo'] or 0},
+    }
+
+
+def calcular_do_banco():
+    """Totais direto da tabela de parceiros, com duas consultas agrupadas."""
+    grupos = {
+        (linha['tipo'], linha['status'], linha['senha_definida']): linha['total']
+        for linha in Parceiro.objects.values('tipo', 'status', 'senha_definida').annotate(total=Count('id')).order_by()
+    }
+    saidas = dict(
+        Parceiro.objects.filter(status=True, data_saida__isnull=False)
+        .values_list('data_saida').annotate(total=Count('id')).order_by()
+    )
+    return grupos, saidas
+
+
+def divergencias():
+    """Diferenças entre o resumo gravado e a contagem real: {chave: (resumo, real)}."""
+    grupos, saidas = calcular_do_banco()
+    gravados = {
+        (tipo, status, senha): total
+        for tipo, status, senha, total in ResumoParceiros.objects.values_list('tipo', 'status', 'senha_definida', 'total')
+    }
+    saidas_gravadas = dict(ResumoSaidaParceiros.objects.values_list('data_saida', 'total'))
+    diferencas = {}
+    for reais, resumo, prefixo in ((grupos, gravados, 'grupo'), (saidas, saidas_gravadas, 'saida')):
+        for chave in set(reais) | set(resumo):
+            if reais.get(chave, 0) != resumo.get(chave, 0):
+                diferencas[(prefixo, chave)] = (resumo.get(chave, 0), reais.get(chave, 0))
+    return diferencas
+
+
+def reconstruir():
+    """Apaga e recalcula o resumo. Retorna (grupos, datas de saída) gravados."""
+    grupos, saidas = calcular_do_banco()
+    with transaction.atomic():
+        ResumoParceiros.objects.all().delete()
+        ResumoSaidaParceiros.objects.all().delete()
+        ResumoParceiros.objects.bulk_create([
+            ResumoParceiros(tipo=tipo, status=status, senha_definida=senha, total=total)
+            for (tipo, status, senha), total in grupos.items()
+        ])
+        ResumoSaidaParceiros.objects.bulk_create([
+            ResumoSaidaParceiros(data_saida=data, total=total) for data, total in saidas.items()
+        ])
+    return len(grupos), len(saidas)
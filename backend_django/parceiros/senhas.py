@@ -0,0 +1,87 @@
+# CÓDIGO para: backend_django/parceiros/senhas.py
+
+# Definição da senha dos gestores na API Embedded (PUT /change-password),
+# individual ou em lote. A senha vai direto para a API e não passa pela outbox,
+# para nunca ficar gravada no banco. No lote as chamadas rodam em um pool de
+# threads limitado (o ritmo final é o do limite de taxa da API) e o
+# senha_definida de todos os que deram certo é marcado com um único UPDATE.
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidar_cache_parceiros
+from .concorrencia import executar_em_paralelo
+from .models import Parceiro
+from .resiliencia import ServicoIndisponivel
+from . import historico, resumo, services
+
+
+def marcar_senha_definida(ids):
+    """Marca senha_definida=True em um único UPDATE. Retorna quantos parceiros mudaram."""
+    with transaction.atomic():
+        # Só os que ainda não tinham a senha: redefinir não é alteração para o histórico
+        alterados = list(
+            Parceiro.objects.select_for_update().filter(pk__in=ids, senha_definida=False).values_list('pk', flat=True)
+        )
+        if not alterados:
+            return 0
+        total = resumo.atualizar_com_resumo(
+            Parceiro.objects.filter(pk__in=alterados), senha_definida=True, data_atualizacao=timezone.now()
+        )
+        # update() não dispara signals: histórico e cache são atualizados aqui
+        historico.registrar_alteracoes((pk, {'senha_definida': True}) for pk in alterados)
+        invalidar_cache_parceiros()
+    return total
+
+
+def _definir(item):
+    """Chamada de um item do lote (roda em uma thread do pool). Retorna (sucesso, erro)."""
+    _, email, senha = item
+    try:
+        return services.definir_senha_usuario(email, senha)
+    except ServicoIndisponivel as e:
+        return False, str(e)
+    except Exception as e:
+        return False, f"Erro inesperado ao definir a senha: {e}"
+
+
+def _resultado(pk, resultado, erro=None):
+    return {'id': pk, 'resultado': resultado, 'erro': erro}
+
+
+def definir_senhas(itens, workers=None):
+    """
+    Define a senha de vários parceiros. `itens` é uma lista de {'id', 'senha'}
+    sem ids repetidos (o DefinirSenhaLoteSerializer garante).
+    Retorna uma linha de relatório por item, na ordem recebida, com
+    resultado DEFINIDA, ERRO ou NAO_ENCONTRADO.
+    """
+    if workers is None:
+        workers = getattr(settings, 'PARCEIROS_SENHA_WORKERS', 8)
+
+    ids = [item['id'] for item in itens]
+    emails = dict(Parceiro.objects.filter(status=True, pk__in=ids).values_list('id', 'email_gestor'))
+
+    relatorio = {}
+    chamadas = []
+    for item in itens:
+        pk = item['id']
+        if pk in emails:
+            chamadas.append((pk, emails[pk], item['senha']))
+        else:
+            relatorio[pk] = _resultado(pk, 'NAO_ENCONTRADO', "Parceiro não encontrado.")
+
+    respostas = executar_em_paralelo(_definir, chamadas, workers)
+
+    definidos = []
+    for (pk, _, _), (sucesso, erro) in zip(chamadas, respostas):
+        if sucesso:
+            definidos.append(pk)
+            relatorio[pk] = _resultado(pk, 'DEFINIDA')
+        else:
+            relatorio[pk] = _resultado(pk, 'ERRO', erro)
+    if definidos:
+        marcar_senha_definida(definidos)
+
+    return [relatorio[pk] for pk in ids]
@@ -2,7 +2,13 @@
 
 import requests
 import json
+import logging
+import threading
+import time
 from datetime import datetime
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # --- CORREÇÃO IMPORTANTE AQUI ---
 # No Flask era: from config import EMBEDDED_API_KEY
@@ -10,18 +16,168 @@ from datetime import datetime
 from backend_api.config import EMBEDDED_API_KEY 
 # ---------------------------------
 
+from backend_api import metricas
+from . import espelho
+from .resiliencia import ABERTO, ServicoIndisponivel, get_disjuntor, get_limitador
+
 # --- CONFIGURAÇÕES DA API ---
+# O endereço pode ser trocado em settings.EMBEDDED_API_URL (ex.: a API falsa dos benchmarks)
 EMBEDDED_API_URL = "https://api.powerembedded.com.br/api/user"
 PARCEIROS_GROUP_ID = "3c4761f3-89ef-4642-92ee-b30d214b92d5" 
 # -----------------------------
 
+# Campos do Parceiro que _build_api_payload envia à API (os demais são só locais)
+CAMPOS_API = ("email_gestor", "nome_fantasia", "tipo", "data_saida")
+
+# Headers fixos: montados uma única vez e reaproveitados pela sessão
+_API_HEADERS = {
+    "X-API-Key": EMBEDDED_API_KEY,
+    "Content-Type": "application/json",
+    "Accept": "application/json"
+}
+
+# Métodos que podem ser repetidos com segurança (o POST de criação NÃO entra aqui)
+_METODOS_IDEMPOTENTES = frozenset(["GET", "PUT", "DELETE", "HEAD", "OPTIONS"])
+
+_session = None
+_session_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+class ErroApiEmbedded(Exception):
+    """Falha da API Embedded em operações que não retornam (resultado, erro)."""
+
 def _get_api_headers():
     """Retorna os headers de autenticação padrão para a API."""
-    return {
-        "X-API-Key": EMBEDDED_API_KEY,
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    }
+    return _API_HEADERS
+
+def _get_timeout(read_timeout=None):
+    """Retorna a tupla (connect, read) de timeouts configurada em settings."""
+    connect = getattr(settings, "EMBEDDED_API_CONNECT_TIMEOUT", 3.05)
+    read = read_timeout or getattr(settings, "EMBEDDED_API_READ_TIMEOUT", 10)
+    return (connect, read)
+
+def _criar_session():
+    """
+    Cria a sessão HTTP compartilhada com pool de conexões keep-alive.
+    Retries com backoff só valem para métodos idempotentes, para falhas
+    de conexão (quando a requisição nem chegou ao servidor) e para 502/503/504.
+    Timeout de leitura não é repetido: o servidor pode ainda estar processando,
+    e cada nova tentativa somaria mais um read timeout inteiro à espera.
+    """
+    retry = Retry(
+        total=getattr(settings, "EMBEDDED_API_MAX_RETRIES", 3),
+        read=0,
+        backoff_factor=getattr(settings, "EMBEDDED_API_BACKOFF_FACTOR", 0.5),
+        status_forcelist=(502, 503, 504),
+        allowed_methods=_METODOS_IDEMPOTENTES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=getattr(settings, "EMBEDDED_API_POOL_CONNECTIONS", 4),
+        pool_maxsize=getattr(settings, "EMBEDDED_API_POOL_MAXSIZE", 20),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.headers.update(_API_HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session():
+    """Retorna a sessão HTTP do módulo (criada sob demanda, thread-safe)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _criar_session()
+    return _session
+
+def fechar_session():
+    """Fecha a sessão atual (as conexões do pool são descartadas)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def _api_url(caminho=""):
+    """URL da API Embedded (settings.EMBEDDED_API_URL) com o sufixo `caminho`."""
+    return (getattr(settings, "EMBEDDED_API_URL", None) or EMBEDDED_API_URL) + caminho
+
+def _recusar_por_disjuntor(disjuntor):
+    raise ServicoIndisponivel(
+        "API Embedded indisponível no momento (disjuntor aberto). Tente novamente em instantes.",
+        retry_after=disjuntor.segundos_para_tentar(),
+    )
+
+def _espera_limite():
+    return getattr(settings, "EMBEDDED_API_RATE_LIMIT_ESPERA", 2)
+
+def _recusar_por_limite():
+    raise ServicoIndisponivel("Limite de requisições à API Embedded atingido.", retry_after=1)
+
+def _medir_chamada(operacao, status, inicio):
+    duracao = time.perf_counter() - inicio
+    metricas.API_EXTERNA_DURACAO.observar(duracao, operacao=operacao, status=status)
+    metricas.somar_fase("api_externa", duracao)
+
+def _requisitar(metodo, url, operacao, read_timeout=None, **kwargs):
+    """
+    Executa uma requisição pela sessão compartilhada com os timeouts padrão,
+    respeitando o limite de taxa e o disjuntor (parceiros/resiliencia.py).
+    A duração entra nas métricas com o rótulo `operacao` (create, get, link...).
+    Levanta ServicoIndisponivel quando a chamada é recusada localmente.
+    """
+    disjuntor = get_disjuntor()
+    limitador = get_limitador()
+    # Com o disjuntor aberto nem esperamos pela ficha do limite de taxa
+    if disjuntor.estado == ABERTO:
+        _recusar_por_disjuntor(disjuntor)
+    if limitador and not limitador.adquirir(_espera_limite()):
+        _recusar_por_limite()
+    if not disjuntor.permitir():
+        _recusar_por_disjuntor(disjuntor)
+
+    inicio = time.perf_counter()
+    try:
+        kwargs.setdefault("timeout", _get_timeout(read_timeout))
+        response = get_session().request(metodo, url, **kwargs)
+    except requests.exceptions.RequestException:
+        _medir_chamada(operacao, "falha_conexao", inicio)
+        disjuntor.registrar_falha()
+        raise
+    except BaseException:
+        # Qualquer outra exceção não diz nada sobre a API, mas não pode prender a chamada de teste
+        disjuntor.liberar_teste()
+        raise
+    _medir_chamada(operacao, response.status_code, inicio)
+    _registrar_no_disjuntor(disjuntor, response.status_code)
+    return response
+
+def _headers_idempotencia(chave_idempotencia):
+    """Header repetido em todas as tentativas da mesma operação (ex.: entregas da outbox)."""
+    return {"Idempotency-Key": str(chave_idempotencia)} if chave_idempotencia else None
+
+def _registrar_no_disjuntor(disjuntor, status_code):
+    # 5xx e 429 indicam problema/sobrecarga do lado da API; 4xx são erros nossos
+    if status_code >= 500 or status_code == 429:
+        disjuntor.registrar_falha()
+    else:
+        disjuntor.registrar_sucesso()
+
+def _usuario_da_resposta(response):
+    """Extrai o usuário do corpo da resposta (quando a API o devolve), senão None."""
+    try:
+        corpo = response.json()
+    except (ValueError, json.JSONDecodeError):
+        return None
+    if not isinstance(corpo, dict):
+        return None
+    if isinstance(corpo.get('data'), dict):
+        corpo = corpo['data']
+    return corpo if corpo.get('id') else None
 
 def _build_api_payload(data, api_user_id=None):
     """Monta o payload de dados para a API a partir dos dados do formulário."""
@@ -68,13 +224,144 @@ def _build_api_payload(data, api_user_id=None):
 
     return payload
 
+# --- INTERPRETAÇÃO DAS RESPOSTAS ---
+# Compartilhada com parceiros/services_async.py: as duas versões dos serviços
+# devolvem exatamente os mesmos resultados e mensagens de erro.
+
+def _detalhes_do_erro(response, chave):
+    try:
+        return response.json().get(chave, response.text)
+    except json.JSONDecodeError:
+        return response.text
+
+def _interpretar_criacao(response):
+    """Resposta do POST de criação. Retorna (usuario_devolvido_ou_None, erro)."""
+    if response.status_code != 200:
+        if response.status_code == 401:
+            return None, "API Erro 401: Não Autorizado. Verifique sua Chave de API (Token)."
+        error_details = _detalhes_do_erro(response, "message")
+        return None, f"API Embedded Erro {response.status_code} (POST): {error_details}"
+    return _usuario_da_resposta(response), None
+
+def _interpretar_busca_pos_criacao(get_response, user_email_param):
+    """Resposta do GET feito logo após a criação. Retorna (usuario, erro)."""
+    if get_response.status_code == 200:
+        try:
+            response_data = get_response.json()
+            user_list = response_data.get('data')
+
+            if user_list and len(user_list) > 0:
+                user_data = user_list[0]
+                api_id = user_data.get('id')
+                
+                if api_id:
+                    return dict(user_data, email=user_data.get('email') or user_email_param), None
+                else:
+                    return None, "API criou e listou o usuário, mas ele veio sem 'id' no JSON."
+            else:
+                return None, f"API criou o usuário (POST 200), mas a busca (GET) por '{user_email_param}' não o encontrou."
+
+        except (json.JSONDecodeError, KeyError, IndexError) as e:
+            return None, f"API criou o usuário, mas a resposta GET foi inválida: {e}"
+    else:
+        return None, f"API criou o usuário (POST 200 OK), mas falhou ao buscá-lo (GET {get_response.status_code}). Verifique as permissões da sua chave."
+
+def _interpretar_busca(response, email):
+    """Resposta do GET por e-mail. Retorna (usuario_ou_None, erro)."""
+    if response.status_code != 200:
+        return None, f"API Embedded Erro {response.status_code} (GET): falha ao buscar '{email}'."
+    try:
+        user_list = response.json().get('data') or []
+    except json.JSONDecodeError as e:
+        return None, f"Resposta GET inválida da API: {e}"
+
+    if not user_list:
+        return None, None
+    return dict(user_list[0], email=user_list[0].get('email') or email), None
+
+def _interpretar_link(response):
+    if response.status_code == 200:
+        return True, None # Sucesso
+    elif response.status_code == 401:
+        return False, "API Erro 401 (Link Group): Não Autorizado."
+    elif response.status_code == 403:
+        return False, "API Erro 403 (Link Group): Proibido. Sua chave não tem permissão para vincular grupos."
+    elif response.status_code == 400:
+        return False, f"API Erro 400 (Link Group): {_detalhes_do_erro(response, 'errors')}"
+    else:
+        return False, f"API Erro {response.status_code} (Link Group): Erro desconhecido."
+
+def _interpretar_atualizacao(response, api_user_id):
+    if response.status_code in [200, 204]:
+        return True, None
+    elif response.status_code == 401:
+        return False, "API Erro 401: Não Autorizado."
+    elif response.status_code == 403:
+         return False, "API Erro 403: Proibido. Sua chave não tem permissão para ATUALIZAR (PUT) usuários."
+    elif response.status_code == 404:
+        return False, f"API Erro 404: Usuário com ID '{api_user_id}' não encontrado na API."
+    else:
+        return False, f"API Embedded Erro {response.status_code} (PUT): {_detalhes_do_erro(response, 'message')}"
+
+def _interpretar_delecao(response):
+    if response.status_code in [200, 204, 404]:
+        return True, None
+    elif response.status_code == 401:
+        return False, "API Erro 401: Não Autorizado."
+    elif response.status_code == 403:
+         return False, "API Erro 403: Proibido. Sua chave não tem permissão para DELETAR usuários."
+    elif response.status_code == 400:
+        return False, f"API Embedded Erro 400 (DELETE): {_detalhes_do_erro(response, 'errors')}"
+    else:
+        return False, f"API Embedded Erro {response.status_code} (DELETE): {_detalhes_do_erro(response, 'message')}"
+
+def _interpretar_troca_senha(response):
+    # 200 OK é o sucesso
+    if response.status_code == 200:
+        return True, None
+    elif response.status_code == 401:
+        return False, "API Erro 401 (ChangePass): Não Autorizado."
+    elif response.status_code == 403:
+         return False, "API Erro 403 (ChangePass): Proibido. Sua chave não tem permissão para alterar senhas."
+    elif response.status_code == 400:
+         return False, f"API Erro 400 (ChangePass): {_detalhes_do_erro(response, 'errors')}"
+    else:
+        return False, f"API Erro {response.status_code} (ChangePass): Erro desconhecido."
+
+def _payload_link(user_email):
+    """Valida a configuração do grupo. Retorna (payload, erro)."""
+    if not user_email or not PARCEIROS_GROUP_ID:
+        return None, "Email do usuário ou ID do Grupo não fornecido."
+    if "COLOQUE_O_ID_DO_GRUPO_AQUI" in PARCEIROS_GROUP_ID:
+        return None, 'ID do Grupo "Parceiros" não configurado no código (PARCEIROS_GROUP_ID).'
+    return {
+        "userEmail": user_email,
+        "groups": [PARCEIROS_GROUP_ID]
+    }, None
+
+def _params_pagina(pagina, tamanho_pagina):
+    return {
+        getattr(settings, "EMBEDDED_API_PARAM_PAGINA", "page"): pagina,
+        getattr(settings, "EMBEDDED_API_PARAM_TAMANHO", "pageSize"): tamanho_pagina,
+    }
+
+def _interpretar_pagina(response, pagina):
+    if response.status_code != 200:
+        return None, f"API Embedded Erro {response.status_code} (GET lista, página {pagina})."
+    try:
+        return response.json().get('data') or [], None
+    except json.JSONDecodeError as e:
+        return None, f"Resposta GET inválida da API: {e}"
+
 # --- (CREATE) FUNÇÃO DE CADASTRO NA API ---
 def _cadastrar_usuario_e_buscar_id(data):
     """
     Tenta CRIAR (POST) um novo usuário, e depois BUSCAR (GET com filtro)
-    para capturar o ID retornado.
+    para capturar o ID retornado. Se a resposta do POST já trouxer o usuário,
+    o GET é dispensado. O usuário criado é registrado no espelho local.
+    Se o GET falhar depois do POST, o usuário criado é revertido aqui mesmo
+    (ver reverter_criacao).
     """
-    headers = _get_api_headers()
     try:
         payload = _build_api_payload(data, api_user_id=None) 
     except ValueError as e:
@@ -82,154 +369,143 @@ def _cadastrar_usuario_e_buscar_id(data):
 
     try:
         # --- PASSO 1: Tenta CRIAR o usuário (POST) ---
-        response = requests.post(EMBEDDED_API_URL, headers=headers, json=payload, timeout=10)
-
-        if response.status_code != 200:
-            if response.status_code == 401:
-                return None, "API Erro 401: Não Autorizado. Verifique sua Chave de API (Token)."
-            try:
-                error_details = response.json().get("message", response.text)
-            except json.JSONDecodeError:
-                error_details = response.text
-            return None, f"API Embedded Erro {response.status_code} (POST): {error_details}"
-
-        # --- PASSO 2: SUCESSO! Agora busca o usuário (GET) usando o filtro de email ---
+        response = _requisitar("POST", _api_url(), "create", json=payload)
+        criado, erro = _interpretar_criacao(response)
+        if erro:
+            return None, erro
+
+        # --- PASSO 2: SUCESSO! Se o POST já devolveu o usuário, não precisamos do GET ---
         user_email_param = payload['email']
-        get_url = f"{EMBEDDED_API_URL}?email={user_email_param}"
-        
-        get_response = requests.get(get_url, headers=headers, timeout=10)
-
-        if get_response.status_code == 200:
-            try:
-                response_data = get_response.json()
-                user_list = response_data.get('data')
-
-                if user_list and len(user_list) > 0:
-                    user_data = user_list[0]
-                    api_id = user_data.get('id')
-                    
-                    if api_id:
-                        return {"id": api_id}, None
-                    else:
-                        return None, "API criou e listou o usuário, mas ele veio sem 'id' no JSON."
-                else:
-                    return None, f"API criou o usuário (POST 200), mas a busca (GET) por '{user_email_param}' não o encontrou."
+        if criado:
+            espelho.registrar(dict(payload, **criado))
+            return {"id": criado['id']}, None
+
+        # --- PASSO 3: Busca o usuário (GET) usando o filtro de email ---
+        # Daqui em diante o usuário já existe na API: qualquer falha desfaz a criação
+        try:
+            get_response = _requisitar("GET", _api_url(), "get", params={"email": user_email_param})
+        except Exception:
+            reverter_criacao(user_email_param)
+            raise
+        usuario, erro = _interpretar_busca_pos_criacao(get_response, user_email_param)
+        if erro:
+            return None, f"{erro} {reverter_criacao(user_email_param)}"
+        espelho.registrar(usuario)
+        return {"id": usuario['id']}, None
+
+    except requests.exceptions.RequestException as e:
+        return None, f"Falha de conexão com a API: {e}"
+
+# --- (READ) FUNÇÃO DE BUSCA POR EMAIL ---
+def buscar_usuario_por_email(email, confiar_ausencia=True):
+    """
+    Busca (GET com filtro) um usuário da API pelo email.
+    Retorna (dados_do_usuario, erro); (None, None) quando o usuário não existe.
+    O espelho local é consultado antes; com `confiar_ausencia=False` só um
+    acerto no espelho evita o GET (use quando o estado remoto é incerto).
+    """
+    if not email:
+        return None, "Email do usuário não fornecido."
 
-            except (json.JSONDecodeError, KeyError, IndexError) as e:
-                return None, f"API criou o usuário, mas a resposta GET foi inválida: {e}"
-        else:
-            return None, f"API criou o usuário (POST 200 OK), mas falhou ao buscá-lo (GET {get_response.status_code}). Verifique as permissões da sua chave."
+    usuario = espelho.buscar_por_email(email)
+    if usuario:
+        return espelho.como_dados_api(usuario), None
+    if confiar_ausencia and espelho.ausencia_confirmada(email):
+        return None, None
+
+    try:
+        response = _requisitar("GET", _api_url(), "get", params={"email": email})
+        usuario, erro = _interpretar_busca(response, email)
+        if usuario:
+            espelho.registrar(usuario)
+        return usuario, erro
 
     except requests.exceptions.RequestException as e:
         return None, f"Falha de conexão com a API: {e}"
 
+# --- (READ) LISTAGEM PAGINADA DE USUÁRIOS ---
+def listar_usuarios(pagina=1, tamanho_pagina=100):
+    """Busca (GET) uma página de usuários. Retorna (lista_de_usuarios, erro)."""
+    try:
+        response = _requisitar("GET", _api_url(), "list", params=_params_pagina(pagina, tamanho_pagina))
+        return _interpretar_pagina(response, pagina)
+    except requests.exceptions.RequestException as e:
+        return None, f"Falha de conexão com a API: {e}"
+
+def iterar_usuarios(tamanho_pagina=100):
+    """
+    Gera as páginas de usuários da API até receber uma página incompleta.
+    Levanta ErroApiEmbedded se alguma página falhar.
+    """
+    pagina = 1
+    while True:
+        usuarios, erro = listar_usuarios(pagina, tamanho_pagina)
+        if erro:
+            raise ErroApiEmbedded(erro)
+        if usuarios:
+            yield usuarios
+        if len(usuarios) < tamanho_pagina:
+            return
+        pagina += 1
+
 # --- FUNÇÃO PARA VINCULAR GRUPO ---
 def _linkar_usuario_ao_grupo(user_email):
     """Tenta VINCULAR (PUT) um usuário a um grupo."""
-    if not user_email or not PARCEIROS_GROUP_ID:
-        return False, "Email do usuário ou ID do Grupo não fornecido."
-    if "COLOQUE_O_ID_DO_GRUPO_AQUI" in PARCEIROS_GROUP_ID:
-        return False, 'ID do Grupo "Parceiros" não configurado no código (PARCEIROS_GROUP_ID).'
-
-    api_url_link = f"{EMBEDDED_API_URL}/link-groups"
-    headers = _get_api_headers()
-    
-    payload = {
-        "userEmail": user_email,
-        "groups": [PARCEIROS_GROUP_ID]
-    }
+    payload, erro = _payload_link(user_email)
+    if erro:
+        return False, erro
 
     try:
-        response = requests.put(api_url_link, headers=headers, json=payload, timeout=10)
-
-        if response.status_code == 200:
-            return True, None # Sucesso
-        elif response.status_code == 401:
-            return False, "API Erro 401 (Link Group): Não Autorizado."
-        elif response.status_code == 403:
-            return False, "API Erro 403 (Link Group): Proibido. Sua chave não tem permissão para vincular grupos."
-        elif response.status_code == 400:
-            try:
-                error_details = response.json().get("errors", response.text)
-            except json.JSONDecodeError:
-                error_details = response.text
-            return False, f"API Erro 400 (Link Group): {error_details}"
-        else:
-            return False, f"API Erro {response.status_code} (Link Group): Erro desconhecido."
+        response = _requisitar("PUT", _api_url("/link-groups"), "link", json=payload)
+        return _interpretar_link(response)
     
     except requests.exceptions.RequestException as e:
         return False, f"Falha de conexão com a API (Link Group): {e}"
 
 
 # --- (UPDATE) FUNÇÃO DE ATUALIZAÇÃO NA API ---
-def atualizar_usuario(api_user_id, data):
+def atualizar_usuario(api_user_id, data, chave_idempotencia=None):
     """Tenta ATUALIZAR (PUT) um usuário existente na API Embedded."""
     
     if not api_user_id:
-        print(f"Aviso: Parceiro local não tem 'api_user_id'. Pulando atualização na API.")
+        logger.info("Parceiro local sem 'api_user_id': atualização na API ignorada.")
         return True, None # Permite a atualização local
 
     try:
         payload = _build_api_payload(data, api_user_id=api_user_id)
-        headers = _get_api_headers()
     except ValueError as e:
         return False, str(e)
 
-    api_url_update = EMBEDDED_API_URL # PUT /api/user
-
     try:
-        response = requests.put(api_url_update, headers=headers, json=payload, timeout=10)
-
-        if response.status_code in [200, 204]:
-            return True, None
-        elif response.status_code == 401:
-            return False, "API Erro 401: Não Autorizado."
-        elif response.status_code == 403:
-             return False, "API Erro 403: Proibido. Sua chave não tem permissão para ATUALIZAR (PUT) usuários."
-        elif response.status_code == 404:
-            return False, f"API Erro 404: Usuário com ID '{api_user_id}' não encontrado na API."
-        else:
-            try:
-                error_details = response.json().get("message", response.text)
-            except json.JSONDecodeError:
-                error_details = response.text
-            return False, f"API Embedded Erro {response.status_code} (PUT): {error_details}"
+        response = _requisitar("PUT", _api_url(), "update", json=payload, # PUT /api/user
+                               headers=_headers_idempotencia(chave_idempotencia))
+        sucesso, erro = _interpretar_atualizacao(response, api_user_id)
+        if sucesso:
+            espelho.registrar(payload)
+        return sucesso, erro
 
     except requests.exceptions.RequestException as e:
         return False, f"Falha ao conectar na API Embedded: {e}"
 
 # --- (DELETE) FUNÇÃO DE DELEÇÃO NA API ---
-def deletar_usuario(email):
+def deletar_usuario(email, chave_idempotencia=None):
     """Tenta DELETAR (DELETE) um usuário existente na API Embedded."""
     
     if not email:
-        print(f"Aviso: Parceiro local não tem 'email'. Pulando deleção na API.")
+        logger.info("Parceiro local sem e-mail: deleção na API ignorada.")
         return True, None # Permite a deleção local
 
-    api_url_delete = f"{EMBEDDED_API_URL}/{email}"
-    headers = _get_api_headers()
+    # O espelho garante que o usuário não existe na API: nada a deletar
+    if espelho.ausencia_confirmada(email):
+        return True, None
 
     try:
-        response = requests.delete(api_url_delete, headers=headers, timeout=10)
-
-        if response.status_code in [200, 204, 404]:
-            return True, None
-        elif response.status_code == 401:
-            return False, "API Erro 401: Não Autorizado."
-        elif response.status_code == 403:
-             return False, "API Erro 403: Proibido. Sua chave não tem permissão para DELETAR usuários."
-        elif response.status_code == 400:
-            try:
-                error_details = response.json().get("errors", response.text)
-            except json.JSONDecodeError:
-                error_details = response.text
-            return False, f"API Embedded Erro 400 (DELETE): {error_details}"
-        else:
-            try:
-                error_details = response.json().get("message", response.text)
-            except json.JSONDecodeError:
-                error_details = response.text
-            return False, f"API Embedded Erro {response.status_code} (DELETE): {error_details}"
+        response = _requisitar("DELETE", _api_url(f"/{email}"), "delete",
+                               headers=_headers_idempotencia(chave_idempotencia))
+        sucesso, erro = _interpretar_delecao(response)
+        if sucesso:
+            espelho.remover(email)
+        return sucesso, erro
 
     except requests.exceptions.RequestException as e:
         return False, f"Falha ao conectar na API Embedded: {e}"
@@ -237,27 +513,44 @@ def deletar_usuario(email):
 
 # --- FUNÇÃO DE ROLLBACK (REVERSÃO) ---
 def rollback_criacao_usuario(email):
-    """Tenta deletar um usuário da API usando o email."""
+    """
+    Tenta deletar um usuário da API usando o email. Usada dentro do fluxo de
+    criação; fora dele a reversão vai para a outbox (parceiros/outbox.py),
+    que repete até conseguir. Não consulta a ausência no espelho: a reversão
+    vem logo depois de um POST que pode ter criado o usuário sem o espelho saber.
+    """
     if not email:
         return False
-        
-    print(f"--- ROLLBACK ---")
-    print(f"Tentando deletar usuário '{email}' da API devido à falha na operação.")
-    
-    api_url_delete = f"{EMBEDDED_API_URL}/{email}"
-    headers = _get_api_headers()
+
+    api_url_delete = _api_url(f"/{email}")
     try:
-        response = requests.delete(api_url_delete, headers=headers, timeout=5)
+        response = _requisitar("DELETE", api_url_delete, "rollback", read_timeout=5)
         if response.status_code in [200, 204, 404]:
-            print(f"ROLLBACK: Sucesso ao deletar '{email}'.")
+            espelho.remover(email)
+            logger.info("Rollback: usuário '%s' deletado da API.", email)
             return True
-        else:
-            print(f"ROLLBACK: Falha ao deletar '{email}'. API retornou {response.status_code}.")
-            return False
+        logger.warning("Rollback: falha ao deletar '%s'. API retornou %s.", email, response.status_code)
+        return False
     except Exception as e:
-        print(f"ROLLBACK: Exceção ao tentar deletar '{email}': {e}")
+        logger.warning("Rollback: exceção ao deletar '%s': %s", email, e)
         return False
 
+MENSAGEM_REVERTIDO = "O cadastro do usuário foi revertido."
+MENSAGEM_REVERSAO_AGENDADA = "A API não confirmou a reversão do cadastro do usuário; ela será repetida pela outbox."
+
+
+def reverter_criacao(email):
+    """
+    Desfaz, dentro do fluxo de criação, o usuário que o POST criou. Se a API
+    não confirmar, registra a reversão na outbox, que repete até conseguir.
+    Retorna a frase que descreve o que de fato aconteceu, para a mensagem de erro.
+    """
+    if rollback_criacao_usuario(email):
+        return MENSAGEM_REVERTIDO
+    from .outbox import registrar_desfazer_criacao  # A outbox importa este módulo
+    registrar_desfazer_criacao(email)
+    return MENSAGEM_REVERSAO_AGENDADA
+
 # --- FUNÇÃO PÚBLICA PRINCIPAL ---
 # Esta é a única função que a rota de cadastro precisará chamar
 def criar_parceiro_completo(data):
@@ -265,7 +558,10 @@ def criar_parceiro_completo(data):
     Executa o fluxo completo de cadastro:
     1. Cria usuário (POST) e busca ID (GET)
     2. Vincula ao grupo (PUT)
-    Retorna (api_id, erro)
+    Retorna (api_id, erro). Se algo falhar depois do POST (erro ou exceção,
+    inclusive ServicoIndisponivel), a criação já foi desfeita aqui ou, se a API
+    recusar a reversão, ficou registrada na outbox (ver reverter_criacao):
+    quem chama só precisa desfazer a criação se não conseguir gravar o parceiro.
     """
     user_email = data.get('email_gestor')
     
@@ -276,12 +572,15 @@ def criar_parceiro_completo(data):
         return None, erro_api
 
     # 2. Tenta vincular ao grupo "Parceiros"
-    sucesso_link, erro_link = _linkar_usuario_ao_grupo(user_email)
+    try:
+        sucesso_link, erro_link = _linkar_usuario_ao_grupo(user_email)
+    except Exception:
+        reverter_criacao(user_email)
+        raise
     
     if erro_link:
         # Se falhar ao vincular, desfaz a criação do usuário
-        rollback_criacao_usuario(user_email)
-        return None, f"Erro ao vincular usuário ao grupo: {erro_link}. O cadastro do usuário foi revertido."
+        return None, f"Erro ao vincular usuário ao grupo: {erro_link}. {reverter_criacao(user_email)}"
         
     # 3. Se tudo deu certo, retorna o ID do usuário
     api_id = api_response.get('id') if api_response else None
@@ -294,10 +593,6 @@ def definir_senha_usuario(email, nova_senha):
     if not email or not nova_senha:
         return False, "Email ou nova senha não fornecidos."
 
-    # Endpoint para mudar a senha
-    api_url_change_pass = f"{EMBEDDED_API_URL}/change-password"
-    headers = _get_api_headers()
-    
     # Payload esperado
     payload = {
         "email": email,
@@ -305,23 +600,8 @@ def definir_senha_usuario(email, nova_senha):
     }
 
     try:
-        response = requests.put(api_url_change_pass, headers=headers, json=payload, timeout=10)
-
-        # 200 OK é o sucesso
-        if response.status_code == 200:
-            return True, None
-        elif response.status_code == 401:
-            return False, "API Erro 401 (ChangePass): Não Autorizado."
-        elif response.status_code == 403:
-             return False, "API Erro 403 (ChangePass): Proibido. Sua chave não tem permissão para alterar senhas."
-        elif response.status_code == 400:
-             try:
-                error_details = response.json().get("errors", response.text)
-             except json.JSONDecodeError:
-                error_details = response.text
-             return False, f"API Erro 400 (ChangePass): {error_details}"
-        else:
-            return False, f"API Erro {response.status_code} (ChangePass): Erro desconhecido."
+        response = _requisitar("PUT", _api_url("/change-password"), "change-password", json=payload)
+        return _interpretar_troca_senha(response)
 
     except requests.exceptions.RequestException as e:
-        return False, f"Falha ao conectar na API (ChangePass): {e}"
\ No newline at end of file
+        return False, f"Falha ao conectar na API (ChangePass): {e}"
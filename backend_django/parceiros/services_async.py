@@ -0,0 +1,268 @@
+# CÓDIGO para: backend_django/parceiros/services_async.py
+
+# Versão assíncrona dos serviços da API Embedded (parceiros/services.py), para
+# as views async (parceiros/api/views_async.py) rodando sob ASGI. Usa um
+# httpx.AsyncClient com pool de conexões por event loop, o mesmo limite de
+# taxa/disjuntor e as mesmas funções de interpretação das respostas, então os
+# resultados e as mensagens de erro são idênticos aos da versão síncrona.
+#
+# Diferença principal: no cadastro, a busca do id (GET) e o vínculo ao grupo
+# (PUT link-groups) só dependem do POST e rodam em paralelo.
+
+import asyncio
+import time
+import weakref
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import espelho, outbox
+from .resiliencia import ABERTO, get_disjuntor, get_limitador
+from .services import (
+    _API_HEADERS, _METODOS_IDEMPOTENTES, _api_url, _build_api_payload, _espera_limite,
+    _get_timeout, _interpretar_atualizacao, _interpretar_busca, _interpretar_busca_pos_criacao,
+    _interpretar_criacao, _interpretar_delecao, _interpretar_link, _interpretar_troca_senha,
+    MENSAGEM_REVERSAO_AGENDADA, MENSAGEM_REVERTIDO, _medir_chamada, _payload_link, _recusar_por_disjuntor, _recusar_por_limite, _registrar_no_disjuntor,
+)
+
+# Mesmos status que o Retry da sessão síncrona repete (só métodos idempotentes)
+_STATUS_REPETIVEIS = frozenset([502, 503, 504])
+
+# Um cliente por event loop: um AsyncClient não pode ser usado em outro loop
+_clientes = weakref.WeakKeyDictionary()
+
+
+def _criar_cliente():
+    connect, read = _get_timeout()
+    maximo = getattr(settings, "EMBEDDED_API_POOL_MAXSIZE", 20)
+    return httpx.AsyncClient(
+        headers=_API_HEADERS,
+        timeout=httpx.Timeout(read, connect=connect),
+        limits=httpx.Limits(max_connections=maximo, max_keepalive_connections=maximo),
+        # Repete só falhas ao conectar (a requisição nem saiu), seguro até para o POST
+        transport=httpx.AsyncHTTPTransport(retries=getattr(settings, "EMBEDDED_API_MAX_RETRIES", 3)),
+    )
+
+
+def get_cliente():
+    """AsyncClient do event loop atual (criado sob demanda)."""
+    loop = asyncio.get_running_loop()
+    cliente = _clientes.get(loop)
+    if cliente is None or cliente.is_closed:
+        cliente = _clientes[loop] = _criar_cliente()
+    return cliente
+
+
+async def fechar_cliente():
+    """Fecha o cliente do loop atual (ex.: no shutdown do servidor ASGI)."""
+    cliente = _clientes.pop(asyncio.get_running_loop(), None)
+    if cliente is not None:
+        await cliente.aclose()
+
+
+async def _enviar(metodo, url, read_timeout, kwargs):
+    """A chamada em si, com os retries dos status repetíveis (só métodos idempotentes)."""
+    if read_timeout:
+        connect, _ = _get_timeout()
+        kwargs.setdefault("timeout", httpx.Timeout(read_timeout, connect=connect))
+    repeticoes = getattr(settings, "EMBEDDED_API_MAX_RETRIES", 3) if metodo in _METODOS_IDEMPOTENTES else 0
+    backoff = getattr(settings, "EMBEDDED_API_BACKOFF_FACTOR", 0.5)
+    for tentativa in range(repeticoes + 1):
+        response = await get_cliente().request(metodo, url, **kwargs)
+        if response.status_code not in _STATUS_REPETIVEIS or tentativa == repeticoes:
+            return response
+        await asyncio.sleep(backoff * (2 ** tentativa))
+
+
+async def _requisitar(metodo, url, operacao, read_timeout=None, **kwargs):
+    """Equivalente async de services._requisitar (limite de taxa, disjuntor, métricas e retries)."""
+    disjuntor = get_disjuntor()
+    limitador = get_limitador()
+    if disjuntor.estado == ABERTO:
+        _recusar_por_disjuntor(disjuntor)
+    if limitador and not await limitador.adquirir_async(_espera_limite()):
+        _recusar_por_limite()
+    if not disjuntor.permitir():
+        _recusar_por_disjuntor(disjuntor)
+
+    inicio = time.perf_counter()
+    try:
+        response = await _enviar(metodo, url, read_timeout, kwargs)
+    except httpx.HTTPError:
+        _medir_chamada(operacao, "falha_conexao", inicio)
+        disjuntor.registrar_falha()
+        raise
+    except BaseException:
+        # Configuração, bug ou cancelamento (cliente desconectou): libera a chamada de teste
+        disjuntor.liberar_teste()
+        raise
+    _medir_chamada(operacao, response.status_code, inicio)
+    _registrar_no_disjuntor(disjuntor, response.status_code)
+    return response
+
+
+# --- OPERAÇÕES ---
+
+async def _buscar_id_pos_criacao(email):
+    response = await _requisitar("GET", _api_url(), "get", params={"email": email})
+    return _interpretar_busca_pos_criacao(response, email)
+
+
+async def _linkar_usuario_ao_grupo(user_email):
+    payload, erro = _payload_link(user_email)
+    if erro:
+        return False, erro
+    try:
+        response = await _requisitar("PUT", _api_url("/link-groups"), "link", json=payload)
+        return _interpretar_link(response)
+    except httpx.HTTPError as e:
+        return False, f"Falha de conexão com a API (Link Group): {e}"
+
+
+async def criar_parceiro_completo(data):
+    """
+    Mesmo contrato de services.criar_parceiro_completo: retorna (api_id, erro).
+    Depois do POST, a busca do id (quando o POST não devolve o usuário) e o
+    vínculo ao grupo rodam em paralelo; se qualquer passo depois do POST falhar
+    (inclusive com exceção), o usuário criado é removido antes de retornar
+    (ou, se a API recusar, a reversão fica na outbox).
+    """
+    try:
+        payload = _build_api_payload(data, api_user_id=None)
+    except ValueError as e:
+        return None, str(e)
+    user_email = payload['email']
+
+    try:
+        response = await _requisitar("POST", _api_url(), "create", json=payload)
+    except httpx.HTTPError as e:
+        return None, f"Falha de conexão com a API: {e}"
+    criado, erro = _interpretar_criacao(response)
+    if erro:
+        return None, erro
+
+    try:
+        usuario, erro = await _concluir_criacao(user_email, payload, criado)
+    except BaseException:
+        await reverter_criacao(user_email)
+        raise
+    if erro:
+        return None, f"{erro} {await reverter_criacao(user_email)}"
+
+    await sync_to_async(espelho.registrar)(usuario)
+    return usuario['id'], None
+
+
+async def _concluir_criacao(user_email, payload, criado):
+    """Passos depois do POST: (usuario, erro). Quem chama desfaz a criação se houver erro."""
+    if criado:
+        usuario = dict(payload, **criado)
+        _, erro_link = await _linkar_usuario_ao_grupo(user_email)
+    else:
+        busca, link = await asyncio.gather(
+            _buscar_id_pos_criacao(user_email), _linkar_usuario_ao_grupo(user_email), return_exceptions=True
+        )
+        for resultado in (busca, link):
+            if isinstance(resultado, BaseException) and not isinstance(resultado, httpx.HTTPError):
+                raise resultado
+        if isinstance(busca, httpx.HTTPError):
+            return None, f"Falha de conexão com a API: {busca}."
+        (usuario, erro_busca), (_, erro_link) = busca, link
+        if erro_busca:
+            return None, erro_busca
+
+    if erro_link:
+        return None, f"Erro ao vincular usuário ao grupo: {erro_link}."
+    return usuario, None
+
+
+async def buscar_usuario_por_email(email, confiar_ausencia=True):
+    """Mesmo contrato de services.buscar_usuario_por_email (consulta o espelho antes)."""
+    if not email:
+        return None, "Email do usuário não fornecido."
+
+    usuario = await sync_to_async(espelho.buscar_por_email)(email)
+    if usuario:
+        return espelho.como_dados_api(usuario), None
+    if confiar_ausencia and await sync_to_async(espelho.ausencia_confirmada)(email):
+        return None, None
+
+    try:
+        response = await _requisitar("GET", _api_url(), "get", params={"email": email})
+    except httpx.HTTPError as e:
+        return None, f"Falha de conexão com a API: {e}"
+    usuario, erro = _interpretar_busca(response, email)
+    if usuario:
+        await sync_to_async(espelho.registrar)(usuario)
+    return usuario, erro
+
+
+async def atualizar_usuario(api_user_id, data):
+    """Mesmo contrato de services.atualizar_usuario."""
+    if not api_user_id:
+        return True, None  # Permite a atualização local
+    try:
+        payload = _build_api_payload(data, api_user_id=api_user_id)
+    except ValueError as e:
+        return False, str(e)
+
+    try:
+        response = await _requisitar("PUT", _api_url(), "update", json=payload)
+    except httpx.HTTPError as e:
+        return False, f"Falha ao conectar na API Embedded: {e}"
+    sucesso, erro = _interpretar_atualizacao(response, api_user_id)
+    if sucesso:
+        await sync_to_async(espelho.registrar)(payload)
+    return sucesso, erro
+
+
+async def deletar_usuario(email):
+    """Mesmo contrato de services.deletar_usuario."""
+    if not email:
+        return True, None  # Permite a deleção local
+    if await sync_to_async(espelho.ausencia_confirmada)(email):
+        return True, None
+
+    try:
+        response = await _requisitar("DELETE", _api_url(f"/{email}"), "delete")
+    except httpx.HTTPError as e:
+        return False, f"Falha ao conectar na API Embedded: {e}"
+    sucesso, erro = _interpretar_delecao(response)
+    if sucesso:
+        await sync_to_async(espelho.remover)(email)
+    return sucesso, erro
+
+
+async def reverter_criacao(email):
+    """Mesmo contrato de services.reverter_criacao."""
+    if await rollback_criacao_usuario(email):
+        return MENSAGEM_REVERTIDO
+    await sync_to_async(outbox.registrar_desfazer_criacao)(email)
+    return MENSAGEM_REVERSAO_AGENDADA
+
+
+async def rollback_criacao_usuario(email):
+    """Tenta deletar da API o usuário recém-criado. Retorna True se conseguiu."""
+    if not email:
+        return False
+    try:
+        response = await _requisitar("DELETE", _api_url(f"/{email}"), "rollback", read_timeout=5)
+    except Exception:
+        return False
+    if response.status_code in (200, 204, 404):
+        await sync_to_async(espelho.remover)(email)
+        return True
+    return False
+
+
+async def definir_senha_usuario(email, nova_senha):
+    """Mesmo contrato de services.definir_senha_usuario."""
+    if not email or not nova_senha:
+        return False, "Email ou nova senha não fornecidos."
+    payload = {"email": email, "password": nova_senha}
+    try:
+        response = await _requisitar("PUT", _api_url("/change-password"), "change-password", json=payload)
+    except httpx.HTTPError as e:
+        return False, f"Falha ao conectar na API (ChangePass): {e}"
+    return _interpretar_troca_senha(response)
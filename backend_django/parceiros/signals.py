@@ -0,0 +1,45 @@
+# CÓDIGO para: backend_django/parceiros/signals.py
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import invalidar_cache_parceiros
+from .models import Parceiro
+from . import duplicados, historico, resumo
+
+# Valores anteriores ao save usados pelo resumo do painel, pelo histórico e
+# pelas chaves de duplicidade
+CAMPOS_ACOMPANHADOS = tuple(dict.fromkeys(resumo.CAMPOS + historico.CAMPOS + duplicados.CAMPOS))
+
+
+@receiver(post_save, sender=Parceiro)
+@receiver(post_delete, sender=Parceiro)
+def parceiro_alterado(sender, **kwargs):
+    invalidar_cache_parceiros()
+
+
+# --- RESUMO DO PAINEL, HISTÓRICO DE ALTERAÇÕES E CHAVES DE DUPLICIDADE ---
+
+@receiver(pre_save, sender=Parceiro)
+def guardar_estado_anterior(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(CAMPOS_ACOMPANHADOS):
+        instance._estado_anterior = False  # Nada acompanhado muda neste save
+    elif instance._state.adding or instance.pk is None:
+        instance._estado_anterior = None
+    else:
+        instance._estado_anterior = Parceiro.objects.filter(pk=instance.pk).values(*CAMPOS_ACOMPANHADOS).first()
+
+
+@receiver(post_save, sender=Parceiro)
+def registrar_alteracao(sender, instance, **kwargs):
+    anterior = getattr(instance, '_estado_anterior', None)
+    if anterior is not False:
+        resumo.registrar_save(anterior, instance)
+        historico.registrar_save(anterior, instance)
+        duplicados.registrar_save(anterior, instance)
+
+
+@receiver(post_delete, sender=Parceiro)
+def registrar_delecao(sender, instance, **kwargs):
+    resumo.registrar_delete(instance)
+    historico.registrar_delete(instance)
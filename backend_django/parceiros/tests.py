@@ -1,3 +1,1376 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+import zipfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+import httpx
+from asgiref.sync import sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from backend_api import metricas, middleware, roteamento
+from backend_api.renderers import JSONRendererRapido
+from . import cache as cache_parceiros
+from . import (
+    acoes_em_massa, benchmark, busca, dados_sinteticos, duplicados, espelho, expiracao, historico, idempotencia, importacao, outbox, provisionamento, reconciliacao, resiliencia, resumo, senhas, services,
+    services_async,
+)
+from .api_falsa import ServidorApiFalsa
+from .models import AcaoEmMassa, AlteracaoParceiro, ChaveDuplicidade, EventoOutbox, Parceiro, RespostaIdempotente, ResumoParceiros, SincronizacaoEmbedded, TarefaProvisionamento, UsuarioEmbedded
+
+
+def setUpModule():
+    # O limite de taxa guarda as fichas num arquivo SQLite: nos testes, numa pasta temporária
+    pasta = tempfile.TemporaryDirectory()
+    arquivo = override_settings(EMBEDDED_API_RATE_LIMIT_ARQUIVO=os.path.join(pasta.name, "ratelimit.sqlite3"))
+    arquivo.enable()
+    resiliencia.reiniciar()
+    unittest.addModuleCleanup(pasta.cleanup)
+    unittest.addModuleCleanup(arquivo.disable)
+    unittest.addModuleCleanup(resiliencia.reiniciar)
+
+
+def _dados_parceiro(email="gestor@acme.com", **extra):
+    """Payload válido para POST /api/v1/parceiros/."""
+    dados = {
+        "nome_ajustado": "ACME", "tipo": "INDUSTRIA", "cnpj": "12.345.678/0001-90",
+        "nome_fantasia": "ACME", "razao_social": "ACME LTDA", "gestor": "Fulano",
+        "telefone_gestor": "11999999999", "email_gestor": email, "data_entrada": "2025-01-01",
+    }
+    dados.update(extra)
+    return dados
+
+
+def _resposta(status_code, json_data=None):
+    """Monta uma resposta falsa no formato de requests.Response."""
+    resposta = mock.Mock(status_code=status_code, text="")
+    resposta.json.return_value = json_data or {}
+    return resposta
+
+
+class ParceirosAPITestCase(APITestCase):
+    """Base dos testes da API: começa com o cache vazio e o disjuntor fechado."""
+    def setUp(self):
+        super().setUp()
+        cache_parceiros.get_cache().clear()
+        resiliencia.reiniciar()
+
+
+class SessionEmbeddedTests(TestCase):
+    def setUp(self):
+        resiliencia.reiniciar()
+
+    def tearDown(self):
+        services.fechar_session()
+
+    def test_session_e_reaproveitada(self):
+        self.assertIs(services.get_session(), services.get_session())
+
+    def test_post_nao_entra_nos_retries(self):
+        retry = services.get_session().get_adapter(services.EMBEDDED_API_URL).max_retries
+        self.assertNotIn("POST", retry.allowed_methods)
+        self.assertIn("PUT", retry.allowed_methods)
+        self.assertEqual(retry.read, 0)  # Read timeout não é repetido
+
+    def test_cadastro_usa_a_session_com_timeouts_separados(self):
+        session = mock.Mock()
+        session.request.side_effect = [
+            _resposta(200),
+            _resposta(200, {"data": [{"id": "abc"}]}),
+        ]
+        dados = {"email_gestor": "a@b.com", "nome_fantasia": "ACME", "tipo": "INDUSTRIA"}
+        with mock.patch.object(services, "get_session", return_value=session):
+            resultado, erro = services._cadastrar_usuario_e_buscar_id(dados)
+
+        self.assertIsNone(erro)
+        self.assertEqual(resultado, {"id": "abc"})
+        self.assertEqual(session.request.call_args_list[1].args[0], "GET")
+        self.assertEqual(session.request.call_args_list[1].kwargs["params"], {"email": "a@b.com"})
+        self.assertEqual(session.request.call_args_list[0].kwargs["timeout"], services._get_timeout())
+
+
+class EspelhoUsuariosTests(TestCase):
+    DADOS = {"email_gestor": "a@b.com", "nome_fantasia": "ACME", "tipo": "INDUSTRIA"}
+
+    def setUp(self):
+        resiliencia.reiniciar()
+
+    def _session(self, *respostas):
+        session = mock.Mock()
+        session.request.side_effect = list(respostas)
+        return mock.patch.object(services, "get_session", return_value=session), session
+
+    def test_post_que_devolve_o_usuario_dispensa_o_get(self):
+        patch, session = self._session(_resposta(200, {"id": "abc", "email": "A@b.com"}))
+        with patch:
+            self.assertEqual(services._cadastrar_usuario_e_buscar_id(self.DADOS), ({"id": "abc"}, None))
+        self.assertEqual(session.request.call_count, 1)
+
+        # A busca seguinte é respondida pelo espelho, sem chamada remota
+        patch, session = self._session()
+        with patch:
+            usuario, erro = services.buscar_usuario_por_email("a@b.com")
+        self.assertEqual(usuario["id"], "abc")
+        session.request.assert_not_called()
+
+    def test_rollback_apos_post_ignora_ausencia_no_espelho(self):
+        SincronizacaoEmbedded.objects.create(concluida_em=timezone.now())  # O espelho "confirma" a ausência
+        patch, session = self._session(_resposta(200), _resposta(500), _resposta(204))
+        with patch:
+            api_id, erro = services._cadastrar_usuario_e_buscar_id(self.DADOS)
+        self.assertIsNone(api_id)
+        self.assertIn("revertido", erro)
+        self.assertEqual([c.args[0] for c in session.request.call_args_list], ["POST", "GET", "DELETE"])
+
+    def test_sincronizacao_despeja_ausentes_e_confirma_ausencia(self):
+        espelho.registrar({"id": "velho", "email": "sumiu@x.com"})
+        pagina_1 = [{"id": str(i), "email": f"u{i}@x.com"} for i in range(2)]
+        patch, session = self._session(
+            _resposta(200, {"data": pagina_1}), _resposta(200, {"data": [{"id": "9", "email": "u9@x.com"}]})
+        )
+        with patch:
+            sincronizacao = espelho.sincronizar(services.iterar_usuarios(tamanho_pagina=2))
+
+        self.assertEqual(sincronizacao.total_usuarios, 3)
+        self.assertEqual(session.request.call_args_list[1].kwargs["params"], {"page": 2, "pageSize": 2})
+        self.assertFalse(UsuarioEmbedded.objects.filter(email="sumiu@x.com").exists())
+
+        patch, session = self._session()
+        with patch:
+            self.assertEqual(services.deletar_usuario("sumiu@x.com"), (True, None))
+        session.request.assert_not_called()
+
+
+class ProvisionamentoAssincronoTests(ParceirosAPITestCase):
+    def test_create_assincrono_responde_202_e_enfileira(self):
+        with mock.patch.object(services, "criar_parceiro_completo") as criar:
+            resposta = self.client.post("/api/v1/parceiros/", _dados_parceiro(), HTTP_PREFER="respond-async")
+
+        criar.assert_not_called()
+        self.assertEqual(resposta.status_code, 202)
+        self.assertEqual(resposta.data["status_provisionamento"], "PENDENTE")
+        self.assertTrue(resposta["Location"].endswith(f"/parceiros/{resposta.data['id']}/provisionamento/"))
+        self.assertEqual(TarefaProvisionamento.objects.get().estado, "PENDENTE")
+
+    def test_worker_provisiona_e_status_fica_consultavel(self):
+        resposta = self.client.post("/api/v1/parceiros/", _dados_parceiro(), HTTP_PREFER="respond-async")
+        with mock.patch.object(services, "criar_parceiro_completo", return_value=("api-1", None)):
+            self.assertEqual(provisionamento.processar_pendentes(workers=1), (1, 1))
+
+        status_resp = self.client.get(resposta["Location"])
+        self.assertEqual(status_resp.data["status_provisionamento"], "CONCLUIDO")
+        self.assertEqual(status_resp.data["api_user_id"], "api-1")
+
+    def test_falha_transitoria_volta_para_fila_e_retentativa_busca_antes(self):
+        self.client.post("/api/v1/parceiros/", _dados_parceiro(), HTTP_PREFER="respond-async")
+        with mock.patch.object(services, "criar_parceiro_completo", return_value=(None, "timeout")):
+            self.assertEqual(provisionamento.processar_pendentes(workers=1), (1, 0))
+
+        tarefa = TarefaProvisionamento.objects.get()
+        self.assertEqual((tarefa.estado, tarefa.tentativas), ("PENDENTE", 1))
+
+        # Força o vencimento do backoff: a retentativa encontra o usuário já criado
+        TarefaProvisionamento.objects.update(proxima_tentativa=tarefa.criada_em)
+        with mock.patch.object(services, "buscar_usuario_por_email", return_value=({"id": "api-9"}, None)), \
+                mock.patch.object(services, "_linkar_usuario_ao_grupo", return_value=(True, None)):
+            provisionamento.processar_pendentes(workers=1)
+
+        self.assertEqual(Parceiro.objects.get().api_user_id, "api-9")
+
+    def test_erro_4xx_da_api_falha_sem_novas_tentativas(self):
+        self.client.post("/api/v1/parceiros/", _dados_parceiro(), HTTP_PREFER="respond-async")
+        self.client.post("/api/v1/parceiros/", _dados_parceiro(
+            "b@x.com", nome_fantasia="Beta", razao_social="BETA SA", cnpj="98.765.432/0001-10"), HTTP_PREFER="respond-async")
+        erros = {"gestor@acme.com": "API Embedded Erro 400 (POST): email inválido",
+                 "b@x.com": "API Embedded Erro 503 (POST): Service Unavailable"}
+        with mock.patch.object(services, "criar_parceiro_completo",
+                               side_effect=lambda dados: (None, erros[dados["email_gestor"]])):
+            self.assertEqual(provisionamento.processar_pendentes(workers=1), (2, 0))
+
+        estados = dict(TarefaProvisionamento.objects.values_list("parceiro__email_gestor", "estado"))
+        self.assertEqual(estados, {"gestor@acme.com": "FALHOU", "b@x.com": "PENDENTE"})
+        self.assertEqual(Parceiro.objects.get(email_gestor="gestor@acme.com").status_provisionamento, "ERRO")
+
+
+class ImportacaoTests(ParceirosAPITestCase):
+    CSV = (
+        "nome_ajustado;tipo;cnpj;nome_fantasia;razao_social;gestor;telefone_gestor;email_gestor;data_entrada;data_saida\n"
+        "A;INDUSTRIA;1;Alfa;Alfa SA;Ana;1;alfa@x.com;2025-01-01;\n"
+        "B;DISTRIBUIDOR;2;Beta;Beta SA;Bia;2;beta@x.com;2025-01-01;2026-01-01\n"
+        "B2;DISTRIBUIDOR;2;Beta;Beta SA;Bia;2;beta@x.com;2025-01-01;\n"
+        "C;OUTRO;3;Gama;Gama SA;Gil;3;gama@x.com;2025-01-01;\n"
+        "D;INDUSTRIA;4;Delta;Delta SA;Dan;4;existe@x.com;2025-01-01;\n"
+    )
+
+    def setUp(self):
+        super().setUp()
+        Parceiro.objects.create(**dict(_dados_parceiro("existe@x.com"), data_entrada="2024-01-01"))
+
+    def test_email_gestor_e_aceito_na_criacao_e_ignorado_na_edicao(self):
+        with mock.patch.object(services, "criar_parceiro_completo", return_value=("api-1", None)):
+            resposta = self.client.post("/api/v1/parceiros/", _dados_parceiro(
+                "novo@x.com", nome_fantasia="Novo", razao_social="NOVO SA", cnpj="98.765.432/0001-10"))
+        self.assertEqual(resposta.data["email_gestor"], "novo@x.com")
+
+        url = f"/api/v1/parceiros/{resposta.data['id']}/"
+        self.client.patch(url, {"email_gestor": "outro@x.com"})
+        self.assertEqual(Parceiro.objects.get(pk=resposta.data["id"]).email_gestor, "novo@x.com")
+
+    @override_settings(PARCEIROS_OUTBOX=False)
+    def test_importar_csv_pela_api_gera_relatorio_por_linha(self):
+        arquivo = SimpleUploadedFile("parceiros.csv", self.CSV.encode("utf-8"))
+        with mock.patch.object(services, "criar_parceiro_completo",
+                               side_effect=lambda dados: (f"api-{dados['email_gestor']}", None)) as criar:
+            resposta = self.client.post("/api/v1/parceiros/importar/", {"arquivo": arquivo}, format="multipart")
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data["resumo"], {"CRIADO": 2, "DUPLICADO": 2, "INVALIDO": 1})
+        self.assertEqual([linha["resultado"] for linha in resposta.data["linhas"]],
+                         ["CRIADO", "CRIADO", "DUPLICADO", "INVALIDO", "DUPLICADO"])
+        self.assertEqual(criar.call_count, 2)
+        self.assertEqual(Parceiro.objects.get(email_gestor="beta@x.com").api_user_id, "api-beta@x.com")
+
+    def test_comando_importa_json_em_modo_assincrono(self):
+        registros = [_dados_parceiro(f"p{i}@x.com") for i in range(5)]
+        caminho = self._arquivo_temporario(json.dumps(registros))
+        saida = io.StringIO()
+
+        call_command("import_parceiros", caminho, "--lote", "2", "--assincrono", stdout=saida, stderr=io.StringIO())
+
+        linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+        self.assertEqual([linha["resultado"] for linha in linhas], ["PENDENTE"] * 5)
+        self.assertEqual(TarefaProvisionamento.objects.count(), 5)
+
+    def test_leitura_json_em_streaming_aceita_ndjson(self):
+        texto = io.StringIO('{"a": 1}\n{"a": 2}\n')
+        self.assertEqual(list(importacao.ler_json(texto)), [{"a": 1}, {"a": 2}])
+
+    def _arquivo_temporario(self, conteudo):
+        arquivo = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        self.addCleanup(os.unlink, arquivo.name)
+        arquivo.write(conteudo)
+        arquivo.close()
+        return arquivo.name
+
+
+class ListagemTests(ParceirosAPITestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            Parceiro.objects.create(**dict(
+                _dados_parceiro(f"p{i}@x.com"),
+                tipo="INDUSTRIA" if i % 2 else "DISTRIBUIDOR",
+                nome_fantasia=f"Empresa {i}",
+                data_entrada=f"2025-01-0{i + 1}",
+            ))
+
+    def test_paginacao_por_cursor_percorre_tudo_sem_repetir(self):
+        ids = []
+        url = "/api/v1/parceiros/?page_size=2"
+        while url:
+            resposta = self.client.get(url)
+            ids.extend(item["id"] for item in resposta.data["results"])
+            url = resposta.data["next"]
+        self.assertEqual(ids, sorted(Parceiro.objects.values_list("id", flat=True), reverse=True))
+
+    def test_fields_limita_os_campos(self):
+        resposta = self.client.get("/api/v1/parceiros/?fields=id,nome_fantasia")
+        self.assertEqual(set(resposta.data["results"][0]), {"id", "nome_fantasia"})
+
+    def test_filtros_e_busca(self):
+        resposta = self.client.get("/api/v1/parceiros/?tipo=industria&data_entrada_de=2025-01-03")
+        self.assertEqual(sorted(item["nome_fantasia"] for item in resposta.data["results"]), ["Empresa 3"])
+
+        resposta = self.client.get("/api/v1/parceiros/?search=P4@")
+        self.assertEqual([item["nome_fantasia"] for item in resposta.data["results"]], ["Empresa 4"])
+
+    def test_filtro_por_cnpj_ignora_a_formatacao(self):
+        self.assertEqual(Parceiro.objects.first().cnpj_normalizado, "12345678000190")
+        resposta = self.client.get("/api/v1/parceiros/?cnpj=12345678000190")
+        self.assertEqual(len(resposta.data["results"]), 5)
+
+    def test_filtro_invalido_responde_400(self):
+        self.assertEqual(self.client.get("/api/v1/parceiros/?data_entrada_de=ontem").status_code, 400)
+
+
+class ExportacaoTests(ParceirosAPITestCase):
+    URL = "/api/v1/parceiros/exportar/"
+
+    def setUp(self):
+        super().setUp()
+        Parceiro.objects.create(**_dados_parceiro("a@x.com", nome_fantasia="Alfa <&>", data_saida="2026-01-01"))
+        Parceiro.objects.create(**_dados_parceiro("b@x.com", tipo="DISTRIBUIDOR"))
+        Parceiro.objects.create(**dict(_dados_parceiro("inativo@x.com"), status=False))
+
+    @staticmethod
+    def _conteudo(resposta):
+        return b"".join(resposta.streaming_content)
+
+    def test_csv_com_filtros_da_listagem_e_accept_qualquer(self):
+        resposta = self.client.get(self.URL, {"tipo": "industria"}, HTTP_ACCEPT="text/csv")
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('filename="parceiros.csv"', resposta["Content-Disposition"])
+        registros = list(importacao.ler_csv(io.BytesIO(self._conteudo(resposta))))
+        self.assertEqual([r["email_gestor"] for r in registros], ["a@x.com"])
+        self.assertEqual(registros[0]["senha_definida"], "false")
+
+    def test_csv_neutraliza_formulas(self):
+        Parceiro.objects.create(**_dados_parceiro("f@x.com", gestor="=HYPERLINK(\"http://x\")",
+                                                  telefone_gestor="+5511999990000"))
+        resposta = self.client.get(self.URL, {"search": "f@x.com"})
+        conteudo = self._conteudo(resposta).decode("utf-8-sig")
+        self.assertIn("'=HYPERLINK", conteudo)
+        self.assertIn("'+5511999990000", conteudo)
+        registro = list(importacao.ler_csv(io.StringIO(conteudo)))[0]
+        self.assertEqual((registro["gestor"], registro["telefone_gestor"]), ('=HYPERLINK("http://x")', "+5511999990000"))
+
+    def test_csv_devolve_tabulacao_inicial_na_importacao(self):
+        Parceiro.objects.create(**_dados_parceiro("t@x.com", gestor="\t=1+1"))
+        conteudo = self._conteudo(self.client.get(self.URL, {"search": "t@x.com"})).decode("utf-8-sig")
+        self.assertIn("'\t=1+1", conteudo)
+        registro = list(importacao.ler_csv(io.StringIO(conteudo)))[0]
+        self.assertEqual(registro["gestor"], "\t=1+1")
+
+    def test_ndjson_em_gzip_com_fields(self):
+        resposta = self.client.get(self.URL, {"formato": "ndjson", "gzip": "true", "fields": "email_gestor,id"})
+        self.assertEqual(resposta["Content-Type"], "application/gzip")
+        linhas = gzip.decompress(self._conteudo(resposta)).decode("utf-8").splitlines()
+        registros = [json.loads(linha) for linha in linhas]
+        self.assertEqual(list(registros[1]), ["id", "email_gestor"])
+        self.assertEqual([r["email_gestor"] for r in registros], ["a@x.com", "b@x.com"])
+
+    def test_xlsx_e_um_zip_com_a_planilha(self):
+        resposta = self.client.get(self.URL, {"formato": "xlsx", "search": "Alfa"})
+        with zipfile.ZipFile(io.BytesIO(self._conteudo(resposta))) as arquivo:
+            planilha = ElementTree.fromstring(arquivo.read("xl/worksheets/sheet1.xml"))
+        ns = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+        linhas = planilha.findall(f"{ns}sheetData/{ns}row")
+        self.assertEqual(len(linhas), 2)  # Cabeçalho + Alfa
+        self.assertIn("Alfa <&>", [t.text for t in linhas[1].iter(f"{ns}t")])
+
+    def test_formato_invalido_e_comando(self):
+        self.assertEqual(self.client.get(self.URL, {"formato": "pdf"}).status_code, 400)
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "parceiros.ndjson.gz")
+            call_command("exportar_parceiros", saida=caminho, filtro=["tipo=DISTRIBUIDOR"], stderr=io.StringIO())
+            with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+                self.assertEqual([json.loads(linha)["email_gestor"] for linha in arquivo], ["b@x.com"])
+
+
+class LeituraEnxutaTests(ParceirosAPITestCase):
+    URL = "/api/v1/parceiros/"
+
+    def setUp(self):
+        super().setUp()
+        Parceiro.objects.create(**_dados_parceiro("a@x.com", nome_fantasia="Ação\u2028Ltda", data_saida="2026-01-01"))
+        Parceiro.objects.create(**dict(_dados_parceiro("b@x.com"), api_user_id="api-b", senha_definida=True))
+
+    def _comparar(self, url, parametros=None):
+        enxuta = self.client.get(url, parametros)
+        cache_parceiros.get_cache().clear()
+        with override_settings(PARCEIROS_LEITURA_ENXUTA=False):
+            completa = self.client.get(url, parametros)
+        self.assertEqual(enxuta.status_code, 200)
+        self.assertEqual(enxuta.content, completa.content)
+        return enxuta
+
+    def test_lista_e_detalhe_identicos_ao_serializer_completo(self):
+        resposta = self._comparar(self.URL)
+        self.assertIn(b"\\u2028", resposta.content)
+        self._comparar(self.URL, {"fields": "nome_fantasia,data_saida", "tipo": "INDUSTRIA"})
+        self._comparar(f"{self.URL}{Parceiro.objects.get(email_gestor='a@x.com').pk}/")
+
+    def test_renderer_rapido_gera_os_mesmos_bytes(self):
+        dados = {"quando": datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc), 1: Decimal("1.50"),
+                 "texto": "é\u2029", "lista": [None, True, 0.5]}
+        self.assertEqual(JSONRendererRapido().render(dados), JSONRenderer().render(dados))
+
+
+class CacheLeituraTests(ParceirosAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.parceiro = Parceiro.objects.create(**_dados_parceiro())
+        self.url = f"/api/v1/parceiros/{self.parceiro.pk}/"
+
+    def test_segunda_leitura_vem_do_cache_sem_consultas(self):
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            resposta = self.client.get(self.url)
+        self.assertEqual(resposta["X-Cache"], "HIT")
+        self.assertEqual(resposta.data["email_gestor"], "gestor@acme.com")
+        self.assertEqual(cache_parceiros.estatisticas()["acertos"], 1)
+
+    def test_etag_e_last_modified_respondem_304(self):
+        resposta = self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=resposta["ETag"]).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=resposta["Last-Modified"]).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"outra"').status_code, 200)
+
+    def test_last_modified_da_lista_muda_com_delecao(self):
+        outro = Parceiro.objects.create(**_dados_parceiro("outro@x.com"))
+        lista = self.client.get("/api/v1/parceiros/")
+        with mock.patch.object(cache_parceiros.time, "time", return_value=time.time() + 5), \
+                self.captureOnCommitCallbacks(execute=True):
+            outro.delete()  # Os itens que sobram na lista não mudaram
+        resposta = self.client.get("/api/v1/parceiros/", HTTP_IF_MODIFIED_SINCE=lista["Last-Modified"])
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.data["results"]), 1)
+
+    def test_escrita_invalida_o_cache(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.parceiro.nome_fantasia = "Novo Nome"
+            self.parceiro.save()
+
+        resposta = self.client.get(self.url)
+        self.assertEqual(resposta["X-Cache"], "MISS")
+        self.assertEqual(resposta.data["nome_fantasia"], "Novo Nome")
+
+
+class ResumoPainelTests(ParceirosAPITestCase):
+    URL = "/api/v1/parceiros/stats/"
+
+    def setUp(self):
+        super().setUp()
+        hoje = timezone.localdate()
+        self.a = Parceiro.objects.create(**_dados_parceiro("a@x.com", data_saida=hoje + timedelta(days=10)))
+        self.b = Parceiro.objects.create(**_dados_parceiro("b@x.com", tipo="VAREJO", data_saida=hoje - timedelta(days=1)))
+        Parceiro.objects.create(**_dados_parceiro("c@x.com", status=False, data_saida=hoje + timedelta(days=5)))
+
+    def test_saves_deletes_e_caminhos_em_massa_mantem_o_resumo(self):
+        self.a.tipo = "VAREJO"
+        self.a.save()
+        self.a.save(update_fields=["nome_fantasia"])
+        self.b.delete()
+        senhas.marcar_senha_definida([self.a.pk])
+        importacao._gravar_lote([(1, {}, dict(_dados_parceiro("d@x.com"), api_user_id="api-d"))], False, 10)
+        self.assertEqual(resumo.divergencias(), {})
+
+        estatisticas = resumo.estatisticas(30)
+        self.assertEqual((estatisticas["ativos"], estatisticas["inativos"], estatisticas["senha_pendente"]), (2, 1, 1))
+        self.assertEqual(estatisticas["por_tipo"], {"INDUSTRIA": {"ativos": 1, "inativos": 1},
+                                                    "VAREJO": {"ativos": 1, "inativos": 0}})
+        self.assertEqual((estatisticas["saida_vencida"], estatisticas["vencendo"]["total"]), (0, 1))
+
+    def test_endpoint_usa_o_cache_e_renova_apos_escrita(self):
+        resposta = self.client.get(self.URL, {"dias": 7})
+        self.assertEqual((resposta.data["total"], resposta.data["saida_vencida"]), (3, 1))
+        self.assertEqual(resposta.data["vencendo"], {"dias": 7, "total": 0})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.URL, {"dias": 7})["X-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Parceiro.objects.create(**_dados_parceiro("d@x.com"))
+        self.assertEqual(self.client.get(self.URL, {"dias": 7}).data["total"], 4)
+        self.assertEqual(self.client.get(self.URL, {"dias": "x"}).status_code, 400)
+
+    def test_comando_detecta_e_corrige_divergencias(self):
+        ResumoParceiros.objects.filter(tipo="VAREJO").update(total=99)
+        saida = io.StringIO()
+        call_command("reconstruir_resumo_parceiros", "--verificar", stdout=saida)
+        self.assertIn("1 divergência", saida.getvalue())
+
+        call_command("reconstruir_resumo_parceiros", stdout=io.StringIO())
+        self.assertEqual(resumo.divergencias(), {})
+
+
+class HistoricoAlteracoesTests(ParceirosAPITestCase):
+    URL = "/api/v1/parceiros/changes/"
+
+    def setUp(self):
+        super().setUp()
+        self.a = Parceiro.objects.create(**_dados_parceiro("a@x.com"))
+        self.b = Parceiro.objects.create(**_dados_parceiro("b@x.com"))
+        self.cursor = self.client.get(self.URL).data["cursor"]
+
+    def test_registra_so_o_que_mudou(self):
+        self.a.save()
+        self.a.nome_fantasia = "Novo"
+        self.a.save()
+        self.b.delete()
+        alteracoes = list(AlteracaoParceiro.objects.filter(seq__gt=self.cursor).values_list("operacao", "campos"))
+        self.assertEqual(alteracoes, [("ALTERACAO", {"nome_fantasia": "Novo"}), ("DELECAO", {})])
+
+    def test_changes_entrega_deltas_compactados_com_remocoes(self):
+        self.a.nome_fantasia = "Um"
+        self.a.save()
+        self.a.nome_fantasia = "Dois"
+        self.a.save()
+        senhas.marcar_senha_definida([self.b.pk])
+        expiracao.desativar_lote(timezone.localdate() + timedelta(days=1))  # Nenhum com data_saida
+        self.b.status = False
+        self.b.save()
+        c = Parceiro.objects.create(**_dados_parceiro("c@x.com"))
+        c_pk = c.pk
+        c.delete()
+
+        resposta = self.client.get(self.URL, {"since": self.cursor, "fields": "nome_fantasia"})
+        alteracoes = resposta.data["alteracoes"]
+        self.assertEqual([(item["id"], item["operacao"]) for item in alteracoes],
+                         [(self.a.pk, "GRAVADO"), (self.b.pk, "REMOVIDO"), (c_pk, "REMOVIDO")])
+        self.assertEqual(alteracoes[0]["dados"], {"nome_fantasia": "Dois"})
+        self.assertFalse(resposta.data["mais"])
+
+        vazia = self.client.get(self.URL, {"since": resposta.data["cursor"]}).data
+        self.assertEqual((vazia["alteracoes"], vazia["cursor"]), ([], resposta.data["cursor"]))
+
+    def test_paginacao_e_historico_removido(self):
+        for nome in ("x", "y", "z"):
+            self.a.nome_fantasia = nome
+            self.a.save()
+        pagina = self.client.get(self.URL, {"since": self.cursor, "page_size": 2}).data
+        self.assertTrue(pagina["mais"])
+        self.assertEqual(pagina["cursor"], self.cursor + 2)
+
+        AlteracaoParceiro.objects.filter(seq__lte=self.cursor + 2).delete()
+        self.assertEqual(self.client.get(self.URL, {"since": self.cursor}).status_code, 410)
+        self.assertEqual(self.client.get(self.URL, {"since": "x"}).status_code, 400)
+
+    def test_since_zero_depois_da_limpeza_pede_carga_completa(self):
+        AlteracaoParceiro.objects.update(registrada_em=timezone.now() - timedelta(days=90))
+        self.a.nome_fantasia = "Recente"
+        self.a.save()
+        self.assertEqual(historico.remover_antigas(30), 2)  # As criações de a e b
+
+        resposta = self.client.get(self.URL, {"since": 0})
+        self.assertEqual(resposta.status_code, 410)
+        self.assertEqual(resposta.data["cursor"], historico.cursor_atual())
+
+
+class ExpiracaoTests(TestCase):
+    def setUp(self):
+        hoje = timezone.localdate()
+        self.vencidos = [
+            Parceiro.objects.create(**_dados_parceiro(f"v{i}@x.com", api_user_id=f"api-{i}",
+                                                      data_saida=hoje - timedelta(days=i + 1)))
+            for i in range(3)
+        ]
+        self.hoje = Parceiro.objects.create(**_dados_parceiro("hoje@x.com", data_saida=hoje))
+        self.sem_saida = Parceiro.objects.create(**_dados_parceiro("sem@x.com"))
+
+    def test_desativa_so_os_vencidos_em_lotes(self):
+        desativados, erros = expiracao.processar_vencidos(lote=2)
+        self.assertEqual((desativados, erros), (3, []))
+        self.assertEqual(
+            set(Parceiro.objects.filter(status=True).values_list("email_gestor", flat=True)), {"hoje@x.com", "sem@x.com"}
+        )
+        self.assertEqual(resumo.divergencias(), {})
+        self.assertEqual(expiracao.processar_vencidos(), (0, []))
+
+    def test_historico_so_registra_o_que_mudou(self):
+        expiracao.processar_vencidos()
+        desativacoes = AlteracaoParceiro.objects.filter(campos={"status": False})
+        self.assertEqual(sorted(desativacoes.values_list("parceiro_id", flat=True)), [p.pk for p in self.vencidos])
+
+        self.assertEqual(senhas.marcar_senha_definida([self.hoje.pk, self.sem_saida.pk]), 2)
+        self.assertEqual(senhas.marcar_senha_definida([self.hoje.pk]), 0)  # Já estava definida
+        self.assertEqual(AlteracaoParceiro.objects.filter(campos={"senha_definida": True}).count(), 2)
+
+    @override_settings(PARCEIROS_OUTBOX=True)
+    def test_sincronizacao_pela_outbox(self):
+        expiracao.processar_vencidos(sincronizar=True)
+        eventos = EventoOutbox.objects.order_by("chave")
+        self.assertEqual([e.chave for e in eventos], ["v0@x.com", "v1@x.com", "v2@x.com"])
+        self.assertEqual(eventos[0].payload["api_user_id"], "api-0")
+
+    @override_settings(PARCEIROS_OUTBOX=False)
+    def test_sincronizacao_direta_relata_erros(self):
+        def atualizar(api_user_id, dados):
+            return (False, "Erro 500") if api_user_id == "api-1" else (True, None)
+
+        with mock.patch.object(services, "atualizar_usuario", side_effect=atualizar) as chamada:
+            desativados, erros = expiracao.processar_vencidos(sincronizar=True, workers=1)
+        self.assertEqual(chamada.call_count, 3)
+        self.assertEqual((desativados, erros), (3, [(self.vencidos[1].pk, "Erro 500")]))
+        self.assertFalse(EventoOutbox.objects.exists())
+
+    def test_comando_simular_nao_altera(self):
+        saida = io.StringIO()
+        call_command("expirar_parceiros", "--simular", stdout=saida)
+        self.assertIn("3 parceiro(s) vencido(s)", saida.getvalue())
+        self.assertEqual(Parceiro.objects.filter(status=True).count(), 5)
+
+
+class BancoDeDadosTests(ParceirosAPITestCase):
+    URL = "/api/v1/parceiros/"
+
+    def test_sqlite_em_wal_com_busy_timeout(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], settings.DATABASES["default"]["OPTIONS"]["timeout"] * 1000)
+
+    def test_roteador_so_usa_a_replica_quando_pedido_e_configurado(self):
+        roteador = roteamento.RoteadorBancos()
+        with roteamento.leitura_na_replica():
+            self.assertIsNone(roteador.db_for_read(Parceiro))  # Sem réplica configurada
+        with mock.patch.object(roteamento, "replica_configurada", return_value=True):
+            self.assertIsNone(roteador.db_for_read(Parceiro))
+            with roteamento.leitura_na_replica():
+                self.assertEqual(roteador.db_for_read(Parceiro), "replica")
+                self.assertEqual(roteador.db_for_write(Parceiro), "default")
+            self.assertFalse(roteador.allow_migrate("replica", "parceiros"))
+
+    @override_settings(PARCEIROS_OUTBOX=True)  # A escrita só grava no banco, sem chamar a API
+    def test_leituras_marcadas_e_escrita_fixa_o_primario(self):
+        vistos = []
+        original = roteamento.ativar_replica
+
+        def ativar(ativa=True):
+            vistos.append(ativa)
+            return original(ativa)
+
+        with mock.patch.object(roteamento, "ativar_replica", side_effect=ativar):
+            self.client.get(self.URL)
+            resposta = self.client.post(self.URL, _dados_parceiro(), format="json")
+            self.assertEqual(resposta.cookies["parceiros_primario"]["max-age"], 5)
+            self.client.get(self.URL)
+        self.assertEqual(vistos, [True, False, False])
+
+
+class AdminParceirosTests(TestCase):
+    URL = "/admin/parceiros/parceiro/"
+
+    def setUp(self):
+        cache_parceiros.get_cache().clear()
+        usuario = get_user_model().objects.create_superuser("admin", "admin@x.com", "senha")
+        self.client.force_login(usuario)
+        dados_sinteticos.semear_parceiros(250)
+
+    def test_paginacao_por_cursor_com_contagem_limitada(self):
+        primeira = self.client.get(self.URL)
+        self.assertContains(primeira, "Próxima página")
+        ids = [p.pk for p in primeira.context["cl"].result_list]
+        self.assertEqual(ids, sorted(ids, reverse=True)[:100])
+
+        segunda = self.client.get(self.URL + primeira.context["cl"].url_proxima)
+        self.assertEqual(segunda.context["cl"].result_list[0].pk, ids[-1] - 1)
+
+        with mock.patch("parceiros.admin.PaginadorEstimado.LIMITE_CONTAGEM", 100):
+            self.assertContains(self.client.get(self.URL), "Mais de 100 parceiros")
+
+    def test_busca_por_cnpj_usa_o_normalizado(self):
+        parceiro = Parceiro.objects.order_by("id").first()
+        resposta = self.client.get(self.URL, {"q": parceiro.cnpj})
+        self.assertEqual([p.pk for p in resposta.context["cl"].result_list], [parceiro.pk])
+
+    def _acao(self, acao, ids):
+        return self.client.post(self.URL, {"action": acao, "_selected_action": ids})
+
+    def test_acoes_so_enfileiram_e_o_worker_executa_em_lotes(self):
+        ids = list(Parceiro.objects.filter(status=True).order_by("id").values_list("id", flat=True)[:3])
+        self._acao("desativar", ids)
+        self.assertEqual(AcaoEmMassa.objects.get().parceiro_ids, ids)
+        self.assertEqual(Parceiro.objects.filter(id__in=ids, status=True).count(), 3)
+
+        self.assertEqual(acoes_em_massa.processar_pendentes(), (1, 1))
+        self.assertEqual(Parceiro.objects.filter(id__in=ids, status=True).count(), 0)
+        self.assertEqual(resumo.divergencias(), {})
+
+    @override_settings(PARCEIROS_SENHA_WORKERS=1)
+    def test_reenviar_senha_define_e_envia_por_email(self):
+        alvo = Parceiro.objects.filter(status=True).order_by("id").first()
+        self._acao("reenviar_senha", [alvo.pk])
+        with mock.patch.object(services, "definir_senha_usuario", return_value=(True, None)) as definir:
+            acoes_em_massa.processar_pendentes()
+        email, senha = definir.call_args.args
+        self.assertEqual(email, alvo.email_gestor)
+        self.assertEqual(mail.outbox[0].to, [alvo.email_gestor])
+        self.assertIn(senha, mail.outbox[0].body)
+        self.assertTrue(Parceiro.objects.get(pk=alvo.pk).senha_definida)
+
+
+class BuscaTests(ParceirosAPITestCase):
+    URL = "/api/v1/parceiros/autocomplete/"
+
+    def setUp(self):
+        super().setUp()
+        self.acao = Parceiro.objects.create(**_dados_parceiro(
+            "a@x.com", nome_fantasia="Ação Comércio", razao_social="ACAO LTDA", cnpj="11.222.333/0001-44"))
+        self.gestor = Parceiro.objects.create(**_dados_parceiro(
+            "b@x.com", nome_fantasia="Outra", razao_social="OUTRA SA", gestor="Acácio Souza", cnpj="55.666.777/0001-88"))
+
+    def _ids(self, q, **extra):
+        resposta = self.client.get(self.URL, {"q": q, **extra})
+        self.assertEqual(resposta.status_code, 200)
+        return [item["id"] for item in resposta.data["resultados"]]
+
+    def test_prefixos_sem_acento_ordenados_por_relevancia(self):
+        self.assertEqual(self._ids("acao com"), [self.acao.pk])
+        self.assertEqual(self._ids("COMÉ"), [self.acao.pk])
+        self.assertEqual(self._ids("ac"), [self.acao.pk, self.gestor.pk])  # Nome fantasia pesa mais que gestor
+        self.assertEqual(self._ids("55.666"), [self.gestor.pk])
+        self.assertEqual(self._ids("a"), [])
+        self.assertEqual(self.client.get(self.URL, {"q": "ac"}).data["resultados"][0]["cnpj"], "11.222.333/0001-44")
+
+    def test_indice_acompanha_saves_updates_e_deletes(self):
+        self.acao.nome_fantasia = "Zeta"
+        self.acao.save()
+        self.assertEqual(self._ids("zet"), [self.acao.pk])
+        self.assertEqual(self._ids("acao com"), [])
+
+        Parceiro.objects.filter(pk=self.acao.pk).update(status=False)
+        self.assertEqual(self._ids("zet"), [])
+        Parceiro.objects.filter(pk=self.acao.pk).update(status=True)
+        self.assertEqual(self._ids("zet"), [self.acao.pk])
+
+        self.gestor.delete()
+        self.assertEqual(self._ids("acacio"), [])
+        self.assertEqual(busca.termos("12.345.678/0001-90"), ["12345678000190"])
+        self.assertEqual(self.client.get(self.URL, {"q": "ze", "limit": 99}).status_code, 400)
+
+
+class DuplicadosTests(ParceirosAPITestCase):
+    URL = "/api/v1/parceiros/duplicados/"
+
+    def setUp(self):
+        super().setUp()
+        self.a = Parceiro.objects.create(**_dados_parceiro(
+            "a@x.com", nome_fantasia="Ação Comércio", razao_social="Ação Comércio de Alimentos Ltda",
+            cnpj="11.222.333/0001-44"))
+        self.b = Parceiro.objects.create(**_dados_parceiro(
+            "b@x.com", nome_fantasia="ACAO COMERCIO", razao_social="ACAO COMERCIO DE ALIMENTOS S/A",
+            cnpj="99.888.777/0001-66"))
+        self.c = Parceiro.objects.create(**_dados_parceiro(
+            "c@x.com", nome_fantasia="Outra Empresa", razao_social="Outra Empresa Ltda", cnpj="11222333000144"))
+        self.d = Parceiro.objects.create(**_dados_parceiro(
+            "d@x.com", nome_fantasia="Zeta Transportes", razao_social="Zeta Transportes Ltda",
+            cnpj="55.666.777/0001-88"))
+
+    def test_relatorio_agrupa_por_cnpj_e_nome_parecido(self):
+        resposta = self.client.get(self.URL)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data["total_grupos"], 1)
+        grupo = resposta.data["grupos"][0]
+        self.assertEqual([p["id"] for p in grupo["parceiros"]], [self.a.pk, self.b.pk, self.c.pk])
+        motivos = {(par["a"], par["b"]): par["motivo"] for par in grupo["pares"]}
+        self.assertEqual(motivos[(self.a.pk, self.b.pk)], "NOME")
+        self.assertEqual(motivos[(self.a.pk, self.c.pk)], "CNPJ")
+        self.assertEqual(self.client.get(self.URL, {"limiar": 2}).status_code, 400)
+
+    def test_blocos_grandes_mantem_cnpj_e_ligam_nomes_em_cadeia(self):
+        e = Parceiro.objects.create(**_dados_parceiro(
+            "e@x.com", nome_fantasia="Acao Comercio", razao_social="Acao Comercio de Alimentos",
+            cnpj="44.333.222/0001-11"))
+        relatorio = duplicados.encontrar_duplicados(tamanho_maximo_bloco=1)
+        self.assertEqual(relatorio["total_grupos"], 1)
+        grupo = relatorio["grupos"][0]
+        self.assertEqual([p["id"] for p in grupo["parceiros"]], [self.a.pk, self.b.pk, self.c.pk, e.pk])
+        pares = {(par["a"], par["b"]): par["motivo"] for par in grupo["pares"]}
+        self.assertEqual(pares[(self.a.pk, self.c.pk)], "CNPJ")
+        self.assertNotIn((self.a.pk, e.pk), pares)  # Só vizinhos nas bandas de nome
+
+    def test_chaves_acompanham_saves_e_deletes(self):
+        self.d.nome_fantasia = self.d.razao_social = "Acao Comercio Alimentos"
+        self.d.save()
+        self.assertIn(self.d.pk, [c["id"] for c in duplicados.candidatos_para(_dados_parceiro(
+            nome_fantasia="Acão Comercio", razao_social="ACAO COMERCIO ALIMENTOS", cnpj="1"))])
+        self.c.delete()
+        self.assertFalse(ChaveDuplicidade.objects.filter(parceiro_id=self.c.pk).exists())
+
+        antes = set(ChaveDuplicidade.objects.values_list("parceiro_id", "chave"))
+        duplicados.reindexar()
+        self.assertEqual(set(ChaveDuplicidade.objects.values_list("parceiro_id", "chave")), antes)
+
+    @override_settings(PARCEIROS_OUTBOX=False)
+    def test_create_barra_duplicado_antes_de_chamar_a_api(self):
+        with mock.patch.object(services, "criar_parceiro_completo", return_value=("api-1", None)) as criar:
+            resposta = self.client.post("/api/v1/parceiros/", _dados_parceiro(
+                "novo@x.com", nome_fantasia="Zeta Transporte", razao_social="ZETA TRANSPORTE LTDA ME", cnpj="1"))
+            self.assertEqual(resposta.status_code, 409)
+            self.assertEqual([p["id"] for p in resposta.data["duplicados"]], [self.d.pk])
+            criar.assert_not_called()
+
+            resposta = self.client.post("/api/v1/parceiros/?ignorar_duplicados=true", _dados_parceiro(
+                "novo@x.com", nome_fantasia="Zeta Transporte", razao_social="ZETA TRANSPORTE LTDA ME", cnpj="1"))
+        self.assertEqual(resposta.status_code, 201)
+        criar.assert_called_once()
+
+
+@override_settings(PARCEIROS_OUTBOX=False)
+class IdempotenciaTests(ParceirosAPITestCase):
+    URL = "/api/v1/parceiros/"
+
+    def _post(self, dados, chave="chave-1"):
+        return self.client.post(self.URL, dados, format="json", headers={"Idempotency-Key": chave})
+
+    def test_repeticao_devolve_a_resposta_gravada_sem_chamar_a_api(self):
+        with mock.patch.object(services, "criar_parceiro_completo", return_value=("api-1", None)) as criar:
+            primeira = self._post(_dados_parceiro())
+            repetida = self._post(_dados_parceiro())
+        self.assertEqual((primeira.status_code, repetida.status_code), (201, 201))
+        self.assertEqual(repetida.json(), primeira.json())
+        self.assertEqual(repetida["Idempotent-Replayed"], "true")
+        self.assertNotIn("Idempotent-Replayed", primeira)
+        criar.assert_called_once()
+        self.assertEqual(Parceiro.objects.count(), 1)
+
+        outra = self._post(_dados_parceiro(nome_fantasia="Outro"))
+        self.assertEqual(outra.status_code, 422)  # Mesma chave, outro corpo
+
+    def test_chave_vale_por_cliente(self):
+        outro = {"nome_fantasia": "Outra", "razao_social": "OUTRA SA", "cnpj": "98.765.432/0001-10"}
+        with mock.patch.object(services, "criar_parceiro_completo", side_effect=[("api-1", None), ("api-2", None)]) as criar:
+            primeira = self._post(_dados_parceiro())
+            segunda = self.client.post(self.URL, _dados_parceiro("b@x.com", **outro), format="json",
+                                       headers={"Idempotency-Key": "chave-1"}, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual((primeira.status_code, segunda.status_code), (201, 201))
+        self.assertNotIn("Idempotent-Replayed", segunda)
+        self.assertEqual(criar.call_count, 2)
+
+    def test_falha_5xx_libera_a_chave(self):
+        with mock.patch.object(services, "criar_parceiro_completo",
+                               side_effect=resiliencia.ServicoIndisponivel("fora do ar")):
+            self.assertEqual(self._post(_dados_parceiro()).status_code, 503)
+        self.assertFalse(RespostaIdempotente.objects.exists())
+        with mock.patch.object(services, "criar_parceiro_completo", return_value=("api-1", None)):
+            self.assertEqual(self._post(_dados_parceiro()).status_code, 201)
+
+    @override_settings(PARCEIROS_IDEMPOTENCIA_ESPERA=0.2, PARCEIROS_IDEMPOTENCIA_TIMEOUT_RESERVA=60)
+    def test_requisicao_em_andamento_espera_e_reserva_abandonada_e_assumida(self):
+        self.assertEqual(idempotencia.reservar("k", "p")[0], idempotencia.NOVA)
+        self.assertEqual(idempotencia.reservar("k", "p")[0], idempotencia.EM_ANDAMENTO)
+        self.assertEqual(idempotencia.reservar("k", "outra")[0], idempotencia.CONFLITO)
+        RespostaIdempotente.objects.update(reservada_em=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(idempotencia.reservar("k", "p")[0], idempotencia.NOVA)
+
+        with mock.patch.object(idempotencia, "reservar", return_value=(idempotencia.EM_ANDAMENTO, None)), \
+                mock.patch.object(idempotencia, "consultar") as consultar, \
+                mock.patch.object(services, "criar_parceiro_completo") as criar:
+            resposta = self._post(_dados_parceiro())
+        self.assertEqual(resposta.status_code, 409)  # Na hora: a rota síncrona não espera
+        self.assertEqual(resposta["Retry-After"], "1")
+        consultar.assert_not_called()
+        criar.assert_not_called()
+
+        RespostaIdempotente.objects.update(expira_em=timezone.now())
+        self.assertEqual(idempotencia.remover_expiradas(), 1)
+
+    async def test_rota_async_tambem_repete(self):
+        dados = json.dumps({"email_gestor": "invalido"})
+        primeira = await self.async_client.post("/api/v1/async/parceiros/", dados, content_type="application/json",
+                                                headers={"Idempotency-Key": "async-1"})
+        repetida = await self.async_client.post("/api/v1/async/parceiros/", dados, content_type="application/json",
+                                                headers={"Idempotency-Key": "async-1"})
+        self.assertEqual((primeira.status_code, repetida.status_code), (400, 400))
+        self.assertEqual(repetida.json(), primeira.json())
+        self.assertEqual(repetida["Idempotent-Replayed"], "true")
+
+
+@override_settings(PARCEIROS_OUTBOX=False)  # Chamadas diretas à API
+class EdicaoSincronizadaTests(ParceirosAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.parceiro = Parceiro.objects.create(**dict(_dados_parceiro(), api_user_id="api-1"))
+        self.url = f"/api/v1/parceiros/{self.parceiro.pk}/"
+
+    def test_telefone_e_gestor_nao_chamam_a_api(self):
+        with mock.patch.object(services, "atualizar_usuario") as atualizar:
+            resposta = self.client.patch(self.url, {"telefone_gestor": "1188887777", "gestor": "Beltrano"})
+            self.client.patch(self.url, {"nome_fantasia": "ACME"})  # mesmo valor: sem diferença
+        self.assertEqual(resposta.status_code, 200)
+        atualizar.assert_not_called()
+        self.assertEqual(Parceiro.objects.get(pk=self.parceiro.pk).gestor, "Beltrano")
+
+    def test_campo_da_api_sincroniza_e_falha_desfaz_o_local(self):
+        with mock.patch.object(services, "atualizar_usuario", return_value=(True, None)) as atualizar:
+            self.client.patch(self.url, {"nome_fantasia": "ACME Nova"})
+        atualizar.assert_called_once()
+        self.assertEqual(atualizar.call_args.args[1]["nome_fantasia"], "ACME Nova")
+
+        with mock.patch.object(services, "atualizar_usuario", return_value=(False, "Erro 500")):
+            resposta = self.client.patch(self.url, {"tipo": "DISTRIBUIDOR"})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertEqual(Parceiro.objects.get(pk=self.parceiro.pk).tipo, "INDUSTRIA")
+
+    def test_api_antes_do_banco_e_falha_local_restaura_a_api(self):
+        with mock.patch.object(services, "atualizar_usuario", return_value=(True, None)) as atualizar, \
+                mock.patch("parceiros.api.serializers.ParceiroSerializer.save", side_effect=RuntimeError("falhou")):
+            resposta = self.client.patch(self.url, {"tipo": "DISTRIBUIDOR"})
+        self.assertEqual(resposta.status_code, 500)
+        self.assertEqual([chamada.args[1]["tipo"] for chamada in atualizar.call_args_list], ["DISTRIBUIDOR", "INDUSTRIA"])
+        self.assertFalse(EventoOutbox.objects.exists())
+
+    def test_restauracao_recusada_pela_api_fica_na_outbox(self):
+        respostas = [(True, None), resiliencia.ServicoIndisponivel("limite")]
+        with mock.patch.object(services, "atualizar_usuario", side_effect=respostas), \
+                mock.patch("parceiros.api.serializers.ParceiroSerializer.save", side_effect=RuntimeError("falhou")):
+            resposta = self.client.patch(self.url, {"tipo": "DISTRIBUIDOR"})
+        self.assertEqual(resposta.status_code, 500)
+        evento = EventoOutbox.objects.get()
+        self.assertEqual((evento.operacao, evento.payload["dados"]["tipo"]), ("ATUALIZAR", "INDUSTRIA"))
+
+    def test_delete_chama_a_api_antes_de_apagar_a_linha(self):
+        def deletar(email):
+            self.assertTrue(Parceiro.objects.filter(pk=self.parceiro.pk).exists())
+            return True, None
+
+        with mock.patch.object(services, "deletar_usuario", side_effect=deletar):
+            self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assertFalse(Parceiro.objects.filter(pk=self.parceiro.pk).exists())
+
+    def test_delete_remove_na_api_e_mantem_a_linha_se_falhar(self):
+        with mock.patch.object(services, "deletar_usuario", return_value=(False, "Erro 500")):
+            self.assertEqual(self.client.delete(self.url).status_code, 400)
+        self.assertTrue(Parceiro.objects.filter(pk=self.parceiro.pk).exists())
+
+        with mock.patch.object(services, "deletar_usuario", return_value=(True, None)) as deletar:
+            self.assertEqual(self.client.delete(self.url).status_code, 204)
+        deletar.assert_called_once_with("gestor@acme.com")
+        self.assertFalse(Parceiro.objects.filter(pk=self.parceiro.pk).exists())
+
+
+@override_settings(PARCEIROS_OUTBOX=True)
+class OutboxTests(ParceirosAPITestCase):
+    def test_desfazer_criacao_nao_apaga_usuario_de_parceiro_existente(self):
+        evento = outbox.registrar_desfazer_criacao("gestor@acme.com")  # O cliente repetiu e o cadastro deu certo
+        with mock.patch.object(services, "deletar_usuario") as deletar:
+            self.assertEqual(outbox.despachar_pendentes(workers=1), (1, 1))
+        deletar.assert_not_called()
+        self.assertEqual(EventoOutbox.objects.get(pk=evento.pk).estado, "CONCLUIDO")
+        self.assertIsNone(outbox.desfazer_criacao("gestor@acme.com"))
+
+    @override_settings(PARCEIROS_OUTBOX=False)
+    def test_falha_ao_gravar_depois_da_criacao_desfaz_na_hora(self):
+        with mock.patch.object(services, "criar_parceiro_completo", return_value=("api-2", None)), \
+                mock.patch.object(services, "rollback_criacao_usuario", return_value=True) as rollback, \
+                mock.patch("parceiros.api.serializers.ParceiroSerializer.save", side_effect=RuntimeError("falhou")):
+            resposta = self.client.post("/api/v1/parceiros/", _dados_parceiro(
+                "novo@x.com", nome_fantasia="Nova", razao_social="NOVA SA", cnpj="98.765.432/0001-10"))
+        self.assertEqual(resposta.status_code, 500)
+        rollback.assert_called_once_with("novo@x.com")
+        self.assertFalse(EventoOutbox.objects.filter(operacao="DESFAZER_CRIACAO").exists())
+
+    def test_reversao_recusada_pela_api_vai_para_a_outbox(self):
+        with mock.patch.object(services, "_cadastrar_usuario_e_buscar_id", return_value=({"id": "api-2"}, None)), \
+                mock.patch.object(services, "_linkar_usuario_ao_grupo", return_value=(False, "403")), \
+                mock.patch.object(services, "rollback_criacao_usuario", return_value=False):
+            api_id, erro = services.criar_parceiro_completo(_dados_parceiro("novo@x.com"))
+        self.assertIsNone(api_id)
+        self.assertNotIn("foi revertido", erro)
+        self.assertIn(services.MENSAGEM_REVERSAO_AGENDADA, erro)
+        self.assertEqual(list(EventoOutbox.objects.values_list("chave", "operacao")),
+                         [("novo@x.com", "DESFAZER_CRIACAO")])
+
+    def test_falha_no_get_depois_do_post_desfaz_no_servico(self):
+        respostas = [_resposta(200), resiliencia.ServicoIndisponivel("limite")]
+        with mock.patch.object(services, "_requisitar", side_effect=respostas), \
+                mock.patch.object(services, "rollback_criacao_usuario", return_value=True) as rollback:
+            with self.assertRaises(resiliencia.ServicoIndisponivel):
+                services.criar_parceiro_completo(_dados_parceiro("novo@x.com"))
+        rollback.assert_called_once_with("novo@x.com")
+
+    def setUp(self):
+        super().setUp()
+        self.parceiro = Parceiro.objects.create(**dict(_dados_parceiro(), api_user_id="api-1"))
+        self.url = f"/api/v1/parceiros/{self.parceiro.pk}/"
+
+    def test_escritas_so_gravam_eventos_sem_chamar_a_api(self):
+        with mock.patch.object(services, "_requisitar") as requisitar:
+            self.client.patch(self.url, {"telefone_gestor": "1188887777"})
+            self.client.patch(self.url, {"nome_fantasia": "ACME Nova"})
+            resposta = self.client.delete(self.url)
+        requisitar.assert_not_called()
+        self.assertEqual(resposta.status_code, 204)
+        eventos = list(EventoOutbox.objects.order_by("id").values_list("operacao", "chave"))
+        self.assertEqual(eventos, [("ATUALIZAR", "gestor@acme.com"), ("DELETAR", "gestor@acme.com")])
+        self.assertEqual(EventoOutbox.objects.first().payload["dados"]["nome_fantasia"], "ACME Nova")
+
+    def test_despacho_em_ordem_por_chave_com_idempotencia(self):
+        primeiro = outbox.registrar_atualizacao(self.parceiro)
+        segundo = outbox.registrar_delecao(self.parceiro)
+        outro = outbox.registrar_desfazer_criacao("outro@x.com")
+
+        with mock.patch.object(services, "atualizar_usuario", return_value=(False, "Erro 500")) as atualizar, \
+                mock.patch.object(services, "deletar_usuario", return_value=(True, None)) as deletar:
+            # Um evento por chave no lote: a deleção espera a atualização
+            self.assertEqual(outbox.despachar_pendentes(workers=1), (2, 1))
+            self.assertEqual(atualizar.call_args.kwargs["chave_idempotencia"], primeiro.chave_idempotencia)
+            deletar.assert_called_once_with("outro@x.com", chave_idempotencia=outro.chave_idempotencia)
+
+            # A atualização falhou e está em backoff: a fila da chave fica parada
+            self.assertEqual(outbox.despachar_pendentes(workers=1), (0, 0))
+            EventoOutbox.objects.filter(pk=primeiro.pk).update(proxima_tentativa=primeiro.criado_em)
+            atualizar.return_value = (True, None)
+            self.assertEqual(outbox.despachar_pendentes(workers=1), (1, 1))
+            self.assertEqual(outbox.despachar_pendentes(workers=1), (1, 1))
+
+        segundo.refresh_from_db()
+        self.assertEqual(segundo.estado, "CONCLUIDO")
+        self.assertEqual(EventoOutbox.objects.get(pk=primeiro.pk).tentativas, 2)
+
+    def test_evento_espera_o_provisionamento_e_usa_o_id_criado(self):
+        Parceiro.objects.filter(pk=self.parceiro.pk).update(api_user_id=None, status_provisionamento="PENDENTE")
+        self.parceiro.refresh_from_db()
+        tarefa = provisionamento.enfileirar_provisionamento(self.parceiro)
+        outbox.registrar_atualizacao(self.parceiro)
+        self.assertEqual(outbox.reservar_eventos(10), [])
+
+        with mock.patch.object(services, "criar_parceiro_completo", return_value=("api-9", None)):
+            provisionamento.processar_pendentes(workers=1)
+        with mock.patch.object(services, "atualizar_usuario", return_value=(True, None)) as atualizar:
+            self.assertEqual(outbox.despachar_pendentes(workers=1), (1, 1))
+        self.assertEqual(atualizar.call_args.args[0], "api-9")
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.estado, "CONCLUIDA")
+
+    def test_idempotency_key_vai_no_header(self):
+        with mock.patch.object(services, "_requisitar", return_value=_resposta(200)) as requisitar:
+            services.deletar_usuario("gestor@acme.com", chave_idempotencia="abc")
+        self.assertEqual(requisitar.call_args.kwargs["headers"], {"Idempotency-Key": "abc"})
+
+
+@override_settings(PARCEIROS_SENHA_WORKERS=1)
+class DefinirSenhaTests(ParceirosAPITestCase):
+    URL = "/api/v1/parceiros/"
+
+    def setUp(self):
+        super().setUp()
+        self.a = Parceiro.objects.create(**_dados_parceiro("a@x.com"))
+        self.b = Parceiro.objects.create(**_dados_parceiro("b@x.com"))
+
+    def test_definir_senha_marca_o_parceiro(self):
+        with mock.patch.object(services, "definir_senha_usuario", return_value=(True, None)) as definir:
+            resposta = self.client.post(f"{self.URL}{self.a.pk}/definir-senha/", {"senha": "Senha@123"})
+        self.assertEqual(resposta.data, {"id": self.a.pk, "senha_definida": True})
+        definir.assert_called_once_with("a@x.com", "Senha@123")
+        self.assertTrue(Parceiro.objects.get(pk=self.a.pk).senha_definida)
+
+        with mock.patch.object(services, "definir_senha_usuario", return_value=(False, "Erro 400")):
+            resposta = self.client.post(f"{self.URL}{self.b.pk}/definir-senha/", {"senha": "x"})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertFalse(Parceiro.objects.get(pk=self.b.pk).senha_definida)
+
+    def test_lote_relata_cada_parceiro_e_atualiza_so_os_definidos(self):
+        def definir(email, senha):
+            return (True, None) if email == "a@x.com" else (False, "Erro 404")
+
+        itens = [{"id": self.a.pk, "senha": "s1"}, {"id": self.b.pk, "senha": "s2"}, {"id": 999, "senha": "s3"}]
+        with mock.patch.object(services, "definir_senha_usuario", side_effect=definir):
+            resposta = self.client.post(f"{self.URL}definir-senha-lote/", itens, format="json")
+
+        self.assertEqual(resposta.data["resumo"], {"DEFINIDA": 1, "ERRO": 1, "NAO_ENCONTRADO": 1})
+        self.assertEqual([r["id"] for r in resposta.data["resultados"]], [self.a.pk, self.b.pk, 999])
+        self.assertEqual(list(Parceiro.objects.filter(senha_definida=True).values_list("pk", flat=True)), [self.a.pk])
+
+    def test_lote_rejeita_repetidos_e_vazio(self):
+        repetidos = [{"id": self.a.pk, "senha": "s"}, {"id": self.a.pk, "senha": "t"}]
+        self.assertEqual(self.client.post(f"{self.URL}definir-senha-lote/", repetidos, format="json").status_code, 400)
+        self.assertEqual(self.client.post(f"{self.URL}definir-senha-lote/", [], format="json").status_code, 400)
+
+
+class ReconciliacaoTests(TestCase):
+    def setUp(self):
+        self.ok = Parceiro.objects.create(**dict(_dados_parceiro("ok@x.com"), api_user_id="1"))
+        self.sem_id = Parceiro.objects.create(**_dados_parceiro("semid@x.com"))
+        self.divergente = Parceiro.objects.create(**dict(_dados_parceiro("div@x.com"), api_user_id="3"))
+        self.sumido = Parceiro.objects.create(**dict(_dados_parceiro("sumido@x.com"), api_user_id="4"))
+        self.paginas = [
+            [{"id": "1", "email": "OK@x.com", "name": "ACME", "department": "INDUSTRIA"},
+             {"id": "2", "email": "semid@x.com", "name": "ACME", "department": "INDUSTRIA"}],
+            [{"id": "3", "email": "div@x.com", "name": "Outro Nome", "department": "INDUSTRIA"},
+             {"id": "5", "email": "orfao@x.com", "department": "DISTRIBUIDOR"},
+             {"id": "6", "email": "admin@x.com", "name": "Admin", "department": "TI"}],
+        ]
+
+    def test_diff_em_uma_passada(self):
+        divergencias = list(reconciliacao.comparar(reconciliacao.indexar_parceiros(), self.paginas))
+        self.assertEqual(
+            sorted((item["tipo"], item["email"]) for item in divergencias),
+            [("dados_divergentes", "div@x.com"), ("local_sem_api_id", "semid@x.com"),
+             ("local_sem_remoto", "sumido@x.com"), ("remoto_orfao", "orfao@x.com")],
+        )
+
+    def test_usuario_remoto_que_nao_e_parceiro_nao_e_orfao(self):
+        divergencias = list(reconciliacao.comparar(reconciliacao.indexar_parceiros(), self.paginas))
+        self.assertNotIn("admin@x.com", [item["email"] for item in divergencias])
+        with mock.patch.object(services, "atualizar_usuario", return_value=(True, None)), \
+                mock.patch.object(services, "deletar_usuario", return_value=(True, None)) as deletar:
+            reconciliacao.aplicar_correcoes(divergencias, workers=1, chamadas_por_segundo=0, remover_orfaos=True)
+        deletar.assert_called_once_with("orfao@x.com")
+
+    def test_aplicar_correcoes(self):
+        divergencias = list(reconciliacao.comparar(reconciliacao.indexar_parceiros(), self.paginas))
+        with mock.patch.object(services, "atualizar_usuario", return_value=(True, None)) as atualizar, \
+                mock.patch.object(services, "deletar_usuario") as deletar:
+            reconciliacao.aplicar_correcoes(divergencias, workers=1, chamadas_por_segundo=0)
+
+        atualizar.assert_called_once()
+        deletar.assert_not_called()  # órfãos só com remover_orfaos=True
+        self.assertEqual(Parceiro.objects.get(pk=self.sem_id.pk).api_user_id, "2")
+        self.assertEqual(Parceiro.objects.get(pk=self.sumido.pk).status_provisionamento, "PENDENTE")
+        self.assertTrue(TarefaProvisionamento.objects.filter(parceiro=self.sumido).exists())
+
+
+@override_settings(EMBEDDED_API_DISJUNTOR_VOLUME_MINIMO=2, EMBEDDED_API_RATE_LIMIT=None)
+class ResilienciaTests(ParceirosAPITestCase):
+    @override_settings(PARCEIROS_OUTBOX=False)
+    def test_disjuntor_abre_e_create_responde_503_sem_chamar_a_api(self):
+        session = mock.Mock()
+        session.request.return_value = _resposta(503)
+        with mock.patch.object(services, "get_session", return_value=session):
+            for _ in range(2):
+                services._linkar_usuario_ao_grupo("a@b.com")
+            self.assertEqual(resiliencia.get_disjuntor().estado, resiliencia.ABERTO)
+
+            session.request.reset_mock()
+            resposta = self.client.post("/api/v1/parceiros/", _dados_parceiro())
+
+        self.assertEqual(resposta.status_code, 503)
+        self.assertIn("Retry-After", resposta)
+        session.request.assert_not_called()
+        self.assertFalse(EventoOutbox.objects.exists())  # Nada foi criado na API: nada a desfazer
+        self.assertEqual(self.client.get("/api/v1/parceiros/status-api/").data["disjuntor"]["aberturas"], 1)
+
+    def test_excecao_na_chamada_de_teste_nao_prende_o_disjuntor(self):
+        disjuntor = resiliencia.Disjuntor(volume_minimo=1, tempo_aberto=0)
+        disjuntor.registrar_falha()
+        session = mock.Mock()
+        session.request.side_effect = [ValueError("configuração inválida"), _resposta(200)]
+        with mock.patch.object(services, "get_disjuntor", return_value=disjuntor), \
+                mock.patch.object(services, "get_session", return_value=session):
+            with self.assertRaises(ValueError):
+                services._requisitar("GET", services._api_url(), "get")
+            self.assertEqual(services._requisitar("GET", services._api_url(), "get").status_code, 200)
+        self.assertEqual(disjuntor.estado, resiliencia.FECHADO)
+
+    def test_disjuntor_semi_aberto_fecha_com_sucesso(self):
+        disjuntor = resiliencia.Disjuntor(volume_minimo=1, tempo_aberto=0)
+        disjuntor.registrar_falha()
+        self.assertTrue(disjuntor.permitir())   # chamada de teste
+        self.assertFalse(disjuntor.permitir())  # só uma por vez
+        disjuntor.registrar_sucesso()
+        self.assertEqual(disjuntor.estado, resiliencia.FECHADO)
+
+    def test_token_bucket_compartilhado_pelo_arquivo(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "bucket.sqlite3")
+            primeiro = resiliencia.TokenBucket("api", taxa=0.001, capacidade=2, caminho=caminho)
+            outro_processo = resiliencia.TokenBucket("api", taxa=0.001, capacidade=2, caminho=caminho)
+
+            self.assertTrue(primeiro.adquirir())
+            self.assertTrue(outro_processo.adquirir())
+            self.assertFalse(primeiro.adquirir(espera_maxima=0))
+            self.assertEqual(primeiro.metricas()["negadas"], 1)
+
+
+class InstrumentacaoTests(ParceirosAPITestCase):
+    def test_metrics_exporta_rota_consultas_e_chamadas_externas(self):
+        Parceiro.objects.create(**_dados_parceiro("m@x.com", api_user_id="m1"))
+        self.client.get("/api/v1/parceiros/")
+
+        session = mock.Mock()
+        session.request.return_value = _resposta(200)
+        with mock.patch.object(services, "get_session", return_value=session):
+            services.definir_senha_usuario("m@x.com", "Senha@123")
+
+        with override_settings(METRICAS_TOKEN="segredo"):
+            corpo = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer segredo").content.decode()
+        self.assertIn('http_requisicao_duracao_segundos_count{metodo="GET",rota="parceiro-list",status="200"}', corpo)
+        self.assertIn('http_requisicao_fase_duracao_segundos_count{fase="serializacao",rota="parceiro-list"}', corpo)
+        self.assertIn('embedded_api_duracao_segundos_count{operacao="change-password",status="200"}', corpo)
+        self.assertIn('embedded_api_disjuntor_estado{estado="FECHADO"} 1', corpo)
+        self.assertIn('# TYPE embedded_api_disjuntor_eventos_total counter', corpo)
+        self.assertIn('parceiros_cache_consultas_total{resultado="falha"}', corpo)
+
+    @override_settings(INSTRUMENTACAO_LIMIAR_LENTO=0)
+    def test_requisicao_lenta_vai_para_o_log_com_as_consultas(self):
+        with self.assertLogs("backend_api.instrumentacao", level="WARNING") as logs:
+            self.client.get("/api/v1/parceiros/")
+        self.assertIn("parceiro-list", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+    @override_settings(METRICAS_TOKEN="segredo")
+    def test_metrics_exige_token_quando_configurado(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        resposta = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer segredo")
+        self.assertEqual(resposta.status_code, 200)
+
+    @override_settings(METRICAS_TOKEN="")
+    def test_metrics_fechado_sem_token_configurado(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+
+@override_settings(EMBEDDED_API_RATE_LIMIT=None)
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        resiliencia.reiniciar()
+        self.addCleanup(services.fechar_session)
+
+    def test_servicos_contra_a_api_falsa(self):
+        dados = {"email_gestor": "a@b.com", "nome_fantasia": "ACME", "tipo": "INDUSTRIA"}
+        with ServidorApiFalsa() as api, override_settings(EMBEDDED_API_URL=api.url):
+            api_id, erro = services.criar_parceiro_completo(dados)
+            self.assertIsNone(erro)
+            self.assertEqual(services.definir_senha_usuario("a@b.com", "Senha@123"), (True, None))
+            self.assertEqual(services.deletar_usuario("a@b.com"), (True, None))
+
+        self.assertTrue(api_id)
+        self.assertEqual(api.estado.chamadas, {
+            "POST /api/user": 1, "PUT /link-groups": 1, "PUT /change-password": 1, "DELETE /api/user": 1,
+        })
+
+    def test_resumo_das_medicoes(self):
+        resumo = benchmark.resumir_medicoes(list(range(1, 101)), [2] * 100, [200] * 99 + [503], 2.0)
+        self.assertEqual(resumo["req_por_s"], 50)
+        self.assertEqual((resumo["latencia_ms"]["p50"], resumo["latencia_ms"]["p95"], resumo["latencia_ms"]["p99"]),
+                         (50, 95, 99))
+        self.assertEqual(resumo["erros"], {"503": 1})
+
+
+@override_settings(EMBEDDED_API_RATE_LIMIT=None)
+@override_settings(PARCEIROS_OUTBOX=False)  # Chamadas diretas à API
+class ViewsAsyncTests(TestCase):
+    URL = "/api/v1/async/parceiros/"
+
+    def setUp(self):
+        resiliencia.reiniciar()
+        cache_parceiros.get_cache().clear()
+
+    def _api(self, tratar):
+        cliente = httpx.AsyncClient(transport=httpx.MockTransport(tratar))
+        return mock.patch.object(services_async, "get_cliente", return_value=cliente)
+
+    async def test_criacao_busca_o_id_e_vincula_o_grupo_em_paralelo(self):
+        chegaram = []
+        ambos = asyncio.Event()
+
+        async def tratar(request):
+            if request.method == "POST":
+                return httpx.Response(200, json={})
+            # GET e link-groups só respondem quando os dois estiverem em andamento
+            chegaram.append(request.method)
+            if len(chegaram) == 2:
+                ambos.set()
+            await asyncio.wait_for(ambos.wait(), timeout=2)
+            if request.method == "GET":
+                return httpx.Response(200, json={"data": [{"id": "api-1", "email": "a@b.com"}]})
+            return httpx.Response(200, json={})
+
+        with self._api(tratar):
+            resposta = await self.async_client.post(self.URL, _dados_parceiro("a@b.com"),
+                                                    content_type="application/json")
+
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual(sorted(chegaram), ["GET", "PUT"])
+        parceiro = await Parceiro.objects.aget(email_gestor="a@b.com")
+        self.assertEqual(parceiro.api_user_id, "api-1")
+
+    async def test_falha_no_vinculo_desfaz_o_usuario(self):
+        metodos = []
+
+        def tratar(request):
+            metodos.append(request.method)
+            if request.method == "PUT":
+                return httpx.Response(403)
+            return httpx.Response(200, json={"id": "api-1", "email": "a@b.com"})
+
+        with self._api(tratar):
+            resposta = await self.async_client.post(self.URL, _dados_parceiro("a@b.com"),
+                                                    content_type="application/json")
+
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn("revertido", resposta.json()["detail"])
+        self.assertEqual(metodos, ["POST", "PUT", "DELETE"])
+        self.assertFalse(await Parceiro.objects.filter(email_gestor="a@b.com").aexists())
+
+    async def test_falha_na_busca_e_no_vinculo_ainda_desfaz_o_usuario(self):
+        metodos = []
+
+        def tratar(request):
+            metodos.append(request.method)
+            if request.method == "POST":
+                return httpx.Response(200, json={})
+            if request.method == "DELETE":
+                return httpx.Response(204)
+            return httpx.Response(403 if request.method == "PUT" else 500)
+
+        with self._api(tratar):
+            resposta = await self.async_client.post(self.URL, _dados_parceiro("a@b.com"),
+                                                    content_type="application/json")
+
+        self.assertEqual(resposta.status_code, 400)
+        self.assertEqual(metodos[-1], "DELETE")
+        self.assertFalse(await EventoOutbox.objects.aexists())
+
+    async def test_consultas_da_view_async_entram_na_metrica(self):
+        # A conexão do teste abriu antes de o middleware carregar (no servidor o sinal a cobre)
+        await sync_to_async(middleware._instalar_nas_conexoes_da_thread)()
+        tratar = mock.Mock(return_value=httpx.Response(200, json={"id": "api-1", "email": "a@b.com"}))
+        with self._api(tratar), mock.patch.object(metricas.REQUISICOES_CONSULTAS, "observar") as observar:
+            resposta = await self.async_client.post(self.URL, _dados_parceiro("a@b.com"),
+                                                    content_type="application/json")
+
+        self.assertEqual(resposta.status_code, 201)
+        consultas = observar.call_args.args[0]
+        self.assertEqual(observar.call_args.kwargs, {"rota": "parceiro-async-list"})
+        self.assertGreater(consultas, 0)  # O ORM roda em outra thread, com outra conexão
+
+    async def test_definir_senha_valida_o_corpo(self):
+        parceiro = await Parceiro.objects.acreate(**dict(_dados_parceiro("s@x.com"), api_user_id="s1"))
+        tratar = mock.Mock(return_value=httpx.Response(200, json={}))
+        with self._api(tratar):
+            resposta = await self.async_client.post(f"{self.URL}{parceiro.pk}/definir-senha/",
+                                                    {"senha": ""}, content_type="application/json")
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn("senha", resposta.json())
+        tratar.assert_not_called()
+
+    async def test_definir_senha_e_deletar(self):
+        parceiro = await Parceiro.objects.acreate(**dict(_dados_parceiro("s@x.com"), api_user_id="s1"))
+        with self._api(lambda request: httpx.Response(200, json={})):
+            resposta = await self.async_client.post(f"{self.URL}{parceiro.pk}/definir-senha/",
+                                                    {"senha": "Senha@123"}, content_type="application/json")
+            self.assertEqual(resposta.status_code, 200)
+            self.assertTrue((await Parceiro.objects.aget(pk=parceiro.pk)).senha_definida)
+            self.assertTrue(await AlteracaoParceiro.objects.filter(
+                parceiro_id=parceiro.pk, operacao="ALTERACAO", campos={"senha_definida": True}).aexists())
+
+            resposta = await self.async_client.delete(f"{self.URL}{parceiro.pk}/")
+        self.assertEqual(resposta.status_code, 204)
+        self.assertFalse(await Parceiro.objects.filter(pk=parceiro.pk).aexists())
+
+    async def test_falha_no_banco_apos_atualizar_restaura_a_api(self):
+        parceiro = await Parceiro.objects.acreate(**dict(_dados_parceiro("u@x.com"), api_user_id="u1"))
+        with self._api(lambda request: httpx.Response(200, json={})), \
+                mock.patch("parceiros.api.serializers.ParceiroSerializer.save", side_effect=RuntimeError("falhou")), \
+                mock.patch.object(outbox, "restaurar_na_api") as restaurar:
+            resposta = await self.async_client.patch(f"{self.URL}{parceiro.pk}/", {"nome_fantasia": "Novo"},
+                                                     content_type="application/json")
+        self.assertEqual(resposta.status_code, 500)
+        restaurar.assert_called_once_with(parceiro.pk)
+
+    async def test_atualizacao_so_chama_a_api_quando_campos_dela_mudam(self):
+        parceiro = await Parceiro.objects.acreate(**dict(_dados_parceiro("u@x.com"), api_user_id="u1"))
+        metodos = []
+
+        def tratar(request):
+            metodos.append(request.method)
+            return httpx.Response(200, json={})
+
+        with self._api(tratar):
+            resposta = await self.async_client.patch(f"{self.URL}{parceiro.pk}/", {"gestor": "Outro"},
+                                                     content_type="application/json")
+            self.assertEqual(resposta.status_code, 200)
+            self.assertEqual(metodos, [])
+
+            await self.async_client.patch(f"{self.URL}{parceiro.pk}/", {"nome_fantasia": "Novo"},
+                                          content_type="application/json")
+        self.assertEqual(metodos, ["PUT"])
+        self.assertEqual((await Parceiro.objects.aget(pk=parceiro.pk)).nome_fantasia, "Novo")
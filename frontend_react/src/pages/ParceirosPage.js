@@ -1,25 +1,34 @@
 // Conteúdo para: frontend_react/src/pages/ParceirosPage.js
 // (Este é o código do react_django/src/pages/ParceirosPage.js)
 
-import React, { useState, useEffect } from 'react';
-import { getParceiros, createParceiro } from '../services/api';
+import React, { useState, useEffect, useRef } from 'react';
+import { getParceiros, createParceiro, novaChaveIdempotencia } from '../services/api';
+
+// Só os campos exibidos na tabela (a API devolve apenas essas colunas)
+const CAMPOS_TABELA = 'id,nome_fantasia,email_gestor,tipo,senha_definida';
 
 function ParceirosPage() {
   // 1. "Estado" do React. Substitui as variáveis do template.
   const [parceiros, setParceiros] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [proximaPagina, setProximaPagina] = useState(null); // URL do cursor `next`
+  // Chave de idempotência do envio em curso: a mesma em todas as tentativas
+  const chaveEnvio = useRef(null);
   
-  // 2. Busca os dados quando o componente é montado
+  // 2. Busca a primeira página quando o componente é montado
   useEffect(() => {
     fetchParceiros();
   }, []);
 
-  const fetchParceiros = async () => {
+  // Sem `cursorUrl` recomeça da primeira página; com ele, acrescenta a próxima
+  const fetchParceiros = async (cursorUrl = null) => {
     try {
       setLoading(true);
-      const response = await getParceiros();
-      setParceiros(response.data); // Coloca os dados da API no "estado"
+      const response = await getParceiros({ fields: CAMPOS_TABELA }, cursorUrl);
+      const { results, next } = response.data;
+      setParceiros((atuais) => (cursorUrl ? [...atuais, ...results] : results));
+      setProximaPagina(next);
       setError(null);
     } catch (err) {
       setError('Falha ao buscar parceiros.');
@@ -32,11 +41,19 @@ function ParceirosPage() {
   const handleCreate = async (formData) => {
     // Esta função é um exemplo, você precisará de um formulário
     // para coletar o 'formData'
+    if (!chaveEnvio.current) {
+        chaveEnvio.current = novaChaveIdempotencia();
+    }
     try {
-        // await createParceiro(formData);
+        // await createParceiro(formData, false, chaveEnvio.current);
+        // chaveEnvio.current = null; // Cadastro concluído: o próximo envio usa outra chave
         // fetchParceiros(); // Atualiza a lista!
         alert('Funcionalidade de Criar Parceiro ainda não implementada no form de React.');
     } catch (err) {
+        // Só timeout, falha de rede e 5xx repetem a chave; as demais respostas encerram o envio
+        if (err.response && err.response.status < 500) {
+            chaveEnvio.current = null;
+        }
         alert('Erro ao criar parceiro: ' + err.response?.data?.detail);
     }
   };
@@ -85,6 +102,10 @@ function ParceirosPage() {
           ))}
         </tbody>
       </table>
+
+      {proximaPagina && !loading && (
+        <button onClick={() => fetchParceiros(proximaPagina)}>Carregar mais</button>
+      )}
     </div>
   );
 }
@@ -11,7 +11,33 @@ const api = axios.create({
 });
 
 // Funções que nosso app React irá chamar
-export const getParceiros = () => api.get('/parceiros/');
-export const createParceiro = (parceiroData) => api.post('/parceiros/', parceiroData);
+// A listagem é paginada por cursor: a resposta traz { next, previous, results }.
+// `params` aceita os filtros (tipo, senha_definida, search...) e `fields`;
+// para as páginas seguintes basta passar a URL `next` recebida em `cursorUrl`.
+export const getParceiros = (params = {}, cursorUrl = null) =>
+  cursorUrl ? api.get(cursorUrl) : api.get('/parceiros/', { params });
+// Autocomplete: parceiros ativos que começam com as palavras de `q` (sem acentos)
+export const autocompleteParceiros = (q, limit = 10) =>
+  api.get('/parceiros/autocomplete/', { params: { q, limit } });
+// Sincronização incremental: guarde o `cursor` da resposta e chame de novo
+// enquanto `mais` for true. Cada item é GRAVADO (com `dados`) ou REMOVIDO.
+export const getParceirosAlteracoes = (since = 0, params = {}) =>
+  api.get('/parceiros/changes/', { params: { ...params, since } });
+// Relatório de possíveis duplicados: { grupos: [{ parceiros, pares }], ... }
+export const getParceirosDuplicados = (limiar) =>
+  api.get('/parceiros/duplicados/', { params: limiar ? { limiar } : {} });
+// Responde 409 com `duplicados` quando a empresa parece já cadastrada;
+// confirme com o usuário e reenvie com ignorarDuplicados = true.
+// Gere a `chaveIdempotencia` uma vez por envio do formulário (novaChaveIdempotencia)
+// e repita a mesma nas novas tentativas: o backend devolve a resposta da primeira
+// tentativa em vez de cadastrar de novo. Uma chave nova equivale a um novo cadastro:
+// gere outra depois de qualquer resposta abaixo de 500 (inclusive o 409 de
+// duplicados, cujo reenvio com ignorarDuplicados muda a URL).
+export const novaChaveIdempotencia = () => crypto.randomUUID();
+export const createParceiro = (parceiroData, ignorarDuplicados, chaveIdempotencia) =>
+  api.post('/parceiros/', parceiroData, {
+    params: ignorarDuplicados ? { ignorar_duplicados: true } : {},
+    headers: { 'Idempotency-Key': chaveIdempotencia },
+  });
 export const deleteParceiro = (id) => api.delete(`/parceiros/${id}/`);
 // etc.
\ No newline at end of file